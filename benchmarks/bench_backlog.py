@@ -0,0 +1,76 @@
+#### for running in vscode (comment out when on Raspberry Pi)
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+####
+
+# Drain a 10,000 entry transmit backlog through a link that always succeeds, comparing
+# GNSS.drain_backlog against the old recursive send_gnss_json pattern (one recursion,
+# isfile check and list.remove per entry). Files live in a temp directory.
+#   python benchmarks/bench_backlog.py [entries]
+
+import tempfile
+import time
+from src.gps import GNSS
+
+
+class InstantCell:
+    """Link that accepts every file immediately."""
+    def __init__(self):
+        self.sent = 0
+
+    def send_file(self, path):
+        self.sent += 1
+        return True
+
+
+def make_backlog(gnss, n):
+    for utc_id in range(n):
+        with open(os.path.join(gnss.logs_dir, f"gnss_{utc_id}.json"), "w") as f:
+            f.write('{"f":[{"utc":%d}]}' % utc_id)
+    gnss.transmit_backlog = list(range(n))
+
+
+def legacy_drain(gnss, cell):
+    # the shape of the old send_gnss_json: send oldest, list.remove, recurse while time remains
+    if not gnss.transmit_backlog:
+        return True
+    oldest = gnss.transmit_backlog[0]
+    path = os.path.join(gnss.logs_dir, f"gnss_{oldest}.json")
+    if os.path.isfile(path) and cell.send_file(path):
+        os.remove(path)
+        gnss.transmit_backlog.remove(oldest)
+    return legacy_drain(gnss, cell)
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+    print(f"backlog: {n} entries, recursion limit {sys.getrecursionlimit()}")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        gnss = GNSS()
+        gnss.logs_dir = tmp
+        make_backlog(gnss, n)
+        cell = InstantCell()
+        start = time.perf_counter()
+        try:
+            legacy_drain(gnss, cell)
+            outcome = "ok"
+        except RecursionError:
+            outcome = "RecursionError"
+        elapsed = time.perf_counter() - start
+        print(f"recursive  {outcome:15s} sent {cell.sent:6d} in {elapsed:7.3f} s, "
+              f"{len(gnss.transmit_backlog)} left")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        gnss = GNSS()
+        gnss.logs_dir = tmp
+        make_backlog(gnss, n)
+        cell = InstantCell()
+        result = gnss.drain_backlog(cell, time_budget=float('inf'))
+        print(f"drain      {'ok':15s} sent {result['sent']:6d} in {result['time_used']:7.3f} s, "
+              f"{result['remaining']} left ({result['time_used'] / max(1, result['sent']) * 1e6:.1f} us/entry)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+#### for running in vscode (comment out when on Raspberry Pi)
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+####
+
+# Transmit backlog bookkeeping at 50,000 pending batches: the old list (`in` + isfile per add,
+# list.remove per send) against BacklogIndex, boot recovery from the logs directory with a
+# current, stale and missing backlog.txt, and a full drain. Files live in a temp directory.
+#   python benchmarks/bench_backlog_index.py [entries]
+
+import json
+import tempfile
+import time
+from src.gps import GNSS
+from src.backlogindex import BacklogIndex
+
+SAMPLE = 1000  # operations timed at full depth for the per-operation costs
+
+
+class InstantCell:
+    """Link that accepts every file immediately."""
+    def send_file(self, path):
+        return True
+
+
+def timed(fn, repeat=1):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        result = fn()
+    return (time.perf_counter() - start) / repeat, result
+
+
+def fill(gnss, n):
+    """Write n batch files through create_gnss_json and queue them; returns the write time."""
+    start = time.perf_counter()
+    for utc_id in range(1, n + 1):
+        gnss.create_gnss_json({"f": [{"utc": utc_id, "lat": -34.1394, "lon": 18.3927}]}, unique_id=utc_id)
+        gnss.add_to_transmit_backlog(utc_id)
+    return time.perf_counter() - start
+
+
+def per_op_costs(gnss, n):
+    ids = gnss.transmit_backlog.ids()
+    legacy = list(ids[:-SAMPLE])
+    index = BacklogIndex(ids[:-SAMPLE])
+    tail = ids[-SAMPLE:]
+
+    def legacy_add():
+        for utc_id in tail:
+            if utc_id not in legacy and os.path.isfile(os.path.join(gnss.logs_dir, f"gnss_{utc_id}.json")):
+                legacy.append(utc_id)
+
+    def index_add():
+        for utc_id in tail:
+            if utc_id not in index:
+                index.add(utc_id)
+
+    add_legacy, _ = timed(legacy_add)
+    add_index, _ = timed(index_add)
+    # the sent batch is not always the oldest (bundles ack out of order): remove from the middle
+    middle = ids[n // 2:n // 2 + SAMPLE]
+    remove_legacy, _ = timed(lambda: [legacy.remove(utc_id) for utc_id in middle])
+    remove_index, _ = timed(lambda: [index.discard(utc_id) for utc_id in middle])
+    print(f"add (check + queue) at {n} deep   list {add_legacy / SAMPLE * 1e6:8.1f} us/op   "
+          f"index {add_index / SAMPLE * 1e6:6.2f} us/op")
+    print(f"remove at {n} deep             list {remove_legacy / SAMPLE * 1e6:8.1f} us/op   "
+          f"index {remove_index / SAMPLE * 1e6:6.2f} us/op")
+
+
+def recovery(gnss, n):
+    path = os.path.join(gnss.logs_dir, 'backlog.txt')
+    gnss.update_backlog_file(gnss.transmit_backlog)
+
+    def old_boot():
+        with open(path, 'r') as f:
+            rows = json.load(f)["b"]
+        return [row[0] for row in rows]  # trusted as is, never checked against the files
+
+    t_old, _ = timed(old_boot, 3)
+    t_persisted, (index, how) = timed(lambda: BacklogIndex.recover(gnss.logs_dir, path), 3)
+    assert how == "persisted" and len(index) == n
+    # stale: one batch sent after the last save
+    os.remove(os.path.join(gnss.logs_dir, "gnss_1.json"))
+    t_stale, (index, how) = timed(lambda: BacklogIndex.recover(gnss.logs_dir, path), 3)
+    assert how == "rebuilt" and len(index) == n - 1
+    os.rename(path, path + '.bak')
+    t_scanned, (index, how) = timed(lambda: BacklogIndex.recover(gnss.logs_dir, path), 3)
+    assert how == "scanned" and len(index) == n - 1
+    os.rename(path + '.bak', path)
+    t_save, _ = timed(lambda: index.save(path))
+    print(f"boot: load backlog.txt only (old) {t_old * 1e3:7.1f} ms   recover persisted {t_persisted * 1e3:7.1f} ms   "
+          f"stale {t_stale * 1e3:7.1f} ms   no index {t_scanned * 1e3:7.1f} ms   save {t_save * 1e3:6.1f} ms")
+    gnss.transmit_backlog = index
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 50000
+    print(f"backlog: {n} pending batches")
+    with tempfile.TemporaryDirectory() as tmp:
+        gnss = GNSS()
+        gnss.logs_dir = tmp
+        written = fill(gnss, n)
+        print(f"write + queue {n} batches: {written:.2f} s")
+        per_op_costs(gnss, n)
+        recovery(gnss, n)
+        result = gnss.drain_backlog(InstantCell(), time_budget=float('inf'))
+        print(f"drain: sent {result['sent']} in {result['time_used']:.2f} s "
+              f"({result['time_used'] / max(1, result['sent']) * 1e6:.1f} us/entry incl. file delete), "
+              f"{result['remaining']} left")
+
+
+if __name__ == "__main__":
+    main()
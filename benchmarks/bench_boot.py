@@ -0,0 +1,104 @@
+#### for running in vscode (comment out when on Raspberry Pi)
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+####
+
+# Cold start pieces: module imports in a fresh interpreter (everything main.py used to import
+# up front vs the boot path now), YAML parse vs the cached config, GNSS.boot on the simulated
+# UART module (every setting written vs FAST_BOOT read-back), and cellular connection set-up
+# against a local ingest server (handshake modelled by its connect_delay), one after the other
+# vs overlapped with the GNSS boot, up to the first upload answered.
+#   python benchmarks/bench_boot.py [connect_delay_s]
+
+import statistics
+import subprocess
+import tempfile
+import threading
+import time
+from src.startup import load_config
+from src.gps import GNSS
+from src.DFRobot_GNSS import DFRobot_GNSS_UART
+from src.fake_serial import FakeGNSSSerial
+from src.fake_ingest import FakeIngestServer
+from src.cellular import Cellular
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+CONFIG_PATH = os.path.join(ROOT, 'configs', 'config.yaml')
+EAGER = "import yaml, ssl, src.gps, src.cellular, src.simplify, src.transmit, src.batchcontrol, src.replay"
+LAZY = "import src.startup, src.gps, src.cellular"
+
+
+def cold_import(statement, runs=7):
+    times = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, "-c", statement], cwd=ROOT, check=True)
+        times.append(time.perf_counter() - start)
+    return statistics.median(times)
+
+
+def boot_gnss(logs_dir, fast):
+    gnss = GNSS()
+    gnss.logs_dir = logs_dir
+    gnss.gnss = DFRobot_GNSS_UART(9600, ser=FakeGNSSSerial(latency=0.002))
+    gnss.gnss.rgb_on()  # the state a module is left in by the previous run
+    start = time.perf_counter()
+    gnss.boot(fast=fast)
+    return time.perf_counter() - start, gnss.boot_stats
+
+
+def start_cellular(url):
+    cell = Cellular(endpoint=url)
+    cell.warm_up()
+    return cell
+
+
+def main():
+    connect_delay = float(sys.argv[1]) if len(sys.argv) > 1 else 0.6
+    print(f"cold import (fresh interpreter, median): everything up front {cold_import(EAGER) * 1e3:6.0f} ms   "
+          f"boot path {cold_import(LAZY) * 1e3:6.0f} ms   (bare interpreter {cold_import('pass') * 1e3:4.0f} ms)")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = os.path.join(tmp, 'config_cache.json')
+        import yaml
+        start = time.perf_counter()
+        with open(CONFIG_PATH, 'r') as f:
+            yaml.safe_load(f)
+        t_yaml = time.perf_counter() - start
+        load_config(CONFIG_PATH, cache)
+        start = time.perf_counter()
+        _, cached = load_config(CONFIG_PATH, cache)
+        t_cache = time.perf_counter() - start
+        assert cached
+        print(f"config: yaml.safe_load {t_yaml * 1e3:6.1f} ms   cached {t_cache * 1e3:5.2f} ms")
+
+        t_full, stats_full = boot_gnss(tmp, fast=False)
+        t_fast, stats_fast = boot_gnss(tmp, fast=True)
+        print(f"GNSS.boot (9600 baud module): write all {t_full * 1e3:5.0f} ms ({stats_full['device_writes']} writes)   "
+              f"fast {t_fast * 1e3:5.0f} ms ({stats_fast['device_writes']} writes)")
+
+        with FakeIngestServer(connect_delay=connect_delay) as server:
+            # one after the other: the cellular connection is set up after the GNSS boot
+            start = time.perf_counter()
+            boot_gnss(tmp, fast=True)
+            cell = start_cellular(server.url)
+            assert cell.session.post(b'{"f":[]}') is not None
+            t_serial = time.perf_counter() - start
+            cell.close()
+            # overlapped: connection set-up in a thread while the GNSS boots
+            start = time.perf_counter()
+            box = {}
+            thread = threading.Thread(target=lambda: box.update(cell=start_cellular(server.url)))
+            thread.start()
+            boot_gnss(tmp, fast=True)
+            thread.join()
+            assert box['cell'].session.post(b'{"f":[]}') is not None
+            t_overlap = time.perf_counter() - start
+            box['cell'].close()
+        print(f"GNSS boot to first upload ({connect_delay:g} s handshake): sequential {t_serial * 1e3:5.0f} ms   "
+              f"overlapped {t_overlap * 1e3:5.0f} ms")
+
+
+if __name__ == "__main__":
+    main()
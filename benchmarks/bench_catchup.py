@@ -0,0 +1,73 @@
+#### for running in vscode (comment out when on Raspberry Pi)
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+####
+
+# Catch-up after a cellular outage: the backlog built up during `minutes` of no coverage
+# (one batch per GNSS_SEND_BATCH_SIZE * GNSS_SEARCH_RATE seconds) is drained through a
+# simulated link with a fixed round trip per upload plus transfer time, once with one file
+# per upload and once with bundles. Time is simulated, so the numbers are link time only.
+#   python benchmarks/bench_catchup.py [minutes] [rtt_s] [kbit_s]
+
+import tempfile
+from src.gps import GNSS
+from src.cellular import build_bundle, BUNDLE_MAX_BYTES
+from src.fake_clock import FakeClock
+
+
+class SimCell:
+    """Link where every upload costs one round trip plus its bytes at `kbit_s`."""
+    def __init__(self, clock, rtt, kbit_s, bundle_max_bytes):
+        self.clock = clock
+        self.rtt = rtt
+        self.bytes_per_s = kbit_s * 1000 / 8
+        self.bundle_max_bytes = bundle_max_bytes
+        self.uploads = 0
+        self.payload_bytes = 0
+
+    def _upload(self, size):
+        self.uploads += 1
+        self.payload_bytes += size
+        self.clock.t += self.rtt + size / self.bytes_per_s
+
+    def send_file(self, path):
+        self._upload(os.path.getsize(path))
+        return True
+
+    def send_bundle(self, batches):
+        self._upload(len(build_bundle(batches)))
+        return [i for i, _ in batches]
+
+
+def run(minutes, rtt, kbit_s, bundle_max_bytes):
+    with tempfile.TemporaryDirectory() as tmp:
+        gnss = GNSS(search_rate=2)
+        gnss.logs_dir = tmp
+        utc = 1756813036
+        for i in range(int(minutes * 60 / (2 * 5))):
+            batch = {"f": [{"utc": utc + 2 * j, "lat": -34.139425, "lon": 18.39277, "alt": 30.8, "sog": 12.5,
+                            "cog": 57.4, "fx": 1, "hdop": 0.7, "nsat": 18} for j in range(5)]}
+            gnss.create_gnss_json(batch, unique_id=utc)
+            gnss.transmit_backlog.append(utc)
+            utc += 10
+        n = len(gnss.transmit_backlog)
+        clock = FakeClock(0.0)
+        cell = SimCell(clock, rtt, kbit_s, bundle_max_bytes)
+        result = gnss.drain_backlog(cell, time_budget=float('inf'), clock=clock)
+        return n, result, cell
+
+
+def main():
+    minutes = float(sys.argv[1]) if len(sys.argv) > 1 else 5
+    rtt = float(sys.argv[2]) if len(sys.argv) > 2 else 0.5
+    kbit_s = float(sys.argv[3]) if len(sys.argv) > 3 else 100
+    print(f"outage {minutes:g} min, rtt {rtt:g} s, {kbit_s:g} kbit/s")
+    for label, limit in (("per file", 0), (f"bundles {BUNDLE_MAX_BYTES // 1024} KiB", BUNDLE_MAX_BYTES)):
+        n, result, cell = run(minutes, rtt, kbit_s, limit)
+        print(f"{label:16s} {result['sent']:4d}/{n} batches in {cell.uploads:4d} uploads, "
+              f"{cell.payload_bytes:7d} B, {result['time_used']:7.1f} s link time")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+#### for running in vscode (comment out when on Raspberry Pi)
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+####
+
+# Bytes on the wire and latency per fix of the two GNSS_FIX_SOURCE modes, against a fake
+# serial device that models the module turnaround and the UART wire time:
+#   nmea        GNSS.read_gnss_dict on the NMEA dump (latch delay, length, 250 byte blocks)
+#   getters     the eight DFRobot getters one after the other (one request per field group)
+#   registers   one fix register block read + decode (no cross-checks)
+#   regs+check  registers with the NMEA cross-check every 30 reads (the config default)
+# then the decode cost alone (no I/O): NMEA framing + parsing against the register decode.
+#   python benchmarks/bench_fix_source.py [reads]
+
+import time
+import timeit
+from src import nmea
+from src.DFRobot_GNSS import DFRobot_GNSS_UART
+from src.fake_serial import FakeGNSSSerial
+from src.gps import GNSS, TEST_GNSS_DATA
+from src.regfix import decode_fix_registers
+
+CROSSCHECK = 30
+
+
+def getters(dev):
+    dev.get_date()
+    dev.get_utc()
+    dev.get_lat()
+    dev.get_lon()
+    dev.get_num_sta_used()
+    dev.get_alt()
+    dev.get_sog()
+    dev.get_cog()
+
+
+def run(name, ser, fn, reads):
+    ser.requests = ser.bytes_in = ser.bytes_out = 0
+    start = time.perf_counter()
+    for _ in range(reads):
+        fn()
+    ms = (time.perf_counter() - start) / reads * 1e3
+    print(f"  {name:10s} {ms:8.1f} ms/fix  {ser.requests / reads:5.1f} requests  "
+          f"{ser.bytes_in / reads:7.1f} B in  {ser.bytes_out / reads:5.1f} B out")
+    return ms
+
+
+def main():
+    reads = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    for baud in (9600, 115200):
+        print(f"{len(TEST_GNSS_DATA)} byte NMEA dump @ {baud} baud")
+        ser = FakeGNSSSerial(bytes(TEST_GNSS_DATA), baudrate=baud)
+        dev = DFRobot_GNSS_UART(baud, ser=ser)
+        gnss = GNSS(device=dev)
+        nmea_ms = run("nmea", ser, gnss.read_gnss_dict, reads)
+        run("getters", ser, lambda: getters(dev), reads)
+        gnss.use_register_fixes(crosscheck_every=0)
+        reg_ms = run("registers", ser, gnss.read_gnss_dict, max(reads, 10))
+        gnss.use_register_fixes(crosscheck_every=CROSSCHECK)
+        check_ms = run("regs+check", ser, gnss.read_gnss_dict, CROSSCHECK)
+        print(f"  registers {nmea_ms / reg_ms:.0f}x faster per fix, {nmea_ms / check_ms:.0f}x with cross-checks")
+
+    n = 20000
+    regs = bytes(DFRobot_GNSS_UART(1_000_000, ser=FakeGNSSSerial(bytes(TEST_GNSS_DATA))).get_fix_registers())
+
+    def parse_dump():
+        rmc, gga = nmea.latest_rmc_gga(nmea.NMEAFramer(types=(nmea.RMC, nmea.GGA)).feed(TEST_GNSS_DATA), verified=True)
+        nmea.parse_rmc(rmc)
+        nmea.parse_gga(gga)
+
+    parse_us = timeit.timeit(parse_dump, number=n) / n * 1e6
+    decode_us = timeit.timeit(lambda: decode_fix_registers(regs), number=n) / n * 1e6
+    print(f"decode only: NMEA {parse_us:.1f} us/fix, registers {decode_us:.1f} us/fix ({parse_us / decode_us:.0f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+#### for running in vscode (comment out when on Raspberry Pi)
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+####
+
+# Payload size and encode/decode time of the binary delta/varint batch format against the
+# compact JSON that create_gnss_json sends today (compress_gnss_dict(scaled=False)) and the
+# scaled-integer JSON variant, for 5, 50 and 500 fix batches.
+#   python benchmarks/bench_fixcodec.py [repeats]
+
+import json
+import time
+import zlib
+from src import fixcodec
+from src.gps import GNSS
+from benchmarks.fixtures import track
+
+
+def bench(fn, arg, repeats):
+    fn(arg)  # warm up
+    start = time.perf_counter()
+    for _ in range(repeats):
+        fn(arg)
+    return (time.perf_counter() - start) / repeats * 1e6
+
+
+def main():
+    repeats = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    gnss = GNSS()
+
+    def json_float(batch):
+        return json.dumps(gnss.compress_gnss_dict(batch, scaled=False), separators=(',', ':')).encode()
+
+    def json_scaled(batch):
+        return json.dumps(gnss.compress_gnss_dict(batch, scaled=True), separators=(',', ':')).encode()
+
+    def binary(batch):
+        return fixcodec.encode_batch(batch['f'])
+
+    print(f"{'fixes':>5s} {'format':12s} {'bytes':>7s} {'B/fix':>6s} {'zlib':>7s} {'enc us':>9s} {'dec us':>9s}")
+    for n in (5, 50, 500):
+        batch = {'f': track(n)}
+        for name, enc, dec in (("json", json_float, json.loads),
+                               ("json scaled", json_scaled, json.loads),
+                               ("binary", binary, fixcodec.decode_batch)):
+            data = enc(batch)
+            enc_us = bench(enc, batch, max(1, repeats * 5 // n))
+            dec_us = bench(dec, data, max(1, repeats * 5 // n))
+            print(f"{n:5d} {name:12s} {len(data):7d} {len(data) / n:6.1f} {len(zlib.compress(data, 9)):7d} "
+                  f"{enc_us:9.1f} {dec_us:9.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+#### for running in vscode (comment out when on Raspberry Pi)
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+####
+
+# Time one full NMEA dump acquisition (DFRobot_GNSS.get_all_gnss) against a fake
+# serial device that models the module turnaround and the UART wire time.
+#   python benchmarks/bench_gnss_read.py [dump_bytes]
+
+import time
+from src.DFRobot_GNSS import DFRobot_GNSS_UART, I2C_START_GET, I2C_DATA_LEN_H, I2C_ALL_DATA
+from src.fake_serial import FakeGNSSSerial
+from src.gps import TEST_GNSS_DATA
+
+
+def legacy_read_reg(ser, reg, length):
+    # the original UART read_reg: fixed 50 ms sleep, then take whatever has arrived
+    ser.write([reg & 0x7F, length])
+    time.sleep(0.05)
+    timenow = time.time()
+    while (time.time() - timenow) <= 1:
+        count = ser.inWaiting()
+        if count != 0:
+            recv = ser.read(count)
+            ser.flushInput()
+            return list(recv)
+    return [0] * length
+
+
+def legacy_get_all_gnss(ser):
+    # the original get_all_gnss: 0.1 s settle, another 0.1 s, then 32 byte reads
+    ser.write([I2C_START_GET | 0x80, 0x55])
+    time.sleep(0.1)
+    rslt = legacy_read_reg(ser, I2C_DATA_LEN_H, 2)
+    length = rslt[0] * 256 + rslt[1]
+    time.sleep(0.1)
+    all_data = [0] * (length + 1)
+    len1 = length // 32
+    len2 = length % 32
+    for num in range(0, len1 + 1):
+        n = len2 if num == len1 else 32
+        rslt = legacy_read_reg(ser, I2C_ALL_DATA, n)
+        all_data[num * 32:] = [0x0A if b == 0 else b for b in rslt]
+    return all_data
+
+
+def run(name, fn, ser):
+    ser.requests = 0
+    start = time.perf_counter()
+    data = fn()
+    elapsed = time.perf_counter() - start
+    print(f"  {name:7s} {elapsed * 1000:8.1f} ms  {ser.requests:3d} requests  {len(data)} bytes")
+    return elapsed
+
+
+def main():
+    size = int(sys.argv[1]) if len(sys.argv) > 1 else 1300
+    dump = (bytes(TEST_GNSS_DATA) * (size // len(TEST_GNSS_DATA) + 1))[:size]
+    for baud in (9600, 115200):
+        print(f"{size} byte dump @ {baud} baud (wire time {size * 10.0 / baud * 1000:.0f} ms)")
+        ser = FakeGNSSSerial(dump, baudrate=baud)
+        old = run("legacy", lambda: legacy_get_all_gnss(ser), ser)
+        dev = DFRobot_GNSS_UART(baud, ser=ser)
+        new = run("bulk", dev.get_all_gnss, ser)
+        print(f"  speedup {old / new:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
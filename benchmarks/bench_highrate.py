@@ -0,0 +1,85 @@
+#### for running in vscode (comment out when on Raspberry Pi)
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+####
+
+# High-rate mode (src/highrate.py) pinned to one core:
+#   sustained - the acquisition thread against a simulated 10 Hz receiver in real time for
+#               `seconds`, while the main thread runs a 1 s loop taking the decimated fixes:
+#               achieved fix rate, fixes lost or read twice, track bytes and CPU share.
+#   headroom  - poll() back to back over pre-generated 10 Hz epochs (parse, ring, decimate,
+#               track write every 10 fixes) with a simulated clock: cost per fix and the
+#               highest rate one core could keep up with.
+#   python benchmarks/bench_highrate.py [seconds] [hz]
+
+import tempfile
+import time
+from src.fixlog import FixLog
+from src.highrate import HighRateTracker, Decimator, TRACK_HEADER
+from src.fake_nmea_stream import FakeNMEAStream
+
+
+def pin_one_core():
+    try:
+        os.sched_setaffinity(0, {min(os.sched_getaffinity(0))})
+        return True
+    except (AttributeError, OSError):
+        return False
+
+
+def sustained(tmp, seconds, hz):
+    source = FakeNMEAStream(hz=hz, filler=3)
+    track = FixLog(os.path.join(tmp, 'track.csv'), header=TRACK_HEADER, compress=False)
+    tracker = HighRateTracker(source.get_all_gnss, hz=hz, ring_size=int(hz * 600), track=track,
+                              decimator=Decimator(interval=1.0))
+    cpu0, start = time.process_time(), time.monotonic()
+    tracker.start()
+    uplink = 0
+    while time.monotonic() - start < seconds:
+        time.sleep(1.0)  # the main loop at GNSS_SEARCH_RATE 1 s
+        uplink += len(tracker.take_uplink())
+    tracker.stop()
+    elapsed, cpu = time.monotonic() - start, time.process_time() - cpu0
+    track.close()
+    stats = tracker.stats()
+    expected = source.epoch
+    print(f"sustained {hz:g} Hz for {elapsed:.1f} s: {stats['fixes']} of {expected} epochs kept "
+          f"({stats['fixes'] / elapsed:.2f} fixes/s), lost {stats['lost'] + source.overflowed}, "
+          f"duplicates {stats['duplicates']}, {uplink} sent after decimation, poll overruns {stats['overruns']}")
+    print(f"   poll {stats['poll_us_mean']:.0f} us mean / {stats['poll_us_max']:.0f} us max, CPU {cpu / elapsed * 100:.1f}% of one core "
+          f"(includes the simulated receiver), track {track.bytes / elapsed / 1024:.1f} KiB/s in {track.blocks} writes")
+
+
+def headroom(tmp, hz, fixes=20000):
+    stream = FakeNMEAStream(hz=hz)
+    chunks = [stream.epoch_sentences(n) for n in range(fixes)]
+    now = [0.0]
+    feed = iter(chunks)
+    track = FixLog(os.path.join(tmp, 'headroom.csv'), header=TRACK_HEADER, compress=False, max_bytes=None,
+                   rotate_daily=False)
+    tracker = HighRateTracker(lambda: next(feed), hz=hz, ring_size=6000, track=track, flush_interval=1.0,
+                              clock=lambda: now[0])
+    start = time.perf_counter()
+    for _ in range(fixes):
+        tracker.poll()
+        now[0] += 1.0 / hz
+    tracker.flush()
+    per_fix = (time.perf_counter() - start) / fixes
+    track.close()
+    print(f"headroom: {per_fix * 1e6:.0f} us per fix (read excluded) -> up to {1 / per_fix:,.0f} fixes/s on one core, "
+          f"{hz * per_fix * 100:.2f}% of a core at {hz:g} Hz; {tracker.stats()['fixes']} fixes, "
+          f"{track.blocks} track writes")
+
+
+def main():
+    seconds = float(sys.argv[1]) if len(sys.argv) > 1 else 10.0
+    hz = float(sys.argv[2]) if len(sys.argv) > 2 else 10.0
+    print(f"pinned to one core: {pin_one_core()}")
+    with tempfile.TemporaryDirectory() as tmp:
+        headroom(tmp, hz)
+        sustained(tmp, seconds, hz)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,244 @@
+#### for running in vscode (comment out when on Raspberry Pi)
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+####
+
+# Per-operation latency and allocation profile of the main loop hot path, on hours of
+# replayed 1 Hz dumps (see fixtures.py), an in-memory GNSS device and a fake Cellular.
+# Results are written as JSON so runs can be compared:
+#   python benchmarks/bench_hotpath.py [--hours 1] [--store files|segments] [--fix-log flush|fsync|batch] [--out FILE]
+#   python benchmarks/bench_hotpath.py --compare benchmarks/results/OLD.json
+#
+# Each operation is timed over every call (time.perf_counter_ns, tracemalloc off), then run
+# again from fresh state under tracemalloc for the first --alloc-samples calls to get the
+# transient peak and the retained bytes per call.
+
+import argparse
+import contextlib
+import json
+import platform
+import subprocess
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+from src.gps import GNSS
+
+sys.path.insert(0, os.path.dirname(__file__))
+from fixtures import synth_dumps
+
+RESULTS_DIR = os.path.join(os.path.dirname(__file__), 'results')
+
+
+class ReplayDevice:
+    """Stands in for DFRobot_GNSS: every get_all_gnss() returns the next dump as a list of ints."""
+    def __init__(self, dumps):
+        self.dumps = dumps
+        self.i = 0
+
+    def get_all_gnss(self):
+        dump = self.dumps[self.i % len(self.dumps)]
+        self.i += 1
+        return list(dump)
+
+
+class FakeCell:
+    """Cellular without the modem: reads the file like Cellular.send_file and returns `up`."""
+    def __init__(self, up=True):
+        self.up = up
+
+    def send_file(self, path):
+        with open(path, 'r') as f:
+            f.read()
+        return self.up
+
+
+def percentile(sorted_values, q):
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0
+    k = max(0, min(len(sorted_values) - 1, int(round(q / 100 * len(sorted_values) + 0.5)) - 1))
+    return sorted_values[k]
+
+
+class Scenario:
+    """Fresh GNSS + temp logs dir per run, so the timing and allocation passes start alike."""
+    def __init__(self, args, dumps):
+        self.args = args
+        self.dumps = dumps
+        self.tmp = tempfile.TemporaryDirectory()
+        self.gnss = GNSS(search_rate=args.search_rate)
+        self.gnss.logs_dir = self.tmp.name
+        self.gnss.gnss = ReplayDevice(dumps)
+        if args.store == 'segments':
+            self.gnss.use_segment_queue(segment_bytes=args.segment_bytes)
+        self.gnss.open_fix_log(mode=args.fix_log)
+        # decoded fixes and batches as inputs for the later stages (not timed)
+        parser = GNSS(search_rate=args.search_rate)
+        parser.gnss = ReplayDevice(dumps)
+        self.fixes = [parser.read_gnss_dict(test_mode=False) for _ in dumps]
+        b = args.batch
+        self.batches = [{'f': self.fixes[i:i + b]} for i in range(0, len(self.fixes) - b + 1, b)]
+
+    def close(self):
+        self.gnss.fix_log.close()
+        if self.gnss.queue is not None:
+            self.gnss.queue.close()
+        self.tmp.cleanup()
+
+    def ops(self):
+        """(name, calls) pairs; `calls` is a list of zero-argument callables run in order."""
+        g = self.gnss
+        compact = self.args.compact
+        n_b = len(self.batches)
+        ids = list(range(1, n_b + 1))
+        ok, down = FakeCell(True), FakeCell(False)
+        json_paths = {}
+
+        def create(i):
+            json_paths[i] = g.create_gnss_json(self.batches[i], unique_id=ids[i], compact=compact)
+
+        def send_ok(i):
+            g.create_gnss_json(self.batches[i], unique_id=ids[i], compact=compact)
+            # last_gnss_time in the past: no retry budget, one attempt like a busy interval
+            g.send_gnss_json(ids[i], ok, last_gnss_time=0.0)
+
+        def send_down(i):
+            g.create_gnss_json(self.batches[i], unique_id=ids[i], compact=compact)
+            g.send_gnss_json(ids[i], down, last_gnss_time=0.0)
+
+        def drain_one():
+            g.drain_backlog(ok, time_budget=0)  # exactly one send per call
+
+        decompress = []
+        if g.queue is None and compact:  # decompress_gnss_json reads the compact (array) files
+            decompress = [('decompress_gnss_json', [lambda i=i: g.decompress_gnss_json(json_paths[i], scaled=False)
+                                                    for i in range(n_b)])]
+        return [
+            ('get_gnss_dict', [lambda: g.get_gnss_dict(test_mode=False)] * len(self.dumps)),
+            ('append_gnss_to_log', [lambda f=f: g.append_gnss_to_log(f) for f in self.fixes]),
+            ('compress_gnss_dict', [lambda b=b: g.compress_gnss_dict(b, scaled=False) for b in self.batches]),
+            ('create_gnss_json', [lambda i=i: create(i) for i in range(n_b)]),
+        ] + decompress + [
+            ('send_gnss_json_link_up', [lambda i=i: send_ok(i) for i in range(n_b)]),
+            ('send_gnss_json_outage', [lambda i=i: send_down(i) for i in range(n_b)]),
+            ('drain_backlog_per_entry', [drain_one] * n_b),
+        ]
+
+
+def run_timing(args, dumps):
+    scenario = Scenario(args, dumps)
+    results = {}
+    try:
+        for name, calls in scenario.ops():
+            samples = []
+            for call in calls:
+                t0 = time.perf_counter_ns()
+                call()
+                samples.append(time.perf_counter_ns() - t0)
+            samples.sort()
+            results[name] = {
+                'n': len(samples),
+                'mean_us': sum(samples) / len(samples) / 1e3,
+                'p50_us': percentile(samples, 50) / 1e3,
+                'p90_us': percentile(samples, 90) / 1e3,
+                'p99_us': percentile(samples, 99) / 1e3,
+                'max_us': samples[-1] / 1e3,
+            }
+    finally:
+        scenario.close()
+    return results
+
+
+def run_allocations(args, dumps, results):
+    scenario = Scenario(args, dumps)
+    tracemalloc.start()
+    try:
+        for name, calls in scenario.ops():
+            peaks, kept = [], []
+            for call in calls[:args.alloc_samples]:
+                before = tracemalloc.get_traced_memory()[0]
+                tracemalloc.reset_peak()
+                call()
+                current, peak = tracemalloc.get_traced_memory()
+                peaks.append(peak - before)
+                kept.append(current - before)
+            results[name].update({
+                'alloc_peak_bytes_mean': sum(peaks) / len(peaks),
+                'alloc_peak_bytes_max': max(peaks),
+                'alloc_retained_bytes_mean': sum(kept) / len(kept),
+            })
+    finally:
+        tracemalloc.stop()
+        scenario.close()
+
+
+def git_revision():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                              cwd=os.path.dirname(__file__), timeout=10).stdout.strip()
+    except Exception:
+        return ''
+
+
+def print_table(results, baseline=None):
+    head = f"{'operation':26s} {'n':>6s} {'p50 us':>9s} {'p90 us':>9s} {'p99 us':>9s} {'max us':>10s} {'peak B':>9s}"
+    print(head + ("  p50 vs base" if baseline else ""))
+    for name, r in results.items():
+        line = (f"{name:26s} {r['n']:6d} {r['p50_us']:9.1f} {r['p90_us']:9.1f} {r['p99_us']:9.1f} "
+                f"{r['max_us']:10.1f} {r.get('alloc_peak_bytes_mean', 0):9.0f}")
+        if baseline and name in baseline:
+            line += f"  {r['p50_us'] / max(baseline[name]['p50_us'], 1e-9):10.2f}x"
+        print(line)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--hours', type=float, default=1.0, help='hours of 1 Hz dumps to replay')
+    parser.add_argument('--batch', type=int, default=5, help='fixes per batch (GNSS_SEND_BATCH_SIZE)')
+    parser.add_argument('--search-rate', type=float, default=2)
+    parser.add_argument('--store', choices=('files', 'segments'), default='files', help='backlog store')
+    parser.add_argument('--segment-bytes', type=int, default=64 * 1024)
+    parser.add_argument('--fix-log', choices=('flush', 'fsync', 'batch'), default='flush', help='fix log durability')
+    parser.add_argument('--compact', type=int, default=1, help='SEND_COMPACT (1/0)')
+    parser.add_argument('--alloc-samples', type=int, default=200, help='calls per operation under tracemalloc')
+    parser.add_argument('--out', help='result file (default benchmarks/results/hotpath_<time>.json)')
+    parser.add_argument('--compare', help='earlier result file to compare p50 against')
+    args = parser.parse_args()
+    args.compact = bool(args.compact)
+
+    dumps = list(synth_dumps(int(args.hours * 3600)))
+    with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):  # the methods print a lot
+        results = run_timing(args, dumps)
+        run_allocations(args, dumps, results)
+
+    report = {
+        'meta': {
+            'time': datetime.now().isoformat(timespec='seconds'),
+            'git': git_revision(),
+            'python': platform.python_version(),
+            'machine': platform.machine(),
+            'platform': platform.platform(),
+            'args': vars(args),
+            'dumps': len(dumps),
+            'dump_bytes': sum(len(d) for d in dumps),
+        },
+        'ops': results,
+    }
+    out = args.out or os.path.join(RESULTS_DIR, f"hotpath_{datetime.now():%Y%m%d-%H%M%S}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(out)), exist_ok=True)
+    with open(out, 'w') as f:
+        json.dump(report, f, indent=2)
+
+    baseline = None
+    if args.compare:
+        with open(args.compare, 'r') as f:
+            baseline = json.load(f)['ops']
+    print(f"{len(dumps)} dumps ({args.hours:g} h), batch {args.batch}, store {args.store}")
+    print_table(results, baseline)
+    print(f"results: {out}")
+
+
+if __name__ == "__main__":
+    main()
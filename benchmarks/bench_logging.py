@@ -0,0 +1,124 @@
+#### for running in vscode (comment out when on Raspberry Pi)
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+####
+
+# Main loop latency with debug logging on vs off (src/runlog.py): the loop's work (read +
+# parse a synthetic one-second dump, log the fix, batch, every 5th fix serialize and
+# send_gnss_json over an instant simulated link, with the loop's own debug lines) per
+# iteration, mean and p99, for
+#   sync DEBUG   - every record written and flushed on the loop thread, like the old print()
+#                  redirect to logs/output.txt
+#   queued DEBUG - RunLog: records queued, written by the background writer
+#   queued INFO  - RunLog with the debug trace filtered out at the call
+# each on a plain file and on one whose flushes take sd_latency (an SD card under writeback).
+#   python benchmarks/bench_logging.py [iterations] [sd_latency_s]
+
+import logging
+import tempfile
+import time
+from benchmarks.fixtures import synth_dumps
+from src.gps import GNSS
+from src.cellular import Cellular
+from src.runlog import RunLog
+
+BATCH = 5
+log = logging.getLogger("bench")
+
+
+class DumpDevice:
+    """GNSS device stub serving the synthetic dumps in order (wrapping around)."""
+    def __init__(self, dumps):
+        self.dumps = [list(d) for d in dumps]
+        self.i = 0
+
+    def get_all_gnss(self):
+        dump = self.dumps[self.i % len(self.dumps)]
+        self.i += 1
+        return dump
+
+
+class SlowFile:
+    """Append-only file whose flush() stalls for `latency` seconds."""
+    def __init__(self, path, latency):
+        self.f = open(path, 'a')
+        self.latency = latency
+
+    def write(self, text):
+        return self.f.write(text)
+
+    def flush(self):
+        self.f.flush()
+        if self.latency:
+            time.sleep(self.latency)
+
+    def close(self):
+        self.f.close()
+
+
+def run(gnss, cell, iterations):
+    batch, count, times = {}, 0, []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        fix = gnss.get_gnss_dict()
+        gnss.check_sats(fix)
+        gnss.append_gnss_to_log(fix)
+        batch = gnss.append_gnss_dict_send(batch if count else {}, fix)
+        log.debug("gnss_count: %d", count)
+        log.debug("enter backlog empty")
+        if count >= BATCH - 1:
+            log.debug("reached batch size")
+            gnss.create_gnss_json(batch, unique_id=fix['utc'], compact=True)
+            empty = gnss.send_gnss_json(fix['utc'], cell, time.time())
+            log.debug("transmit_backlog_empty in main: %s", empty)
+            count = 0
+        else:
+            count += 1
+        times.append(time.perf_counter() - start)
+    times.sort()
+    return sum(times) / len(times), times[int(0.99 * (len(times) - 1))]
+
+
+def main():
+    iterations = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    sd_latency = float(sys.argv[2]) if len(sys.argv) > 2 else 0.001
+    dumps = list(synth_dumps(300))
+    root = logging.getLogger()
+    with tempfile.TemporaryDirectory() as tmp:
+        gnss = GNSS(device=DumpDevice(dumps))
+        gnss.logs_dir = tmp
+        gnss.open_fix_log()
+        cell = Cellular(bundle_max_bytes=0)
+        cell.test_send_delay = 0
+        cell.test_counter = 1600  # past the simulated outages: every send succeeds
+        for latency in (0.0, sd_latency):
+            for name in ("sync DEBUG", "queued DEBUG", "queued INFO"):
+                out = SlowFile(os.path.join(tmp, 'runtime.log'), latency)
+                handler = logging.StreamHandler(out)
+                run_log = None
+                if name.startswith("sync"):
+                    handler.setFormatter(logging.Formatter("%(asctime)s %(levelname)s %(name)s: %(message)s"))
+                    root.setLevel(logging.DEBUG)
+                    root.addHandler(handler)
+                else:
+                    run_log = RunLog(handler, level=name.split()[1], burst=0)
+                    run_log.start(capture_prints=False)
+                mean, p99 = run(gnss, cell, iterations)
+                if run_log is not None:
+                    start = time.perf_counter()
+                    run_log.stop(timeout=600)
+                    behind = time.perf_counter() - start
+                    written = run_log.stats()["written"]
+                else:
+                    root.removeHandler(handler)
+                    behind, written = 0.0, None
+                out.close()
+                os.remove(os.path.join(tmp, 'runtime.log'))
+                print(f"flush {latency * 1e3:4.1f} ms  {name:12s}: loop {mean * 1e6:8.1f} us mean {p99 * 1e6:8.1f} us p99"
+                      + (f"   ({written} records, writer {behind * 1e3:.0f} ms behind at the end)" if written is not None else ""))
+        gnss.fix_log.close()
+
+
+if __name__ == "__main__":
+    main()
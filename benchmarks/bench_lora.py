@@ -0,0 +1,46 @@
+#### for running in vscode (comment out when on Raspberry Pi)
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+####
+
+# LoRa airtime of one position per packet: the 12 byte bit-packed packet (src/lora.py) vs the
+# compact JSON of the same fix, per spreading factor at 125 kHz / CR 4/5, with the shortest
+# interval the 1% duty cycle allows one rider and how many riders one channel carries
+# (pure ALOHA, 18.4% usable) at a given position interval ("!" = the interval breaks the duty
+# cycle). Also times encode/decode.
+#   python benchmarks/bench_lora.py [interval_s]
+
+import json
+import time
+from src.lora import LoRaPositionCodec, PACKET_BYTES, time_on_air, channel_capacity
+
+FIX = {"utc": 1756813036, "lat": -34.139425, "lon": 18.39277, "alt": 30.8, "sog": 12.5, "cog": 57.4,
+       "fx": 1, "hdop": 0.7, "nsat": 18}
+
+
+def main():
+    interval = float(sys.argv[1]) if len(sys.argv) > 1 else 10
+    json_bytes = len(json.dumps({"f": [list(FIX.values())]}, separators=(",", ":")))
+    print(f"packet {PACKET_BYTES} B, compact JSON {json_bytes} B, one position every {interval:g} s")
+    for sf in range(7, 13):
+        packet, text = time_on_air(PACKET_BYTES, sf=sf), time_on_air(json_bytes, sf=sf)
+        cap_p, cap_j = channel_capacity(packet, interval), channel_capacity(text, interval)
+        print(f"SF{sf:<2d} packet {packet * 1e3:7.1f} ms (min interval {cap_p['min_interval']:6.1f} s, "
+              f"{cap_p['riders']:4d} riders{' ' if cap_p['duty_ok'] else '!'})   JSON {text * 1e3:7.1f} ms (min interval "
+              f"{cap_j['min_interval']:6.1f} s, {cap_j['riders']:4d} riders{' ' if cap_j['duty_ok'] else '!'})")
+
+    codec = LoRaPositionCodec(-34.1, 18.4)
+    n = 20000
+    t0 = time.perf_counter()
+    for i in range(n):
+        packet = codec.encode(FIX, 1, i)
+    t1 = time.perf_counter()
+    for _ in range(n):
+        codec.decode(packet, ref_time=FIX["utc"])
+    t2 = time.perf_counter()
+    print(f"encode {(t1 - t0) / n * 1e6:.1f} us, decode {(t2 - t1) / n * 1e6:.1f} us")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+#### for running in vscode (comment out when on Raspberry Pi)
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+####
+
+# Overhead of the stage instrumentation (src/metrics.py): the main loop's work (read + parse
+# a synthetic one-second dump, log the fix, batch, every 5th fix serialize + send over an
+# instant link, wait with no time left) run back to back with and without Metrics attached,
+# alternating rounds and keeping the fastest of each. The overhead is reported against the
+# loop work itself and against a real GNSS_SEARCH_RATE loop.
+#   python benchmarks/bench_metrics.py [iterations] [search_rate]
+
+import tempfile
+import time
+from benchmarks.fixtures import synth_dumps
+from src.gps import GNSS
+from src.cellular import Cellular
+from src.metrics import Metrics
+
+BATCH = 5
+ROUNDS = 5
+
+
+class DumpDevice:
+    """GNSS device stub serving the synthetic dumps in order (wrapping around)."""
+    def __init__(self, dumps):
+        self.dumps = [list(d) for d in dumps]
+        self.i = 0
+
+    def get_all_gnss(self):
+        dump = self.dumps[self.i % len(self.dumps)]
+        self.i += 1
+        return dump
+
+
+class InstantCell(Cellular):
+    """Cellular whose uploads succeed at once (the send path and its metrics are kept)."""
+    def _send_file(self, json_path):
+        return True
+
+
+def run(gnss, cell, iterations):
+    batch, count = {}, 0
+    start = time.perf_counter()
+    for _ in range(iterations):
+        fix = gnss.get_gnss_dict()
+        last = time.time()
+        gnss.check_sats(fix)
+        gnss.append_gnss_to_log(fix)
+        batch = gnss.append_gnss_dict_send(batch if count else {}, fix)
+        if count >= BATCH - 1:
+            path = gnss.create_gnss_json(batch, unique_id=fix['utc'], compact=True)
+            cell.send_file(path)
+            os.remove(path)
+            count = 0
+        else:
+            count += 1
+        gnss.wait_for_send(last, 0)
+    return (time.perf_counter() - start) / iterations
+
+
+def main():
+    iterations = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    search_rate = float(sys.argv[2]) if len(sys.argv) > 2 else 2.0
+    dumps = list(synth_dumps(300))
+    with tempfile.TemporaryDirectory() as tmp:
+        gnss = GNSS(device=DumpDevice(dumps))
+        gnss.logs_dir = tmp
+        gnss.open_fix_log()
+        cell = InstantCell(bundle_max_bytes=0)
+        metrics = Metrics(path=os.path.join(tmp, 'metrics.json'))
+        off, on = [], []
+        for _ in range(ROUNDS):
+            gnss.metrics = cell.metrics = None
+            off.append(run(gnss, cell, iterations))
+            gnss.metrics = cell.metrics = metrics
+            on.append(run(gnss, cell, iterations))
+        start = time.perf_counter()
+        metrics.write()
+        t_write = time.perf_counter() - start
+
+        n = 100000
+        start = time.perf_counter()
+        for _ in range(n):
+            metrics.observe('bench', 1e-3)
+        t_observe = (time.perf_counter() - start) / n
+
+    t_off, t_on = min(off), min(on)
+    extra = max(0.0, t_on - t_off)
+    print(f"loop work: {t_off * 1e6:7.1f} us without metrics, {t_on * 1e6:7.1f} us with "
+          f"({extra / t_off * 100:.2f}% of the work, {extra / search_rate * 100:.4f}% of a {search_rate:g} s loop)")
+    print(f"observe(): {t_observe * 1e6:.2f} us per call, snapshot write {t_write * 1e3:.2f} ms "
+          f"(every interval, {t_write / 30 * 100:.4f}% of 30 s)")
+    print(f"stages recorded: {sorted(metrics.histograms)}, counters {metrics.counters}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+#### for running in vscode (comment out when on Raspberry Pi)
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+####
+
+# Compare the purpose-built RMC/GGA parser in src/nmea.py against the old
+# pynmea2 path used by get_gnss_dict, on the recorded test dump.
+#   python benchmarks/bench_nmea.py [repeats]
+
+import time
+import pynmea2
+from src import nmea
+from src.gps import TEST_GNSS_DATA
+
+
+def old_path(data):
+    # what get_gnss_dict did before: str conversion + pynmea2.parse on every '$' line
+    text = ''.join(chr(b) for b in data).replace('\x00', '')
+    rmc = gga = None
+    for line in text.splitlines():
+        if not line.startswith('$'):
+            continue
+        try:
+            msg = pynmea2.parse(line, check=True)
+        except Exception:
+            continue
+        st = getattr(msg, 'sentence_type', '')
+        if st == 'RMC':
+            rmc = msg
+        elif st == 'GGA':
+            gga = msg
+    return (rmc.datestamp, rmc.timestamp, rmc.latitude, rmc.longitude, rmc.spd_over_grnd, rmc.true_course,
+            gga.gps_qual, gga.num_sats, gga.altitude, gga.horizontal_dil)
+
+
+def new_path(data):
+    rmc, gga = nmea.latest_rmc_gga(nmea.split_dump(data))
+    return nmea.parse_rmc(rmc) + nmea.parse_gga(gga)
+
+
+def framer_path(data, framer=nmea.NMEAFramer(types=(nmea.RMC, nmea.GGA))):
+    # what get_gnss_dict does now: streaming framer (RMC/GGA only) + parser
+    rmc, gga = nmea.latest_rmc_gga(framer.feed(data), verified=True)
+    return nmea.parse_rmc(rmc) + nmea.parse_gga(gga)
+
+
+def bench(fn, data, repeats):
+    fn(data)  # warm up
+    start = time.perf_counter()
+    for _ in range(repeats):
+        fn(data)
+    return time.perf_counter() - start
+
+
+def main():
+    repeats = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    data = TEST_GNSS_DATA
+    n_sentences = len(nmea.split_dump(data))
+    print(f"dump: {len(data)} bytes, {n_sentences} sentences, {repeats} repeats")
+    results = {}
+    for name, fn in (("pynmea2", old_path), ("nmea", new_path), ("framer", framer_path)):
+        elapsed = bench(fn, data, repeats)
+        per_dump_us = elapsed / repeats * 1e6
+        results[name] = per_dump_us
+        print(f"{name:8s} {per_dump_us:9.1f} us/dump  {n_sentences * repeats / elapsed:12.0f} sentences/s")
+    print(f"speedup: {results['pynmea2'] / results['nmea']:.1f}x (split), "
+          f"{results['pynmea2'] / results['framer']:.1f}x (framer)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+#### for running in vscode (comment out when on Raspberry Pi)
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+####
+
+# Trajectory simplification (src/simplify.py) on long batches of a synthetic 2 s ride:
+# straight fire-road legs with turns, speed changes, stops and 1.5 m GNSS noise.
+# Reports the share of fixes kept, the max time-interpolation error, the JSON bytes saved
+# and the time per batch against a pure-Python version of the same algorithm.
+#   python benchmarks/bench_simplify.py [tolerance_m ...]
+
+import json
+import math
+import random
+import time
+from src.simplify import simplify_fixes, local_xy
+
+M_PER_DEG = 111195.0
+
+
+def ride(n, seed=1, noise=1.5):
+    rnd = random.Random(seed)
+    lat, lon, heading, fixes = -34.139425, 18.39277, 0.0, []
+    for i in range(n):
+        if i % 40 == 0:
+            heading += rnd.uniform(-1.5, 1.5)
+        speed = 0.0 if 100 <= i % 300 < 110 else 8 + 4 * math.sin(i / 25)
+        lat += speed * 2 * math.cos(heading) / M_PER_DEG
+        lon += speed * 2 * math.sin(heading) / (M_PER_DEG * math.cos(math.radians(lat)))
+        fixes.append({"utc": 1756813036 + 2 * i, "lat": round(lat + rnd.gauss(0, noise) / M_PER_DEG, 6),
+                      "lon": round(lon + rnd.gauss(0, noise) / M_PER_DEG, 6), "alt": 30.8, "sog": round(speed, 2),
+                      "cog": round(math.degrees(heading) % 360, 1), "fx": 1, "hdop": 0.7, "nsat": 18})
+    return fixes
+
+
+def python_simplify(fixes, tolerance):
+    # same time-aware Douglas-Peucker, one point at a time
+    t = [float(f["utc"]) for f in fixes]
+    x, y = (list(a) for a in local_xy([f["lat"] for f in fixes], [f["lon"] for f in fixes]))
+    keep = [False] * len(fixes)
+    keep[0] = keep[-1] = True
+    stack = [(0, len(fixes) - 1)]
+    while stack:
+        i, j = stack.pop()
+        best, best_d = None, tolerance
+        for k in range(i + 1, j):
+            r = (t[k] - t[i]) / (t[j] - t[i])
+            d = math.hypot(x[k] - (x[i] + r * (x[j] - x[i])), y[k] - (y[i] + r * (y[j] - y[i])))
+            if d > best_d:
+                best, best_d = k, d
+        if best is not None:
+            keep[best] = True
+            stack += [(i, best), (best, j)]
+    return [f for f, k in zip(fixes, keep) if k]
+
+
+def timed(fn, *args, repeat=5):
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        out = fn(*args)
+        best = min(best, time.perf_counter() - t0)
+    return out, best
+
+
+def main():
+    tolerances = [float(a) for a in sys.argv[1:]] or [2.0, 5.0, 10.0]
+    for n in (30, 300, 3000):
+        fixes = ride(n)
+        raw = len(json.dumps({"f": fixes}, separators=(",", ":")))
+        for tol in tolerances:
+            (kept, max_error), t_np = timed(simplify_fixes, fixes, tol)
+            kept_py, t_py = timed(python_simplify, fixes, tol, repeat=1 if n > 1000 else 5)
+            assert len(kept_py) == len(kept)
+            size = len(json.dumps({"f": kept}, separators=(",", ":")))
+            print(f"{n:5d} fixes  tol {tol:4.1f} m  kept {len(kept):5d} ({len(kept) / n:6.1%})  "
+                  f"max error {max_error:4.2f} m  JSON {raw:7d} -> {size:7d} B  "
+                  f"numpy {t_np * 1e3:7.2f} ms  python {t_py * 1e3:8.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+#### for running in vscode (comment out when on Raspberry Pi)
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+####
+
+# Upload rate and bytes per fix through src/httpsession.py against the local stand-in ingest
+# server (src/fake_ingest.py), with and without connection reuse and with pipelining.
+# The server charges `connect_ms` per new connection (the TCP/TLS handshake a cellular link
+# pays) and `request_ms` per request. Batches are 5-fix compact JSON like the main loop sends.
+#   python benchmarks/bench_uplink.py [uploads] [connect_ms] [request_ms]
+
+import json
+import time
+from src.httpsession import HTTPSession
+from src.fake_ingest import FakeIngestServer
+
+FIXES_PER_BATCH = 5
+
+
+def make_batches(n):
+    batches = []
+    for i in range(n):
+        utc = 1756813036 + i * 10
+        fixes = [[utc + 2 * j, -34.139425, 18.39277, 30.8, 12.5, 57.4, 1, 0.7, 18] for j in range(FIXES_PER_BATCH)]
+        batches.append(json.dumps({"f": fixes}, separators=(",", ":")).encode())
+    return batches
+
+
+def run(label, batches, connect_ms, request_ms, **options):
+    with FakeIngestServer(connect_delay=connect_ms / 1e3, request_delay=request_ms / 1e3) as server:
+        session = HTTPSession(server.url, **options)
+        start = time.perf_counter()
+        if session.pipeline > 1:
+            ok = sum(1 for answer in session.post_many(batches) if answer is not None)
+        else:
+            ok = sum(1 for body in batches if session.post(body) is not None)
+        elapsed = time.perf_counter() - start
+        session.close()
+        stats = session.stats()
+        wire = stats['bytes_sent'] + stats['bytes_received']
+        print(f"{label:22s} {ok:4d} ok {ok / elapsed:7.1f} uploads/s  {server.connections:4d} connections  "
+              f"{wire / (ok * FIXES_PER_BATCH):6.1f} B/fix (HTTP, excl. TCP/TLS)  "
+              f"connect {stats['connect_time'] * 1e3:7.1f} ms  requests {stats['request_time'] * 1e3:8.1f} ms")
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 100
+    connect_ms = float(sys.argv[2]) if len(sys.argv) > 2 else 20
+    request_ms = float(sys.argv[3]) if len(sys.argv) > 3 else 2
+    print(f"{n} uploads of {FIXES_PER_BATCH} fixes, connect {connect_ms:g} ms, request {request_ms:g} ms")
+    batches = make_batches(n)
+    run("new connection each", batches, connect_ms, request_ms, keepalive=False)
+    run("keep-alive", batches, connect_ms, request_ms)
+    run("keep-alive pipeline 4", batches, connect_ms, request_ms, pipeline=4)
+
+
+if __name__ == "__main__":
+    main()
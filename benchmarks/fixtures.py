@@ -0,0 +1,80 @@
+#### for running in vscode (comment out when on Raspberry Pi)
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+####
+
+# Benchmark fixtures: the recorded module dump embedded in src/gps.py (TEST_GNSS_DATA)
+# replayed as one dump per second for hours of riding. Every second keeps the recorded
+# sentence mix (GGA, GLL, 3x GSA, GSV, RMC, VTG, ZDA, TXT) and byte layout, with the
+# time, date and a random-walk track written into GGA/GLL/RMC/VTG/ZDA and the
+# checksums recomputed, so parsers see realistic, valid, changing data.
+# track() gives the same kind of riding as parsed fix dicts, for the batch codecs.
+
+import random
+from datetime import datetime, timedelta, timezone
+from src import nmea
+from src.replay import sentence, dm
+from src.gps import TEST_GNSS_DATA
+
+START = datetime(2025, 9, 2, 11, 37, 16, tzinfo=timezone.utc)  # time of the recorded dump
+START_LAT, START_LON = -(34 + 8.36553 / 60), 18 + 23.56621 / 60
+
+
+def _rewrite(fields, t, lat, lon, sog, cog):
+    hms = t.strftime('%H%M%S.000').encode()
+    ns, ew = (b'N' if lat >= 0 else b'S'), (b'E' if lon >= 0 else b'W')
+    kind = fields[0][2:]
+    if kind == b'GGA':
+        fields[1:6] = [hms, dm(lat, 2), ns, dm(lon, 3), ew]
+    elif kind == b'GLL':
+        fields[1:6] = [dm(lat, 2), ns, dm(lon, 3), ew, hms]
+    elif kind == b'RMC':
+        fields[1] = hms
+        fields[3:10] = [dm(lat, 2), ns, dm(lon, 3), ew, b'%.2f' % sog, b'%.2f' % cog, t.strftime('%d%m%y').encode()]
+    elif kind == b'VTG':
+        fields[1] = b'%.2f' % cog
+        fields[5] = b'%.2f' % sog
+        fields[7] = b'%.2f' % (sog * 1.852)
+    elif kind == b'ZDA':
+        fields[1:5] = [hms, b'%02d' % t.day, b'%02d' % t.month, b'%04d' % t.year]
+    return fields
+
+
+def synth_dumps(seconds, seed=1):
+    """
+    Yield `seconds` consecutive one-second dumps (bytes) shaped like TEST_GNSS_DATA.
+    """
+    rnd = random.Random(seed)
+    template = [line[1:line.index(b'*')].split(b',') for line in nmea.split_dump(TEST_GNSS_DATA)]
+    lat, lon, cog = START_LAT, START_LON, 57.43
+    for i in range(seconds):
+        sog = max(0.0, 12 + rnd.gauss(0, 4))  # knots
+        cog = (cog + rnd.gauss(0, 8)) % 360
+        lat += rnd.uniform(-1, 1) * 5e-5
+        lon += rnd.uniform(-1, 1) * 5e-5
+        t = START + timedelta(seconds=i)
+        yield b''.join(sentence(b','.join(_rewrite(list(f), t, lat, lon, sog, cog))) for f in template)
+
+
+
+def track(n, seed=1):
+    """A plausible 1 Hz track: small steps in position, slowly varying other fields."""
+    rnd = random.Random(seed)
+    lat, lon, alt = -34.139425, 18.392770, 30.8
+    fixes = []
+    for i in range(n):
+        lat += rnd.uniform(-5e-5, 5e-5)
+        lon += rnd.uniform(-5e-5, 5e-5)
+        alt += rnd.uniform(-0.5, 0.5)
+        fixes.append({'utc': 1756813036 + i, 'lat': round(lat, 6), 'lon': round(lon, 6),
+                      'alt': round(alt, 1), 'sog': round(rnd.uniform(0, 25), 2),
+                      'cog': round(rnd.uniform(0, 359.9), 1), 'fx': 1,
+                      'hdop': round(rnd.uniform(0.6, 2.0), 1), 'nsat': rnd.randint(4, 20)})
+    return fixes
+
+
+if __name__ == "__main__":
+    # print the first few synthetic dumps
+    for dump in synth_dumps(int(sys.argv[1]) if len(sys.argv) > 1 else 2):
+        sys.stdout.write(dump.decode())
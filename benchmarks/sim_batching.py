@@ -0,0 +1,145 @@
+#### for running in vscode (comment out when on Raspberry Pi)
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+####
+
+# Simulated ride through the Cellular test failure schedule (src/cellular.py _test_link_up),
+# comparing fixed batch sizes with src/batchcontrol.py. Each GNSS interval the harness does
+# what main.main does without the transmit worker: take a fix, close the batch when it is
+# full and drain the backlog with GNSS.drain_backlog for the rest of the interval, otherwise
+# send the live position while there is a backlog (the adaptive policy drains the backlog
+# instead when the link is poor). Time is simulated: an upload costs `rtt` plus its bytes at
+# `kbit_s` (a failed one only `rtt`), and the fix delay is the time from a fix being taken
+# until the server first has it (live position or batch).
+# The schedule is indexed by send attempts; here it is indexed by GNSS interval instead, so
+# every policy rides through the same outages.
+#   python benchmarks/sim_batching.py [minutes] [rtt_s] [kbit_s]
+
+import contextlib
+import io
+import tempfile
+from src.gps import GNSS
+from src.cellular import Cellular
+from src.batchcontrol import BatchController
+from src.fake_clock import FakeClock
+
+SEARCH_RATE = 2
+POSITION_BYTES = 120  # compact single fix upload
+REQUEST_OVERHEAD = 250  # HTTP request + response headers per upload (see benchmarks/bench_uplink.py)
+
+
+class ScheduledLink:
+    """Upload cost model plus the Cellular test schedule (by GNSS interval)."""
+    def __init__(self, clock, rtt, kbit_s, always_up=False):
+        self.clock = clock
+        self.always_up = always_up
+        self.rtt = rtt
+        self.bytes_per_s = kbit_s * 1000 / 8
+        with contextlib.redirect_stdout(io.StringIO()):
+            self.schedule = Cellular(bundle_max_bytes=0)
+        self.bundle_max_bytes = 0  # one batch per upload, the batch size is what is compared
+        self.batches = {}     # batch id -> fix times
+        self.delivered = {}   # fix time -> delivery time
+        self.attempts = 0
+        self.bytes = 0
+
+    def _upload(self, size):
+        self.attempts += 1
+        self.schedule.test_counter = int(self.clock.t / SEARCH_RATE)
+        ok = self.always_up or self.schedule._test_link_up()
+        if ok:
+            size += REQUEST_OVERHEAD
+            self.bytes += size
+            self.clock.t += self.rtt + size / self.bytes_per_s
+        else:
+            self.clock.t += self.rtt  # no coverage: the connect fails, nothing goes out
+        return ok
+
+    def _deliver(self, fix_times):
+        for fix_time in fix_times:
+            self.delivered.setdefault(fix_time, self.clock.t)
+
+    def send_file(self, path):
+        ok = self._upload(os.path.getsize(path))
+        if ok:
+            self._deliver(self.batches[int(os.path.basename(path)[5:-5])])
+        return ok
+
+    def send_position(self, fix_time):
+        ok = self._upload(POSITION_BYTES)
+        if ok:
+            self._deliver([fix_time])
+        return ok
+
+
+def ride(minutes, rtt, kbit_s, always_up=False, batch_size=5, controller=None):
+    clock = FakeClock(0.0)
+    link = ScheduledLink(clock, rtt, kbit_s, always_up)
+    with tempfile.TemporaryDirectory() as tmp, contextlib.redirect_stdout(io.StringIO()):
+        gnss = GNSS(search_rate=SEARCH_RATE)
+        gnss.logs_dir = tmp
+        fix = gnss.read_gnss_dict(test_mode=True)
+        if controller is not None:
+            gnss.send_observer = controller.record_send
+        fixes, batch, taken = [], {}, []
+        tick = 0.0
+        while tick < minutes * 60:
+            clock.t = max(clock.t, tick)
+            fix_time = clock.t
+            taken.append(fix_time)
+            fixes.append(fix_time)
+            batch = gnss.append_gnss_dict_send(batch, dict(fix, utc=int(fix_time)))
+            size = controller.update(len(gnss.transmit_backlog)) if controller is not None else batch_size
+            send_position = controller.send_position if controller is not None else True
+            deadline = tick + 0.95 * SEARCH_RATE
+            if len(fixes) >= size:
+                utc_id = len(link.batches)
+                link.batches[utc_id] = fixes
+                gnss.create_gnss_json(batch, unique_id=utc_id, compact=True)
+                gnss.add_to_transmit_backlog(utc_id)
+                gnss.drain_backlog(link, time_budget=deadline - clock.t, clock=clock)
+                fixes, batch = [], {}
+            elif gnss.transmit_backlog and send_position:
+                t0 = clock.t
+                ok = link.send_position(fix_time)
+                if controller is not None:
+                    controller.record_send(ok, clock.t - t0)
+                if ok and clock.t < deadline:
+                    gnss.drain_backlog(link, time_budget=deadline - clock.t, clock=clock)
+            elif gnss.transmit_backlog:
+                gnss.drain_backlog(link, time_budget=deadline - clock.t, max_failures=1, clock=clock)
+            tick = max(tick + SEARCH_RATE, clock.t)
+        left = len(gnss.transmit_backlog)
+    delays = sorted(link.delivered[t] - t for t in taken if t in link.delivered)
+    return {
+        'fixes': len(taken),
+        'delivered': len(delays),
+        'p50': delays[len(delays) // 2] if delays else 0.0,
+        'p95': delays[int(len(delays) * 0.95)] if delays else 0.0,
+        'mean': sum(delays) / len(delays) if delays else 0.0,
+        'attempts': link.attempts,
+        'bytes': link.bytes,
+        'backlog_left': left,
+        'changes': controller.changes if controller is not None else 0,
+    }
+
+
+def main():
+    minutes = float(sys.argv[1]) if len(sys.argv) > 1 else 60
+    rtt = float(sys.argv[2]) if len(sys.argv) > 2 else 0.5
+    kbit_s = float(sys.argv[3]) if len(sys.argv) > 3 else 20
+    print(f"{minutes:g} min ride, fix every {SEARCH_RATE} s, rtt {rtt:g} s, {kbit_s:g} kbit/s")
+    for always_up in (False, True):
+        print("link always up" if always_up else "Cellular test failure schedule")
+        runs = [(f"fixed {n}", dict(batch_size=n)) for n in (2, 5, 15, 30)]
+        runs.append(("adaptive 2..30", dict(controller=BatchController(batch_size=5, min_batch=2, max_batch=30))))
+        for label, options in runs:
+            r = ride(minutes, rtt, kbit_s, always_up, **options)
+            print(f"  {label:15s} delay p50 {r['p50']:7.1f} s  p95 {r['p95']:7.1f} s  mean {r['mean']:7.1f} s  "
+                  f"delivered {r['delivered']:5d}/{r['fixes']}  uploads {r['attempts']:5d}  "
+                  f"{r['bytes'] / 1024:7.1f} KiB  backlog left {r['backlog_left']:3d}  size changes {r['changes']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,47 @@
+#### for running in vscode (comment out when on Raspberry Pi)
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+####
+
+# Offline run of the LoRa duty cycle scheduler (src/lora.py LoRaScheduler) with the fake
+# radio and a simulated clock: a fix every 2 s for `hours`, per spreading factor, on the
+# configured 868 MHz g1 sub-band (1%). Reports the position update rate achieved against
+# the legal limit and the worst rolling-hour airtime the radio saw.
+#   python benchmarks/sim_lora_duty.py [hours] [position_interval_s]  (0: the legal minimum)
+
+from src.lora import LoRaPositionCodec, LoRaScheduler, DUTY_WINDOW, POSITION_HEADROOM
+from src.fake_radio import FakeLoRaRadio
+from src.fake_clock import FakeClock
+
+FIX = {"utc": 1756813036, "lat": -34.139425, "lon": 18.39277, "alt": 30.8, "sog": 12.5, "cog": 57.4,
+       "fx": 1, "hdop": 0.7, "nsat": 18}
+
+
+def run(sf, hours, position_interval):
+    clock = FakeClock(0.0)
+    radio = FakeLoRaRadio(clock, sf=sf)
+    codec = LoRaPositionCodec(-34.1, 18.4)
+    seq = iter(range(1 << 30))
+    sched = LoRaScheduler(radio, lambda fix: codec.encode(fix, 1, next(seq)), frequency_mhz=868.1, sf=sf,
+                          position_interval=position_interval, clock=clock)
+    while clock.t < hours * 3600:
+        sched.tick(dict(FIX, utc=FIX["utc"] + int(clock.t)))
+        clock.t += 2
+    return sched.report(), radio.max_window_airtime() / (sched.duty_cycle * DUTY_WINDOW)
+
+
+def main():
+    hours = float(sys.argv[1]) if len(sys.argv) > 1 else 2
+    position_interval = float(sys.argv[2]) if len(sys.argv) > 2 else None
+    print(f"{hours:g} h, fix every 2 s, position interval "
+          f"{position_interval if position_interval is not None else f'{POSITION_HEADROOM:g} x the legal minimum'}")
+    for sf in range(7, 13):
+        r, worst = run(sf, hours, position_interval)
+        print(f"SF{sf:<2d} airtime {r['packet_airtime_ms']:7.1f} ms  legal {r['legal_positions_per_min']:5.2f}/min  "
+              f"achieved {r['positions_per_min']:5.2f}/min (every {r['achieved_interval']:6.1f} s)  "
+              f"backlog sent {r['backlog_sent']:4d}  missed {r['missed']:4d}  worst hour {worst:6.1%} of the limit")
+
+
+if __name__ == "__main__":
+    main()
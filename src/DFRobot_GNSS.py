@@ -55,6 +55,7 @@ I2C_ALL_DATA = 33
 I2C_GNSS_MODE = 34
 I2C_SLEEP_MODE = 35
 I2C_RGB_MODE = 36
+FIX_REGS_LEN = I2C_COG_X - I2C_YEAR_H + 1   # date/time, lat, lon, satellites, alt, sog, cog: one contiguous block
 
 ENABLE_POWER = 0
 DISABLE_POWER = 1
@@ -105,12 +106,17 @@ class DFRobot_GNSS(object):
   __txbuf        = [0]          # i2c send buffer
   __gnss_all_data  = [0]*1300     # gnss data
   __uart_i2c     =  0
-  def __init__(self, bus, Baud):
+  ALL_DATA_BLOCK = 32           # bytes per I2C_ALL_DATA read (SMBus block limit)
+  START_GET_SETTLE = 0.1        # seconds for the module to latch its NMEA buffer after I2C_START_GET
+  WRITE_SETTLE = 0.1            # seconds the module is given after a configuration write (mode, power, RGB)
+  BEGIN_SETTLE = 0.1            # seconds waited after the ID read in begin()
+  def __init__(self, bus, Baud, ser=None):
     if bus != 0:
       self.i2cbus = smbus.SMBus(bus)
       self.__uart_i2c = I2C_MODE
     else:
-      self.ser = serial.Serial("/dev/ttyAMA0", baudrate=Baud,stopbits=1, timeout=0.5)
+      # ser: already opened serial-like object (e.g. src.fake_serial.FakeGNSSSerial for benchmarks)
+      self.ser = ser if ser is not None else serial.Serial("/dev/ttyAMA0", baudrate=Baud,stopbits=1, timeout=0.5)
       self.__uart_i2c = UART_MODE
       if self.ser.isOpen == False:
         self.ser.open()
@@ -120,7 +126,7 @@ class DFRobot_GNSS(object):
       @brief Init sensor 
     '''
     rslt = self.read_reg(I2C_ID, 1)
-    time.sleep(0.1)
+    time.sleep(self.BEGIN_SETTLE)
     if rslt == -1:
       return False
     if rslt[0] != GNSS_DEVICE_ADDR:
@@ -182,6 +188,16 @@ class DFRobot_GNSS(object):
       lat_lon.lonitude_degree = lat_lon.lon_ddd + lat_lon.lon_mm/60.0 + lat_lon.lon_mmmmm/100000.0/60.0
     return lat_lon
 
+  def get_fix_registers(self):
+    '''!
+      @brief Get the whole fix register block in one read
+      @n I2C_YEAR_H..I2C_COG_X are contiguous, so the fields of get_date, get_utc, get_lat, get_lon,
+      @n get_num_sta_used, get_alt, get_sog and get_cog come in one FIX_REGS_LEN byte transaction
+      @n (decoded by src.regfix.decode_fix_registers)
+      @return list of FIX_REGS_LEN ints, -1 if the read failed
+    '''
+    return self.read_reg(I2C_YEAR_H, FIX_REGS_LEN)
+
   def get_num_sta_used(self):
     '''!
       @brief Get the number of the used satellites 
@@ -242,7 +258,10 @@ class DFRobot_GNSS(object):
       @retval 7 gps + beidou + glonass
     '''
     rslt = self.read_reg(I2C_GNSS_MODE, 1)
-    return rslt[0]
+    if rslt != -1:
+      return rslt[0]
+    else:
+      return 0
 
   def set_gnss(self, mode):
     '''!
@@ -258,7 +277,7 @@ class DFRobot_GNSS(object):
     '''
     self.__txbuf[0] = mode
     self.write_reg(I2C_GNSS_MODE, self.__txbuf)
-    time.sleep(0.1)
+    time.sleep(self.WRITE_SETTLE)
   
   def enable_power(self):
     '''!
@@ -266,7 +285,7 @@ class DFRobot_GNSS(object):
     '''
     self.__txbuf[0] = ENABLE_POWER
     self.write_reg(I2C_SLEEP_MODE, self.__txbuf)
-    time.sleep(0.1)
+    time.sleep(self.WRITE_SETTLE)
     
   def disable_power(self):
     '''!
@@ -274,7 +293,7 @@ class DFRobot_GNSS(object):
     '''
     self.__txbuf[0] = DISABLE_POWER
     self.write_reg(I2C_SLEEP_MODE, self.__txbuf)
-    time.sleep(0.1)
+    time.sleep(self.WRITE_SETTLE)
     
 
   def rgb_on(self):
@@ -283,7 +302,7 @@ class DFRobot_GNSS(object):
     '''
     self.__txbuf[0] = RGB_ON
     self.write_reg(I2C_RGB_MODE, self.__txbuf)
-    time.sleep(0.1)
+    time.sleep(self.WRITE_SETTLE)
   
   def rgb_off(self):
     '''!
@@ -291,7 +310,7 @@ class DFRobot_GNSS(object):
     '''
     self.__txbuf[0] = RGB_OFF
     self.write_reg(I2C_RGB_MODE, self.__txbuf)
-    time.sleep(0.1)
+    time.sleep(self.WRITE_SETTLE)
 
   def get_gnss_len(self):
     '''!
@@ -300,7 +319,7 @@ class DFRobot_GNSS(object):
     '''
     self.__txbuf[0] = 0x55
     self.write_reg(I2C_START_GET, self.__txbuf)
-    time.sleep(0.1)
+    time.sleep(self.START_GET_SETTLE)
     rslt = self.read_reg(I2C_DATA_LEN_H, 2)
     if rslt != -1:
       return rslt[0]*256 + rslt[1]
@@ -310,27 +329,22 @@ class DFRobot_GNSS(object):
   def get_all_gnss(self):
     '''!
       @brief Get gnss data
+      @n The buffer is pulled in as few I2C_ALL_DATA transactions as the bus allows
+      @n (ALL_DATA_BLOCK bytes each), NUL bytes are replaced by '\\n'
+      @return list of ints, empty if the length could not be read
     '''
+    # CHANGE: one settle delay (inside get_gnss_len) instead of two, and no
+    # 0-byte read when the length is a multiple of the block size
     len = self.get_gnss_len()
-    time.sleep(0.1)
-    all_data = [0]*(len+1)
-    # CHANGE: 2 lines below
-    #len1 = (len) / 32
-    len1 = (len) // 32
-    len2 = ((len)%32) 
-    for num in range (0, len1+1):
-      if num == len1:
-        rslt = self.read_reg(I2C_ALL_DATA, len2)
-        for i in range (0, len2):
-          if rslt[i] == 0:
-            rslt[i] = 0x0A
-        all_data[num*32:] = rslt
-      else:
-        rslt = self.read_reg(I2C_ALL_DATA, 32)
-        for i in range (0, 32):
-          if rslt[i] == 0:
-            rslt[i] = 0x0A
-        all_data[num*32:] = rslt
+    all_data = []
+    remaining = len
+    while remaining > 0:
+      n = min(remaining, self.ALL_DATA_BLOCK)
+      rslt = self.read_reg(I2C_ALL_DATA, n)
+      if rslt == -1:
+        break
+      all_data += [0x0A if b == 0 else b for b in rslt]
+      remaining -= n
     return all_data
 
 class DFRobot_GNSS_I2C(DFRobot_GNSS): 
@@ -356,10 +370,14 @@ class DFRobot_GNSS_I2C(DFRobot_GNSS):
     return rslt
 
 class DFRobot_GNSS_UART(DFRobot_GNSS):
+  ALL_DATA_BLOCK = 250          # the UART request carries the length in one byte
+  READ_MARGIN = 0.2             # seconds allowed on top of the wire time for the module to answer
 
-  def __init__(self, Baud):
+  def __init__(self, Baud, ser=None):
     self.__Baud = Baud
-    super(DFRobot_GNSS_UART, self).__init__(0, Baud)
+    self.short_reads = 0          # reads that timed out before `length` bytes arrived
+    self.last_short_read = None   # (reg, expected, received) of the latest short read
+    super(DFRobot_GNSS_UART, self).__init__(0, Baud, ser)
 
   def write_reg(self, reg, data):
     send = [0]*2
@@ -368,24 +386,22 @@ class DFRobot_GNSS_UART(DFRobot_GNSS):
     self.ser.write(send)
     return
 
-  def read_reg(self, reg, len):
-    recv = [0]*len
-    send = [0]*2
-    send[0] = reg&0x7F
-    send[1] = len
-    # print("send ", send) # DEBUG
-    self.ser.write(send)
-    time.sleep(0.05)
-    timenow = time.time()
-    while(time.time() - timenow) <= 1:
-      count = self.ser.inWaiting()
-      if count != 0:
-        # print("count", count) # DEBUG
-        recv = self.ser.read(count)
-        # print("recv", recv) #DEBUG
-        self.ser.flushInput()
-        # CHANGE: 2 lines below
-        recv = list(recv)
-        # recv =[ord(c) for c in recv]
-        return recv
-    return recv
+  def read_reg(self, reg, length, timeout=None):
+    '''!
+      @brief Request `length` bytes from reg and block until they have all arrived
+      @n No fixed sleep and no polling: serial.read() sleeps in the kernel until `length`
+      @n bytes are in or the per-call deadline (wire time + READ_MARGIN, or `timeout`) passes
+      @return list of ints, or -1 on a short read (counted in short_reads, details in last_short_read)
+    '''
+    if timeout is None:
+      timeout = length * 10.0 / self.__Baud + self.READ_MARGIN
+    if self.ser.timeout != timeout:
+      self.ser.timeout = timeout
+    self.ser.flushInput()             # drop late bytes of an earlier, timed out request
+    self.ser.write([reg&0x7F, length])
+    recv = self.ser.read(length)
+    if len(recv) != length:
+      self.short_reads += 1
+      self.last_short_read = (reg, length, len(recv))
+      return -1
+    return list(recv)
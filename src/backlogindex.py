@@ -0,0 +1,242 @@
+# imports
+import os
+import json
+import threading
+from collections import OrderedDict, namedtuple
+from itertools import islice
+
+_PREFIX = 'gnss_'
+_SUFFIX = '.json'
+
+# what is known about one pending batch file (None where unknown, e.g. recovered from disk)
+BatchInfo = namedtuple('BatchInfo', 'size fixes first_utc last_utc')
+_UNKNOWN = BatchInfo(None, None, None, None)
+
+
+def batch_id(name):
+    """UTC ID of a batch file name (`gnss_{id}.json`), None for any other file."""
+    if name.startswith(_PREFIX) and name.endswith(_SUFFIX):
+        digits = name[len(_PREFIX):-len(_SUFFIX)]
+        if digits.isdigit():
+            return int(digits)
+    return None
+
+
+class BacklogIndex:
+    """
+    In-memory index of the per-file transmit backlog: the batch IDs waiting to be sent,
+    oldest first, with what is known about each file (size, fix count, first/last fix UTC).
+
+    Entries live in an OrderedDict keyed by batch ID, so add, membership, removal of any
+    entry and taking the oldest are all O(1), where the old list needed a scan for `in` and
+    list.remove(). Sizes come from the index, so sends do not stat files to check a byte
+    budget. The index reads like a list of IDs (len, iteration, [i], `in`, == with a list,
+    append/remove), so code written against the list keeps working.
+
+    The index is persisted to backlog.txt with save() (only when it changed since the last
+    save) and rebuilt by recover() at boot: one os.scandir pass over the logs directory
+    finds the batch files actually on disk, and the persisted index is only trusted when it
+    names exactly those files. Otherwise (missing, unreadable or stale) the index is rebuilt
+    from the directory in UTC ID order, keeping the persisted details of files it still
+    lists and taking the size of the others from the scan.
+
+    Args:
+        ids (iterable): Batch IDs to start with, oldest first (details unknown).
+    """
+
+    def __init__(self, ids=()):
+        self._entries = OrderedDict()  # utc_id -> BatchInfo, oldest first
+        self._lock = threading.Lock()
+        self.changes = 0  # mutations so far; save() skips the write when nothing changed
+        self._saved = None
+        for utc_id in ids:
+            self._entries[utc_id] = _UNKNOWN
+
+    # --- list-like view of the pending IDs ---
+    def __len__(self):
+        return len(self._entries)
+
+    def __iter__(self):
+        return iter(self.ids())
+
+    def __contains__(self, utc_id):
+        return utc_id in self._entries
+
+    def __getitem__(self, i):
+        with self._lock:
+            if isinstance(i, slice):
+                return list(self._entries)[i]
+            n = len(self._entries)
+            if i < 0:
+                i += n
+            if not 0 <= i < n:
+                raise IndexError("backlog index out of range")
+            if i == n - 1:
+                return next(reversed(self._entries))
+            return next(islice(self._entries, i, None))
+
+    def __eq__(self, other):
+        if isinstance(other, (BacklogIndex, list, tuple)):
+            return self.ids() == list(other)
+        return NotImplemented
+
+    def __repr__(self):
+        return f"BacklogIndex({self.ids()!r})"
+
+    def append(self, utc_id):
+        """list.append: add with unknown details."""
+        self.add(utc_id)
+
+    def remove(self, utc_id):
+        """list.remove: raises ValueError if `utc_id` is not pending."""
+        if not self.discard(utc_id):
+            raise ValueError(f"{utc_id} not in backlog")
+
+    # --- index operations ---
+    def ids(self):
+        """Snapshot of the pending IDs, oldest first."""
+        with self._lock:
+            return list(self._entries)
+
+    def info(self, utc_id):
+        """BatchInfo of a pending batch, or None if it is not pending."""
+        return self._entries.get(utc_id)
+
+    def add(self, utc_id, size=None, fixes=None, first_utc=None, last_utc=None):
+        """
+        Queue a batch at the tail unless it is already pending.
+
+        Returns:
+            bool: True if it was added.
+
+        Raises:
+            TypeError: If `utc_id` is not an int (its file name would not be recovered at boot).
+        """
+        if not isinstance(utc_id, int):
+            raise TypeError(f"Batch ID must be an int, got {utc_id!r}")
+        with self._lock:
+            if utc_id in self._entries:
+                return False
+            self._entries[utc_id] = BatchInfo(size, fixes, first_utc, last_utc)
+            self.changes += 1
+            return True
+
+    def discard(self, utc_id):
+        """
+        Drop a batch wherever it is in the backlog.
+
+        Returns:
+            bool: True if it was pending.
+        """
+        with self._lock:
+            if self._entries.pop(utc_id, None) is None:
+                return False
+            self.changes += 1
+            return True
+
+    def clear(self):
+        with self._lock:
+            if self._entries:
+                self._entries.clear()
+                self.changes += 1
+
+    def pending_bytes(self):
+        """Total size of the pending files whose size is known."""
+        with self._lock:
+            return sum(info.size or 0 for info in self._entries.values())
+
+    # --- persistence ---
+    def save(self, path):
+        """
+        Write the index to `path` (atomically) if it changed since it was last saved or loaded.
+
+        Returns:
+            bool: True if the file was written.
+        """
+        with self._lock:
+            if self._saved == self.changes and os.path.isfile(path):
+                return False
+            rows = [[utc_id, *info] for utc_id, info in self._entries.items()]
+            changes = self.changes
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        tmp = path + '.tmp'
+        with open(tmp, 'w') as f:
+            f.write(json.dumps({"v": 1, "b": rows}, separators=(",", ":")))
+        os.replace(tmp, path)
+        self._saved = changes
+        return True
+
+    @classmethod
+    def load(cls, path):
+        """
+        Read an index written by save() (or a plain JSON list of IDs, the old backlog.txt).
+
+        Returns:
+            BacklogIndex | None: None if the file is missing or unreadable.
+        """
+        try:
+            with open(path, 'r') as f:
+                data = json.load(f)
+            index = cls()
+            if isinstance(data, list):
+                index._entries = OrderedDict.fromkeys(data, _UNKNOWN)
+            else:
+                make = BatchInfo._make
+                index._entries = OrderedDict((row[0], make(row[1:])) for row in data["b"])
+            index._saved = index.changes
+            return index
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            print(f"Unreadable backlog index {path}: {e}")
+            return None
+
+    @classmethod
+    def scan(cls, directory):
+        """
+        The batch files in `directory` from one os.scandir pass.
+
+        Returns:
+            dict: utc_id -> os.DirEntry of every `gnss_{id}.json` file.
+        """
+        found = {}
+        start, stop = len(_PREFIX), -len(_SUFFIX)
+        try:
+            with os.scandir(directory) as entries:
+                for entry in entries:
+                    name = entry.name
+                    # batch_id() inlined: this loop runs once per file at boot
+                    if name.startswith(_PREFIX) and name.endswith(_SUFFIX) and name[start:stop].isdigit():
+                        found[int(name[start:stop])] = entry
+        except FileNotFoundError:
+            pass
+        return found
+
+    @classmethod
+    def recover(cls, directory, path):
+        """
+        Index of the batch files in `directory`, reusing the persisted index at `path` when it
+        still matches the directory.
+
+        Returns:
+            tuple: (BacklogIndex, how) with how "persisted" (the saved index matched),
+                "rebuilt" (saved index stale, rebuilt from the directory) or "scanned" (no
+                usable saved index).
+        """
+        found = cls.scan(directory)
+        saved = cls.load(path)
+        if saved is not None and len(saved) == len(found) and all(utc_id in found for utc_id in saved._entries):
+            return saved, "persisted"
+        index = cls()
+        known = saved._entries if saved is not None else {}
+        for utc_id in sorted(found):
+            info = known.get(utc_id)
+            if info is None or info.size is None:
+                try:
+                    size = found[utc_id].stat().st_size
+                except OSError:
+                    continue  # removed since the scan
+                info = BatchInfo(size, *(info or _UNKNOWN)[1:])
+            index._entries[utc_id] = info
+        index.changes = 1  # not saved yet
+        return index, "rebuilt" if saved is not None else "scanned"
@@ -0,0 +1,124 @@
+# imports
+import threading
+from collections import deque
+
+
+class BatchController:
+    """
+    Picks the batch size (fixes per upload) and whether to send the live position on its own,
+    from the recent send outcomes and the backlog depth.
+
+    A good link (high success rate, fast sends, no backlog) gets small batches so fixes reach
+    the server soon after they are taken. A poor link gets large batches, so the few uploads
+    that get through carry more fixes each and the per-request overhead is paid less often.
+    While most sends fail the live position is not sent on its own (`send_position` False):
+    the caller probes the link with the oldest backlog batch instead, which delivers many
+    fixes when it gets through.
+
+    The size follows a target between `min_batch` and `max_batch`:
+    - success rate at or below `poor_success` (or a backlog of `backlog_high` entries) -> max_batch,
+    - success rate at or above `good_success` -> min_batch, linear in between,
+    - mean send latency above `latency_target` scales the target up by the excess ratio.
+    It grows to a larger target at once and shrinks by one per update, so a short good spell
+    in a bad link does not flip it back and forth.
+
+    Send outcomes come from record_send() (set it as `GNSS.send_observer`).
+
+    Args:
+        batch_size (int): Size used until there are send outcomes (GNSS_SEND_BATCH_SIZE).
+        min_batch (int): Smallest batch size.
+        max_batch (int): Largest batch size.
+        window (int): Send outcomes the rates are computed over.
+        good_success (float): Success rate treated as a good link.
+        poor_success (float): Success rate treated as a poor link.
+        latency_target (float): Send latency (s) above which batches grow.
+        backlog_high (int): Backlog entries treated as a poor link.
+    """
+
+    def __init__(self, batch_size=5, min_batch=2, max_batch=30, window=20, good_success=0.9, poor_success=0.5,
+                 latency_target=2.0, backlog_high=10):
+        if not 1 <= min_batch <= max_batch:
+            raise ValueError(f"Bad batch size bounds: {min_batch}..{max_batch}")
+        if not poor_success < good_success:
+            raise ValueError(f"poor_success ({poor_success}) must be below good_success ({good_success})")
+        self.min_batch = min_batch
+        self.max_batch = max_batch
+        self.good_success = good_success
+        self.poor_success = poor_success
+        self.latency_target = latency_target
+        self.backlog_high = backlog_high
+        self.batch_size = min(max_batch, max(min_batch, batch_size))
+        self.send_position = True
+        self._sends = deque(maxlen=window)  # (ok, seconds)
+        self._lock = threading.Lock()
+        self.changes = 0
+
+    def record_send(self, ok, seconds):
+        """
+        Record the outcome of one upload attempt.
+
+        Args:
+            ok (bool): Whether the upload succeeded.
+            seconds (float): How long the attempt took.
+        """
+        with self._lock:
+            self._sends.append((bool(ok), seconds))
+
+    def success_rate(self):
+        """Share of the recent sends that succeeded (None before the first send)."""
+        with self._lock:
+            if not self._sends:
+                return None
+            return sum(ok for ok, _ in self._sends) / len(self._sends)
+
+    def mean_latency(self):
+        """Mean duration (s) of the recent sends (None before the first send)."""
+        with self._lock:
+            if not self._sends:
+                return None
+            return sum(seconds for _, seconds in self._sends) / len(self._sends)
+
+    def target(self, backlog_depth):
+        """Batch size the current link and backlog call for (before smoothing)."""
+        rate = self.success_rate()
+        if rate is None:
+            return self.batch_size
+        if rate <= self.poor_success or backlog_depth >= self.backlog_high:
+            return self.max_batch
+        quality = min(1.0, (rate - self.poor_success) / (self.good_success - self.poor_success))
+        size = self.max_batch - quality * (self.max_batch - self.min_batch)
+        latency = self.mean_latency()
+        if latency > self.latency_target > 0:
+            size *= latency / self.latency_target
+        return int(min(self.max_batch, max(self.min_batch, round(size))))
+
+    def update(self, backlog_depth):
+        """
+        Re-evaluate the batch size and the live position decision.
+
+        Args:
+            backlog_depth (int): Entries waiting in the transmit backlog.
+
+        Returns:
+            int: The batch size to use for the batch being collected.
+        """
+        target = self.target(backlog_depth)
+        size = target if target > self.batch_size else max(target, self.batch_size - 1)
+        if size != self.batch_size:
+            self.changes += 1
+            self.batch_size = size
+        rate = self.success_rate()
+        # live positions only make sense while there is a backlog delaying the batches and
+        # some sends still get through
+        self.send_position = backlog_depth > 0 and (rate is None or rate > self.poor_success)
+        return self.batch_size
+
+    def stats(self):
+        """Current decision and link estimates as a dict (for logging)."""
+        return {
+            "batch_size": self.batch_size,
+            "send_position": self.send_position,
+            "success_rate": self.success_rate(),
+            "mean_latency": self.mean_latency(),
+            "changes": self.changes,
+        }
@@ -0,0 +1,113 @@
+# imports
+import time
+from src.metrics import Histogram
+
+POLICIES = ("skip", "catch_up")
+
+
+class TickScheduler:
+    """
+    Fix cadence on absolute time.monotonic deadlines.
+
+    Tick k is due at start + k * period, computed from the tick number rather than from when
+    the previous read finished, so processing time, sleep wake-up latency and wall clock
+    steps (NTP, GNSS time) never shift the schedule. The loop calls wait() at the end of each
+    iteration, which sleeps until the next tick is due.
+
+    When an iteration overruns past one or more deadlines, `policy` decides what happens to
+    the missed ticks:
+        "skip"      the missed ticks are dropped and the next one runs at once, in the slot
+                    in progress, so the grid (and the start of the next interval) is kept.
+        "catch_up"  the missed ticks run back to back without sleeping until the schedule is
+                    met again, at most `max_catch_up` of them (older ones are dropped).
+
+    remaining() is the time left until the next tick, which the transmit logic spends on
+    sends. The lateness of every tick against its deadline (the jitter) is kept in a log2
+    histogram, see stats().
+
+    Args:
+        period (float): Seconds between ticks (GNSS_SEARCH_RATE); 0 runs ticks back to back.
+        policy (str): "skip" or "catch_up".
+        max_catch_up (int): Missed ticks "catch_up" still runs.
+        clock (callable): Monotonic clock, replaceable in tests and simulations.
+        sleep (callable): Sleep function, replaceable in tests and simulations.
+    """
+
+    def __init__(self, period, policy="skip", max_catch_up=10, clock=time.monotonic, sleep=time.sleep):
+        if policy not in POLICIES:
+            raise ValueError(f"Unknown overrun policy {policy!r}, expected one of {POLICIES}")
+        self.period = period
+        self.policy = policy
+        self.max_catch_up = max_catch_up
+        self.clock = clock
+        self.sleep = sleep
+        self.start_time = None
+        self.tick = 0  # number of the tick in progress
+        self.jitter = Histogram()  # lateness of each tick against its deadline
+        # counters
+        self.ticks = 0
+        self.overruns = 0
+        self.skipped = 0
+
+    def start(self, now=None):
+        """Start the grid: tick 0 is due now (or at `now`)."""
+        self.start_time = self.clock() if now is None else now
+        self.tick = 0
+        self.ticks = 1
+        self.jitter.add(0.0)
+
+    def deadline(self, tick):
+        """Time tick number `tick` is due."""
+        return self.start_time + tick * self.period
+
+    def interval_start(self):
+        """Deadline of the tick in progress (the start of the current interval)."""
+        if self.start_time is None:
+            self.start()
+        return self.deadline(self.tick)
+
+    def remaining(self):
+        """Seconds until the next tick is due (negative once it is overdue)."""
+        if self.start_time is None:
+            self.start()
+        return self.deadline(self.tick + 1) - self.clock()
+
+    def wait(self):
+        """
+        Sleep until the next tick is due, applying the overrun policy if it already is.
+
+        Returns:
+            float: Seconds slept (0 after an overrun).
+        """
+        if self.start_time is None:
+            self.start()
+        self.tick += 1
+        due = self.deadline(self.tick)
+        now = self.clock()
+        slept = 0.0
+        if now < due:
+            self.sleep(due - now)
+            slept = due - now
+            now = self.clock()
+        elif self.period > 0:
+            self.overruns += 1
+            behind = int((now - due) // self.period)  # further ticks whose deadline has passed
+            drop = behind if self.policy == "skip" else max(0, behind - self.max_catch_up)
+            self.tick += drop
+            self.skipped += drop
+            due = self.deadline(self.tick)
+        self.ticks += 1
+        self.jitter.add(max(0.0, now - due))
+        return slept
+
+    def stats(self):
+        """Counters and tick lateness (ms) as a dict (for logging)."""
+        jitter = self.jitter.summary()
+        return {
+            "ticks": self.ticks,
+            "overruns": self.overruns,
+            "skipped": self.skipped,
+            "late_ms_mean": jitter["mean_ms"],
+            "late_ms_p99": jitter["p99_ms"],
+            "late_ms_max": jitter["max_ms"],
+        }
@@ -2,17 +2,70 @@
 import time
 import os
 import json
+import logging
+from src.httpsession import HTTPSession
+
+log = logging.getLogger(__name__)
+
+# Bundled uploads: several backlog batches in one request, acknowledged per batch.
+#   request:  {"b":[{"id":<batch utc id>,"d":<batch json>}, ...]}
+#   response: {"ack":[<batch utc id>, ...]}   (the batches the server stored)
+BUNDLE_MAX_BYTES = 16 * 1024  # default payload limit of one bundle upload
+
+
+def bundle_entry_size(batch_id, data):
+    """Bytes one batch adds to a bundle payload (its data plus the id wrapper and separator)."""
+    return len(data) + len(json.dumps(batch_id)) + len('{"id":,"d":},')
+
+
+def build_bundle(batches):
+    """
+    Pack batches into one bundle payload.
+
+    Args:
+        batches (list[tuple]): (batch_id, batch JSON bytes) pairs, oldest first.
+
+    Returns:
+        bytes: The bundle request body.
+    """
+    return b'{"b":[' + b','.join(b'{"id":%s,"d":%s}' % (json.dumps(i).encode(), bytes(d)) for i, d in batches) + b']}'
+
+
+def parse_bundle_ack(response, batch_ids):
+    """
+    Batches acknowledged by a bundle response, in bundle order.
+
+    Args:
+        response (bytes | str | None): Server response body.
+        batch_ids (list): IDs that were in the bundle (acks for anything else are ignored).
+
+    Returns:
+        list: The acknowledged IDs; empty if the response is missing or unreadable.
+    """
+    try:
+        acked = set(json.loads(response)["ack"])
+    except Exception:
+        return []
+    return [i for i in batch_ids if i in acked]
 
 
 class Cellular:
-    def __init__(self):
+    def __init__(self, bundle_max_bytes=BUNDLE_MAX_BYTES, endpoint=None, **session_options):
         # Initialize GNSS in UART mode at 9600 baud  
         #self.gnss = DFRobot_GNSS_UART(9600)
         print(f"Cellular module initialized.")
+        # payload limit for send_bundle (GNSS.drain_backlog packs batches up to it, 0 disables bundles)
+        self.bundle_max_bytes = bundle_max_bytes
+        # with an endpoint, uploads are POSTed over one persistent connection (see src/httpsession.py),
+        # otherwise sends are simulated
+        self.session = HTTPSession(endpoint, **session_options) if endpoint else None
+        # src.metrics.Metrics given the 'send' stage timings and sends_ok/sends_failed counts (optional)
+        self.metrics = None
 
         # TEST For testing purposes
         self.test_send_success = False
         self.test_counter = 0
+        self.test_send_delay = 0.5  # simulated round trip (s)
 
     def boot(self):
         """
@@ -41,15 +94,120 @@ class Cellular:
         Returns:
             bool: True if the data was sent successfully, False otherwise.
         """
+        t0 = time.perf_counter()
+        ok = False
+        try:
+            ok = self._send_file(json_path)
+        except Exception as e:
+            print(f"Error in send_file: {e}")
+        self._observe_send(t0, ok)
+        return ok
+
+    def _send_file(self, json_path):
+        if self.session is not None:
+            with open(json_path, 'rb') as f:
+                return self.session.post(f.read()) is not None
         # TEST test sending the file by reading it and printing its contents
         with open(json_path, 'r') as f:
             data = f.read()
-        print(f"Attempting to send data: {data}")
+        log.debug("Attempting to send data: %s", data)
         # Simulate sending delay
-        time.sleep(0.5)
+        time.sleep(self.test_send_delay)
         # Implement actual sending logic here
 
         # return False if failed and true if successful
+        return self._test_link_up()
+
+    def send_bundle(self, batches):
+        """
+        Upload several batches in one request; the server acknowledges each batch on its own.
+
+        Args:
+            batches (list[tuple]): (batch_id, batch JSON bytes) pairs, oldest first. The caller
+                keeps the total within `bundle_max_bytes` (see bundle_entry_size).
+
+        Returns:
+            list: IDs of the batches the server acknowledged (possibly only some, or none).
+        """
+        t0 = time.perf_counter()
+        acked = []
+        try:
+            ids = [i for i, _ in batches]
+            response = self._post(build_bundle(batches))
+            acked = parse_bundle_ack(response, ids)
+        except Exception as e:
+            print(f"Error in send_bundle: {e}")
+        self._observe_send(t0, len(acked) == len(batches))
+        return acked
+
+    def send_many(self, paths):
+        """
+        Send several files as separate uploads, pipelined on the persistent connection.
+
+        Args:
+            paths (list[str]): JSON files, oldest first.
+
+        Returns:
+            list[bool]: Per file, True if it was sent successfully.
+        """
+        if self.session is None:
+            return [self.send_file(path) for path in paths]
+        t0 = time.perf_counter()
+        bodies = []
+        for path in paths:
+            with open(path, 'rb') as f:
+                bodies.append(f.read())
+        results = [answer is not None for answer in self.session.post_many(bodies)]
+        self._observe_send(t0, all(results))
+        return results
+
+    @property
+    def pipeline(self):
+        """Uploads send_many() keeps in flight on the connection (1 when sends are simulated)."""
+        return self.session.pipeline if self.session is not None else 1
+
+    def warm_up(self):
+        """
+        Open the upload connection before the first send (nothing to do when sends are
+        simulated). Safe to run in a background thread while the GNSS boots.
+
+        Returns:
+            bool: True if the connection is open or not needed.
+        """
+        return self.session.connect() if self.session is not None else True
+
+    def stats(self):
+        """Connection statistics of the HTTP session (empty when sends are simulated)."""
+        return self.session.stats() if self.session is not None else {}
+
+    def close(self):
+        if self.session is not None:
+            self.session.close()
+
+    def _observe_send(self, t0, ok):
+        """Record one upload (started at perf_counter() `t0`) in `metrics` (if set)."""
+        if self.metrics is not None:
+            self.metrics.observe('send', time.perf_counter() - t0)
+            self.metrics.count('sends_ok' if ok else 'sends_failed')
+
+    def _post(self, payload):
+        """
+        Send one request body and return the response body (None on failure).
+
+        Without an endpoint this simulates one round trip and a server that stores every
+        batch of a bundle when the (simulated) link is up.
+        """
+        if self.session is not None:
+            return self.session.post(payload)
+        log.debug("Attempting to send bundle: %d bytes", len(payload))
+        # Simulate sending delay (one round trip for the whole bundle)
+        time.sleep(self.test_send_delay)
+        if not self._test_link_up():
+            return None
+        ids = [entry["id"] for entry in json.loads(payload)["b"]]
+        return json.dumps({"ack": ids}).encode()
+
+    def _test_link_up(self):
         # TEST s1 always successful
         #if self.test_counter >= 0:
         # # TEST s2 fail first 1 times then succeed
@@ -79,11 +237,11 @@ class Cellular:
             self.test_send_success = True
 
         if not self.test_send_success:
-            print(f"Cell: send fail. On send attempt {self.test_counter}")
+            log.debug("Cell: send fail. On send attempt %d", self.test_counter)
         else:
-            print(f"Cell: send success. On send attempt {self.test_counter}")
+            log.debug("Cell: send success. On send attempt %d", self.test_counter)
 
         #TEST
         self.test_counter += 1
 
-        return self.test_send_success
\ No newline at end of file
+        return self.test_send_success
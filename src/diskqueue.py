@@ -0,0 +1,223 @@
+# imports
+import os
+import json
+import struct
+import threading
+import zlib
+from collections import deque
+
+# record header: payload length, crc32 over key + payload, key (the batch UTC ID)
+_HEADER = struct.Struct('<IIq')
+_KEY = struct.Struct('<q')
+_SEG_PREFIX = 'seg_'
+_SEG_SUFFIX = '.q'
+_INDEX = 'index.json'
+
+
+def _crc(key, payload):
+    return zlib.crc32(payload, zlib.crc32(_KEY.pack(key)))
+
+
+class SegmentQueue:
+    """
+    Durable FIFO of (key, payload) records kept in append-only segment files.
+
+    Records are appended to `seg_NNNNNNNN.q` until a segment reaches `segment_bytes`, then
+    a new segment is started. The only file rewritten in place is the small `index.json`
+    holding the head (first unacked record); it is replaced atomically on every ack, and a
+    segment is deleted as soon as the head moves past it. Nothing else is ever modified.
+
+    Crash behaviour:
+    - A power cut during put() can leave a torn record at the end of the tail segment. Every
+      record carries its length and a CRC, so on open the tail is scanned and cut back to
+      the last complete record (`truncated` counts the bytes dropped).
+    - A power cut during ack() leaves either the old or the new index, never a mix, so an
+      ack that returned is never lost; at worst the record being acked is sent again.
+
+    The unacked records are also tracked in memory (segment, offset, size, key), which
+    makes put/peek/ack O(1). The queue reads like a list of keys (len, iteration, [i],
+    `in`), so code that only inspects the backlog works on either backend.
+
+    Args:
+        directory (str): Directory owned by the queue (created if missing).
+        segment_bytes (int): Size at which a new segment is started.
+        fsync (bool): fsync every append and index update (turn off only in benchmarks).
+    """
+
+    def __init__(self, directory, segment_bytes=64 * 1024, fsync=True):
+        self.directory = directory
+        self.segment_bytes = segment_bytes
+        self.fsync = fsync
+        self.truncated = 0
+        self._lock = threading.Lock()
+        self._pending = deque()  # (segment, offset, size, key) of unacked records, oldest first
+        self._tail = None
+        self._tail_seg = 0
+        self._tail_size = 0
+        os.makedirs(directory, exist_ok=True)
+        self._recover()
+
+    # --- list-like view of the pending keys ---
+    def __len__(self):
+        return len(self._pending)
+
+    def __iter__(self):
+        return iter([rec[3] for rec in self._pending])
+
+    def __getitem__(self, i):
+        return self._pending[i][3]
+
+    def __contains__(self, key):
+        return any(rec[3] == key for rec in self._pending)
+
+    @property
+    def tail_path(self):
+        """Path of the segment new records are appended to."""
+        return self._segment_path(self._tail_seg)
+
+    # --- queue operations ---
+    def put(self, key, payload):
+        """
+        Append a record and make it durable before returning.
+
+        Args:
+            key (int): Record key (the batch UTC ID).
+            payload (bytes): Record data.
+        """
+        key = int(key)
+        payload = bytes(payload)
+        record = _HEADER.pack(len(payload), _crc(key, payload), key) + payload
+        with self._lock:
+            if self._tail_size and self._tail_size + len(record) > self.segment_bytes:
+                self._open_tail(self._tail_seg + 1)
+            offset = self._tail_size
+            self._tail.write(record)
+            self._tail.flush()
+            if self.fsync:
+                os.fsync(self._tail.fileno())
+            self._tail_size += len(record)
+            self._pending.append((self._tail_seg, offset, len(record), key))
+
+    def peek(self, index=0):
+        """
+        Args:
+            index (int): Position among the unacked records (0 is the oldest).
+
+        Returns:
+            tuple | None: (key, payload) of that record, or None if there is none.
+        """
+        with self._lock:
+            if index >= len(self._pending):
+                return None
+            seg, offset, size, key = self._pending[index]
+            with open(self._segment_path(seg), 'rb') as f:
+                f.seek(offset + _HEADER.size)
+                return key, f.read(size - _HEADER.size)
+
+    def ack(self, count=1):
+        """
+        Mark the oldest `count` records as delivered, persist the new head once and delete
+        segments that no longer hold unacked records.
+
+        Returns:
+            int | None: Key of the last acked record, or None if the queue was empty or
+            `count` < 1 (nothing acked).
+        """
+        if count <= 0:
+            return None
+        with self._lock:
+            if not self._pending:
+                return None
+            for _ in range(min(count, len(self._pending))):
+                key = self._pending.popleft()[3]
+            if self._pending:
+                head = self._pending[0][:2]
+            else:
+                head = (self._tail_seg, self._tail_size)
+            self._write_index(*head)
+            for seg in self._segments():
+                if seg < head[0]:
+                    self._remove_segment(seg)
+            return key
+
+    def close(self):
+        with self._lock:
+            if self._tail is not None:
+                self._tail.close()
+                self._tail = None
+
+    # --- internals ---
+    def _segment_path(self, seg):
+        return os.path.join(self.directory, f"{_SEG_PREFIX}{seg:08d}{_SEG_SUFFIX}")
+
+    def _segments(self):
+        segs = []
+        for name in os.listdir(self.directory):
+            if name.startswith(_SEG_PREFIX) and name.endswith(_SEG_SUFFIX):
+                try:
+                    segs.append(int(name[len(_SEG_PREFIX):-len(_SEG_SUFFIX)]))
+                except ValueError:
+                    pass
+        return sorted(segs)
+
+    def _remove_segment(self, seg):
+        try:
+            os.remove(self._segment_path(seg))
+        except FileNotFoundError:
+            pass
+
+    def _read_index(self):
+        try:
+            with open(os.path.join(self.directory, _INDEX), 'r') as f:
+                index = json.load(f)
+            return int(index['segment']), int(index['offset'])
+        except Exception:
+            return 0, 0  # missing or unreadable: everything still on disk is pending
+
+    def _write_index(self, seg, offset):
+        path = os.path.join(self.directory, _INDEX)
+        tmp = path + '.tmp'
+        with open(tmp, 'w') as f:
+            json.dump({'segment': seg, 'offset': offset}, f)
+            f.flush()
+            if self.fsync:
+                os.fsync(f.fileno())
+        os.replace(tmp, path)
+
+    def _open_tail(self, seg):
+        if self._tail is not None:
+            self._tail.close()
+        self._tail = open(self._segment_path(seg), 'ab')
+        self._tail_seg = seg
+        self._tail_size = self._tail.tell()
+
+    def _scan(self, seg, start, last):
+        """Index the records of one segment from `start`; cut a torn end off the last one."""
+        path = self._segment_path(seg)
+        with open(path, 'rb') as f:
+            data = f.read()
+        pos = start
+        while pos + _HEADER.size <= len(data):
+            size, crc, key = _HEADER.unpack_from(data, pos)
+            end = pos + _HEADER.size + size
+            if end > len(data) or _crc(key, data[pos + _HEADER.size:end]) != crc:
+                break
+            self._pending.append((seg, pos, end - pos, key))
+            pos = end
+        if pos < len(data):
+            # torn or corrupt record: nothing after it can be trusted
+            self.truncated += len(data) - pos
+            if last:
+                with open(path, 'r+b') as f:
+                    f.truncate(pos)
+
+    def _recover(self):
+        head_seg, head_offset = self._read_index()
+        segs = self._segments()
+        for seg in segs:
+            if seg < head_seg:
+                self._remove_segment(seg)  # acked, removal was interrupted
+        segs = [seg for seg in segs if seg >= head_seg]
+        for i, seg in enumerate(segs):
+            self._scan(seg, head_offset if seg == head_seg else 0, last=(i == len(segs) - 1))
+        self._open_tail(segs[-1] if segs else head_seg)
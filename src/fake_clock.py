@@ -0,0 +1,14 @@
+class FakeClock:
+    """
+    Clock for tests: a callable returning `t`, which the test sets or advances by hand
+    (`clock.t += 0.1`). Pass it wherever code takes a `clock` (time.monotonic or time.time).
+
+    Args:
+        t (float): Starting time in seconds.
+    """
+
+    def __init__(self, t=100.0):
+        self.t = t
+
+    def __call__(self):
+        return self.t
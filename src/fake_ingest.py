@@ -0,0 +1,122 @@
+# imports
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class _IngestHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive unless the client asks to close
+    disable_nagle_algorithm = True  # headers and body are separate writes
+
+    def setup(self):
+        super().setup()
+        self.served = 0  # requests answered on this connection
+        server = self.server.ingest
+        with server.lock:
+            server.connections += 1
+        if server.connect_delay:
+            time.sleep(server.connect_delay)  # stands in for the TCP/TLS handshake round trips
+
+    def do_POST(self):
+        server = self.server.ingest
+        body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        if server.request_delay:
+            time.sleep(server.request_delay)
+        try:
+            data = json.loads(body)
+        except ValueError:
+            self._answer(400, b'{"error":"bad json"}')
+            return
+        with server.lock:
+            server.requests += 1
+            server.bytes_in += len(body)
+            if isinstance(data, dict) and isinstance(data.get("b"), list):
+                acked = []
+                for entry in data["b"]:
+                    if entry.get("id") not in server.reject:
+                        server.batches[entry.get("id")] = entry.get("d")
+                        acked.append(entry.get("id"))
+                answer = json.dumps({"ack": acked}).encode()
+            else:
+                server.batches[len(server.batches)] = data
+                answer = None if server.no_content else b'{"ok":true}'
+        self.served += 1
+        close = 0 < server.max_requests_per_connection <= self.served
+        if answer is None:
+            self._answer(204, b"", close=close)
+        else:
+            self._answer(200, answer, close=close)
+
+    def _answer(self, status, body, close=False):
+        self.send_response(status)
+        if status != 204:  # 204 has neither a body nor a length
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+        if close:
+            self.send_header("Connection", "close")
+            self.close_connection = True
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass  # quiet
+
+
+class FakeIngestServer:
+    """
+    Local stand-in for the cellular ingest endpoint (uplink.cellular.endpoint), for tests and
+    benchmarks of the HTTP transport.
+
+    Accepts POSTed batches and bundles ({"b":[{"id":..,"d":..}, ...]}, answered with
+    {"ack":[ids]}) over HTTP/1.1 with keep-alive, one thread per connection.
+    `connect_delay` is charged once per new connection (before its first answer, so a client
+    sees it in the first request rather than in connect()) and `request_delay` once per
+    request, so connection reuse shows up in wall time the way it does on a cellular link.
+
+    Args:
+        connect_delay (float): Seconds added to every new connection.
+        request_delay (float): Seconds added to every request.
+        reject (set): Bundle batch IDs that are never acknowledged.
+        max_requests_per_connection (int): Close connections after this many requests (0: never).
+        no_content (bool): Answer plain batches with 204 No Content (no body, no Content-Length).
+    """
+
+    def __init__(self, connect_delay=0.0, request_delay=0.0, reject=(), max_requests_per_connection=0,
+                 no_content=False):
+        self.connect_delay = connect_delay
+        self.request_delay = request_delay
+        self.reject = set(reject)
+        self.max_requests_per_connection = max_requests_per_connection
+        self.no_content = no_content
+        self.lock = threading.Lock()
+        self.connections = 0
+        self.requests = 0
+        self.bytes_in = 0
+        self.batches = {}
+        self._httpd = ThreadingHTTPServer(("127.0.0.1", 0), _IngestHandler)
+        self._httpd.daemon_threads = True
+        self._httpd.ingest = self
+        self._thread = None
+
+    @property
+    def url(self):
+        return f"http://127.0.0.1:{self._httpd.server_address[1]}/ingest"
+
+    def start(self):
+        self._thread = threading.Thread(target=self._httpd.serve_forever, args=(0.05,), name="fake-ingest",
+                                        daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._httpd.shutdown()
+        self._httpd.server_close()
+        if self._thread is not None:
+            self._thread.join()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
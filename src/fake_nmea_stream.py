@@ -0,0 +1,70 @@
+# imports
+import math
+import time
+from datetime import datetime, timezone
+from src.replay import sentence, dm
+
+# the recorded dump's position (see benchmarks/fixtures.py)
+START_LAT, START_LON = -(34 + 8.36553 / 60), 18 + 23.56621 / 60
+START_UTC = 1756813036.0  # 2025-09-02 11:37:16 UTC
+
+
+class FakeNMEAStream:
+    """
+    Simulated high-rate receiver streaming NMEA, in place of the GNSS device.
+
+    Epochs are due every 1/hz seconds of `clock` from the first call; get_all_gnss() returns
+    the sentences of every epoch that became due since the previous call (GGA + RMC with
+    centisecond times, plus `filler` GSA sentences per epoch), the way a serial port
+    buffers a 5-10 Hz stream between reads. The track is a rider going round a circle.
+
+    Args:
+        hz (float): Epochs per second.
+        clock (callable): Monotonic clock, replaceable in tests and benchmarks.
+        start_utc (float): UTC of the first epoch.
+        filler (int): Extra (ignored) sentences per epoch, to model a busier stream.
+        max_epochs (int): Epochs returned by one read at most (older ones are lost, like an
+            overflowing receive buffer).
+    """
+
+    def __init__(self, hz=10, clock=time.monotonic, start_utc=START_UTC, filler=0, max_epochs=100):
+        self.hz = hz
+        self.clock = clock
+        self.start_utc = start_utc
+        self.filler = filler
+        self.max_epochs = max_epochs
+        self._t0 = None
+        self.epoch = 0  # next epoch number to send
+        self.overflowed = 0
+
+    def epoch_sentences(self, n):
+        """GGA + RMC (+ filler) of epoch number `n`."""
+        seconds, centis = divmod(round((self.start_utc + n / self.hz) * 100), 100)
+        t = datetime.fromtimestamp(seconds, timezone.utc)
+        hms = b'%s.%02d' % (t.strftime('%H%M%S').encode(), centis)
+        date = t.strftime('%d%m%y').encode()
+        angle = n / (self.hz * 60.0) * 2 * math.pi  # one lap a minute
+        lat = START_LAT + 0.001 * math.sin(angle)
+        lon = START_LON + 0.001 * math.cos(angle)
+        lat_f = (dm(lat, 2, 6), b'N' if lat >= 0 else b'S')
+        lon_f = (dm(lon, 3, 6), b'E' if lon >= 0 else b'W')
+        cog = (math.degrees(-angle) + 270.0) % 360.0
+        gga = b','.join([b'GNGGA', hms, *lat_f, *lon_f, b'1', b'18', b'0.7', b'%.1f' % (78.7 + math.sin(angle)),
+                         b'M', b'32.7', b'M', b'', b''])
+        rmc = b','.join([b'GNRMC', hms, b'A', *lat_f, *lon_f, b'12.50', b'%.2f' % cog, date, b'', b'', b'A', b'V'])
+        out = sentence(gga) + sentence(rmc)
+        for _ in range(self.filler):
+            out += sentence(b'GNGSA,A,3,10,12,15,18,23,24,25,32,,,,,1.2,0.7,1.0,1')
+        return out
+
+    def get_all_gnss(self):
+        now = self.clock()
+        if self._t0 is None:
+            self._t0 = now
+        due = int((now - self._t0) * self.hz + 1e-9) + 1  # epochs due so far
+        if due - self.epoch > self.max_epochs:
+            self.overflowed += due - self.epoch - self.max_epochs
+            self.epoch = due - self.max_epochs
+        out = b''.join(self.epoch_sentences(n) for n in range(self.epoch, due))
+        self.epoch = due
+        return out
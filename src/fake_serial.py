@@ -0,0 +1,142 @@
+# imports
+import time
+from bisect import bisect_right
+from src.DFRobot_GNSS import (I2C_ID, I2C_START_GET, I2C_DATA_LEN_H, I2C_DATA_LEN_L, I2C_ALL_DATA,
+                              I2C_GNSS_MODE, GNSS_DEVICE_ADDR, GPS_BeiDou_GLONASS, I2C_YEAR_H, FIX_REGS_LEN)
+from src import nmea
+from src.regfix import encode_fix_registers
+
+
+class FakeGNSSSerial:
+    """
+    Stand-in for serial.Serial that speaks the DFRobot GNSS UART register protocol.
+
+    Pass it to DFRobot_GNSS_UART(9600, ser=FakeGNSSSerial(...)) to time register
+    exchanges without hardware. The fix registers (I2C_YEAR_H..I2C_COG_X) hold the latest
+    RMC/GGA fix of the NMEA buffer, as the module keeps them. Every answer byte "arrives" at a realistic moment:
+    `latency` seconds after the request for the module to react, then one byte per
+    10 bit times at `baudrate`. read()/inWaiting() only see bytes that have arrived,
+    so fixed sleeps and polling in the driver cost real wall time here too.
+
+    Args:
+        nmea (bytes | list[int]): Buffer served by I2C_ALL_DATA after each I2C_START_GET.
+        baudrate (int): Simulated line speed.
+        latency (float): Module turnaround per request, in seconds.
+        timeout (float): Default read timeout, like serial.Serial(timeout=...).
+    """
+
+    def __init__(self, nmea=b'', baudrate=9600, latency=0.002, timeout=0.5):
+        self.baudrate = baudrate
+        self.latency = latency
+        self.timeout = timeout
+        self.nmea = bytes(nmea)
+        self.regs = bytearray(64)
+        self.regs[I2C_ID] = GNSS_DEVICE_ADDR
+        self.regs[I2C_GNSS_MODE] = GPS_BeiDou_GLONASS
+        self._fill_fix_registers()
+        self._snapshot = b''
+        self._snapshot_pos = 0
+        self._rx = bytearray()   # answer bytes not read yet
+        self._rx_times = []      # arrival time of each byte in _rx
+        self._line_free = 0.0    # when the module finishes sending what is already queued
+        # counters for benchmarks
+        self.requests = 0
+        self.bytes_in = 0        # bytes sent by the module
+        self.bytes_out = 0       # bytes sent by the driver
+
+    # --- serial.Serial surface used by the driver ---
+    def isOpen(self):
+        return True
+
+    def open(self):
+        pass
+
+    def close(self):
+        pass
+
+    def write(self, data):
+        data = bytes(data)
+        self.bytes_out += len(data)
+        for i in range(0, len(data) - 1, 2):
+            self._command(data[i], data[i + 1])
+        return len(data)
+
+    def inWaiting(self):
+        return self._arrived(time.monotonic())
+
+    in_waiting = property(inWaiting)
+
+    def read(self, size=1):
+        deadline = time.monotonic() + (self.timeout or 0)
+        while True:
+            now = time.monotonic()
+            n = self._arrived(now)
+            if n >= size or now >= deadline:
+                break
+            # sleep until the byte we still need arrives (or the timeout)
+            want = self._rx_times[size - 1] if len(self._rx_times) >= size else deadline
+            time.sleep(max(0.0, min(want, deadline) - now))
+        n = min(n, size)
+        out = bytes(self._rx[:n])
+        del self._rx[:n]
+        del self._rx_times[:n]
+        return out
+
+    def flushInput(self):
+        n = self._arrived(time.monotonic())
+        del self._rx[:n]
+        del self._rx_times[:n]
+
+    reset_input_buffer = flushInput
+
+    # --- module side ---
+    def set_nmea(self, nmea):
+        """Replace the NMEA buffer served on the next I2C_START_GET (and the fix registers)."""
+        self.nmea = bytes(nmea)
+        self._fill_fix_registers()
+
+    def _fill_fix_registers(self):
+        rmc, gga = nmea.latest_rmc_gga(nmea.split_dump(self.nmea))
+        utc = lat = lon = sog = cog = alt = None
+        nsat = 0
+        try:
+            if rmc:
+                utc, lat, lon, sog, cog = nmea.parse_rmc(rmc)
+            if gga:
+                _, nsat, alt, _ = nmea.parse_gga(gga)
+        except ValueError:
+            pass
+        self.regs[I2C_YEAR_H:I2C_YEAR_H + FIX_REGS_LEN] = encode_fix_registers(utc, lat, lon, alt, sog, cog, nsat)
+
+    def _arrived(self, now):
+        return bisect_right(self._rx_times, now)
+
+    def _command(self, reg, value):
+        byte_time = 10.0 / self.baudrate
+        now = time.monotonic()
+        if reg & 0x80:
+            # register write
+            reg &= 0x7F
+            self.regs[reg] = value
+            if reg == I2C_START_GET and value == 0x55:
+                self._snapshot = self.nmea
+                self._snapshot_pos = 0
+                self.regs[I2C_DATA_LEN_H] = len(self._snapshot) >> 8
+                self.regs[I2C_DATA_LEN_L] = len(self._snapshot) & 0xFF
+            return
+        # register read of `value` bytes
+        self.requests += 1
+        if reg == I2C_ALL_DATA:
+            answer = self._snapshot[self._snapshot_pos:self._snapshot_pos + value]
+            self._snapshot_pos += value
+            answer = answer.ljust(value, b'\x00')
+        else:
+            answer = bytes(self.regs[reg:reg + value])
+        # the 2 request bytes travel first, then the module answers after `latency`
+        t = max(now + 2 * byte_time + self.latency, self._line_free)
+        for b in answer:
+            t += byte_time
+            self._rx.append(b)
+            self._rx_times.append(t)
+        self._line_free = t
+        self.bytes_in += len(answer)
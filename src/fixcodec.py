@@ -0,0 +1,135 @@
+# imports
+import math
+
+# Binary batch format (version 1)
+#
+#   byte 0     version (low nibble) | flags (high nibble)
+#   varint     number of fixes
+#   per fix    [varint None-mask, only if FLAG_MASKS]
+#              9 zigzag varints: the first fix holds absolute values, every later fix
+#              the difference to the previous fix, field by field
+#
+# Fields are the scaled integers of compress_gnss_dict(scaled=True), in the same order.
+# A field that is None is flagged in the fix's mask and not written; its running value
+# is left unchanged so the next delta is taken against the last known value.
+FORMAT_VERSION = 1
+FLAG_MASKS = 0x10
+
+FIELDS = ('utc', 'lat', 'lon', 'alt', 'sog', 'cog', 'fx', 'hdop', 'nsat')
+SCALES = (1, 1e6, 1e6, 10, 100, 10, 1, 10, 1)  # utc s, deg, deg, 0.1 m, 0.01 kn, 0.1 deg, -, 0.1, -
+
+
+def _put_varint(out, n):
+    """Append the unsigned LEB128 encoding of `n` to bytearray `out`."""
+    while n > 0x7F:
+        out.append((n & 0x7F) | 0x80)
+        n >>= 7
+    out.append(n)
+
+
+def _put_zigzag(out, n):
+    """Append signed `n` as a zigzag varint (small magnitudes of either sign stay short)."""
+    _put_varint(out, (n << 1) if n >= 0 else ((-n << 1) - 1))
+
+
+def _get_varint(data, pos):
+    """Decode an unsigned varint at `pos`; returns (value, next position)."""
+    n = shift = 0
+    while True:
+        b = data[pos]  # IndexError on a truncated batch
+        pos += 1
+        n |= (b & 0x7F) << shift
+        if b < 0x80:
+            return n, pos
+        shift += 7
+
+
+def _get_zigzag(data, pos):
+    n, pos = _get_varint(data, pos)
+    return (n >> 1) if not n & 1 else -((n + 1) >> 1), pos
+
+
+def scale_fix(fix):
+    """
+    Scale one fix dict to the integer tuple used on the wire.
+
+    Returns:
+        tuple: (values, mask) where values holds 9 ints (0 for a missing field) and bit i
+        of mask is set when FIELDS[i] is None or absent.
+    """
+    values = []
+    mask = 0
+    for i, (key, scale) in enumerate(zip(FIELDS, SCALES)):
+        v = fix.get(key)
+        if v is None or (isinstance(v, float) and math.isnan(v)):
+            mask |= 1 << i
+            values.append(0)
+        else:
+            values.append(int(v) if scale == 1 else int(round(v * scale)))
+    return values, mask
+
+
+def encode_batch(fixes):
+    """
+    Encode a list of fix dicts as a version 1 binary batch.
+
+    Args:
+        fixes (list[dict]): Fixes as in gnss_dict_send["f"], oldest first.
+
+    Returns:
+        bytes: The encoded batch.
+    """
+    scaled = [scale_fix(fix) for fix in fixes]
+    masks = any(mask for _, mask in scaled)
+    out = bytearray((FORMAT_VERSION | (FLAG_MASKS if masks else 0),))
+    _put_varint(out, len(scaled))
+    prev = [0] * len(FIELDS)
+    for values, mask in scaled:
+        if masks:
+            _put_varint(out, mask)
+        for i, v in enumerate(values):
+            if not mask >> i & 1:
+                _put_zigzag(out, v - prev[i])
+                prev[i] = v
+    return bytes(out)
+
+
+def decode_batch(data):
+    """
+    Decode a binary batch produced by encode_batch().
+
+    Args:
+        data (bytes): The encoded batch.
+
+    Returns:
+        list[dict]: Fix dicts with the same units (and rounding) as decompress_gnss_json(scaled=True);
+        fields that were None are None again.
+
+    Raises:
+        ValueError: On an unknown version or a truncated/over-long batch.
+    """
+    if not data or data[0] & 0x0F != FORMAT_VERSION:
+        raise ValueError(f"Unsupported fix batch version: {data[0] & 0x0F if data else None}")
+    masks = data[0] & FLAG_MASKS
+    try:
+        count, pos = _get_varint(data, 1)
+        prev = [0] * len(FIELDS)
+        fixes = []
+        for _ in range(count):
+            mask = 0
+            if masks:
+                mask, pos = _get_varint(data, pos)
+            fix = {}
+            for i, (key, scale) in enumerate(zip(FIELDS, SCALES)):
+                if mask >> i & 1:
+                    fix[key] = None
+                    continue
+                delta, pos = _get_zigzag(data, pos)
+                prev[i] += delta
+                fix[key] = prev[i] if scale == 1 else prev[i] / scale
+            fixes.append(fix)
+    except IndexError:
+        raise ValueError("Truncated fix batch")
+    if pos != len(data):
+        raise ValueError(f"{len(data) - pos} trailing bytes after fix batch")
+    return fixes
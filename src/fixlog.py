@@ -0,0 +1,250 @@
+# imports
+import os
+import json
+import glob
+import gzip
+import shutil
+import threading
+import time
+
+# durability modes
+FLUSH = "flush"  # every fix is handed to the OS at once, never fsynced (what append_gnss_to_log always did)
+FSYNC = "fsync"  # every fix is fsynced before append() returns: nothing lost, one SD write per fix
+BATCH = "batch"  # fixes are buffered and written + fsynced every `sync_every` fixes or `sync_interval` s
+
+
+class FixLog:
+    """
+    Append-only JSON-lines fix log that keeps its file open.
+
+    Durability is chosen with `mode`:
+    - FLUSH: a power cut can lose what the OS had not written back yet (seconds).
+    - FSYNC: a power cut loses nothing that append() returned for.
+    - BATCH: a power cut loses at most the buffered fixes (< sync_every, or sync_interval s).
+
+    The file is rotated when it would grow past `max_bytes` or when the (UTC) day changes.
+    Rotated files are renamed `<name>.<YYYYmmdd-HHMMSS><ext>` and, with `compress`, gzipped
+    in a background thread; only the newest `max_backups` are kept (None keeps them all).
+
+    stats() reports the cost of the calls themselves (buffering, writes, fsyncs, rotations).
+
+    Args:
+        path (str): Log file, e.g. logs/gnss_log.txt.
+        mode (str): FLUSH, FSYNC or BATCH.
+        sync_every (int): BATCH: fixes per write + fsync.
+        sync_interval (float | None): BATCH: also write + fsync when this many seconds passed.
+        max_bytes (int | None): Rotate before the file grows past this size.
+        rotate_daily (bool): Rotate when the UTC date changes.
+        compress (bool): Gzip rotated files.
+        max_backups (int | None): Rotated files to keep.
+        clock (callable): Wall clock (epoch seconds), replaceable in tests.
+        header (str | None): Line written at the top of every new file (e.g. CSV column names).
+    """
+
+    def __init__(self, path, mode=FLUSH, sync_every=10, sync_interval=5.0, max_bytes=5_000_000,
+                 rotate_daily=True, compress=True, max_backups=None, clock=time.time, header=None):
+        if mode not in (FLUSH, FSYNC, BATCH):
+            raise ValueError(f"Unknown fix log mode: {mode}")
+        self.path = path
+        self.mode = mode
+        self.sync_every = max(1, int(sync_every))
+        self.sync_interval = sync_interval
+        self.max_bytes = max_bytes
+        self.rotate_daily = rotate_daily
+        self.compress = compress
+        self.max_backups = max_backups
+        self.clock = clock
+        self.header = header
+        self._file = None
+        self._size = 0
+        self._day = None
+        self._buffer = []
+        self._buffer_bytes = 0
+        self._buffered_lines = 0
+        self._last_sync = clock()
+        self._compressor = None
+        # stats
+        self.lines = 0
+        self.bytes = 0
+        self.syncs = 0
+        self.rotations = 0
+        self.blocks = 0
+        self._calls = 0
+        self._append_ns_total = 0
+        self._append_ns_max = 0
+        self._sync_ns_max = 0
+
+    def append(self, fix):
+        """
+        Log one fix dict as a JSON line (durability per `mode`).
+        """
+        t0 = time.perf_counter_ns()
+        line = json.dumps(fix) + '\n'
+        if self._file is None:
+            self._open()
+        if self._should_rotate(len(line)):
+            self.rotate()
+        if self.mode == BATCH:
+            self._buffer.append(line)
+            self._buffer_bytes += len(line)
+            self._buffered_lines += 1
+            if (self._buffered_lines >= self.sync_every
+                    or (self.sync_interval is not None and self.clock() - self._last_sync >= self.sync_interval)):
+                self.sync()
+        else:
+            self._write(line)
+            if self.mode == FSYNC:
+                self._fsync()
+        self.lines += 1
+        self._calls += 1
+        dt = time.perf_counter_ns() - t0
+        self._append_ns_total += dt
+        self._append_ns_max = max(self._append_ns_max, dt)
+
+    def append_block(self, text, lines):
+        """
+        Log `lines` already formatted lines at once (durability per `mode`, counted as lines).
+
+        For high-rate tracks: one write (or one buffer append) per block instead of per fix.
+        """
+        if not lines:
+            return
+        t0 = time.perf_counter_ns()
+        if self._file is None:
+            self._open()
+        if self._should_rotate(len(text)):
+            self.rotate()
+        if self.mode == BATCH:
+            self._buffer.append(text)
+            self._buffer_bytes += len(text)
+            self._buffered_lines += lines
+            if (self._buffered_lines >= self.sync_every
+                    or (self.sync_interval is not None and self.clock() - self._last_sync >= self.sync_interval)):
+                self.sync()
+        else:
+            self._write(text)
+            if self.mode == FSYNC:
+                self._fsync()
+        self.lines += lines
+        self._calls += 1
+        dt = time.perf_counter_ns() - t0
+        self._append_ns_total += dt
+        self._append_ns_max = max(self._append_ns_max, dt)
+        self.blocks += 1
+
+    def sync(self):
+        """Write out buffered fixes and fsync the file."""
+        if self._file is None:
+            return
+        if self._buffer:
+            self._write(''.join(self._buffer))
+            self._buffer = []
+            self._buffer_bytes = 0
+            self._buffered_lines = 0
+        self._fsync()
+
+    def rotate(self):
+        """Close the current file, rename it with a timestamp and start a new one."""
+        self.sync()
+        self._close_file()
+        if os.path.isfile(self.path) and os.path.getsize(self.path) > 0:
+            root, ext = os.path.splitext(self.path)
+            rotated = f"{root}.{time.strftime('%Y%m%d-%H%M%S', time.gmtime(self.clock()))}{ext}"
+            n = 1
+            while os.path.exists(rotated) or os.path.exists(rotated + '.gz'):
+                rotated = f"{root}.{time.strftime('%Y%m%d-%H%M%S', time.gmtime(self.clock()))}-{n}{ext}"
+                n += 1
+            os.replace(self.path, rotated)
+            self.rotations += 1
+            if self.compress:
+                self._wait_compressor()
+                self._compressor = threading.Thread(target=self._compress, args=(rotated,), daemon=True)
+                self._compressor.start()
+            else:
+                self._prune()
+        self._open()
+
+    def close(self):
+        """Flush, fsync and close (waits for a running compression)."""
+        self.sync()
+        self._close_file()
+        self._wait_compressor()
+
+    def stats(self):
+        """Counters and call latencies (microseconds) as a dict (for logging)."""
+        return {
+            "lines": self.lines,
+            "bytes": self.bytes,
+            "buffered": self._buffered_lines,
+            "syncs": self.syncs,
+            "rotations": self.rotations,
+            "blocks": self.blocks,
+            "append_us_mean": self._append_ns_total / self._calls / 1e3 if self._calls else 0.0,
+            "append_us_max": self._append_ns_max / 1e3,
+            "sync_us_max": self._sync_ns_max / 1e3,
+        }
+
+    # --- internals ---
+    def _open(self):
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        self._file = open(self.path, 'a')
+        try:
+            self._size = os.path.getsize(self.path)
+        except OSError:
+            self._size = 0
+        self._day = time.gmtime(self.clock())[:3]
+        if self.header and self._size == 0:
+            self._write(self.header + '\n')
+
+    def _close_file(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def _should_rotate(self, incoming):
+        if self.rotate_daily and time.gmtime(self.clock())[:3] != self._day:
+            return self._size + self._buffer_bytes > 0
+        if self.max_bytes is not None and self._size + self._buffer_bytes > 0:
+            return self._size + self._buffer_bytes + incoming > self.max_bytes
+        return False
+
+    def _write(self, data):
+        self._file.write(data)
+        self._file.flush()
+        self._size += len(data)
+        self.bytes += len(data)
+
+    def _fsync(self):
+        t0 = time.perf_counter_ns()
+        try:
+            os.fsync(self._file.fileno())
+        except (OSError, ValueError, TypeError):
+            pass  # not a real file (e.g. mocked in tests)
+        self.syncs += 1
+        self._last_sync = self.clock()
+        self._sync_ns_max = max(self._sync_ns_max, time.perf_counter_ns() - t0)
+
+    def _compress(self, rotated):
+        try:
+            with open(rotated, 'rb') as src, gzip.open(rotated + '.gz', 'wb') as dst:
+                shutil.copyfileobj(src, dst)
+            os.remove(rotated)
+        except Exception as e:
+            print(f"Error compressing {rotated}: {e}")
+        self._prune()
+
+    def _wait_compressor(self):
+        if self._compressor is not None:
+            self._compressor.join()
+            self._compressor = None
+
+    def _prune(self):
+        if self.max_backups is None:
+            return
+        root, ext = os.path.splitext(self.path)
+        rotated = sorted(glob.glob(f"{glob.escape(root)}.*{ext}") + glob.glob(f"{glob.escape(root)}.*{ext}.gz"))
+        for old in rotated[:max(0, len(rotated) - self.max_backups)]:
+            try:
+                os.remove(old)
+            except OSError:
+                pass
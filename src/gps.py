@@ -1,36 +1,97 @@
 # imports
 import time  
-from src.DFRobot_GNSS import DFRobot_GNSS_UART, GPS_BeiDou_GLONASS
-import pynmea2
-from datetime import datetime, timezone
+import threading
+import logging
+from collections import deque
+from src.DFRobot_GNSS import (DFRobot_GNSS_UART, GPS_BeiDou_GLONASS, I2C_GNSS_MODE, I2C_SLEEP_MODE, I2C_RGB_MODE,
+                              ENABLE_POWER, RGB_ON)
+from src import nmea
+from src.diskqueue import SegmentQueue
+from src.backlogindex import BacklogIndex
+from src import fixcodec
+from src.fixlog import FixLog
+from src.lora import LoRaPositionCodec, LoRaScheduler, PACKET_BYTES, time_on_air
 import os
 import json
-from src.cellular import Cellular
+from src.cellular import Cellular, bundle_entry_size
 # TEST imports 
 import random # for TEST mode
 
+log = logging.getLogger(__name__)
+
+# runtime files: fix log, batch JSON files, backlog.txt
+LOGS_DIR = os.path.join(os.path.dirname(__file__), '../logs/')
+
+# keys of a fix dict, in the order used by the compact formats
+FIX_KEYS = ('utc', 'lat', 'lon', 'alt', 'sog', 'cog', 'fx', 'hdop', 'nsat')
+
+# TEST recorded NMEA dump (one get_all_gnss() read) used in test mode
+TEST_GNSS_DATA = [36, 71, 78, 71, 71, 65, 44, 49, 49, 51, 55, 49, 53, 46, 48, 48, 48, 44, 51, 52, 48, 56, 46, 51, 54, 53, 53, 51, 44, 83, 44, 48, 49, 56, 50, 51, 46, 53, 54, 54, 50, 48, 44, 69, 44, 49, 44, 49, 56, 44, 48, 46, 55, 44, 55, 56, 46, 55, 44, 77, 44, 51, 48, 46, 56, 44, 77, 44, 44, 42, 54, 52, 13, 10, 36, 71, 78, 71, 76, 76, 44, 51, 52, 48, 56, 46, 51, 54, 53, 53, 51, 44, 83, 44, 48, 49, 56, 50, 51, 46, 53, 54, 54, 50, 48, 44, 69, 44, 49, 49, 51, 55, 49, 53, 46, 48, 48, 48, 44, 65, 44, 65, 42, 53, 67, 13, 10, 36, 71, 78, 71, 83, 65, 44, 65, 44, 51, 44, 48, 49, 44, 48, 50, 44, 48, 51, 44, 48, 55, 44, 48, 56, 44, 49, 52, 44, 49, 55, 44, 49, 57, 44, 50, 50, 44, 51, 48, 44, 44, 44, 49, 46, 53, 44, 48, 46, 55, 44, 49, 46, 51, 44, 49, 42, 51, 55, 13, 10, 36, 71, 78, 71, 83, 65, 44, 65, 44, 51, 44, 48, 56, 44, 50, 57, 44, 51, 48, 44, 51, 54, 44, 52, 53, 44, 44, 44, 44, 44, 44, 44, 44, 49, 46, 53, 44, 48, 46, 55, 44, 49, 46, 51, 44, 52, 42, 51, 49, 13, 10, 36, 71, 78, 71, 83, 65, 44, 65, 44, 51, 44, 55, 56, 44, 56, 48, 44, 55, 57, 44, 44, 44, 44, 44, 44, 44, 44, 44, 44, 49, 46, 53, 44, 48, 46, 55, 44, 49, 46, 51, 44, 50, 42, 51, 65, 13, 10, 36, 71, 80, 71, 83, 86, 44, 51, 44, 49, 44, 49, 50, 44, 48, 49, 44, 54, 53, 44, 49, 48, 55, 44, 50, 49, 44, 48, 50, 44, 51, 56, 44, 49, 51, 53, 44, 50, 49, 44, 48, 51, 44, 50, 48, 44, 48, 53, 53, 44, 51, 53, 44, 48, 54, 44, 48, 55, 44, 51, 51, 48, 44, 44, 48, 42, 54, 56, 13, 10, 36, 71, 80, 71, 83, 86, 44, 51, 44, 50, 44, 49, 50, 44, 48, 55, 44, 51, 50, 44, 51, 53, 52, 44, 50, 50, 44, 48, 56, 44, 49, 52, 44, 49, 49, 51, 44, 50, 56, 44, 49, 51, 44, 48, 54, 44, 50, 53, 54, 44, 44, 49, 52, 44, 54, 48, 44, 50, 49, 52, 44, 50, 55, 44, 48, 42, 54, 51, 13, 10, 36, 71, 80, 71, 83, 86, 44, 51, 44, 51, 44, 49, 50, 44, 49, 55, 44, 52, 53, 44, 50, 54, 48, 44, 50, 52, 44, 49, 57, 44, 50, 54, 44, 50, 55, 52, 44, 50, 55, 44, 50, 50, 44, 52, 48, 44, 50, 50, 52, 44, 50, 54, 44, 51, 48, 44, 53, 49, 44, 51, 49, 54, 44, 50, 54, 44, 48, 42, 54, 56, 13, 10, 36, 66, 68, 71, 83, 86, 44, 50, 44, 49, 44, 48, 54, 44, 48, 53, 44, 44, 44, 51, 49, 44, 48, 56, 44, 50, 54, 44, 49, 49, 48, 44, 50, 53, 44, 50, 57, 44, 55, 57, 44, 50, 51, 50, 44, 49, 54, 44, 51, 48, 44, 51, 55, 44, 49, 51, 53, 44, 50, 52, 44, 48, 42, 52, 65, 13, 10, 36, 66, 68, 71, 83, 86, 44, 50, 44, 50, 44, 48, 54, 44, 51, 54, 44, 53, 54, 44, 48, 50, 52, 44, 51, 52, 44, 52, 53, 44, 54, 55, 44, 50, 52, 49, 44, 50, 54, 44, 48, 42, 55, 54, 13, 10, 36, 71, 76, 71, 83, 86, 44, 50, 44, 49, 44, 48, 54, 44, 55, 56, 44, 50, 49, 44, 48, 52, 48, 44, 51, 52, 44, 56, 48, 44, 52, 53, 44, 50, 48, 55, 44, 50, 49, 44, 55, 57, 44, 55, 51, 44, 48, 54, 53, 44, 49, 57, 44, 56, 56, 44, 48, 53, 44, 49, 52, 52, 44, 44, 48, 42, 55, 57, 13, 10, 36, 71, 76, 71, 83, 86, 44, 50, 44, 50, 44, 48, 54, 44, 56, 49, 44, 54, 56, 44, 49, 54, 52, 44, 44, 54, 56, 44, 50, 50, 44, 50, 57, 48, 44, 44, 48, 42, 55, 69, 13, 10, 36, 71, 78, 82, 77, 67, 44, 49, 49, 51, 55, 49, 54, 46, 48, 48, 48, 44, 65, 44, 51, 52, 48, 56, 46, 51, 54, 53, 53, 51, 44, 83, 44, 48, 49, 56, 50, 51, 46, 53, 54, 54, 50, 49, 44, 69, 44, 48, 46, 48, 48, 44, 53, 55, 46, 52, 51, 44, 48, 50, 48, 57, 50, 53, 44, 44, 44, 65, 44, 86, 42, 50, 65, 13, 10, 36, 71, 78, 86, 84, 71, 44, 53, 55, 46, 52, 51, 44, 84, 44, 44, 77, 44, 48, 46, 48, 48, 44, 78, 44, 48, 46, 48, 48, 44, 75, 44, 65, 42, 49, 54, 13, 10, 36, 71, 78, 90, 68, 65, 44, 49, 49, 51, 55, 49, 54, 46, 48, 48, 48, 44, 48, 50, 44, 48, 57, 44, 50, 48, 50, 53, 44, 48, 48, 44, 48, 48, 42, 52, 53, 13, 10, 36, 71, 80, 84, 88, 84, 44, 48, 49, 44, 48, 49, 44, 48, 49, 44, 65, 78, 84, 69, 78, 78, 65, 32, 79, 75, 42, 51, 53, 13, 10]
+
 class GNSS:
-    def __init__(self, search_rate=2, test_mode=False):
+    def __init__(self, search_rate=2, test_mode=False, device=None):
         try:
             self.search_rate = search_rate
-            self.test_mode = test_mode
-            self.gnss = None
+            # a supplied device (e.g. src.replay.NMEAReplay) replaces both the UART module and the test bytes
+            self.test_mode = test_mode and device is None
+            self.logs_dir = LOGS_DIR
+            self.gnss = device
             # Initialize GNSS in UART mode at 9600 baud  
-            if not self.test_mode:
+            if not self.test_mode and self.gnss is None:
                 try:
                     self.gnss = DFRobot_GNSS_UART(9600)
                 except Exception as e:
                     print(f"Failed to initialise GNSS UART: {e}")
                     self.gnss = None
             print(f"GNSS initialized with search rate: {self.search_rate} seconds")
-            self.transmit_backlog = []#[]  # Initialize transmit backlog
+            # incremental NMEA framer: keeps partial sentences between reads, only RMC/GGA are kept
+            self.framer = nmea.NMEAFramer(types=(nmea.RMC, nmea.GGA))
+            # background acquisition (see start_acquisition), off by default
+            self._acq_thread = None
+            self._acq_stop = threading.Event()
+            self._fix_lock = threading.Lock()
+            self._fix_ready = threading.Event()  # set once the ring holds a fix
+            self._fix_ring = deque(maxlen=1)
+            self._fix_seq = 0          # fixes produced by the acquisition thread
+            self._fix_seq_taken = 0    # seq of the newest fix handed out by get_gnss_dict
+            self.last_fix_age = None   # seconds between the returned fix being read and returned
+            self.last_fix_skipped = 0  # fixes produced but never returned since the previous call
+            self.last_fix_new = True   # get_gnss_dict returned a fix not returned before (False: the no-fix dict)
+            self.max_fix_age = None    # seconds a cached fix stays usable (None: 3 acquisition periods)
+            self._acq_period = 1.0
+            self.high_rate = None  # src.highrate.HighRateTracker while high-rate mode runs (see start_high_rate)
+            self.uplink_backfill = []  # high-rate: older decimated fixes returned with the last get_gnss_dict
+            self.register_reader = None  # src.regfix.RegisterFixReader: fixes from the register block (see use_register_fixes)
+            self.transmit_backlog = []  # BacklogIndex of pending batch files (see the property)
+            self._batch_info = {}  # utc_id -> (size, fixes, first_utc, last_utc) of files written by create_gnss_json
+            self._last_batch_id = 0  # newest ID given out by batch_id()
+            self.queue = None  # SegmentQueue once use_segment_queue() is called (then also transmit_backlog)
+            self.fix_log = None  # FixLog behind append_gnss_to_log, opened on first use (see open_fix_log)
+            self.send_observer = None  # callable(ok, seconds) told about every upload attempt (e.g. BatchController.record_send)
+            self.metrics = None  # src.metrics.Metrics given the stage timings (acquire, parse, log, batch, serialize, wait)
+            self.scheduler = None  # src.cadence.TickScheduler: fix cadence on monotonic deadlines instead of last_gnss_time
+            self.simplify_tolerance = 0.0  # metres, > 0 drops fixes create_gnss_json can reconstruct (see src/simplify.py)
+            self.last_simplify = None  # stats of the last simplified batch
+            self.boot_stats = {}  # what boot() did (device writes made/skipped, backlog recovery)
             self.tmp_transmit_backlog_empty = False # Temporary variable to track if backlog is empty after sending
             # TEST
             self.test_count = 0
         except Exception as e:
             print(f"Error in __init__: {e}")
 
-    def boot(self):
+    @property
+    def transmit_backlog(self):
+        """Pending batch IDs, oldest first: a BacklogIndex, or the SegmentQueue with use_segment_queue()."""
+        return self._transmit_backlog
+
+    @transmit_backlog.setter
+    def transmit_backlog(self, backlog):
+        # a plain list of IDs (e.g. from tests or old callers) becomes an index
+        if not isinstance(backlog, (BacklogIndex, SegmentQueue)):
+            backlog = BacklogIndex(backlog)
+        self._transmit_backlog = backlog
+
+    def boot(self, fast=False):
         """
         Initializes and boots up the GNSS (Global Navigation Satellite System) module.
 
@@ -39,6 +100,13 @@ class GNSS:
         If the GNSS module is not detected, it prints an error message and returns False.
         On successful initialization, it prints a confirmation message and returns True.
 
+        The module keeps its settings across a reboot of the Pi, so with `fast` each setting is
+        read back first and only written (with the driver's settle delay) if it differs.
+        `boot_stats` holds the writes made and skipped and how the backlog was recovered.
+
+        Args:
+            fast (bool): Check the device settings before writing them.
+
         Returns:
             bool: True if the GNSS module was initialized successfully, False otherwise.
         """
@@ -50,18 +118,15 @@ class GNSS:
                 if not self.gnss.begin():  
                     print("No Devices! GNSS module not detected.")  
                     return False
-                self.gnss.enable_power()  
-                self.gnss.set_gnss(GPS_BeiDou_GLONASS)  
-                self.gnss.rgb_on()   # turn on the onboard RGB LED (it may already be on by default)  
-
-            # Check for backlog.txt in the logs directory and populate transmit_backlog if it exists
-            backlog_path = os.path.join(os.path.dirname(__file__), '../logs/backlog.txt')
-            if os.path.isfile(backlog_path):
-                with open(backlog_path, 'r') as f:
-                    try:
-                        self.transmit_backlog = json.load(f)
-                    except Exception:
-                        self.transmit_backlog = []
+                writes = self.configure_device(check=fast)
+                self.boot_stats.update(device_writes=writes, device_skipped=3 - writes)
+
+            # rebuild the transmit backlog from the batch files in the logs directory (backlog.txt
+            # is only trusted while it lists exactly those files)
+            backlog, how = BacklogIndex.recover(self.logs_dir, os.path.join(self.logs_dir, 'backlog.txt'))
+            self.transmit_backlog = backlog
+            self.boot_stats['backlog'] = how
+            print(f"Transmit backlog: {len(backlog)} pending batches ({how}).")
 
             print("GNSS module initialized successfully.")  
             return True
@@ -69,6 +134,40 @@ class GNSS:
             print(f"Error in boot: {e}")
             return False
 
+    def configure_device(self, check=False):
+        """
+        Power on the module, select GPS + BeiDou + GLONASS and turn the RGB LED on.
+
+        Args:
+            check (bool): Read each setting back first and skip the write if it already holds
+                (a device without register reads is always written).
+
+        Returns:
+            int: Number of settings written.
+        """
+        settings = ((I2C_SLEEP_MODE, ENABLE_POWER, self.gnss.enable_power),
+                    (I2C_GNSS_MODE, GPS_BeiDou_GLONASS, lambda: self.gnss.set_gnss(GPS_BeiDou_GLONASS)),
+                    (I2C_RGB_MODE, RGB_ON, self.gnss.rgb_on))  # the LED may already be on by default
+        writes = 0
+        for reg, value, write in settings:
+            if check and self._read_device_reg(reg) == value:
+                continue
+            write()
+            writes += 1
+        return writes
+
+    def _read_device_reg(self, reg):
+        """One register of the module, None if it cannot be read."""
+        read_reg = getattr(self.gnss, 'read_reg', None)
+        if read_reg is None:
+            return None
+        try:
+            rslt = read_reg(reg, 1)
+            return None if rslt == -1 or not rslt else rslt[0]
+        except Exception as e:
+            print(f"Error reading GNSS register {reg}: {e}")
+            return None
+
     def start(self):
         try:
             if not self.test_mode and self.gnss:
@@ -85,7 +184,213 @@ class GNSS:
         except Exception as e:
             print(f"Error in stop: {e}")
 
+    def start_acquisition(self, ring_size=8, period=1.0):
+        """
+        Start a background thread that keeps reading the GNSS device into a bounded ring of fixes.
+
+        While it runs, get_gnss_dict() returns the newest fix immediately instead of blocking on
+        serial I/O, and records its age and the number of skipped fixes in `last_fix_age` and
+        `last_fix_skipped`. Only the thread talks to the device while acquisition is running.
+
+        Args:
+            ring_size (int): Number of recent fixes kept (oldest are dropped).
+            period (float): Seconds between reads; the module refreshes its data at 1 Hz.
+
+        Returns:
+            bool: True if the thread is running.
+        """
+        try:
+            if self._acq_thread is not None and self._acq_thread.is_alive():
+                return True
+            with self._fix_lock:
+                self._fix_ring = deque(maxlen=ring_size)
+            self._acq_period = period
+            self._fix_ready.clear()
+            self._acq_stop.clear()
+            self._acq_thread = threading.Thread(target=self._acquisition_loop, args=(period,),
+                                                name="gnss-acquisition", daemon=True)
+            self._acq_thread.start()
+            print(f"GNSS background acquisition started (period {period} s, ring {ring_size})")
+            return True
+        except Exception as e:
+            print(f"Error in start_acquisition: {e}")
+            self._acq_thread = None
+            return False
+
+    def stop_acquisition(self, timeout=2.0):
+        """
+        Stop the background acquisition thread; get_gnss_dict() reads synchronously again.
+        """
+        try:
+            self._acq_stop.set()
+            if self._acq_thread is not None:
+                self._acq_thread.join(timeout)
+            self._acq_thread = None
+        except Exception as e:
+            print(f"Error in stop_acquisition: {e}")
+
+    def _acquisition_loop(self, period):
+        # read -> parse -> push, then sleep until the next period (Event.wait so stop is immediate)
+        while not self._acq_stop.is_set():
+            started = time.monotonic()
+            try:
+                gnss_dict = self.read_gnss_dict()
+                if gnss_dict:
+                    with self._fix_lock:
+                        self._fix_seq += 1
+                        self._fix_ring.append((time.monotonic(), self._fix_seq, gnss_dict))
+                    self._fix_ready.set()
+            except Exception as e:
+                print(f"Error in _acquisition_loop: {e}")
+            self._acq_stop.wait(max(0.0, period - (time.monotonic() - started)))
+
+    def start_high_rate(self, hz=10, ring_size=6000, track_path=None, decimate_every=0, decimate_interval=1.0,
+                        flush_interval=1.0, source=None, **track_options):
+        """
+        Start high-rate (1-10 Hz) acquisition: every fix goes to a bounded in-memory ring and
+        the full-rate CSV track (logs/gnss_track.csv by default, rotated like the fix log),
+        while only a decimated stream reaches get_gnss_dict() and the uplink.
+
+        The receiver must be set to output at `hz` (the DFRobot module itself updates at 1 Hz).
+        While it runs, get_gnss_dict() returns the newest decimated fix at once (the no-fix dict,
+        with `last_fix_new` False, if none was decimated since the previous call) and leaves the
+        older decimated fixes since the previous call in `uplink_backfill`.
+
+        Args:
+            hz (float): Receiver output rate; the device is read this often.
+            ring_size (int): Fixes kept in memory.
+            track_path (str | None): Full-rate track file.
+            decimate_every (int): Send every Nth fix (0 = time based).
+            decimate_interval (float): Seconds between sent fixes when time based.
+            flush_interval (float): Seconds between track writes.
+            source: Device read instead of the GNSS module (anything with get_all_gnss()).
+            **track_options: FixLog options of the track (mode, max_bytes, compress, ...).
+
+        Returns:
+            bool: True if the acquisition thread is running.
+        """
+        try:
+            if self.high_rate is not None:
+                return True
+            from src.highrate import HighRateTracker, Decimator, TRACK_HEADER
+            device = source if source is not None else self.gnss
+            if device is None:
+                print("GNSS hardware interface not initialised.")
+                return False
+            track = FixLog(track_path or os.path.join(self.logs_dir, 'gnss_track.csv'), header=TRACK_HEADER,
+                           **track_options)
+            self.high_rate = HighRateTracker(device.get_all_gnss, hz=hz, ring_size=ring_size, track=track,
+                                             decimator=Decimator(decimate_every, decimate_interval),
+                                             flush_interval=flush_interval)
+            return self.high_rate.start()
+        except Exception as e:
+            print(f"Error in start_high_rate: {e}")
+            self.high_rate = None
+            return False
+
+    def stop_high_rate(self):
+        """Stop high-rate acquisition and write out the rest of the track."""
+        try:
+            if self.high_rate is not None:
+                self.high_rate.stop()
+                self.high_rate.track.close()
+            self.high_rate = None
+        except Exception as e:
+            print(f"Error in stop_high_rate: {e}")
+
+    def use_register_fixes(self, crosscheck_every=30, tolerance=1e-5, max_mismatches=3):
+        """
+        Read fixes from the module's fix register block (one FIX_REGS_LEN byte read) instead of
+        parsing the NMEA dump, with an NMEA cross-check every `crosscheck_every` reads (see
+        src/regfix.py). The registers carry no fix quality or HDOP: fx is derived from the
+        position and satellite count, hdop is the one of the latest cross-check.
+
+        Args:
+            crosscheck_every (int): Reads between NMEA cross-checks (0 = never).
+            tolerance (float): Degrees a cross-checked position may differ by.
+            max_mismatches (int): Disagreeing cross-checks in a row that go back to NMEA.
+
+        Returns:
+            bool: True if fixes now come from the registers (False in test mode or with a
+            device without the register block, e.g. a replay).
+        """
+        try:
+            if self.test_mode or not hasattr(self.gnss, 'get_fix_registers'):
+                print("GNSS fix registers not available, reading the NMEA dump.")
+                return False
+            from src.regfix import RegisterFixReader
+            self.register_reader = RegisterFixReader(self.gnss, lambda: self.read_gnss_dict(registers=False),
+                                                     crosscheck_every=crosscheck_every, tolerance=tolerance,
+                                                     max_mismatches=max_mismatches)
+            return True
+        except Exception as e:
+            print(f"Error in use_register_fixes: {e}")
+            self.register_reader = None
+            return False
+
+    def get_latest_fix(self):
+        """
+        Return the newest fix from the acquisition ring without touching the device.
+
+        Returns:
+            tuple: (gnss_dict, age_s, skipped) where age_s is how long ago the fix was read and
+            skipped is how many newer-than-last-returned fixes were passed over, or (None, None, 0)
+            if the ring is still empty.
+        """
+        gnss_dict, age, skipped, _ = self._take_fix()
+        return gnss_dict, age, skipped
+
+    def _take_fix(self):
+        """get_latest_fix() plus whether the fix is newer than the one taken before (one lock)."""
+        with self._fix_lock:
+            if not self._fix_ring:
+                return None, None, 0, False
+            read_at, seq, gnss_dict = self._fix_ring[-1]
+            new = seq > self._fix_seq_taken
+            skipped = max(0, seq - self._fix_seq_taken - 1)
+            self._fix_seq_taken = seq
+        return gnss_dict, time.monotonic() - read_at, skipped, new
+
     def get_gnss_dict(self, test_mode=None):
+        """
+        Get the current GNSS fix dict (see read_gnss_dict for the keys).
+
+        With background acquisition running this returns the newest cached fix at once and sets
+        `last_fix_age` / `last_fix_skipped`. Before the first fix is cached it waits up to one
+        search interval for it. A fix dict of Nones (the same as "no data") is returned, with
+        `last_fix_new` False, while no fix arrived since the previous call (the loop runs faster
+        than the reads) or the newest one is older than `max_fix_age` (a wedged reader), so the
+        same fix never goes into a batch twice. Without the thread it reads the device
+        synchronously. In high-rate mode see start_high_rate().
+
+        Args:
+            test_mode (bool): Passed to read_gnss_dict on a synchronous read.
+
+        Returns:
+            dict: The fix dict, or {} on error.
+        """
+        if self.high_rate is not None:
+            fixes = self.high_rate.take_uplink()
+            self.uplink_backfill = fixes[:-1]
+            self.last_fix_age = None
+            self.last_fix_skipped = 0
+            self.last_fix_new = bool(fixes)
+            return fixes[-1] if fixes else dict.fromkeys(FIX_KEYS)
+        if self._acq_thread is not None:
+            if not self._fix_ready.is_set():
+                self._fix_ready.wait(self.search_rate)
+            gnss_dict, age, skipped, new = self._take_fix()
+            self.last_fix_age = age
+            self.last_fix_skipped = skipped
+            max_age = self.max_fix_age if self.max_fix_age is not None else 3 * self._acq_period
+            self.last_fix_new = gnss_dict is not None and new and age <= max_age
+            return gnss_dict if self.last_fix_new else dict.fromkeys(FIX_KEYS)
+        self.last_fix_age = 0.0
+        self.last_fix_skipped = 0
+        self.last_fix_new = True
+        return self.read_gnss_dict(test_mode)
+
+    def read_gnss_dict(self, test_mode=None, registers=None):
         """
         Retrieves and parses GNSS (Global Navigation Satellite System) data, returning a compact dictionary
         with key navigation and status fields.
@@ -95,8 +400,12 @@ class GNSS:
         and parses them to obtain relevant information such as position, time, speed, course, fix quality,
         number of satellites, altitude, and horizontal dilution of precision.
 
+        After use_register_fixes() the fix comes from the module's register block instead (same
+        keys, see src/regfix.py), unless `registers` is False.
+
         Args:
             test_mode (bool): If True, uses example NMEA sentences for testing instead of live GNSS data.
+            registers (bool): Read the register block (None: when use_register_fixes() is on).
 
         Returns:
             dict: A dictionary containing the following keys:
@@ -119,89 +428,52 @@ class GNSS:
         try: 
             if test_mode is None:
                 test_mode = self.test_mode
+            if registers is None:
+                registers = self.register_reader is not None and not test_mode
+            t0 = time.perf_counter()
+            if registers:
+                gnss_dict = self.register_reader.read()
+                # a cross-check read timed itself as an NMEA read
+                if not self.register_reader.last_was_nmea:
+                    self._observe('acquire', t0)
+                return gnss_dict
             # 1) raw bytes (ints) -> text lines
             # TEST
             if test_mode:
                 # Example NMEA sentences for testing
-                all_gnss_data = [36, 71, 78, 71, 71, 65, 44, 49, 49, 51, 55, 49, 53, 46, 48, 48, 48, 44, 51, 52, 48, 56, 46, 51, 54, 53, 53, 51, 44, 83, 44, 48, 49, 56, 50, 51, 46, 53, 54, 54, 50, 48, 44, 69, 44, 49, 44, 49, 56, 44, 48, 46, 55, 44, 55, 56, 46, 55, 44, 77, 44, 51, 48, 46, 56, 44, 77, 44, 44, 42, 54, 52, 13, 10, 36, 71, 78, 71, 76, 76, 44, 51, 52, 48, 56, 46, 51, 54, 53, 53, 51, 44, 83, 44, 48, 49, 56, 50, 51, 46, 53, 54, 54, 50, 48, 44, 69, 44, 49, 49, 51, 55, 49, 53, 46, 48, 48, 48, 44, 65, 44, 65, 42, 53, 67, 13, 10, 36, 71, 78, 71, 83, 65, 44, 65, 44, 51, 44, 48, 49, 44, 48, 50, 44, 48, 51, 44, 48, 55, 44, 48, 56, 44, 49, 52, 44, 49, 55, 44, 49, 57, 44, 50, 50, 44, 51, 48, 44, 44, 44, 49, 46, 53, 44, 48, 46, 55, 44, 49, 46, 51, 44, 49, 42, 51, 55, 13, 10, 36, 71, 78, 71, 83, 65, 44, 65, 44, 51, 44, 48, 56, 44, 50, 57, 44, 51, 48, 44, 51, 54, 44, 52, 53, 44, 44, 44, 44, 44, 44, 44, 44, 49, 46, 53, 44, 48, 46, 55, 44, 49, 46, 51, 44, 52, 42, 51, 49, 13, 10, 36, 71, 78, 71, 83, 65, 44, 65, 44, 51, 44, 55, 56, 44, 56, 48, 44, 55, 57, 44, 44, 44, 44, 44, 44, 44, 44, 44, 44, 49, 46, 53, 44, 48, 46, 55, 44, 49, 46, 51, 44, 50, 42, 51, 65, 13, 10, 36, 71, 80, 71, 83, 86, 44, 51, 44, 49, 44, 49, 50, 44, 48, 49, 44, 54, 53, 44, 49, 48, 55, 44, 50, 49, 44, 48, 50, 44, 51, 56, 44, 49, 51, 53, 44, 50, 49, 44, 48, 51, 44, 50, 48, 44, 48, 53, 53, 44, 51, 53, 44, 48, 54, 44, 48, 55, 44, 51, 51, 48, 44, 44, 48, 42, 54, 56, 13, 10, 36, 71, 80, 71, 83, 86, 44, 51, 44, 50, 44, 49, 50, 44, 48, 55, 44, 51, 50, 44, 51, 53, 52, 44, 50, 50, 44, 48, 56, 44, 49, 52, 44, 49, 49, 51, 44, 50, 56, 44, 49, 51, 44, 48, 54, 44, 50, 53, 54, 44, 44, 49, 52, 44, 54, 48, 44, 50, 49, 52, 44, 50, 55, 44, 48, 42, 54, 51, 13, 10, 36, 71, 80, 71, 83, 86, 44, 51, 44, 51, 44, 49, 50, 44, 49, 55, 44, 52, 53, 44, 50, 54, 48, 44, 50, 52, 44, 49, 57, 44, 50, 54, 44, 50, 55, 52, 44, 50, 55, 44, 50, 50, 44, 52, 48, 44, 50, 50, 52, 44, 50, 54, 44, 51, 48, 44, 53, 49, 44, 51, 49, 54, 44, 50, 54, 44, 48, 42, 54, 56, 13, 10, 36, 66, 68, 71, 83, 86, 44, 50, 44, 49, 44, 48, 54, 44, 48, 53, 44, 44, 44, 51, 49, 44, 48, 56, 44, 50, 54, 44, 49, 49, 48, 44, 50, 53, 44, 50, 57, 44, 55, 57, 44, 50, 51, 50, 44, 49, 54, 44, 51, 48, 44, 51, 55, 44, 49, 51, 53, 44, 50, 52, 44, 48, 42, 52, 65, 13, 10, 36, 66, 68, 71, 83, 86, 44, 50, 44, 50, 44, 48, 54, 44, 51, 54, 44, 53, 54, 44, 48, 50, 52, 44, 51, 52, 44, 52, 53, 44, 54, 55, 44, 50, 52, 49, 44, 50, 54, 44, 48, 42, 55, 54, 13, 10, 36, 71, 76, 71, 83, 86, 44, 50, 44, 49, 44, 48, 54, 44, 55, 56, 44, 50, 49, 44, 48, 52, 48, 44, 51, 52, 44, 56, 48, 44, 52, 53, 44, 50, 48, 55, 44, 50, 49, 44, 55, 57, 44, 55, 51, 44, 48, 54, 53, 44, 49, 57, 44, 56, 56, 44, 48, 53, 44, 49, 52, 52, 44, 44, 48, 42, 55, 57, 13, 10, 36, 71, 76, 71, 83, 86, 44, 50, 44, 50, 44, 48, 54, 44, 56, 49, 44, 54, 56, 44, 49, 54, 52, 44, 44, 54, 56, 44, 50, 50, 44, 50, 57, 48, 44, 44, 48, 42, 55, 69, 13, 10, 36, 71, 78, 82, 77, 67, 44, 49, 49, 51, 55, 49, 54, 46, 48, 48, 48, 44, 65, 44, 51, 52, 48, 56, 46, 51, 54, 53, 53, 51, 44, 83, 44, 48, 49, 56, 50, 51, 46, 53, 54, 54, 50, 49, 44, 69, 44, 48, 46, 48, 48, 44, 53, 55, 46, 52, 51, 44, 48, 50, 48, 57, 50, 53, 44, 44, 44, 65, 44, 86, 42, 50, 65, 13, 10, 36, 71, 78, 86, 84, 71, 44, 53, 55, 46, 52, 51, 44, 84, 44, 44, 77, 44, 48, 46, 48, 48, 44, 78, 44, 48, 46, 48, 48, 44, 75, 44, 65, 42, 49, 54, 13, 10, 36, 71, 78, 90, 68, 65, 44, 49, 49, 51, 55, 49, 54, 46, 48, 48, 48, 44, 48, 50, 44, 48, 57, 44, 50, 48, 50, 53, 44, 48, 48, 44, 48, 48, 42, 52, 53, 13, 10, 36, 71, 80, 84, 88, 84, 44, 48, 49, 44, 48, 49, 44, 48, 49, 44, 65, 78, 84, 69, 78, 78, 65, 32, 79, 75, 42, 51, 53, 13, 10]
+                all_gnss_data = TEST_GNSS_DATA
             else:
                 if self.gnss:
                     try:
                         all_gnss_data = self.gnss.get_all_gnss() or [] # get the raw byte array (ints)
                     except Exception as e:
-                        print(f"Error in get_gnss_dict: {e}")
+                        print(f"Error in read_gnss_dict: {e}")
                         all_gnss_data = []
                 else:
                     all_gnss_data = []
-            all_gnss_data_text = ''.join(chr(b) for b in all_gnss_data) # convert to text
-            all_gnss_data_text = all_gnss_data_text.replace('\x00','') # drop zeros just in case
-
-            rmc = None
-            gga = None
-
-            # 2) parse (Take a raw string (or bytes) and breaking it into structured 
-            # fields according to a grammar or format - NMEA in this case) and 
-            # keep the latest RMC & GGA
-            for line in all_gnss_data_text.splitlines(): # step through lines
-                # check that only NMEA sentences (start with '$')
-                if not line.startswith('$'):
-                    continue
-                try:
-                    # parse with checksum validation to get a pynmea2 object with attributes
-                    msg = pynmea2.parse(line, check=True)
-                except Exception:
-                    continue
-                st = getattr(msg, 'sentence_type', '')
-                if st == 'RMC':
-                    rmc = msg # keep latest RMC 
-                elif st == 'GGA':
-                    gga = msg # keep latest GGA
+            t1 = time.perf_counter()
+            # 1b) raw bytes (ints) -> complete, checksum-valid RMC/GGA sentences. A sentence
+            # cut off at the end of this read is carried over and completed by the next one.
+            lines = self.framer.feed(all_gnss_data)
+
+            # 2) keep the latest RMC & GGA. Other sentence types were skipped by the
+            # framer on their type bytes, and only the two survivors are tokenized.
+            rmc, gga = nmea.latest_rmc_gga(lines, verified=True)
 
             # 3) extract from RMC (lat/lon/time, speed, course)
             utc = lat = lon = sog_k = cog = None
             if rmc:
-                # time/date (UTC) as an epoch seconds (int) - seconds since 1970-01-01
-                datestamp = getattr(rmc, 'datestamp', None)
-                timestamp = getattr(rmc, 'timestamp', None)
-                if datestamp and timestamp:
-                    dt = datetime.combine(datestamp, timestamp).replace(tzinfo=timezone.utc) # dt = datetime.combine(rmc.datestamp, rmc.timestamp).replace(tzinfo=timezone.utc)
-                    utc = int(dt.timestamp())   # epoch seconds (int)
-                    if test_mode: #TEST
-                        utc = int(time.time())  # override with current time in test mode
-                # positions (float degrees)
-                lat = getattr(rmc, 'latitude', None)
-                lon = getattr(rmc, 'longitude', None)
+                # utc as epoch seconds (int), positions in float degrees, speed/course (blank -> 0.0)
+                utc, lat, lon, sog_k, cog = nmea.parse_rmc(rmc)
+                if test_mode and utc is not None: #TEST
+                    utc = int(time.time())  # override with current time in test mode
                 if test_mode: #TEST
                     lat = lat + (random.randint(0, 100) / 1_000_000) # add small random offset for testing
-                # speed/course (may be blank)
-                try:
-                    sog_k = float(getattr(rmc, 'spd_over_grnd', 0) or 0.0)# float(rmc.spd_over_grnd) if rmc.spd_over_grnd else None
-                except Exception:
-                    sog_k = None
-                try:
-                    cog = float(getattr(rmc, 'true_course', 0) or 0.0)# float(rmc.true_course) if rmc.true_course else None
-                except Exception:
-                    cog = None
 
             # 4) extract from GGA (fix, hdop, sats, alt)
             fx = hdop = nsat = alt = None
             if gga:
-                try:
-                    fx = int(getattr(gga, 'gps_qual', 0) or 0)          # 0=no fix, 1=GPS, 2=DGPS, 4/5=RTK...
-                except Exception:
-                    fx = 0
-                try:
-                    nsat = int(getattr(gga, 'num_sats', 0) or 0)
-                except Exception:
-                    nsat = 0
-                try:
-                    alt = float(getattr(gga, 'altitude', 0) or 0.0)
-                except Exception:
-                    alt = None
-                try:
-                    hdop = float(getattr(gga, 'horizontal_dil', 0) or 0.0)
-                except Exception:
-                    hdop = None
+                fx, nsat, alt, hdop = nmea.parse_gga(gga) # fx: 0=no fix, 1=GPS, 2=DGPS, 4/5=RTK...
 
             # 5) tiny rounding to keep JSON small but useful
             def r(x, n): return None if x is None else round(x, n)
@@ -224,9 +496,12 @@ class GNSS:
                 'hdop': hdop,   # horizontal dilution of precision (smaller is better, should be < 2.0)
                 'nsat': nsat    # number of satellites used in fix (needs to be >= 4 for 3D fix)
             }
+            if self.metrics is not None:
+                self.metrics.observe('acquire', t1 - t0)
+            self._observe('parse', t1)
             return gnss_dict
         except Exception as e:
-            print(f"get_gnss_dict: {e}")
+            print(f"read_gnss_dict: {e}")
             return {}
     
     def check_sats(self, gnss_dict):
@@ -258,6 +533,7 @@ class GNSS:
         Returns: updated gnss_dict_send with appended entry.
         """
         try:
+            t0 = time.perf_counter()
             # If this is the first fix, initialise the container
             if not gnss_dict_send:
                 gnss_dict_send = {"f": []}
@@ -265,15 +541,42 @@ class GNSS:
             # Append the new fix
             gnss_dict_send["f"].append(gnss_dict_current)
 
+            self._observe('batch', t0)
             return gnss_dict_send
         except Exception as e:
             print(f"Error in append_gnss_dict_send: {e}")
             return gnss_dict_send
     
+    def batch_id(self, gnss_dict_send):
+        """
+        Unique ID of a batch: the newest fix UTC in it.
+
+        A batch whose fixes all lack a time (no RMC) gets the next ID after the newest one
+        given out or pending, so it is still written and queued under an integer ID.
+
+        Args:
+            gnss_dict_send (dict): Batch dictionary ({"f": [fixes]}).
+
+        Returns:
+            int: Batch ID.
+        """
+        utcs = [f["utc"] for f in gnss_dict_send.get("f", []) if isinstance(f, dict) and f.get("utc") is not None]
+        if utcs:
+            utc_id = int(max(utcs))
+        else:
+            utc_id = max(self._last_batch_id, max(self.transmit_backlog, default=0)) + 1
+        self._last_batch_id = max(self._last_batch_id, utc_id)
+        return utc_id
+
     def wait_for_send(self, last_gnss_time, search_rate):
         """
         Waits until the next GNSS search interval has elapsed.
 
+        With `scheduler` set this sleeps until its next tick deadline (and `last_gnss_time` /
+        `search_rate` are not used), so processing time and clock steps do not shift the fix
+        cadence. With `metrics` set the sleep is recorded as the 'wait' stage, and an interval
+        that was already used up counts as a 'loop_overrun'.
+
         Args:
             last_gnss_time (float): Timestamp of the last GNSS reading.
             search_rate (int): GNSS search rate in seconds.
@@ -282,16 +585,57 @@ class GNSS:
             None
         """
         try:
-            elapsed = time.time() - last_gnss_time # time since last GNSS reading
-            wait_time = max(0, search_rate - elapsed) # time to wait to maintain search rate
-            if wait_time > 0: # only sleep if we need to (if more than serach_rate seconds has passed, no need to wait)
-                time.sleep(wait_time) # wait the required time
+            if self.scheduler is not None:
+                wait_time = self.scheduler.wait()
+            else:
+                elapsed = time.time() - last_gnss_time # time since last GNSS reading
+                wait_time = max(0, search_rate - elapsed) # time to wait to maintain search rate
+                if wait_time > 0: # only sleep if we need to (if more than serach_rate seconds has passed, no need to wait)
+                    time.sleep(wait_time) # wait the required time
+            if self.metrics is not None:
+                self.metrics.observe('wait', wait_time)
+                if wait_time <= 0:
+                    self.metrics.count('loop_overrun')
         except Exception as e:
             print(f"Error in wait_for_send: {e}")
 
+    def interval_time_left(self, last_gnss_time):
+        """
+        Seconds left for sending in the current search interval: up to 95% of it, measured
+        from the scheduler's tick deadline when `scheduler` is set, else from `last_gnss_time`.
+        Negative once that share is used up.
+        """
+        if self.scheduler is not None:
+            return self.scheduler.remaining() - 0.05 * self.scheduler.period
+        return 0.95 * self.search_rate - (time.time() - last_gnss_time)
+
+    def open_fix_log(self, **options):
+        """
+        (Re)open the fix log `logs/gnss_log.txt` used by append_gnss_to_log.
+
+        Args:
+            **options: FixLog options (mode, sync_every, sync_interval, max_bytes, rotate_daily,
+                compress, max_backups). The defaults flush every fix to the OS without fsync,
+                like the log always did, and rotate daily or at 5 MB into gzipped files.
+
+        Returns:
+            bool: True if the log is ready, False otherwise.
+        """
+        try:
+            if self.fix_log is not None:
+                self.fix_log.close()
+            self.fix_log = FixLog(os.path.join(self.logs_dir, 'gnss_log.txt'), **options)
+            return True
+        except Exception as e:
+            print(f"Error in open_fix_log: {e}")
+            self.fix_log = None
+            return False
+
     def append_gnss_to_log(self, gnss_dict_current):
         """
-        Append a GNSS dictionary entry to the transmit log file.
+        Append a GNSS dictionary entry to the fix log (one JSON line per fix).
+
+        The log file stays open between calls; durability and rotation follow open_fix_log().
 
         Args:
             gnss_dict (dict): GNSS data dictionary to append.
@@ -300,11 +644,11 @@ class GNSS:
             None
         """
         try:
-            log_path = os.path.join(os.path.dirname(__file__), '../logs/gnss_log.txt')
-            with open(log_path, 'a') as log_file:
-                log_file.write(json.dumps(gnss_dict_current) + '\n')
-            # Append gnss_dict to a log file for later transmission
-            # Implement file handling and appending logic here
+            t0 = time.perf_counter()
+            if self.fix_log is None and not self.open_fix_log():
+                return
+            self.fix_log.append(gnss_dict_current)
+            self._observe('log', t0)
         except Exception as e:
             print(f"Error in append_gnss_to_log: {e}")
 
@@ -364,17 +708,41 @@ class GNSS:
             gnss_dict_send (dict): Dictionary containing GNSS data to send.
             unique_id (str): Unique identifier for the JSON file.
 
+        With `simplify_tolerance` > 0 the fixes are simplified first (first and last fix always
+        kept, every dropped fix reproducible within the tolerance by time interpolation) and
+        `last_simplify` holds the reduction.
+
         Returns:
-            str: Path to the created JSON file.
+            str: Path to the created JSON file (the queue segment with use_segment_queue()).
         """
         try:
+            t0 = time.perf_counter()
+            if self.simplify_tolerance > 0 and len(gnss_dict_send.get("f", [])) > 2:
+                fixes = gnss_dict_send["f"]
+                from src.simplify import simplify_fixes  # numpy is only imported when simplification is on
+                kept, max_error = simplify_fixes(fixes, self.simplify_tolerance)
+                self.last_simplify = {"fixes_in": len(fixes), "fixes_out": len(kept),
+                                      "ratio": len(kept) / len(fixes), "max_error_m": max_error}
+                gnss_dict_send = {**gnss_dict_send, "f": kept}
+            fixes = gnss_dict_send.get("f", [])
+            utcs = [f["utc"] for f in fixes if isinstance(f, dict) and f.get("utc") is not None]
             # Convert to compact format if requested
             if compact:
                 gnss_dict_send = self.compress_gnss_dict(gnss_dict_send, scaled=False)
+            if self.queue is not None:
+                # segment queue: the batch is appended and queued right away
+                self.queue.put(unique_id, json.dumps(gnss_dict_send, separators=(',', ':')).encode())
+                self._observe('serialize', t0)
+                return self.queue.tail_path
             # Save to a JSON file
-            json_path = os.path.join(os.path.dirname(__file__), f'../logs/gnss_{unique_id}.json')
+            json_path = os.path.join(self.logs_dir, f'gnss_{unique_id}.json')
+            data = json.dumps(gnss_dict_send, separators=(',', ':')) # compact JSON
             with open(json_path, 'w') as json_file:
-                json.dump(gnss_dict_send, json_file, separators=(',', ':')) # compact JSON
+                json_file.write(data)
+            # details for the backlog index, so queueing the file does not have to stat it
+            self._batch_info[unique_id] = (len(data.encode()), len(fixes), min(utcs, default=None),
+                                           max(utcs, default=None))
+            self._observe('serialize', t0)
             return json_path
         except Exception as e:
             print(f"Error in create_gnss_json: {e}")
@@ -436,6 +804,37 @@ class GNSS:
             print(f"Error in decompress_gnss_json: {e}")
             return {"f": []}
     
+    def encode_gnss_binary(self, gnss_dict):
+        """
+        Encode a GNSS dict as a binary batch: the first fix as scaled integers (same scaling as
+        compress_gnss_dict(scaled=True)) and every later fix as zigzag-varint deltas. See
+        src/fixcodec.py for the format.
+
+        Args:
+            gnss_dict (dict): {'f': [ {fix}, ... ]}
+
+        Returns:
+            bytes: The encoded batch, or b"" on error.
+        """
+        try:
+            return fixcodec.encode_batch(gnss_dict.get("f", []))
+        except Exception as e:
+            print(f"Error in encode_gnss_binary: {e}")
+            return b""
+
+    def decode_gnss_binary(self, data):
+        #THIS IS FOR TESTING PURPOSES and USE ON SERVER SIDE
+        """
+        Decode a batch from encode_gnss_binary() back into a list of fix dicts.
+
+        Returns: dict {"f": [ {full_fix}, ... ]}
+        """
+        try:
+            return {"f": fixcodec.decode_batch(data)}
+        except Exception as e:
+            print(f"Error in decode_gnss_binary: {e}")
+            return {"f": []}
+
     def json_file_exists(self, name, directory):
         """
         Check if a .json file with the given name exists in the specified directory.
@@ -478,20 +877,26 @@ class GNSS:
     def add_to_transmit_backlog(self, current_utc_id):
         """
         Check if current_utc_id is in transmit_backlog; if not, add it to the end.
-        
+
+        Files written by create_gnss_json() are queued with the details it recorded (no stat);
+        any other ID is only queued if its file exists.
+
         Args:
-            transmit_backlog (list): List of UTC IDs (strings).
             current_utc_id (int): The UTC ID to check/add.
-        
-        Returns:
-            list: Updated transmit_backlog list.
         """
         try:
+            if self.queue is not None:
+                return  # already queued by create_gnss_json
             # check if current_utc_id is already in the backlog
-            if current_utc_id not in self.transmit_backlog:
-                # check if the corresponding JSON file exists in the logs directory
-                if self.json_file_exists(f"gnss_{current_utc_id}", os.path.join(os.path.dirname(__file__), '../logs/')):
-                    self.transmit_backlog.append(current_utc_id)
+            if current_utc_id in self.transmit_backlog:
+                return
+            info = self._batch_info.pop(current_utc_id, None)
+            if info is None:
+                # not written by create_gnss_json in this run: the file must exist (details unknown)
+                if not self.json_file_exists(f"gnss_{current_utc_id}", self.logs_dir):
+                    return
+                info = ()
+            self.transmit_backlog.add(current_utc_id, *info)
         except Exception as e:
             print(f"Error in add_to_transmit_backlog: {e}")
 
@@ -508,18 +913,24 @@ class GNSS:
             list: Updated transmit_backlog list.
         """
         try:
+            if self.queue is not None:
+                # the segment queue is acked in order: only the oldest entry can be removed
+                if self.queue and self.queue[0] == sent_utc_id:
+                    self.queue.ack()
+                else:
+                    print(f"gnss_{sent_utc_id} is not the oldest queued batch, not removed.")
+                return
             # Remove the sent_utc_id from the backlog if present
-            if sent_utc_id in self.transmit_backlog:
-                self.transmit_backlog.remove(sent_utc_id)
+            if self.transmit_backlog.discard(sent_utc_id):
                 # Delete the corresponding JSON file from the logs directory
-                logs_dir = os.path.join(os.path.dirname(__file__), '../logs/')
-                self.delete_json_file(f"gnss_{sent_utc_id}", logs_dir)
+                self.delete_json_file(f"gnss_{sent_utc_id}", self.logs_dir)
         except Exception as e:
             print(f"Error in remove_from_transmit_backlog: {e}")
 
     def check_enough_time_remaining(self, last_gnss_time, search_rate):
         """
-        Check if there is enough time remaining in the current search interval.
+        Check if there is enough time remaining in the current search interval (95% rule,
+        on the scheduler's deadlines when `scheduler` is set, see interval_time_left).
 
         Args:
             start_time (float): Timestamp when the current GNSS search interval started.
@@ -529,52 +940,387 @@ class GNSS:
             bool: True if enough time remains, False otherwise.
         """
         try:
-            elapsed = time.time() - last_gnss_time # time since start of current search interval
+            if self.scheduler is not None:
+                enough = self.interval_time_left(last_gnss_time) > 0
+            else:
+                elapsed = time.time() - last_gnss_time # time since start of current search interval
+                enough = elapsed < 0.95*search_rate # True if we are still within the search rate interval
 
             #TEST
-            print(f"enough time remaining: {elapsed < 0.95*search_rate}")
+            log.debug("enough time remaining: %s", enough)
 
-            return elapsed < 0.95*search_rate # True if we are still within the search rate interval
+            return enough
         except Exception as e:
             print(f"Error in check_enough_time_remaining: {e}")
             return False
     
     def update_backlog_file(self, transmit_backlog):
         """
-        Persist the current transmit_backlog to logs/backlog.txt (overwrite existing).
+        Persist the current transmit_backlog to logs/backlog.txt (replaced atomically, and only
+        when the backlog changed since it was last written).
 
         Args:
-            transmit_backlog (list): List of UTC IDs representing GNSS JSON files that failed to transmit.
+            transmit_backlog (BacklogIndex | list): UTC IDs of the GNSS JSON files waiting to be sent.
 
         Returns:
             None
         """
         try:
-            # Persist the current transmit_backlog to logs/backlog.txt (overwrite existing)
+            if self.queue is not None:
+                return  # the segment queue persists itself
+            if not isinstance(transmit_backlog, BacklogIndex):
+                transmit_backlog = BacklogIndex(transmit_backlog)
             try:
-                backlog_path = os.path.join(os.path.dirname(__file__), '../logs/backlog.txt')
-                # Ensure logs directory exists
-                os.makedirs(os.path.dirname(backlog_path), exist_ok=True)
-                with open(backlog_path, 'w') as f:
-                    json.dump(transmit_backlog, f)
+                transmit_backlog.save(os.path.join(self.logs_dir, 'backlog.txt'))
             except Exception as e:
                 print(f"Failed to write backlog.txt: {e}")
         except Exception as e:
             print(f"Error in update_backlog_file: {e}")
 
+    def drain_backlog(self, cell, time_budget, byte_budget=None, max_failures=None, clock=time.monotonic):
+        """
+        Send backlog files oldest-first within an explicit time/byte budget, iteratively.
+
+        The backlog is walked over a snapshot of its IDs and every sent or missing entry is
+        dropped from the index as it goes, so each step is O(1) (no list.remove / index scans).
+        Sizes come from the index; each file sent on its own costs one existence check, a
+        missing file is dropped from the backlog. A failed send is retried (the
+        backlog stays in order) until the budget or `max_failures` runs out. At least one send
+        is always attempted when there is something to send, even with a zero budget.
+
+        While more than one entry is pending and the transport supports bundles (a Cellular with
+        `bundle_max_bytes` > 0), as many batches as fit in `bundle_max_bytes` go in one
+        send_bundle() upload. The server acknowledges each batch in it: acknowledged batches are
+        deleted, the others stay in the backlog in order and the upload counts as one failure.
+        Without bundles, a transport with `pipeline` > 1 (a Cellular with a persistent
+        connection) gets up to that many files at once through send_many(): still one upload
+        per file, but sharing round trips. Each failed file counts as a failure and is retried.
+
+        Args:
+            cell (object): Transport with a `send_file(path) -> bool` method (and optionally
+                `send_bundle(batches) -> acked ids` with `bundle_max_bytes`).
+            time_budget (float): Seconds available for sending.
+            byte_budget (int | None): Max bytes to send (file sizes); the first file always goes.
+            max_failures (int | None): Stop after this many failed sends (None: only the budget).
+            clock (callable): Monotonic clock, replaceable in tests/benchmarks.
+
+        Returns:
+            dict: {'sent', 'failed', 'missing', 'remaining', 'bytes_sent', 'time_used', 'uploads'}.
+        """
+        if self.queue is not None:
+            return self._drain_queue(cell, time_budget, byte_budget, max_failures, clock)
+        start = clock()
+        backlog = self.transmit_backlog
+        pending = backlog.ids()
+        bundle_limit = self._bundle_limit(cell)
+        depth = self._pipeline_depth(cell)
+        head = 0
+        sent = failed = missing = bytes_sent = uploads = 0
+        try:
+            while head < len(pending):
+                if (sent or failed) and clock() - start >= time_budget:
+                    break
+                if bundle_limit and len(pending) - head > 1:
+                    # pack from the head until the bundle (or the byte budget) is full
+                    bundle, end, used = [], head, 0
+                    budget_spent = False
+                    while end < len(pending):
+                        utc_id = pending[end]
+                        try:
+                            with open(os.path.join(self.logs_dir, f"gnss_{utc_id}.json"), 'rb') as f:
+                                data = f.read()
+                        except FileNotFoundError:
+                            print(f"File gnss_{utc_id}.json not found, removing from backlog.")
+                            backlog.discard(utc_id)
+                            missing += 1
+                            end += 1
+                            continue
+                        size = bundle_entry_size(utc_id, data)
+                        if bundle and used + size > bundle_limit:
+                            break
+                        if (byte_budget is not None and (sent or bundle)
+                                and bytes_sent + sum(len(d) for _, d in bundle) + len(data) > byte_budget):
+                            budget_spent = True
+                            break
+                        bundle.append((utc_id, data))
+                        used += size
+                        end += 1
+                    if not bundle:
+                        if budget_spent:
+                            break  # not even the next batch fits in the byte budget
+                        head = end  # only missing files
+                        continue
+                    uploads += 1
+                    t0 = clock()
+                    acked = set(cell.send_bundle(bundle))
+                    self._observe_send(len(acked) == len(bundle), clock() - t0)
+                    for utc_id, data in bundle:
+                        if utc_id in acked:
+                            self.delete_json_file(f"gnss_{utc_id}", self.logs_dir)
+                            backlog.discard(utc_id)
+                            sent += 1
+                            bytes_sent += len(data)
+                    kept = [utc_id for utc_id, _ in bundle if utc_id not in acked]
+                    if not kept:
+                        head = end
+                        continue
+                    # acknowledged and missing entries left the index, the rest is retried first
+                    pending[head:end] = kept
+                    failed += 1
+                    if max_failures is not None and failed >= max_failures:
+                        break
+                    continue
+                if depth > 1 and len(pending) - head > 1:
+                    # pipeline up to `depth` files on the connection, each still its own upload
+                    group, end, group_bytes = [], head, 0
+                    while end < len(pending) and len(group) < depth:
+                        utc_id = pending[end]
+                        path = os.path.join(self.logs_dir, f"gnss_{utc_id}.json")
+                        info = backlog.info(utc_id)
+                        size = info.size if info is not None and info.size is not None else None
+                        try:
+                            if size is None:
+                                size = os.path.getsize(path)
+                        except FileNotFoundError:
+                            print(f"File gnss_{utc_id}.json not found, removing from backlog.")
+                            backlog.discard(utc_id)
+                            missing += 1
+                            end += 1
+                            continue
+                        if byte_budget is not None and (sent or group) and bytes_sent + group_bytes + size > byte_budget:
+                            break
+                        group.append((utc_id, path, size))
+                        group_bytes += size
+                        end += 1
+                    if not group:
+                        if end == head:
+                            break  # not even the next file fits in the byte budget
+                        head = end  # only missing files
+                        continue
+                    uploads += len(group)
+                    t0 = clock()
+                    results = self._send_many(cell, [path for _, path, _ in group])
+                    self._observe_send(all(results), clock() - t0)
+                    kept = []
+                    for (utc_id, path, size), ok in zip(group, results):
+                        if ok:
+                            self.delete_json_file(f"gnss_{utc_id}", self.logs_dir)
+                            backlog.discard(utc_id)
+                            sent += 1
+                            bytes_sent += size
+                        else:
+                            kept.append(utc_id)
+                            failed += 1
+                    # sent and missing entries left the index, failed ones are retried first
+                    pending[head:end] = kept
+                    if not kept:
+                        continue
+                    if max_failures is not None and failed >= max_failures:
+                        break
+                    continue
+                utc_id = pending[head]
+                name = f"gnss_{utc_id}"
+                if not self.json_file_exists(name, self.logs_dir):
+                    print(f"File {name}.json not found, removing from backlog.")
+                    backlog.discard(utc_id)
+                    missing += 1
+                    head += 1
+                    continue
+                path = os.path.join(self.logs_dir, f"{name}.json")
+                info = backlog.info(utc_id)
+                size = info.size if info is not None and info.size is not None else 0
+                if byte_budget is not None:
+                    if not size:
+                        size = os.path.getsize(path)
+                    if sent and bytes_sent + size > byte_budget:
+                        break
+                uploads += 1
+                t0 = clock()
+                ok = self._send_file(cell, path)
+                self._observe_send(ok, clock() - t0)
+                if ok:
+                    self.delete_json_file(name, self.logs_dir)
+                    backlog.discard(utc_id)
+                    sent += 1
+                    bytes_sent += size
+                    head += 1
+                else:
+                    failed += 1
+                    if max_failures is not None and failed >= max_failures:
+                        break
+        except Exception as e:
+            print(f"Error in drain_backlog: {e}")
+        return {
+            'sent': sent,
+            'failed': failed,
+            'missing': missing,
+            'remaining': len(backlog),
+            'bytes_sent': bytes_sent,
+            'time_used': clock() - start,
+            'uploads': uploads,
+        }
+
+    def _observe(self, stage, t0):
+        """Record the time since perf_counter() `t0` as `stage` in `metrics` (if set)."""
+        if self.metrics is not None:
+            self.metrics.observe(stage, time.perf_counter() - t0)
+
+    def _observe_send(self, ok, seconds):
+        """Report one upload attempt to `send_observer` (observer errors never break a send)."""
+        if self.send_observer is not None:
+            try:
+                self.send_observer(bool(ok), seconds)
+            except Exception as e:
+                print(f"Error in send_observer: {e}")
+
+    def _send_file(self, cell, path):
+        """cell.send_file(path), with an exception counted as a failed send (e.g. an unreadable file)."""
+        try:
+            return bool(cell.send_file(path))
+        except Exception as e:
+            print(f"Error sending {path}: {e}")
+            return False
+
+    def _send_many(self, cell, paths):
+        """cell.send_many(paths), with an exception counted as a failed send of every file."""
+        try:
+            results = [bool(ok) for ok in cell.send_many(paths)]
+        except Exception as e:
+            print(f"Error sending {len(paths)} files: {e}")
+            results = []
+        return results + [False] * (len(paths) - len(results))
+
+    def _pipeline_depth(self, cell):
+        """Files the transport can have in flight at once (send_many), 1 if it only takes one."""
+        depth = getattr(cell, 'pipeline', 1)
+        return depth if isinstance(depth, int) and depth > 1 and hasattr(cell, 'send_many') else 1
+
+    def _bundle_limit(self, cell):
+        """Bundle payload limit of the transport, 0 if it only takes single files."""
+        limit = getattr(cell, 'bundle_max_bytes', 0)
+        return limit if isinstance(limit, int) and limit > 0 and hasattr(cell, 'send_bundle') else 0
+
+    def _drain_queue(self, cell, time_budget, byte_budget, max_failures, clock):
+        """
+        drain_backlog() for the segment queue: the head record is written to
+        `logs/tmp_send.json` for cell.send_file() and acked once it has been sent.
+
+        Bundles work as in drain_backlog, except that the queue can only be acked in order: a
+        batch acknowledged behind an unacknowledged one is sent again later (the server keys
+        batches by ID, so the repeat is harmless).
+        """
+        start = clock()
+        bundle_limit = self._bundle_limit(cell)
+        sent = failed = bytes_sent = uploads = 0
+        path = os.path.join(self.logs_dir, "tmp_send.json")
+        try:
+            while self.queue:
+                if (sent or failed) and clock() - start >= time_budget:
+                    break
+                if bundle_limit and len(self.queue) > 1:
+                    bundle, used, size_sum = [], 0, 0
+                    while len(bundle) < len(self.queue):
+                        utc_id, payload = self.queue.peek(len(bundle))
+                        size = bundle_entry_size(utc_id, payload)
+                        if bundle and used + size > bundle_limit:
+                            break
+                        if byte_budget is not None and (sent or bundle) and bytes_sent + size_sum + len(payload) > byte_budget:
+                            break
+                        bundle.append((utc_id, payload))
+                        used += size
+                        size_sum += len(payload)
+                    if not bundle:
+                        break  # not even the head batch fits in the byte budget
+                    uploads += 1
+                    t0 = clock()
+                    acked = set(cell.send_bundle(bundle))
+                    self._observe_send(len(acked) == len(bundle), clock() - t0)
+                    n = 0
+                    while n < len(bundle) and bundle[n][0] in acked:
+                        bytes_sent += len(bundle[n][1])
+                        n += 1
+                    if n:
+                        self.queue.ack(n)
+                        sent += n
+                    if n < len(bundle):
+                        failed += 1
+                        if max_failures is not None and failed >= max_failures:
+                            break
+                    continue
+                utc_id, payload = self.queue.peek()
+                if byte_budget is not None and sent and bytes_sent + len(payload) > byte_budget:
+                    break
+                with open(path, 'wb') as f:
+                    f.write(payload)
+                uploads += 1
+                t0 = clock()
+                ok = self._send_file(cell, path)
+                self._observe_send(ok, clock() - t0)
+                if ok:
+                    self.queue.ack()
+                    sent += 1
+                    bytes_sent += len(payload)
+                else:
+                    failed += 1
+                    if max_failures is not None and failed >= max_failures:
+                        break
+        except Exception as e:
+            print(f"Error in drain_backlog: {e}")
+        return {
+            'sent': sent,
+            'failed': failed,
+            'missing': 0,
+            'remaining': len(self.queue),
+            'bytes_sent': bytes_sent,
+            'time_used': clock() - start,
+            'uploads': uploads,
+        }
+
+    def use_segment_queue(self, directory=None, segment_bytes=64 * 1024):
+        """
+        Keep the transmit backlog in an append-only SegmentQueue instead of one
+        `gnss_{id}.json` file per batch plus backlog.txt.
+
+        create_gnss_json() then appends the batch to the queue, add_to_transmit_backlog() has
+        nothing left to do and remove_from_transmit_backlog()/drain_backlog() ack the head.
+        `transmit_backlog` becomes the queue itself (it reads like a list of UTC IDs). Batches
+        still waiting as files from the per-file backlog are moved into the queue.
+
+        Args:
+            directory (str | None): Queue directory, `logs/queue/` by default.
+            segment_bytes (int): Segment size before a new segment file is started.
+
+        Returns:
+            bool: True if the queue is in use, False if it could not be opened.
+        """
+        try:
+            queue = SegmentQueue(directory or os.path.join(self.logs_dir, 'queue'), segment_bytes)
+            for utc_id in self.transmit_backlog:
+                json_path = os.path.join(self.logs_dir, f"gnss_{utc_id}.json")
+                if os.path.isfile(json_path):
+                    with open(json_path, 'rb') as f:
+                        queue.put(utc_id, f.read())
+                    os.remove(json_path)
+            self.update_backlog_file([])
+            self.queue = queue
+            self.transmit_backlog = queue
+            print(f"Transmit backlog in segment queue ({len(queue)} pending, {queue.truncated} torn bytes dropped).")
+            return True
+        except Exception as e:
+            print(f"Error in use_segment_queue: {e}")
+            return False
+
     def send_gnss_json(self, current_utc_id, cell, last_gnss_time):
         """
         Transmit GNSS JSON files, handling the current file and any backlog.
 
         Behavior
-        - When no backlog exists, attempt to send the current file `gnss_{current_utc_id}.json`. On
-          success, delete the file. On failure, ensure `current_utc_id` is appended to
-          `transmit_backlog`.
-        - When a backlog exists, attempt to send the oldest entry first. On success, delete the file
-          and remove its ID from `transmit_backlog`.
-        - If time remains in the current GNSS search interval (based on `last_gnss_time` and
-          `self.search_rate`), the method may attempt additional sends (including recursively) until
-          time runs out or the backlog is empty.
+        - The current file `gnss_{current_utc_id}.json` joins the tail of `transmit_backlog`
+          (if it exists), then drain_backlog() sends oldest-first: successfully sent files are
+          deleted and removed from the backlog, failed ones stay in order.
+        - Sending continues until 95% of the current GNSS search interval (based on
+          `last_gnss_time` and `self.search_rate`) is used or the backlog is empty; at least one
+          attempt is always made.
 
         Parameters
         ----------
@@ -593,95 +1339,61 @@ class GNSS:
         Side Effects
         ------------
         - Deletes successfully transmitted JSON files from `../logs/`.
-        - Mutates `transmit_backlog` by adding failed current IDs and removing successfully sent oldest IDs.
-        - May perform additional send attempts while time remains in the interval.
+        - Mutates `transmit_backlog` and persists it to backlog.txt.
         """
-        # Send the GNSS JSON file
-        try: # very basic error handling
+        try:
             # TEST
-            print(f"entered into send_gnss_json with backlog: {self.transmit_backlog}")
-
-            # check if the transmit_backlog is empty
-            if not self.transmit_backlog: # backlog is empty
-                # check if there is a current position json file to send in the logs directory
-                # if there is send it and if not set transmit log to empty and return
-
-                if self.json_file_exists(f"gnss_{current_utc_id}", os.path.join(os.path.dirname(__file__), '../logs/')):
-                    # print(f"Sending current position gnss_{current_utc_id}.json")
-                    # send the current position json file and return True if successful 
-                    success_transmission = cell.send_file(os.path.join(os.path.dirname(__file__), '../logs', f"gnss_{current_utc_id}.json"))              
-
-                    # if successful, delete the file and return transmit_backlog_empty = True
-                    if success_transmission:
-                        self.delete_json_file(f"gnss_{current_utc_id}", os.path.join(os.path.dirname(__file__), '../logs/'))
-                        print(f"Deleted gnss_{current_utc_id}.json after successful transmission.")
-                        # transmit_backlog_empty = True
-                        # return True
-                    else:
-                        # check if current_utc_id is in the transmit_backlog and add if not
-                        self.add_to_transmit_backlog(current_utc_id)
-                        # TEST s2:
-                        print(f"Failed to send gnss_{current_utc_id}.json, added to backlog.")
-                        print(f"transmit_log: {self.transmit_backlog}")
-                        #
-                        # check if there is enough time remaining in the current search interval to
-                        # send another json file from the transmit_backlog
-                        if self.check_enough_time_remaining(last_gnss_time, self.search_rate):
-                            #TEST s2:
-                            print("enough time to try again.")
-                            #
-                            self.send_gnss_json(current_utc_id, cell, last_gnss_time)
-
-                        # transmit_backlog is not empty
-                        # self.update_backlog_file(self.transmit_backlog)
-                        # return False
-                    
-                else:
-                    print("Log empty and no current json, Nothing to send.")
-                    # reset and transmit_backlog_empty = True
-                    # return True
-                
-            else: # backlog is not empty
-                print("Backlog in transmit log... trying to send oldest entry.")
-                # check if current_utc_id is in the transmit_backlog and add if not
-                self.add_to_transmit_backlog(current_utc_id)
-                # get the oldest entry in the transmit_backlog
-                oldest_utc_id = self.transmit_backlog[0]
-                # check if the json file exists in the logs directory
-                if self.json_file_exists(f"gnss_{oldest_utc_id}", os.path.join(os.path.dirname(__file__), '../logs/')):
-                    # print(f"Sending backlog gnss_{oldest_utc_id}.json")
-                    # send the oldest entry in the transmit_backlog and return True if successful
-                    success_transmission = cell.send_file(os.path.join(os.path.dirname(__file__), '../logs', f"gnss_{oldest_utc_id}.json"))
-                    
-                    # if successful, remove the entry from the transmit_backlog and delete the file
-                    if success_transmission:
-                        self.remove_from_transmit_backlog(oldest_utc_id)
-                else:
-                    # if the file does not exist, remove the entry from the transmit_backlog
-                    print(f"File gnss_{oldest_utc_id}.json not found, removing from backlog.")
-                    self.remove_from_transmit_backlog(oldest_utc_id)
-                
-                # check if there is enough time remaining in the current search interval to
-                # send another json file from the transmit_backlog
-                if self.check_enough_time_remaining(last_gnss_time, self.search_rate):
-                    self.send_gnss_json(current_utc_id, cell, last_gnss_time)
-
-            if self.transmit_backlog:
-                # transmit_backlog is not empty
-                self.update_backlog_file(self.transmit_backlog)
-                return False
-            else:
-                # transmit_backlog is empty
-                self.update_backlog_file(self.transmit_backlog)
-                # TEST s2:
-                print(F"Transmit backlog {self.transmit_backlog}")
-                #
+            log.debug("entered into send_gnss_json with backlog length: %d", len(self.transmit_backlog))
+
+            # the current batch goes behind anything older
+            self.add_to_transmit_backlog(current_utc_id)
+            if not self.transmit_backlog:
+                print("Log empty and no current json, Nothing to send.")
                 return True
-            
+
+            # time left in this interval (same 95% rule as check_enough_time_remaining)
+            time_budget = self.interval_time_left(last_gnss_time)
+            result = self.drain_backlog(cell, time_budget)
+            log.debug("drain result: %s", result)
+
+            self.update_backlog_file(self.transmit_backlog)
+            return not self.transmit_backlog
+
         except Exception as e:
                 print(f"Error in send_gnss_json: {e}")
                 return False
-        
+
+    def create_current_position_json(self, gnss_dict_current, compact=False):
+        """
+        Write the current fix to the temporary `logs/tmp_gnss.json` used for live position sends.
+
+        The name cannot clash with batch files (`gnss_{id}.json`), and the file is overwritten on
+        every call.
+
+        Args:
+            gnss_dict_current (dict): The latest fix.
+            compact (bool): Write the compact array format.
+
+        Returns:
+            str: Path to the temp file, or "" if it could not be written.
+        """
+        try:
+            # Paths and temp filename (avoid clashing with batch files like gnss_{id}.json)
+            os.makedirs(self.logs_dir, exist_ok=True)
+            temp_path = os.path.join(self.logs_dir, "tmp_gnss.json")
+
+            # Convert to same format as the send dict and convert to compact format if required
+            gnss_dict_current = {"f": [gnss_dict_current]}
+            if compact:
+                gnss_dict_current = self.compress_gnss_dict(gnss_dict_current, scaled=False)
+
+            with open(temp_path, 'w') as f:
+                json.dump(gnss_dict_current, f, separators=(',', ':')) # compact json
+            return temp_path
+        except Exception as e:
+            print(f"Failed to write temp current position file: {e}")
+            return ""
+
     def send_current_position(self, cell, gnss_dict_current, last_gnss_time, compact = False):
         """
         Send the current position as a temporary JSON file.
@@ -696,37 +1408,26 @@ class GNSS:
         """
         try:
             #TEST
-            print("Entered send_current_position")
+            log.debug("Entered send_current_position")
             #
 
             tmp_transmit_backlog_empty = False # assume backlog is has contents unless we find otherwise (otherwise we would not be in send current position)
 
-            # Paths and temp filename (avoid clashing with batch files like gnss_{id}.json)
-            logs_dir = os.path.join(os.path.dirname(__file__), '../logs')
-            os.makedirs(logs_dir, exist_ok=True)
-            temp_name = f"tmp_gnss.json"
-            temp_path = os.path.join(logs_dir, temp_name)
-
-            # Convert to same format as the send dict and convert to compact format if required
-            gnss_dict_current = {"f": [gnss_dict_current]}
-            if compact:
-                gnss_dict_current = self.compress_gnss_dict(gnss_dict_current, scaled=False)
-
             # create a temp .json file in the log from the current gnss dict
-            try:
-                with open(temp_path, 'w') as f:
-                    json.dump(gnss_dict_current, f, separators=(',', ':')) # compact json
-            except Exception as e:
-                print(f"Failed to write temp current position file: {e}")
+            temp_path = self.create_current_position_json(gnss_dict_current, compact=compact)
+            if not temp_path:
                 return False
 
             # attempt to send it using cell.send_file()
             def _try_send(path):
+                t0 = time.monotonic()
                 try:
-                    return cell.send_file(path)
+                    ok = cell.send_file(path)
                 except Exception as e:
                     print(f"Error sending temp current position file: {e}")
-                    return False
+                    ok = False
+                self._observe_send(ok, time.monotonic() - t0)
+                return ok
 
             # create a loop to try send file while there is enough time remaining
             enough_time = self.check_enough_time_remaining(last_gnss_time, self.search_rate)
@@ -770,13 +1471,88 @@ class GNSS_lora(GNSS):
         try:
             super().__init__(search_rate)
             self.lora_config = lora_config
+            config = lora_config or {}
+            origin = config.get("origin") or {}
+            # venue origin the packet positions are relative to (defaults to the first fix sent)
+            self.lora_codec = None
+            if origin.get("lat") is not None and origin.get("lon") is not None:
+                self.lora_codec = LoRaPositionCodec(origin["lat"], origin["lon"], origin.get("time") or 0)
+            self.lora_device_id = config.get("device_id", 0)
+            self.lora_seq = 0
+            self.lora_airtime = time_on_air(PACKET_BYTES, sf=config.get("spreading_factor", 7),
+                                            bw_hz=config.get("bandwidth_khz", 125) * 1000,
+                                            cr=config.get("coding_rate", 5) - 4)
+            self.radio = None  # LoRa driver with send(bytes) (not wired up yet)
+            self.lora_scheduler = None  # LoRaScheduler once start_lora_scheduler() is called
+            self.last_packet = None
         except Exception as e:
             print(f"Error in GNSS_lora.__init__: {e}")
 
-    def transmit_current_position(self):
+    def encode_lora_position(self, gnss_dict_current):
+        """
+        Pack a fix into a 12 byte LoRa position packet (see src/lora.py) with the next sequence
+        number. The venue origin defaults to the first fix packed.
+
+        Returns:
+            bytes: The packet.
+        """
+        if self.lora_codec is None:
+            self.lora_codec = LoRaPositionCodec(gnss_dict_current["lat"], gnss_dict_current["lon"])
+        packet = self.lora_codec.encode(gnss_dict_current, self.lora_device_id, self.lora_seq)
+        self.lora_seq = (self.lora_seq + 1) & 0xFF
+        self.last_packet = packet
+        return packet
+
+    def start_lora_scheduler(self, clock=time.monotonic):
+        """
+        Route transmit_current_position through a LoRaScheduler (duty cycle airtime budget)
+        set up from lora_config (frequency_mhz, spreading_factor, bandwidth_khz, coding_rate,
+        position_interval, burst). Needs `radio`.
+
+        Returns:
+            bool: True if the scheduler was started.
+        """
+        try:
+            config = self.lora_config or {}
+            self.lora_scheduler = LoRaScheduler(self.radio, self.encode_lora_position,
+                                                frequency_mhz=config.get("frequency_mhz", 868.0),
+                                                sf=config.get("spreading_factor", 7),
+                                                bw_hz=config.get("bandwidth_khz", 125) * 1000,
+                                                cr=config.get("coding_rate", 5) - 4,
+                                                position_interval=config.get("position_interval"),
+                                                burst=config.get("burst"), clock=clock)
+            return True
+        except Exception as e:
+            print(f"Error in start_lora_scheduler: {e}")
+            self.lora_scheduler = None
+            return False
+
+    def transmit_current_position(self, gnss_dict_current=None):
+        """
+        Pack the current fix into a 12 byte LoRa position packet (see src/lora.py) and hand
+        it to the radio.
+
+        With start_lora_scheduler() the scheduler decides instead: the live position, a missed
+        earlier position or nothing, within the duty cycle.
+
+        Args:
+            gnss_dict_current (dict | None): Fix dict to send.
+
+        Returns:
+            bytes | None: The packet sent, or None if nothing was sent.
+        """
         try:
             # Transmit position over LoRa
             # use compact binary packet for the lora transmission
-            pass
+            if self.lora_scheduler is not None:
+                action = self.lora_scheduler.tick(gnss_dict_current)
+                return self.last_packet if action != "none" else None
+            if not gnss_dict_current or gnss_dict_current.get("lat") is None:
+                return None
+            packet = self.encode_lora_position(gnss_dict_current)
+            if self.radio is not None:
+                self.radio.send(packet)
+            return packet
         except Exception as e:
             print(f"Error in transmit_current_position: {e}")
+            return None
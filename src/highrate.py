@@ -0,0 +1,279 @@
+# imports
+import math
+import threading
+import time
+from array import array
+from collections import deque
+from src import nmea
+from src.cadence import TickScheduler
+from src.gps import FIX_KEYS
+
+NAN = float('nan')
+
+# full-rate track file: one CSV row per fix, columns FIX_KEYS (utc with centiseconds, nan = missing)
+TRACK_HEADER = ','.join(FIX_KEYS)
+TRACK_ROW = '%.2f,%.7f,%.7f,%.1f,%.2f,%.1f,%.0f,%.1f,%.0f\n'
+
+# rounding of the uplink fix dicts, as in GNSS.read_gnss_dict
+_DIGITS = {'lat': 6, 'lon': 6, 'alt': 1, 'sog': 2, 'cog': 1, 'hdop': 1}
+
+
+class FixRing:
+    """
+    Bounded ring of fixes in preallocated columns (one array('d') per FIX_KEYS field).
+
+    Memory is fixed at 72 bytes per slot whatever the rate, and push() only stores floats
+    into slots that already exist, so a full-rate track costs no allocations once running.
+    Readers keep their own sequence number and collect what was pushed since with rows();
+    what the ring overwrote before they got to it is reported as lost.
+
+    Args:
+        capacity (int): Fixes kept (e.g. 6000 = 10 minutes at 10 Hz).
+    """
+
+    def __init__(self, capacity):
+        self.capacity = capacity
+        self.columns = [array('d', [NAN]) * capacity for _ in FIX_KEYS]
+        self.seq = 0  # fixes pushed so far
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return min(self.seq, self.capacity)
+
+    def push(self, values):
+        """Store one fix given as FIX_KEYS-ordered values (None for missing)."""
+        with self._lock:
+            i = self.seq % self.capacity
+            for column, v in zip(self.columns, values):
+                column[i] = NAN if v is None else v
+            self.seq += 1
+
+    def rows(self, since):
+        """
+        Fixes pushed after sequence number `since` that are still in the ring.
+
+        Returns:
+            tuple: (rows, seq, lost): FIX_KEYS-ordered float tuples oldest first, the sequence
+                number to pass next time and how many fixes were overwritten before being read.
+        """
+        with self._lock:
+            seq = self.seq
+            start = max(since, seq - self.capacity)
+            if start >= seq:
+                return [], seq, start - since
+            i, j = start % self.capacity, seq % self.capacity
+            if i < j:
+                columns = [column[i:j] for column in self.columns]
+            else:
+                columns = [column[i:] + column[:j] for column in self.columns]
+        return list(zip(*columns)), seq, start - since
+
+    def latest(self):
+        """The newest fix as FIX_KEYS-ordered floats, or None while empty."""
+        with self._lock:
+            if not self.seq:
+                return None
+            i = (self.seq - 1) % self.capacity
+            return tuple(column[i] for column in self.columns)
+
+
+class Decimator:
+    """
+    Picks the uplink fixes out of the full-rate stream.
+
+    With `every` > 0 every Nth fix is taken. Otherwise the first fix of each `interval`
+    second slot of UTC time is taken (slots aligned to whole multiples of `interval`), so a
+    1 s interval sends the fixes on the second whatever the rate, and a gap in the stream
+    does not shift the following picks.
+
+    Args:
+        every (int): Take every Nth fix (0 = time based).
+        interval (float): Seconds between uplink fixes when time based.
+    """
+
+    def __init__(self, every=0, interval=1.0):
+        self.every = every
+        self.interval = interval
+        self._count = 0
+        self._slot = None
+
+    def accept(self, utc):
+        """True if the fix at `utc` (epoch seconds) goes to the uplink."""
+        if self.every > 0:
+            self._count += 1
+            if self._count >= self.every:
+                self._count = 0
+                return True
+            return False
+        slot = math.floor(utc / self.interval + 1e-6)  # 1e-6: 0.1 s steps are not exact in binary
+        if slot != self._slot:
+            self._slot = slot
+            return True
+        return False
+
+
+def fix_dict(values):
+    """
+    Uplink fix dict of FIX_KEYS-ordered values: rounded like read_gnss_dict, utc in whole
+    seconds (what the batch formats carry), nan as None.
+    """
+    fix = {}
+    for key, v in zip(FIX_KEYS, values):
+        if v is None or v != v:
+            fix[key] = None
+        elif key in ('utc', 'fx', 'nsat'):
+            fix[key] = int(v)
+        else:
+            fix[key] = round(v, _DIGITS[key])
+    return fix
+
+
+class HighRateTracker:
+    """
+    High-rate (1-10 Hz) acquisition, decoupled from the main loop.
+
+    A background thread polls `read` (the device's get_all_gnss) `hz` times a second on
+    monotonic deadlines and parses every epoch in what it got, not just the latest one
+    (nmea.parse_epochs). Each new fix goes into a FixRing. Fixes read twice are dropped by
+    their UTC, which happens when the module buffer is read faster than it refreshes.
+    Every `flush_interval` seconds the fixes since the last flush are formatted as CSV rows
+    and handed to `track` (a FixLog) as one block, so the SD card sees one write per
+    interval instead of one per fix. The Decimator picks the fixes that go to the uplink,
+    which the main loop collects with take_uplink() at its own pace.
+
+    Args:
+        read (callable): Returns the bytes received since the last call.
+        hz (float): Polls per second (the receiver's output rate).
+        ring_size (int): Fixes kept in memory.
+        track (FixLog | None): Full-rate track log (CSV rows, TRACK_HEADER columns).
+        decimator (Decimator | None): Uplink selection, every 1 s by default.
+        flush_interval (float): Seconds between track writes.
+        uplink_size (int): Uplink fixes kept until taken (oldest dropped first).
+        clock (callable): Monotonic clock, replaceable in tests.
+    """
+
+    def __init__(self, read, hz=10, ring_size=6000, track=None, decimator=None, flush_interval=1.0,
+                 uplink_size=600, clock=time.monotonic):
+        self.read = read
+        self.hz = hz
+        self.ring = FixRing(ring_size)
+        self.track = track
+        self.decimator = decimator if decimator is not None else Decimator()
+        self.flush_interval = flush_interval
+        self.uplink = deque(maxlen=uplink_size)
+        self.clock = clock
+        self.framer = nmea.NMEAFramer(types=(nmea.RMC, nmea.GGA))
+        self._last_utc = None
+        self._track_seq = 0
+        self._last_flush = clock()
+        self._thread = None
+        self._stop = threading.Event()
+        self.scheduler = None
+        # counters
+        self.polls = 0
+        self.fixes = 0
+        self.duplicates = 0
+        self.decimated = 0
+        self.lost = 0  # overwritten in the ring before they were written to the track
+        self._poll_ns_total = 0
+        self._poll_ns_max = 0
+
+    def poll(self):
+        """
+        Read once, keep every new fix, decimate, and write the track when due.
+
+        Returns:
+            int: New fixes.
+        """
+        t0 = time.perf_counter_ns()
+        added = 0
+        try:
+            data = self.read() or b''
+        except Exception as e:
+            print(f"Error in HighRateTracker.poll: {e}")
+            data = b''
+        for values in nmea.parse_epochs(self.framer.feed(data)):
+            utc = values[0]
+            if self._last_utc is not None and utc <= self._last_utc:
+                self.duplicates += 1
+                continue
+            self._last_utc = utc
+            self.ring.push(values)
+            added += 1
+            if self.decimator.accept(utc):
+                self.uplink.append(fix_dict(values))
+                self.decimated += 1
+        self.fixes += added
+        self.polls += 1
+        if self.track is not None and self.clock() - self._last_flush >= self.flush_interval:
+            self.flush()
+        dt = time.perf_counter_ns() - t0
+        self._poll_ns_total += dt
+        self._poll_ns_max = max(self._poll_ns_max, dt)
+        return added
+
+    def flush(self):
+        """Write the fixes since the last flush to the track as one block."""
+        self._last_flush = self.clock()
+        rows, self._track_seq, lost = self.ring.rows(self._track_seq)
+        self.lost += lost
+        if rows and self.track is not None:
+            try:
+                self.track.append_block(''.join([TRACK_ROW % row for row in rows]), len(rows))
+            except Exception as e:
+                print(f"Error in HighRateTracker.flush: {e}")
+
+    def take_uplink(self):
+        """The uplink fixes decimated since the last call, oldest first."""
+        fixes = []
+        while self.uplink:
+            fixes.append(self.uplink.popleft())
+        return fixes
+
+    def latest_fix(self):
+        """The newest full-rate fix as an uplink fix dict, or None before the first one."""
+        values = self.ring.latest()
+        return fix_dict(values) if values is not None else None
+
+    def start(self):
+        """Poll in a background thread (hz polls per second, on monotonic deadlines)."""
+        if self._thread is not None and self._thread.is_alive():
+            return True
+        self._stop.clear()
+        # Event.wait as the sleep, so stop() does not wait for the next poll
+        self.scheduler = TickScheduler(1.0 / self.hz, policy="skip", clock=self.clock, sleep=self._stop.wait)
+        self._thread = threading.Thread(target=self._run, name="gnss-high-rate", daemon=True)
+        self._thread.start()
+        print(f"GNSS high-rate acquisition started ({self.hz:g} Hz, ring {self.ring.capacity})")
+        return True
+
+    def stop(self, timeout=2.0):
+        """Stop the thread and write out the rest of the track."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+        if self.track is not None:
+            self.flush()
+            self.track.sync()
+
+    def _run(self):
+        self.scheduler.start()
+        while not self._stop.is_set():
+            self.poll()
+            self.scheduler.wait()
+
+    def stats(self):
+        """Counters, achieved fix rate and poll latency (microseconds) as a dict (for logging)."""
+        stats = {
+            "fixes": self.fixes,
+            "decimated": self.decimated,
+            "duplicates": self.duplicates,
+            "lost": self.lost,
+            "uplink_waiting": len(self.uplink),
+            "poll_us_mean": round(self._poll_ns_total / self.polls / 1e3, 1) if self.polls else 0.0,
+            "poll_us_max": round(self._poll_ns_max / 1e3, 1),
+        }
+        if self.scheduler is not None:
+            stats["overruns"] = self.scheduler.overruns
+        return stats
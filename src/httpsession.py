@@ -0,0 +1,262 @@
+# imports
+import socket
+import time
+from urllib.parse import urlsplit
+
+
+class HTTPSession:
+    """
+    One persistent HTTP/1.1 connection to an upload endpoint (plain sockets, no dependencies).
+
+    Over a cellular link every new connection costs a TCP (and TLS) handshake: several round
+    trips and a few KB before the first byte of data. The session keeps its connection open
+    between uploads (`Connection: keep-alive`) and only reconnects when the server or the
+    network drops it:
+    - a request that fails on a reused connection is retried once on a fresh one (the server
+      may have closed the idle connection; uploads are keyed by batch ID, so a repeat is safe);
+    - a failed connect starts a backoff (`backoff` s, doubling up to `max_backoff`) during
+      which post() fails at once instead of blocking the caller on connect timeouts.
+
+    With `pipeline` > 1, post_many() writes up to that many requests before reading the
+    responses (in order), so a burst of uploads shares round trips as well as the connection.
+
+    stats() splits the time spent connecting from the time spent on requests.
+
+    Args:
+        endpoint (str): http:// or https:// URL the requests are POSTed to.
+        timeout (float): Socket timeout in seconds (connect and each read/write).
+        keepalive (bool): Reuse the connection; False closes it after every request.
+        pipeline (int): Max requests in flight on the connection.
+        backoff (float): First reconnect delay after a failed connect.
+        max_backoff (float): Cap on the reconnect delay.
+        headers (dict | None): Extra request headers (e.g. authorization).
+        clock (callable): Monotonic clock, replaceable in tests.
+    """
+
+    def __init__(self, endpoint, timeout=10.0, keepalive=True, pipeline=1, backoff=1.0, max_backoff=60.0,
+                 headers=None, clock=time.monotonic):
+        url = urlsplit(endpoint)
+        if url.scheme not in ("http", "https") or not url.hostname:
+            raise ValueError(f"Unsupported endpoint: {endpoint}")
+        self.tls = url.scheme == "https"
+        self.host = url.hostname
+        self.port = url.port or (443 if self.tls else 80)
+        self.path = (url.path or "/") + (f"?{url.query}" if url.query else "")
+        self.host_header = self.host if url.port is None else f"{self.host}:{url.port}"
+        self.timeout = timeout
+        self.keepalive = keepalive
+        self.pipeline = max(1, int(pipeline))
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.headers = dict(headers or {})
+        self.clock = clock
+        self._sock = None
+        self._rfile = None
+        self._conn_requests = 0   # requests answered on the current connection
+        self._retry_at = 0.0
+        self._delay = 0.0
+        # stats
+        self.connects = 0
+        self.connect_failures = 0
+        self.requests = 0
+        self.failures = 0
+        self.bytes_sent = 0
+        self.bytes_received = 0
+        self.connect_time = 0.0
+        self.request_time = 0.0
+
+    @property
+    def connected(self):
+        return self._sock is not None
+
+    def post(self, body, content_type="application/json"):
+        """
+        POST one body.
+
+        Args:
+            body (bytes): Request body.
+            content_type (str): Content-Type header.
+
+        Returns:
+            bytes | None: Response body of a 2xx answer, None on any failure.
+        """
+        return self.post_many([body], content_type)[0]
+
+    def post_many(self, bodies, content_type="application/json"):
+        """
+        POST several bodies in order over the session, pipelined up to `pipeline` deep.
+
+        Returns:
+            list: Per body, the 2xx response body or None. After a connection failure the
+                remaining bodies are not attempted (None).
+        """
+        results = [None] * len(bodies)
+        i = 0
+        while i < len(bodies):
+            chunk = bodies[i:i + (self.pipeline if self.keepalive else 1)]
+            answers = self._exchange(chunk, content_type)
+            results[i:i + len(answers)] = answers
+            if len(answers) < len(chunk):
+                break
+            i += len(chunk)
+        return results
+
+    def connect(self):
+        """
+        Open the connection ahead of the first request (e.g. while the GNSS boots), so the
+        handshake is not paid by the first upload.
+
+        Returns:
+            bool: True if connected (or already connected).
+        """
+        return self._sock is not None or self._connect()
+
+    def close(self):
+        """Close the connection (the next request reconnects)."""
+        if self._rfile is not None:
+            try:
+                self._rfile.close()
+            except OSError:
+                pass
+            self._rfile = None
+        if self._sock is not None:
+            try:
+                self._sock.close()
+            except OSError:
+                pass
+            self._sock = None
+        self._conn_requests = 0
+
+    def stats(self):
+        """Counters and timings (seconds) as a dict (for logging)."""
+        return {
+            "connects": self.connects,
+            "connect_failures": self.connect_failures,
+            "requests": self.requests,
+            "failures": self.failures,
+            "bytes_sent": self.bytes_sent,
+            "bytes_received": self.bytes_received,
+            "connect_time": self.connect_time,
+            "request_time": self.request_time,
+            "connect_ms_mean": self.connect_time / self.connects * 1e3 if self.connects else 0.0,
+            "request_ms_mean": self.request_time / self.requests * 1e3 if self.requests else 0.0,
+        }
+
+    # --- internals ---
+    def _connect(self):
+        if self.clock() < self._retry_at:
+            return False  # backing off
+        t0 = time.perf_counter()
+        try:
+            sock = socket.create_connection((self.host, self.port), timeout=self.timeout)
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            if self.tls:
+                import ssl  # only for https endpoints (slow to import on the Pi)
+                sock = ssl.create_default_context().wrap_socket(sock, server_hostname=self.host)
+        except OSError as e:
+            self.connect_time += time.perf_counter() - t0
+            self.connect_failures += 1
+            self._delay = min(self.max_backoff, self._delay * 2 if self._delay else self.backoff)
+            self._retry_at = self.clock() + self._delay
+            print(f"Error connecting to {self.host}:{self.port}: {e} (retry in {self._delay:g} s)")
+            return False
+        self.connect_time += time.perf_counter() - t0
+        self.connects += 1
+        self._delay = 0.0
+        self._sock = sock
+        self._rfile = sock.makefile("rb")
+        self._conn_requests = 0
+        return True
+
+    def _request_head(self, body, content_type):
+        lines = [f"POST {self.path} HTTP/1.1", f"Host: {self.host_header}", f"Content-Type: {content_type}",
+                 f"Content-Length: {len(body)}", f"Connection: {'keep-alive' if self.keepalive else 'close'}"]
+        lines += [f"{k}: {v}" for k, v in self.headers.items()]
+        return ("\r\n".join(lines) + "\r\n\r\n").encode("latin-1")
+
+    def _exchange(self, chunk, content_type):
+        """Send `chunk` on the connection and read its answers; [] or a short list on failure."""
+        for attempt in (0, 1):
+            if self._sock is None and not self._connect():
+                self.failures += len(chunk)
+                return []
+            reused = self._conn_requests > 0
+            answers = []
+            t0 = time.perf_counter()
+            try:
+                data = b"".join(self._request_head(body, content_type) + bytes(body) for body in chunk)
+                self._sock.sendall(data)
+                self.bytes_sent += len(data)
+                for _ in chunk:
+                    status, body, close = self._read_response()
+                    self._conn_requests += 1
+                    self.requests += 1
+                    answers.append(body if 200 <= status < 300 else None)
+                    if close:
+                        self.close()
+                        break
+            except (OSError, ValueError) as e:
+                self.close()
+                if reused and not answers and attempt == 0:
+                    continue  # stale keep-alive connection: retry once on a new one
+                print(f"Error in HTTPSession request: {e}")
+            finally:
+                self.request_time += time.perf_counter() - t0
+            if not self.keepalive:
+                self.close()
+            self.failures += len(chunk) - len(answers) + sum(1 for a in answers if a is None)
+            return answers
+        return []
+
+    def _readline(self):
+        line = self._rfile.readline(65537)
+        self.bytes_received += len(line)
+        return line
+
+    def _read_exact(self, n):
+        data = self._rfile.read(n)
+        self.bytes_received += len(data)
+        if len(data) < n:
+            raise ConnectionError("connection closed mid-response")
+        return data
+
+    def _read_response(self):
+        while True:
+            line = self._readline()
+            if not line:
+                raise ConnectionError("connection closed by server")
+            parts = line.split(None, 2)
+            if len(parts) < 2 or not parts[0].startswith(b"HTTP/"):
+                raise ValueError(f"bad status line: {line[:40]!r}")
+            version, status = parts[0], int(parts[1])
+            headers = {}
+            while True:
+                header = self._readline()
+                if header in (b"\r\n", b"\n", b""):
+                    break
+                key, _, value = header.partition(b":")
+                headers[key.strip().lower()] = value.strip()
+            if not 100 <= status < 200:
+                break  # 1xx answers are interim (no body): the final one follows
+        connection = headers.get(b"connection", b"").lower()
+        close = connection == b"close" or (version == b"HTTP/1.0" and connection != b"keep-alive")
+        if status in (204, 304):
+            body = b""  # never has a body, whatever the headers say
+        elif b"chunked" in headers.get(b"transfer-encoding", b"").lower():
+            body = b""
+            while True:
+                size = int(self._readline().split(b";")[0], 16)
+                if size == 0:
+                    while self._readline() not in (b"\r\n", b"\n", b""):
+                        pass  # trailers
+                    break
+                body += self._read_exact(size)
+                self._readline()
+        elif b"content-length" in headers:
+            body = self._read_exact(int(headers[b"content-length"]))
+        elif close:
+            body = self._rfile.read()  # body runs to the end of the connection
+            self.bytes_received += len(body)
+        else:
+            raise ValueError(f"{status} answer without a length on a kept-alive connection")
+        return status, body, close
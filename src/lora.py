@@ -0,0 +1,383 @@
+# imports
+import math
+import time
+from collections import deque
+
+# Position packet: 12 bytes, big-endian bit fields, most significant first
+#   version   4   PACKET_VERSION
+#   device   12   rider/device ID (0..4095)
+#   seq       8   sequence counter (wraps)
+#   time     17   seconds since the origin time, mod 2^17 (~36 h); unwrapped by the receiver
+#   dlat     18   signed, 1e-5 deg (~1.1 m) from the origin latitude (+-1.31 deg)
+#   dlon     18   signed, 1e-5 deg from the origin longitude
+#   speed     7   0.25 m/s (0..31.75 m/s, saturates)
+#   course    6   5.625 deg
+#   quality   4   0 = no fix, else ceil(hdop) clamped to 1..15
+#   spare     2   zero
+PACKET_VERSION = 1
+PACKET_BYTES = 12
+_FIELDS = (("version", 4), ("device", 12), ("seq", 8), ("time", 17), ("dlat", 18), ("dlon", 18),
+           ("speed", 7), ("course", 6), ("quality", 4), ("spare", 2))
+_BITS = dict(_FIELDS)
+
+# EU868 sub-bands (ETSI EN 300 220 / ERC 70-03): name, low MHz, high MHz, duty cycle
+EU868_SUB_BANDS = (
+    ("h1.3", 863.0, 865.0, 0.001),
+    ("h1.4", 865.0, 868.0, 0.01),
+    ("g1", 868.0, 868.6, 0.01),
+    ("g2", 868.7, 869.2, 0.001),
+    ("g3", 869.4, 869.65, 0.1),
+    ("g4", 869.7, 870.0, 0.01),
+)
+DUTY_WINDOW = 3600.0  # s the duty cycle is measured over
+POSITION_HEADROOM = 1.25  # default position interval over the legal minimum (the spare resends missed positions)
+
+POS_SCALE = 1e5            # 1e-5 deg
+SPEED_STEP = 0.25          # m/s
+COURSE_STEP = 360 / 64     # deg
+KNOT = 1852 / 3600         # m/s
+
+
+def _pack(values):
+    word = 0
+    for name, bits in _FIELDS:
+        word = (word << bits) | (values.get(name, 0) & ((1 << bits) - 1))
+    return word.to_bytes(PACKET_BYTES, "big")
+
+
+def _unpack(packet):
+    word = int.from_bytes(packet, "big")
+    values = {}
+    for name, bits in reversed(_FIELDS):
+        values[name] = word & ((1 << bits) - 1)
+        word >>= bits
+    return values
+
+
+def _signed(value, bits):
+    return value - (1 << bits) if value >= 1 << (bits - 1) else value
+
+
+class LoRaPositionCodec:
+    """
+    Fixed-size bit-packed position packets for the LoRa uplink (layout above).
+
+    Positions are sent as offsets from a venue origin, so a 12 byte packet covers about
+    +-145 km around it at ~1 m resolution; the time is sent as seconds since `origin_time`
+    modulo 2^17 and the receiver picks the matching time nearest to when it received the packet.
+
+    Args:
+        origin_lat (float): Venue origin latitude (degrees).
+        origin_lon (float): Venue origin longitude (degrees).
+        origin_time (int): Epoch seconds the time offset counts from (0: plain epoch).
+    """
+
+    def __init__(self, origin_lat, origin_lon, origin_time=0):
+        self.origin_lat = origin_lat
+        self.origin_lon = origin_lon
+        self.origin_time = int(origin_time)
+
+    def encode(self, fix, device_id, seq):
+        """
+        Pack one fix dict (read_gnss_dict keys) into a packet.
+
+        Args:
+            fix (dict): Fix with utc, lat, lon, sog (knots), cog, fx, hdop.
+            device_id (int): Rider/device ID (0..4095).
+            seq (int): Sequence counter (only the low 8 bits are sent).
+
+        Returns:
+            bytes: PACKET_BYTES long packet.
+
+        Raises:
+            ValueError: The fix has no time/position, is outside the venue range or the ID is too large.
+        """
+        if not 0 <= device_id < 1 << _BITS["device"]:
+            raise ValueError(f"Device ID out of range: {device_id}")
+        if fix.get("utc") is None or fix.get("lat") is None or fix.get("lon") is None:
+            raise ValueError("Fix has no time or position")
+        dlat = round((fix["lat"] - self.origin_lat) * POS_SCALE)
+        dlon = round((fix["lon"] - self.origin_lon) * POS_SCALE)
+        limit = 1 << (_BITS["dlat"] - 1)
+        if not (-limit <= dlat < limit and -limit <= dlon < limit):
+            raise ValueError(f"Position outside the venue range: {fix['lat']}, {fix['lon']}")
+        speed = min((1 << _BITS["speed"]) - 1, round((fix.get("sog") or 0) * KNOT / SPEED_STEP))
+        course = round((fix.get("cog") or 0) / COURSE_STEP) % (1 << _BITS["course"])
+        hdop = fix.get("hdop")
+        if not fix.get("fx"):
+            quality = 0
+        else:
+            quality = min(15, max(1, math.ceil(hdop))) if hdop is not None else 15
+        return _pack({
+            "version": PACKET_VERSION,
+            "device": device_id,
+            "seq": seq,
+            "time": int(fix["utc"]) - self.origin_time,
+            "dlat": dlat,
+            "dlon": dlon,
+            "speed": speed,
+            "course": course,
+            "quality": quality,
+        })
+
+    def decode(self, packet, ref_time=None):
+        """
+        Unpack a packet on the receiving side.
+
+        Args:
+            packet (bytes): PACKET_BYTES long packet.
+            ref_time (float | None): Receive time (epoch s) used to unwrap the 17 bit time;
+                None returns the time as the offset from origin_time within the first wrap.
+
+        Returns:
+            dict: device, seq, utc, lat, lon, sog (knots), cog, fx, hdop (upper bound, None if no fix).
+
+        Raises:
+            ValueError: Wrong length or version.
+        """
+        if len(packet) != PACKET_BYTES:
+            raise ValueError(f"LoRa packet must be {PACKET_BYTES} bytes, got {len(packet)}")
+        v = _unpack(bytes(packet))
+        if v["version"] != PACKET_VERSION:
+            raise ValueError(f"Unsupported LoRa packet version {v['version']}")
+        wrap = 1 << _BITS["time"]
+        utc = self.origin_time + v["time"]
+        if ref_time is not None:
+            # nearest time to the receive time with the same offset modulo 2^17
+            utc += round((ref_time - utc) / wrap) * wrap
+        return {
+            "device": v["device"],
+            "seq": v["seq"],
+            "utc": utc,
+            "lat": round(self.origin_lat + _signed(v["dlat"], _BITS["dlat"]) / POS_SCALE, 6),
+            "lon": round(self.origin_lon + _signed(v["dlon"], _BITS["dlon"]) / POS_SCALE, 6),
+            "sog": round(v["speed"] * SPEED_STEP / KNOT, 2),
+            "cog": round(v["course"] * COURSE_STEP, 1),
+            "fx": 1 if v["quality"] else 0,
+            "hdop": float(v["quality"]) if v["quality"] else None,
+        }
+
+
+def time_on_air(payload_bytes, sf=7, bw_hz=125000, cr=1, preamble=8, explicit_header=True, crc=True,
+                low_dr_optimize=None):
+    """
+    LoRa time on air in seconds (Semtech SX127x datasheet / AN1200.13 formula).
+
+    Args:
+        payload_bytes (int): PHY payload length.
+        sf (int): Spreading factor 6..12.
+        bw_hz (int): Bandwidth in Hz.
+        cr (int): Coding rate 1..4 (4/5..4/8).
+        preamble (int): Programmed preamble symbols.
+        explicit_header (bool): Explicit (variable length) header.
+        crc (bool): Payload CRC on.
+        low_dr_optimize (bool | None): None turns it on when a symbol lasts over 16 ms (as required).
+
+    Returns:
+        float: Seconds on air.
+    """
+    t_sym = (1 << sf) / bw_hz
+    if low_dr_optimize is None:
+        low_dr_optimize = t_sym > 0.016
+    de = 1 if low_dr_optimize else 0
+    ih = 0 if explicit_header else 1
+    n = math.ceil((8 * payload_bytes - 4 * sf + 28 + 16 * crc - 20 * ih) / (4 * (sf - 2 * de)))
+    payload_symbols = 8 + max(n * (cr + 4), 0)
+    return (preamble + 4.25) * t_sym + payload_symbols * t_sym
+
+
+def channel_capacity(airtime, interval, duty_cycle=0.01, utilisation=0.184):
+    """
+    How many riders one channel carries at one packet per `interval` seconds.
+
+    Args:
+        airtime (float): Time on air of one packet (s).
+        interval (float): Seconds between packets of one rider.
+        duty_cycle (float): Regulatory duty cycle per device (EU868 g1: 1%).
+        utilisation (float): Usable share of the channel; 0.184 is the pure ALOHA maximum
+            (uncoordinated transmitters), 1.0 would be a perfectly scheduled TDMA.
+
+    Returns:
+        dict: {'riders', 'min_interval', 'duty_ok'} riders per channel, the shortest interval
+            the duty cycle allows one device and whether `interval` respects it.
+    """
+    return {
+        "riders": int(utilisation * interval / airtime),
+        "min_interval": airtime / duty_cycle,
+        "duty_ok": interval >= airtime / duty_cycle,
+    }
+
+
+def sub_band(frequency_mhz):
+    """
+    EU868 sub-band of a channel.
+
+    Returns:
+        tuple: (name, duty cycle).
+
+    Raises:
+        ValueError: The frequency is outside the EU868 sub-bands.
+    """
+    for name, low, high, duty in EU868_SUB_BANDS:
+        if low <= frequency_mhz < high:
+            return name, duty
+    raise ValueError(f"{frequency_mhz} MHz is not in an EU868 sub-band")
+
+
+class LoRaScheduler:
+    """
+    Airtime budget for the LoRa uplink: decides every GNSS interval whether to send the live
+    position, a backlog packet or nothing, without breaking the sub-band duty cycle.
+
+    Two limits are applied to the airtime of every packet (time_on_air for its length):
+    - a token bucket refilled at the duty cycle (seconds of airtime per second) and holding at
+      most `burst` seconds, which spreads the packets out;
+    - the legal limit itself: the airtime used in the last DUTY_WINDOW seconds (rolling, per
+      sub-band) stays within duty cycle x window.
+
+    Each tick:
+    1. the live position is sent when its slot (every `position_interval`) has come and the
+       budget allows it; a due position that does not fit goes to the backlog (at most one
+       per position_interval, the backlog keeps the newest `backlog_size`) unless the
+       interval is the legal minimum, which leaves no airtime to ever send it;
+    2. otherwise the oldest backlog position is sent if the budget still leaves room for the
+       next live position;
+    3. otherwise nothing is sent.
+
+    report() compares the position update rate achieved with the legal limit (the shortest
+    sustainable interval is the packet airtime / duty cycle).
+
+    Args:
+        radio (object): Driver with send(bytes).
+        encode (callable): fix dict -> packet bytes (e.g. GNSS_lora.encode_lora_position).
+        frequency_mhz (float): Channel frequency (selects the sub-band and its duty cycle).
+        sf (int): Spreading factor.
+        bw_hz (int): Bandwidth in Hz.
+        cr (int): Coding rate 1..4 (4/5..4/8).
+        position_interval (float | None): Target seconds between live positions (at least the
+            legal minimum for a PACKET_BYTES packet); None uses POSITION_HEADROOM x that minimum.
+        burst (float | None): Bucket size in seconds of airtime; None allows one minute of the
+            duty cycle (at least two packets).
+        backlog_size (int): Missed positions kept for later.
+        clock (callable): Monotonic clock, replaceable in tests and simulations.
+    """
+
+    def __init__(self, radio, encode, frequency_mhz=868.0, sf=7, bw_hz=125000, cr=1, position_interval=None,
+                 burst=None, backlog_size=32, clock=time.monotonic):
+        self.radio = radio
+        self.encode = encode
+        self.sub_band, self.duty_cycle = sub_band(frequency_mhz)
+        self.sf = sf
+        self.bw_hz = bw_hz
+        self.cr = cr
+        self.clock = clock
+        self.packet_airtime = time_on_air(PACKET_BYTES, sf=sf, bw_hz=bw_hz, cr=cr)
+        self.legal_interval = self.packet_airtime / self.duty_cycle
+        if position_interval is None:
+            position_interval = self.legal_interval * POSITION_HEADROOM
+        self.position_interval = max(position_interval, self.legal_interval)
+        self.resend_missed = self.position_interval > self.legal_interval  # spare airtime for the backlog
+        self.burst = burst if burst is not None else max(self.duty_cycle * 60, 2 * self.packet_airtime)
+        self.backlog = deque(maxlen=backlog_size)
+        self._tokens = self.burst
+        self._refilled = clock()
+        self._used = deque()  # (time, airtime) within the duty window
+        self._used_total = 0.0
+        self._next_due = None  # time the next live position is due (slots every position_interval)
+        self._last_missed = None
+        self._started = clock()
+        # counters
+        self.positions_sent = 0
+        self.backlog_sent = 0
+        self.missed = 0
+        self.dropped = 0
+        self.airtime = 0.0
+
+    def tick(self, fix):
+        """
+        Decide and send for one GNSS interval.
+
+        Args:
+            fix (dict): The current fix (read_gnss_dict keys).
+
+        Returns:
+            str: "position", "backlog" or "none".
+        """
+        now = self.clock()
+        self._refill(now)
+        has_fix = bool(fix) and fix.get("lat") is not None
+        due = has_fix and (self._next_due is None or now >= self._next_due)
+        if due:
+            if self._allowed(now):
+                self._send(now, self.encode(fix))
+                # fixed slots, so GNSS interval rounding averages out instead of adding up
+                self._next_due = now if self._next_due is None else self._next_due
+                self._next_due = max(self._next_due + self.position_interval, now)
+                self.positions_sent += 1
+                return "position"
+            if self._last_missed is None or now - self._last_missed >= self.position_interval:
+                if not self.resend_missed or len(self.backlog) == self.backlog.maxlen:
+                    self.dropped += 1
+                if self.resend_missed:  # at the legal minimum no spare airtime would ever send it
+                    self.backlog.append(fix)
+                self._last_missed = now
+                self.missed += 1
+            return "none"
+        if self.backlog:
+            # keep enough budget for the next live position
+            if self._allowed(now, reserve=self.packet_airtime):
+                self._send(now, self.encode(self.backlog.popleft()))
+                self.backlog_sent += 1
+                return "backlog"
+        return "none"
+
+    def usage(self):
+        """Share of the duty window's airtime used (1.0 = the legal limit)."""
+        self._expire(self.clock())
+        return self._used_total / (self.duty_cycle * DUTY_WINDOW)
+
+    def report(self):
+        """Achieved position update rate against the legal limit, as a dict (for logging)."""
+        elapsed = self.clock() - self._started
+        achieved = elapsed / self.positions_sent if self.positions_sent else None
+        return {
+            "sub_band": self.sub_band,
+            "duty_cycle": self.duty_cycle,
+            "packet_airtime_ms": self.packet_airtime * 1e3,
+            "legal_interval": self.legal_interval,
+            "position_interval": self.position_interval,
+            "achieved_interval": achieved,
+            "positions_per_min": 60 * self.positions_sent / elapsed if elapsed > 0 else 0.0,
+            "legal_positions_per_min": 60 / self.legal_interval,
+            "positions_sent": self.positions_sent,
+            "backlog_sent": self.backlog_sent,
+            "backlog": len(self.backlog),
+            "missed": self.missed,
+            "dropped": self.dropped,
+            "airtime": self.airtime,
+            "usage": self.usage(),
+        }
+
+    # --- internals ---
+    def _refill(self, now):
+        self._tokens = min(self.burst, self._tokens + (now - self._refilled) * self.duty_cycle)
+        self._refilled = now
+
+    def _expire(self, now):
+        while self._used and self._used[0][0] <= now - DUTY_WINDOW:
+            self._used_total -= self._used.popleft()[1]
+
+    def _allowed(self, now, reserve=0.0):
+        # packets are fixed size, so the budget is checked before one is encoded (no sequence gaps)
+        airtime = self.packet_airtime
+        self._expire(now)
+        return (self._tokens >= airtime + reserve
+                and self._used_total + airtime + reserve <= self.duty_cycle * DUTY_WINDOW)
+
+    def _send(self, now, packet):
+        airtime = time_on_air(len(packet), sf=self.sf, bw_hz=self.bw_hz, cr=self.cr)
+        self.radio.send(packet)
+        self._tokens -= airtime
+        self._used.append((now, airtime))
+        self._used_total += airtime
+        self.airtime += airtime
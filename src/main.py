@@ -9,28 +9,43 @@ if VSCODE_TEST:
 ####
 
 # regular imports
-import yaml
+import time
+import threading
+import logging
 from pathlib import Path
+from src.startup import BootTimer, load_config
+from src import runlog
 
-# Load configuration from JSON file
-CONFIG_PATH = os.path.join(os.path.dirname(__file__), '../configs/config.yaml')
-with open(CONFIG_PATH, 'r') as f:
-    config = yaml.safe_load(f)
+# startup milestones, in seconds since the process started (see src/startup.py)
+boot_timer = BootTimer()
 
-# send log outputs to a file
 # Make sure log directory exists
 Path("logs").mkdir(parents=True, exist_ok=True)
-# Redirect all prints to logs/output.txt
-sys.stdout = open("logs/output.txt", "a")  # "a" = append mode
-sys.stderr = sys.stdout                    # send errors there too
 
-# Import other modules (uncomment as needed)
+# Load configuration from the YAML file (through its parsed copy in logs/, yaml is only imported when it changed)
+CONFIG_PATH = os.path.join(os.path.dirname(__file__), '../configs/config.yaml')
+config, config_cached = load_config(CONFIG_PATH, os.path.join("logs", "config_cache.json"))
+boot_timer.mark("config")
+
+# send log output (prints included) to the rotated log file through a background writer,
+# so the loop never waits on the SD card (level, rotation and rate limit in config['logging'])
+run_log = runlog.setup(config.get('logging', {}))
+log = logging.getLogger(__name__)
+
+# Import other modules (uncomment as needed); optional features import theirs when enabled
 # from DFRobot_GNSS import *
-from src.gps import *
-from src.cellular import *
+from src.gps import GNSS
+from src.cellular import Cellular, BUNDLE_MAX_BYTES
+from src.cadence import TickScheduler
 # from lora import *
 # from rfid import *
 # from utils import *
+boot_timer.mark("imports")
+
+def reboot():
+    """Reboot the Pi once the queued log records, the reason for the reboot among them, are written."""
+    run_log.stop()
+    os.system("sudo reboot")
 
 def main():
     try:
@@ -42,6 +57,23 @@ def main():
         GNSS_SEND_BATCH_SIZE = config['global']['GNSS_SEND_BATCH_SIZE'] # number of GNSS readings to send in one batch
         SEND_COMPACT = config['global']['SEND_COMPACT'] # whether to send compact JSON
         TRANSMIT_MODE =  config['global']['TRANSMIT_MODE'] # Options: "lora", "cellular", "dual"
+        GNSS_BACKGROUND_ACQUISITION = config['global'].get('GNSS_BACKGROUND_ACQUISITION', False) # read GNSS in a background thread
+        GNSS_FIX_SOURCE = config['global'].get('GNSS_FIX_SOURCE', "nmea") # "nmea" dump or the module's "registers"
+        GNSS_REGISTER_CROSSCHECK = config['global'].get('GNSS_REGISTER_CROSSCHECK', 30) # register reads per NMEA cross-check
+        TRANSMIT_WORKER = config['global'].get('TRANSMIT_WORKER', False) # send from a background thread
+        TRANSMIT_QUEUE_SIZE = config['global'].get('TRANSMIT_QUEUE_SIZE', 16) # bound on the transmit worker queue
+        TRANSMIT_BACKLOG_STORE = config['global'].get('TRANSMIT_BACKLOG_STORE', "files") # "files" or "segments"
+        CELL_BUNDLE_MAX_BYTES = config['global'].get('CELL_BUNDLE_MAX_BYTES', BUNDLE_MAX_BYTES) # backlog batches per upload, 0 = one per upload
+        CELL_HTTP = config['global'].get('CELL_HTTP', False) # POST to uplink.cellular.endpoint (False: simulated sends)
+        ADAPTIVE_BATCH = config['global'].get('ADAPTIVE_BATCH', {}) # batch size from link quality (see src/batchcontrol.py)
+        SIMPLIFY_TOLERANCE_M = config['global'].get('SIMPLIFY_TOLERANCE_M', 0) # drop batch fixes reproducible within this many metres, 0 = off
+        FIX_LOG = config['global'].get('FIX_LOG', {}) # fix log durability/rotation (see src/fixlog.py)
+        GNSS_REPLAY = config['global'].get('GNSS_REPLAY', "") # NMEA log / gnss_log.txt track to replay instead of the module
+        GNSS_REPLAY_SPEED = config['global'].get('GNSS_REPLAY_SPEED', 1) # replay time compression, 0 = one epoch per loop
+        METRICS = config['global'].get('METRICS', {}) # per-stage timings and loop overruns, snapshot file (see src/metrics.py)
+        HIGH_RATE = config['global'].get('HIGH_RATE', {}) # 1-10 Hz track to logs/, decimated uplink (see src/highrate.py)
+        GNSS_OVERRUN_POLICY = config['global'].get('GNSS_OVERRUN_POLICY', "skip") # fixes missed by an overrunning iteration: "skip" or "catch_up"
+        FAST_BOOT = config['global'].get('FAST_BOOT', False) # skip device writes that already hold, bring the cellular link up during the GNSS boot
         # LORA_SEND_RATE = config['global']['LORA_SEND_RATE']
         # other globals...
         last_gnss_time = 0
@@ -50,45 +82,165 @@ def main():
         transmit_backlog_empty = True
         gnss_dict_send = {}
 
+        # replay a recording instead of the module (or the VSCode test bytes)
+        replay = None
+        if GNSS_REPLAY:
+            try:
+                from src.replay import NMEAReplay
+                replay = NMEAReplay.from_file(GNSS_REPLAY, speed=GNSS_REPLAY_SPEED,
+                                              dropout=config['global'].get('GNSS_REPLAY_DROPOUT', 0.0),
+                                              corrupt=config['global'].get('GNSS_REPLAY_CORRUPT', 0.0))
+                # the whole loop runs on replay time: one search interval lasts GNSS_SEARCH_RATE / speed
+                GNSS_SEARCH_RATE = GNSS_SEARCH_RATE / GNSS_REPLAY_SPEED if GNSS_REPLAY_SPEED > 0 else 0
+                print(f"Replaying {GNSS_REPLAY}: {len(replay.epochs)} epochs at speed {GNSS_REPLAY_SPEED}")
+            except Exception as e:
+                print(f"Error loading GNSS replay: {e}")
+                return
+        test_mode = VSCODE_TEST and replay is None
+
+        # stage timings of the loop, GNSS and Cellular, written to the snapshot file every METRICS interval
+        metrics = None
+        if METRICS.get('enabled', False):
+            from src.metrics import Metrics
+            metrics = Metrics(path=METRICS.get('path', os.path.join("logs", "metrics.json")),
+                              interval=METRICS.get('interval', 30.0))
+
         # initialize GNSS
         try:
-            gnss = GNSS(search_rate=GNSS_SEARCH_RATE, test_mode=VSCODE_TEST)
+            gnss = GNSS(search_rate=GNSS_SEARCH_RATE, test_mode=test_mode, device=replay)
+            gnss.metrics = metrics
         except Exception as e:
             print(f"Error initializing GNSS: {e}")
             return
         
-        # initialize Cellular
+        # initialize Cellular (FAST_BOOT: in the background, connection included, while the GNSS boots;
+        # the loop waits for it after logging the first fix, before the first send)
         cell = None
+        cell_thread = None
         if TRANSMIT_MODE in ["cellular", "dual"]:
-            try:
-                cell = Cellular()
-            except Exception as e:
-                print(f"Error initializing Cellular: {e}")
-                return
+            def init_cellular():
+                nonlocal cell
+                try:
+                    cell_options = {}
+                    if CELL_HTTP:
+                        uplink = config.get('uplink', {}).get('cellular', {})
+                        cell_options = {'endpoint': uplink['endpoint'],
+                                        'keepalive': uplink.get('keepalive', True),
+                                        'pipeline': uplink.get('pipeline', 1),
+                                        'timeout': uplink.get('timeout', 10.0)}
+                    cell = Cellular(bundle_max_bytes=CELL_BUNDLE_MAX_BYTES, **cell_options)
+                    cell.metrics = metrics
+                    if FAST_BOOT:
+                        cell.warm_up()
+                    boot_timer.mark("cellular")
+                except Exception as e:
+                    print(f"Error initializing Cellular: {e}")
+            if FAST_BOOT:
+                cell_thread = threading.Thread(target=init_cellular, name="cell-init", daemon=True)
+                cell_thread.start()
+            else:
+                init_cellular()
+                if cell is None:
+                    return
         
-        # boot the GNSS (loops on hardware, single attempt in VSCode test mode)
+        # boot the GNSS (loops on hardware, single attempt in VSCode test mode; FAST_BOOT retries
+        # after 0.25 s, doubling up to 5 s)
         try:
             boot_success = False
+            retry_delay = 0.25 if FAST_BOOT else 5
             while not boot_success:
-                boot_success = gnss.boot()
-                if boot_success or VSCODE_TEST:
+                boot_success = gnss.boot(fast=FAST_BOOT)
+                if boot_success or test_mode:
                     break
-                print("GNSS boot failed, retrying in 5 seconds...")
-                time.sleep(5)
+                print(f"GNSS boot failed, retrying in {retry_delay:g} seconds...")
+                time.sleep(retry_delay)
+                retry_delay = min(5, retry_delay * 2)
         except Exception as e:
             print(f"Error during GNSS boot: {e}")
             return
+        boot_timer.mark("gnss_boot")
+
+        # trajectory simplification of the batches (see src/simplify.py)
+        gnss.simplify_tolerance = SIMPLIFY_TOLERANCE_M
+
+        # fix log durability and rotation ("flush", "fsync" or "batch")
+        gnss.open_fix_log(**FIX_LOG)
+
+        # fixes from one read of the module's register block instead of the NMEA dump (see src/regfix.py)
+        if GNSS_FIX_SOURCE == "registers":
+            gnss.use_register_fixes(crosscheck_every=GNSS_REGISTER_CROSSCHECK)
+
+        # move the backlog into the append-only segment queue (after boot loaded backlog.txt)
+        if TRANSMIT_BACKLOG_STORE == "segments":
+            gnss.use_segment_queue()
+
+        # high-rate mode: a thread reads every fix into the full-rate track, the loop gets a decimated stream
+        # (VSCode test mode: a simulated receiver streaming at the configured rate)
+        if HIGH_RATE.get('enabled', False):
+            source = None
+            if test_mode:
+                from src.fake_nmea_stream import FakeNMEAStream
+                source = FakeNMEAStream(hz=HIGH_RATE.get('hz', 10), start_utc=time.time())
+            gnss.start_high_rate(source=source, **{k: v for k, v in HIGH_RATE.items() if k != 'enabled'})
+        # keep draining the GNSS in the background so get_gnss_dict returns the newest fix at once
+        elif GNSS_BACKGROUND_ACQUISITION:
+            gnss.start_acquisition(period=min(1, GNSS_SEARCH_RATE))
+
+        # adapt the batch size (and live position sends) to the observed link quality
+        batch_controller = None
+        batch_size = GNSS_SEND_BATCH_SIZE
+        if ADAPTIVE_BATCH.get('enabled', False):
+            from src.batchcontrol import BatchController
+            batch_controller = BatchController(batch_size=GNSS_SEND_BATCH_SIZE,
+                                               **{k: v for k, v in ADAPTIVE_BATCH.items() if k != 'enabled'})
+            gnss.send_observer = batch_controller.record_send
+
+        # start the transmit worker after boot (boot loads the persisted backlog it will drain)
+        def start_transmit_worker():
+            if not TRANSMIT_WORKER or cell is None:
+                return None
+            from src.transmit import TransmitWorker
+            worker = TransmitWorker(gnss, cell, max_queue=TRANSMIT_QUEUE_SIZE,
+                                    retry_interval=GNSS_SEARCH_RATE, compact=SEND_COMPACT)
+            worker.start()
+            return worker
+        transmit_worker = start_transmit_worker() if cell_thread is None else None
+        boot_timer.mark("loop")
+
+        # fix cadence on monotonic deadlines GNSS_SEARCH_RATE apart from here on (see src/cadence.py):
+        # wait_for_send sleeps to the next tick and the send budgets run to it
+        scheduler = TickScheduler(GNSS_SEARCH_RATE, policy=GNSS_OVERRUN_POLICY)
+        gnss.scheduler = scheduler
+        scheduler.start()
 
         running = True
+        loop_start = None
         while running:
             try:
+                # one full iteration (work + wait) per 'loop' sample, plus the levels worth watching
+                if metrics is not None:
+                    now = time.perf_counter()
+                    if loop_start is not None:
+                        metrics.observe('loop', now - loop_start)
+                    loop_start = now
+                    metrics.gauge('backlog', len(gnss.transmit_backlog))
+                    metrics.gauge('batch_size', batch_size)
+                    metrics.maybe_write()
 
                 # turn on GNSS
                 # here I need to test the power cycling
                 # gnss.start()
 
-                # Fetch position
-                gnss_dict_current = gnss.get_gnss_dict(test_mode=VSCODE_TEST)
+                # Fetch position (newest cached fix when background acquisition is on)
+                gnss_dict_current = gnss.get_gnss_dict(test_mode=test_mode)
+                if GNSS_BACKGROUND_ACQUISITION and gnss.last_fix_skipped:
+                    log.debug("fix age: %.2f s, skipped fixes: %d", gnss.last_fix_age, gnss.last_fix_skipped)
+
+                # no fix since the previous iteration (or only a stale one): nothing to log or batch
+                if not gnss.last_fix_new:
+                    log.debug("no new fix (age %s s), waiting for the next interval", gnss.last_fix_age)
+                    gnss.wait_for_send(time.time(), GNSS_SEARCH_RATE)
+                    continue
 
                 # set the timestamp
                 last_gnss_time = time.time()
@@ -98,29 +250,79 @@ def main():
 
                 # Append the GNSS data to a log file
                 gnss.append_gnss_to_log(gnss_dict_current)
+                if "first_fix" not in boot_timer.marks and gnss_dict_current.get('lat') is not None:
+                    boot_timer.mark("first_fix")
+                    print(f"boot times: {boot_timer.report()}, {gnss.boot_stats}, config cached: {config_cached}")
+                    boot_timer.record(os.path.join("logs", "boot_times.jsonl"), fast_boot=FAST_BOOT,
+                                      config_cached=config_cached, **gnss.boot_stats)
+
+                # FAST_BOOT: the cellular link was brought up in the background, it is needed from here on
+                if cell_thread is not None:
+                    cell_thread.join()
+                    cell_thread = None
+                    if cell is None:
+                        return
+                    transmit_worker = start_transmit_worker()
+                if gnss_send_count == 0 and gnss.fix_log is not None:
+                    print(f"fix log: {gnss.fix_log.stats()}")
+                if gnss_send_count == 0 and gnss.register_reader is not None:
+                    print(f"fix registers: {gnss.register_reader.stats()}")
+                if gnss_send_count == 0 and gnss.high_rate is not None:
+                    print(f"high rate: {gnss.high_rate.stats()}")
+                if gnss_send_count == 0 and gnss.last_simplify is not None:
+                    print(f"simplify: {gnss.last_simplify}")
+                if gnss_send_count == 0 and cell is not None and cell.session is not None:
+                    print(f"cellular: {cell.stats()}")
+                if gnss_send_count == 0:
+                    print(f"logging: {run_log.stats()}")
+                    print(f"cadence: {scheduler.stats()}")
                 
                 # append the current gnss dict to the send gnss dict
                 if gnss_send_count == 0:
                     gnss_dict_send = {} # initialize empty dict if first time
+                for fix in gnss.uplink_backfill: # high-rate: the decimated fixes before the current one
+                    gnss_dict_send = gnss.append_gnss_dict_send(gnss_dict_send, fix)
                 gnss_dict_send = gnss.append_gnss_dict_send(gnss_dict_send, gnss_dict_current)
 
                 # get the current utc send id
-                current_utc_id = gnss_dict_current['utc'] # get the UTC of the last fix in the current dict
+                current_utc_id = gnss.batch_id(gnss_dict_send) # the newest fix UTC in the batch
 
                 # TEST
-                print(f"gnss_count: {gnss_send_count}")
+                log.debug("gnss_count: %d", gnss_send_count)
+
+                # batch size for this reading (may end the batch early when the link recovers)
+                if batch_controller is not None:
+                    batch_size = batch_controller.update(len(gnss.transmit_backlog))
+                    if gnss_send_count == 0:
+                        print(f"batch control: {batch_controller.stats()}")
+                send_position = batch_controller is None or batch_controller.send_position
+
+                # with the transmit worker the loop only queues work and never waits on the network
+                if transmit_worker is not None:
+                    if gnss_send_count >= (batch_size - 1): # -1 because we start counting from 0
+                        gnss.create_gnss_json(gnss_dict_send, unique_id=current_utc_id, compact=SEND_COMPACT)
+                        transmit_worker.submit_batch(current_utc_id)
+                        print(f"transmit worker: {transmit_worker.stats()}")
+                        gnss_send_count = 0
+                    else:
+                        # send the live position ahead of the backlog while there is one
+                        if not transmit_worker.backlog_empty and send_position:
+                            transmit_worker.submit_position(gnss_dict_current)
+                        gnss_send_count += 1
+                    gnss.wait_for_send(last_gnss_time, GNSS_SEARCH_RATE)
+                    continue
 
                 # check if there is a backlog of transmissions to send
                 if transmit_backlog_empty:
                     # if there is no backlog, check if we have reached the batch size to send
                     # TEST
-                    print(f" enter backlog empty")
+                    log.debug("enter backlog empty")
 
-                    if gnss_send_count >= (GNSS_SEND_BATCH_SIZE - 1): # -1 because we start counting from 0
+                    if gnss_send_count >= (batch_size - 1): # -1 because we start counting from 0
                         # reached the batch size
 
                         # TEST
-                        print(f"reached batch size")
+                        log.debug("reached batch size")
                         #  
                         # create the .json file with unique ID and send
                         gnss.create_gnss_json(gnss_dict_send, unique_id=current_utc_id, compact=SEND_COMPACT)
@@ -130,7 +332,7 @@ def main():
                         transmit_backlog_empty = gnss.send_gnss_json(current_utc_id, cell, last_gnss_time) 
 
                         # TEST
-                        print(f"transmit_backlog_empty in main: {transmit_backlog_empty}")
+                        log.debug("transmit_backlog_empty in main: %s", transmit_backlog_empty)
 
                         # reset the gnss counter
                         gnss_send_count = 0
@@ -152,13 +354,13 @@ def main():
                     # the transmit backlog is not empty, so we need to try send that inbeteween the GNSS readings
 
                     # TEST
-                    print(f"enter backlog NOT empty")
+                    log.debug("enter backlog NOT empty")
 
                     # first check if we have reached the batch size to send
-                    if gnss_send_count >= (GNSS_SEND_BATCH_SIZE - 1): # -1 because we start counting from 0
+                    if gnss_send_count >= (batch_size - 1): # -1 because we start counting from 0
                         # reached the batch size
                         # TEST
-                        print(f"reached batch size with backlog not empty")
+                        log.debug("reached batch size with backlog not empty")
                         #
                         # create the .json file with unique ID and send
                         gnss.create_gnss_json(gnss_dict_send, unique_id=current_utc_id, compact=SEND_COMPACT)
@@ -168,7 +370,7 @@ def main():
                         transmit_backlog_empty = gnss.send_gnss_json(current_utc_id, cell, last_gnss_time)
 
                         # TEST
-                        print(f"transmit_backlog_empty in main: {transmit_backlog_empty}")
+                        log.debug("transmit_backlog_empty in main: %s", transmit_backlog_empty)
 
                         # reset the gnss counter
                         gnss_send_count = 0
@@ -178,15 +380,15 @@ def main():
                         # gnss.stop()
                         gnss.wait_for_send(last_gnss_time, GNSS_SEARCH_RATE)
                         continue  # Breaks out of the current iteration of the loop and starts the next iteration (get next GNSS reading)
-                    else:
+                    elif send_position:
                         # because we will try send the current position and the backlog between the GNSS readings
                         #TEST 
-                        print(f"try send current position with backlog not empty")
+                        log.debug("try send current position with backlog not empty")
 
                         transmit_backlog_empty = gnss.send_current_position(cell, gnss_dict_current, last_gnss_time, compact=SEND_COMPACT)
 
                         # TEST
-                        print(f"transmit_backlog_empty in main: {transmit_backlog_empty}")
+                        log.debug("transmit_backlog_empty in main: %s", transmit_backlog_empty)
                         
                         # increment gnss_send_count and wait until the next GNSS search interval has elapsed
                         gnss_send_count += 1
@@ -194,14 +396,23 @@ def main():
                         # gnss.stop()
                         gnss.wait_for_send(last_gnss_time, GNSS_SEARCH_RATE)
                         continue  # Breaks out of the current iteration of the loop and starts the next iteration (get next GNSS reading)
+                    else:
+                        # the link is too poor for live positions: probe it with the oldest backlog batch instead
+                        time_budget = gnss.interval_time_left(last_gnss_time)
+                        gnss.drain_backlog(cell, time_budget=time_budget, max_failures=1)
+                        gnss.update_backlog_file(gnss.transmit_backlog)
+                        transmit_backlog_empty = not gnss.transmit_backlog
+                        gnss_send_count += 1
+                        gnss.wait_for_send(last_gnss_time, GNSS_SEARCH_RATE)
+                        continue
             except Exception as e:
                 print(f"main loop iteration: {e}")
-                os.system("sudo reboot") # reboot the system if there is an error in the main loop
+                reboot() # reboot the system if there is an error in the main loop
                 break
 
     except Exception as e:
         print(f"main: {e}")
-        os.system("sudo reboot") # reboot the system if there is an error in the main function
+        reboot() # reboot the system if there is an error in the main function
 
 if __name__ == "__main__":
     main()
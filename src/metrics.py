@@ -0,0 +1,141 @@
+# imports
+import os
+import json
+import threading
+import time
+
+# histogram bucket i counts durations in [2^(i-1), 2^i) microseconds, the last one everything above
+BUCKETS = 28  # up to 2^27 us ~ 134 s
+
+
+class Histogram:
+    """
+    Duration histogram with log2 buckets in microseconds: recording is one bit_length() and a
+    list increment, and the memory is fixed however many values are recorded. Quantiles are
+    resolved to the upper bound of their bucket (at most 2x high, never above `max`).
+    """
+
+    __slots__ = ("counts", "n", "total", "max")
+
+    def __init__(self):
+        self.counts = [0] * BUCKETS
+        self.n = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def add(self, seconds):
+        # int(us).bit_length() is e for us in [2^(e-1), 2^e), 0 below 1 us
+        self.counts[min(BUCKETS - 1, int(seconds * 1e6).bit_length())] += 1
+        self.n += 1
+        self.total += seconds
+        if seconds > self.max:
+            self.max = seconds
+
+    def quantile(self, q):
+        """Upper bucket bound (s) below which a share `q` of the values fall, 0 when empty."""
+        if not self.n:
+            return 0.0
+        rank = q * self.n
+        seen = 0
+        for i, c in enumerate(self.counts):
+            seen += c
+            if c and seen >= rank:
+                return min(self.max, 2.0 ** i * 1e-6)
+        return self.max
+
+    def summary(self):
+        """n, mean/p50/p90/p99/max in ms and the non-empty buckets ({upper bound in us: count})."""
+        ms = lambda s: round(s * 1e3, 3)
+        return {
+            "n": self.n,
+            "mean_ms": ms(self.total / self.n) if self.n else 0.0,
+            "p50_ms": ms(self.quantile(0.5)),
+            "p90_ms": ms(self.quantile(0.9)),
+            "p99_ms": ms(self.quantile(0.99)),
+            "max_ms": ms(self.max),
+            "le_us": {str(2 ** i): c for i, c in enumerate(self.counts) if c},
+        }
+
+
+class Metrics:
+    """
+    Stage timings, counters and gauges of the tracker, written as a small JSON snapshot.
+
+    The main loop, GNSS and Cellular call observe(stage, seconds) with durations they already
+    measured (acquire, parse, log, batch, serialize, send, wait, loop), count() for events
+    (loop overruns, send failures) and gauge() for levels (backlog depth, batch size).
+    maybe_write() replaces the snapshot file (atomically) at most every `interval` seconds, so
+    a scraper on the Pi can poll it at any time without seeing a half-written file.
+
+    Everything is guarded by one lock, as sends may be timed on the transmit worker thread.
+
+    Args:
+        path (str | None): Snapshot file for maybe_write().
+        interval (float): Seconds between snapshot writes.
+        clock (callable): Monotonic clock, replaceable in tests.
+    """
+
+    def __init__(self, path=None, interval=30.0, clock=time.monotonic):
+        self.path = path
+        self.interval = interval
+        self.clock = clock
+        self.started = clock()
+        self.histograms = {}
+        self.counters = {}
+        self.gauges = {}
+        self.snapshots = 0
+        self._last_write = self.started
+        self._lock = threading.Lock()
+
+    def observe(self, stage, seconds):
+        """Record one duration (s) of `stage`."""
+        with self._lock:
+            hist = self.histograms.get(stage)
+            if hist is None:
+                hist = self.histograms[stage] = Histogram()
+            hist.add(seconds)
+
+    def count(self, name, n=1):
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + n
+
+    def gauge(self, name, value):
+        with self._lock:
+            self.gauges[name] = value
+
+    def snapshot(self):
+        """Everything recorded so far as a JSON-ready dict."""
+        with self._lock:
+            return {
+                "time": round(time.time(), 3),
+                "uptime": round(self.clock() - self.started, 3),
+                "stages": {name: hist.summary() for name, hist in self.histograms.items()},
+                "counters": dict(self.counters),
+                "gauges": dict(self.gauges),
+            }
+
+    def write(self, path=None):
+        """Replace the snapshot file with the current snapshot."""
+        path = path or self.path
+        try:
+            tmp = path + '.tmp'
+            with open(tmp, 'w') as f:
+                f.write(json.dumps(self.snapshot(), separators=(',', ':')))
+            os.replace(tmp, path)
+            self.snapshots += 1
+        except Exception as e:
+            print(f"Error in Metrics.write: {e}")
+
+    def maybe_write(self):
+        """
+        write() if `interval` seconds have passed since the last snapshot.
+
+        Returns:
+            bool: True if a snapshot was written.
+        """
+        now = self.clock()
+        if self.path is None or now - self._last_write < self.interval:
+            return False
+        self._last_write = now
+        self.write()
+        return True
@@ -0,0 +1,338 @@
+# imports
+from datetime import datetime, timezone
+
+# Sentence types that feed the fix dict. Everything else (GSV, GSA, TXT, VTG, ZDA, ...)
+# is skipped on the 3 type bytes alone, without checksumming or tokenizing.
+RMC = b'RMC'
+GGA = b'GGA'
+
+_HEX = b'0123456789ABCDEFabcdef'
+
+
+def _xor_bytes(data):
+    """
+    XOR all bytes of `data` together (the NMEA checksum).
+
+    Folds the bytes as one big integer instead of looping over them in Python,
+    which keeps the cost roughly constant for an 80 byte sentence.
+    """
+    n = len(data)
+    x = int.from_bytes(data, 'little')
+    while n > 1:
+        half = (n + 1) // 2
+        shift = 8 * half
+        x = (x & ((1 << shift) - 1)) ^ (x >> shift)
+        n = half
+    return x
+
+
+def checksum_ok(line):
+    """
+    Validate the `*HH` checksum of a single NMEA sentence held as bytes.
+
+    Mirrors pynmea2.parse(line, check=True): the checksum is mandatory, must be
+    two hex digits and may only be followed by whitespace.
+
+    Args:
+        line (bytes): One sentence starting with b'$' (trailing CR/LF allowed).
+
+    Returns:
+        bool: True if the checksum is present and matches, False otherwise.
+    """
+    star = line.find(b'*', 1)
+    if star < 0:
+        return False
+    cs = line[star + 1:].rstrip()
+    if len(cs) != 2 or cs[0] not in _HEX or cs[1] not in _HEX:
+        return False
+    return _xor_bytes(line[1:star]) == int(cs, 16)
+
+
+def sentence_type(line):
+    """
+    Return the 3 byte sentence type of a talker sentence (e.g. b'RMC'), or b'' if the
+    line does not look like `$ttSSS,`. Proprietary sentences (`$P...`, e.g. `$PGRMC`) have no
+    talker and are never a standard type.
+    """
+    if len(line) < 7 or line[0] != 0x24 or line[6] != 0x2C or not line[1:3].isalnum():  # '$tt' and ','
+        return b''
+    if line[1] == 0x50:  # 'P'
+        return b''
+    return line[3:6]
+
+
+def latest_rmc_gga(lines, verified=False):
+    """
+    Find the latest checksum-valid RMC and GGA sentences.
+
+    Lines are walked newest first and only RMC/GGA candidates are checksummed, so
+    the GSV/GSA/TXT bulk of a dump is skipped on its type bytes alone.
+
+    Args:
+        lines (list[bytes]): NMEA lines, oldest first.
+        verified (bool): Lines were already checksummed (e.g. by NMEAFramer).
+
+    Returns:
+        tuple: (rmc, gga) as raw sentence bytes, either may be None.
+    """
+    rmc = gga = None
+    for line in reversed(lines):
+        st = sentence_type(line)
+        if st == RMC:
+            if rmc is None and (verified or checksum_ok(line)):
+                rmc = line
+                if gga is not None:
+                    break
+        elif st == GGA:
+            if gga is None and (verified or checksum_ok(line)):
+                gga = line
+                if rmc is not None:
+                    break
+    return rmc, gga
+
+
+def split_dump(data):
+    """
+    Split a raw GNSS dump (list of ints or bytes) into NMEA lines starting with '$'.
+
+    NUL bytes are dropped first, the same way get_gnss_dict always has.
+    """
+    raw = bytes(data).replace(b'\x00', b'')
+    return [line for line in raw.splitlines() if line[:1] == b'$']
+
+
+def _fields(line):
+    """Split the data part of a sentence (after `$ttSSS,` and before `*`) on commas."""
+    star = line.find(b'*', 7)
+    return line[7:star].split(b',')
+
+
+def _field(fields, i):
+    """Field `i` decoded to str, or '' when the sentence is shorter (as pynmea2 does)."""
+    return fields[i].decode('ascii', 'replace') if i < len(fields) else ''
+
+
+def _dm_to_sd(dm):
+    """
+    Convert `dddmm.mmmm` to decimal degrees exactly as pynmea2.nmea_utils.dm_to_sd
+    does (same float operations, so the rounded results are identical).
+    """
+    if not dm or dm == '0':
+        return 0.
+    dot = dm.find('.')
+    if dot < 3 or dot == len(dm) - 1 or not (dm[:dot] + dm[dot + 1:]).isdigit():
+        raise ValueError(f"Geographic coordinate value '{dm}' is not valid DDDMM.MMM")
+    return float(dm[:dot - 2]) + float(dm[dot - 2:]) / 60
+
+
+def _signed(dm, direction, positive, negative):
+    sd = _dm_to_sd(dm)
+    if direction == positive:
+        return +sd
+    elif direction == negative:
+        return -sd
+    return 0.
+
+
+def _epoch(date_s, time_s):
+    """
+    RMC `ddmmyy` + `hhmmss[.ss]` to integer epoch seconds, or None if either is
+    missing. Two digit years follow strptime's %y pivot (69-99 -> 19xx).
+
+    Raises:
+        ValueError: On a malformed date or time, which made the pynmea2 path give up
+        on the whole fix as well.
+    """
+    if not date_s or not time_s:
+        return None
+    if len(date_s) != 6:
+        raise ValueError(f"Datestamp '{date_s}' is not valid DDMMYY")
+    yy = int(date_s[4:6])
+    year = 1900 + yy if yy >= 69 else 2000 + yy
+    frac = time_s[6:]
+    us = frac and int(float(frac) * 1000000) or 0
+    dt = datetime(year, int(date_s[2:4]), int(date_s[0:2]),
+                  int(time_s[0:2]), int(time_s[2:4]), int(time_s[4:6]), us,
+                  tzinfo=timezone.utc)
+    return int(dt.timestamp())
+
+
+def _float_or_zero(s):
+    """`float(x or 0.0)` as used on pynmea2 float fields: '' -> 0.0, garbage -> None."""
+    if not s:
+        return 0.0
+    try:
+        return float(s)
+    except ValueError:
+        return None
+
+
+def parse_rmc(line):
+    """
+    Extract the fix dict fields carried by an RMC sentence.
+
+    Args:
+        line (bytes): A checksum-valid RMC sentence.
+
+    Returns:
+        tuple: (utc, lat, lon, sog, cog) unrounded; utc is None without date/time,
+        sog/cog are None if the field is not a number.
+
+    Raises:
+        ValueError: If the position, date or time fields are malformed.
+    """
+    f = _fields(line)
+    utc = _epoch(_field(f, 8), _field(f, 0))
+    lat = _signed(_field(f, 2), _field(f, 3), 'N', 'S')
+    lon = _signed(_field(f, 4), _field(f, 5), 'E', 'W')
+    sog = _float_or_zero(_field(f, 6))
+    cog = _float_or_zero(_field(f, 7))
+    return utc, lat, lon, sog, cog
+
+
+def parse_gga(line):
+    """
+    Extract the fix dict fields carried by a GGA sentence.
+
+    Args:
+        line (bytes): A checksum-valid GGA sentence.
+
+    Returns:
+        tuple: (fx, nsat, alt, hdop) unrounded; fx/nsat fall back to 0 and alt/hdop
+        to None when a field is not a number.
+    """
+    f = _fields(line)
+    try:
+        fx = int(_field(f, 5) or 0)
+    except ValueError:
+        fx = 0
+    try:
+        nsat = int(_field(f, 6) or 0)
+    except ValueError:
+        nsat = 0
+    hdop = _float_or_zero(_field(f, 7))
+    alt = _float_or_zero(_field(f, 8))
+    return fx, nsat, alt, hdop
+
+
+def _time_field(line):
+    """Raw `hhmmss[.ss]` field of an RMC/GGA sentence (the first data field)."""
+    end = line.find(b',', 7)
+    return line[7:end] if end > 0 else b''
+
+
+def parse_epochs(lines):
+    """
+    Every fix in a run of sentences, for receivers that put several epochs into one read
+    (5-10 Hz). Each RMC is paired with the GGA carrying the same time field.
+
+    Unlike parse_rmc(), utc keeps the fraction of the second, so fixes within one second
+    stay apart. RMC sentences without date/time or with malformed fields are skipped.
+
+    Args:
+        lines (list[bytes]): Checksum-valid sentences, oldest first (e.g. from NMEAFramer).
+
+    Returns:
+        list[tuple]: (utc, lat, lon, alt, sog, cog, fx, hdop, nsat) per RMC, oldest first,
+        unrounded; utc as float epoch seconds, the GGA fields None without a matching GGA.
+    """
+    gga = {}
+    for line in lines:
+        if sentence_type(line) == GGA:
+            gga[_time_field(line)] = line
+    out = []
+    for line in lines:
+        if sentence_type(line) != RMC:
+            continue
+        try:
+            utc, lat, lon, sog, cog = parse_rmc(line)
+            if utc is None:
+                continue
+            t = _time_field(line)
+            match = gga.get(t)
+            fx, nsat, alt, hdop = parse_gga(match) if match is not None else (None, None, None, None)
+        except ValueError:
+            continue
+        out.append((utc + float(t[6:] or 0), lat, lon, alt, sog, cog, fx, hdop, nsat))
+    return out
+
+
+class NMEAFramer:
+    """
+    Incremental NMEA framer that turns arbitrary byte chunks into complete sentences.
+
+    Partial sentences are carried over between feed() calls, so a sentence cut at the
+    end of one read is completed by the next one. Bytes outside '$...\\n' are skipped,
+    a '$' inside an unfinished sentence restarts framing there (the earlier fragment
+    is dropped), and sentences that fail the checksum or exceed max_len are dropped.
+    The DFRobot driver turns NULs into '\\n', which simply ends a fragment that then
+    fails its checksum.
+
+    Args:
+        types (tuple[bytes] | None): Sentence types to keep (e.g. (RMC, GGA)); other
+            types are dropped on their type bytes without checksumming. None keeps all.
+        max_len (int): Longest sentence accepted, in bytes without CR/LF.
+    """
+
+    def __init__(self, types=None, max_len=120):
+        self.types = types
+        self.max_len = max_len
+        self._buf = b''
+        self.sentences = 0  # complete, checksum-valid sentences returned
+        self.dropped = 0    # fragments, overlong or checksum-failed sentences
+        self.skipped = 0    # valid frames of a type not in `types`
+
+    def reset(self):
+        """Forget any partial sentence (e.g. after a device restart)."""
+        self._buf = b''
+
+    def feed(self, chunk):
+        """
+        Add a chunk of received bytes.
+
+        Args:
+            chunk (bytes | list[int]): Newly received data.
+
+        Returns:
+            list[bytes]: Complete, checksum-valid sentences (without CR/LF), oldest first.
+        """
+        data = self._buf + bytes(chunk).replace(b'\x00', b'')
+        out = []
+        pos = 0
+        n = len(data)
+        while pos < n:
+            start = data.find(b'$', pos)
+            if start < 0:
+                pos = n  # only garbage left
+                break
+            end = data.find(b'\n', start)
+            cr = data.find(b'\r', start, n if end < 0 else end)
+            if cr >= 0:
+                end = cr  # the '\n' of a CRLF is then skipped as inter-sentence garbage
+            restart = data.find(b'$', start + 1, n if end < 0 else end)
+            if restart >= 0:
+                # a new sentence began before this one ended: resync on it
+                self.dropped += 1
+                pos = restart
+                continue
+            if end < 0:
+                pos = start
+                break  # unfinished sentence: keep it for the next chunk
+            line = data[start:end]
+            pos = end + 1
+            if self.types is not None and sentence_type(line) not in self.types:
+                if sentence_type(line) or line[1:2] == b'P':  # proprietary sentences are skipped too
+                    self.skipped += 1
+                else:
+                    self.dropped += 1
+            elif len(line) <= self.max_len and checksum_ok(line):
+                self.sentences += 1
+                out.append(line)
+            else:
+                self.dropped += 1
+        tail = data[pos:]
+        if len(tail) > self.max_len + 1:
+            self.dropped += 1
+            tail = b''
+        self._buf = tail
+        return out
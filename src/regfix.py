@@ -0,0 +1,207 @@
+# imports
+import calendar
+import logging
+from datetime import datetime, timezone
+from src.DFRobot_GNSS import (I2C_YEAR_H, I2C_YEAR_L, I2C_MONTH, I2C_DATE, I2C_HOUR, I2C_MINUTE, I2C_SECOND,
+                              I2C_LAT_1, I2C_LON_1, I2C_USE_STAR, I2C_ALT_H, I2C_SOG_H, I2C_COG_H, FIX_REGS_LEN)
+
+log = logging.getLogger(__name__)
+
+
+def _coordinate(regs, i, positive, negative):
+    """Degrees from the 6 bytes at `i` (deg, min, min/1e5 in 24 bits, direction), None without a direction."""
+    direction = regs[i + 5]
+    if direction not in (positive, negative):
+        return None
+    sd = regs[i] + (regs[i + 1] + (regs[i + 2] << 16 | regs[i + 3] << 8 | regs[i + 4]) / 100000.0) / 60
+    return sd if direction == positive else -sd
+
+
+def _fixed(regs, i):
+    """The module's unsigned value at `i`: 16 bit integer part (big endian), then hundredths."""
+    return regs[i] * 256 + regs[i + 1] + regs[i + 2] / 100.0
+
+
+def decode_fix_registers(regs):
+    """
+    Fix dict of the module's fix register block (DFRobot_GNSS.get_fix_registers), rounded
+    like GNSS.read_gnss_dict.
+
+    The block is what the module parsed from its own NMEA output: date/time, position,
+    satellites used, altitude, speed and course. It has no fix quality and no HDOP, so fx is
+    1 with a position and satellites in use (else 0) and hdop is None. Altitude is unsigned
+    in the registers (below sea level reads as its absolute value).
+
+    Args:
+        regs (list[int] | bytes): FIX_REGS_LEN bytes from I2C_YEAR_H on.
+
+    Returns:
+        dict: FIX_KEYS fix dict; utc is None before the module has a date, lat/lon without a
+        hemisphere.
+
+    Raises:
+        ValueError: If the block is short.
+    """
+    if len(regs) < FIX_REGS_LEN:
+        raise ValueError(f"Fix register block is {len(regs)} bytes, expected {FIX_REGS_LEN}")
+    year = regs[I2C_YEAR_H] * 256 + regs[I2C_YEAR_L]
+    month, day = regs[I2C_MONTH], regs[I2C_DATE]
+    hour, minute, second = regs[I2C_HOUR], regs[I2C_MINUTE], regs[I2C_SECOND]
+    utc = None
+    # the module reports 2000-01-01 (or zeros) until it has the date from the satellites
+    if year > 2000 and 1 <= month <= 12 and 1 <= day <= 31 and hour < 24 and minute < 60 and second < 61:
+        utc = calendar.timegm((year, month, day, hour, minute, second, 0, 0, 0))
+    lat = _coordinate(regs, I2C_LAT_1, ord('N'), ord('S'))
+    lon = _coordinate(regs, I2C_LON_1, ord('E'), ord('W'))
+    nsat = regs[I2C_USE_STAR]
+    return {
+        'utc': utc,
+        'lat': None if lat is None else round(lat, 6),
+        'lon': None if lon is None else round(lon, 6),
+        'alt': round(_fixed(regs, I2C_ALT_H), 1),
+        'sog': round(_fixed(regs, I2C_SOG_H), 2),
+        'cog': round(_fixed(regs, I2C_COG_H), 1),
+        'fx': 1 if lat is not None and lon is not None and nsat > 0 else 0,
+        'hdop': None,
+        'nsat': nsat,
+    }
+
+
+def encode_fix_registers(utc, lat, lon, alt, sog, cog, nsat):
+    """
+    The fix register block the module would hold for a fix (the inverse of
+    decode_fix_registers), for simulated devices and tests.
+
+    Returns:
+        bytes: FIX_REGS_LEN bytes from I2C_YEAR_H on.
+    """
+    regs = bytearray(FIX_REGS_LEN)
+    if utc is not None:
+        t = datetime.fromtimestamp(int(utc), timezone.utc)
+        regs[I2C_YEAR_H:I2C_SECOND + 1] = bytes([t.year >> 8, t.year & 0xFF, t.month, t.day,
+                                                  t.hour, t.minute, t.second])
+    else:
+        regs[I2C_YEAR_H:I2C_DATE + 1] = bytes([2000 >> 8, 2000 & 0xFF, 1, 1])
+    for i, value, hemispheres in ((I2C_LAT_1, lat, b'NS'), (I2C_LON_1, lon, b'EW')):
+        if value is None:
+            continue
+        deg = int(abs(value))
+        frac = round((abs(value) - deg) * 60 * 100000)  # minutes in 1e-5
+        if frac >= 60 * 100000:
+            deg, frac = deg + 1, 0
+        minutes, frac = divmod(frac, 100000)
+        regs[i:i + 6] = bytes([deg, minutes, frac >> 16, (frac >> 8) & 0xFF, frac & 0xFF,
+                               hemispheres[0] if value >= 0 else hemispheres[1]])
+    regs[I2C_USE_STAR] = min(255, nsat or 0)
+    for i, value in ((I2C_ALT_H, alt), (I2C_SOG_H, sog), (I2C_COG_H, cog)):
+        hundredths = round(abs(value or 0.0) * 100)
+        regs[i:i + 3] = bytes([(hundredths // 100) >> 8 & 0xFF, (hundredths // 100) & 0xFF, hundredths % 100])
+    return bytes(regs)
+
+
+def fixes_agree(fix, reference, tolerance=1e-5):
+    """
+    True if a register fix matches the NMEA fix of the same second within `tolerance`
+    degrees (1e-5 is about 1 m; both carry minutes to 5 decimals, so they normally match to
+    the last digit) and with the same satellite count. Fixes of different seconds agree
+    (the module refreshed between the two reads).
+    """
+    if fix.get('utc') != reference.get('utc'):
+        return fix.get('utc') is not None and reference.get('utc') is not None \
+            and abs(fix['utc'] - reference['utc']) <= 1
+    for key in ('lat', 'lon'):
+        a, b = fix.get(key), reference.get(key)
+        if (a is None) != (b is None) or (a is not None and abs(a - b) > tolerance):
+            return False
+    return fix.get('nsat') == reference.get('nsat')
+
+
+class RegisterFixReader:
+    """
+    Fixes from one read of the module's fix register block instead of the NMEA dump.
+
+    The block is FIX_REGS_LEN (29) bytes in a single request, against a ~1300 byte dump in
+    1 + 6 requests behind a 0.1 s latch delay, and decoding it is a few integer operations
+    instead of framing and parsing sentences.
+
+    Every `crosscheck_every` reads (and whenever the block cannot be read) `nmea_read` is
+    used as well: that read's fix is returned, and it has fx and HDOP, which the registers
+    lack; later register fixes carry that HDOP until the next cross-check. A register fix
+    that disagrees with it (see fixes_agree) is counted and logged, and after
+    `max_mismatches` disagreeing cross-checks in a row the reader is disabled, so every
+    read goes to `nmea_read`.
+
+    Args:
+        device: The GNSS driver (DFRobot_GNSS.get_fix_registers).
+        nmea_read (callable): Returns a fix dict from the NMEA dump.
+        crosscheck_every (int): Reads between NMEA cross-checks (0 = never).
+        tolerance (float): Degrees a cross-checked position may differ by.
+        max_mismatches (int): Disagreeing cross-checks in a row that disable the reader.
+    """
+
+    def __init__(self, device, nmea_read, crosscheck_every=30, tolerance=1e-5, max_mismatches=3):
+        self.device = device
+        self.nmea_read = nmea_read
+        self.crosscheck_every = crosscheck_every
+        self.tolerance = tolerance
+        self.max_mismatches = max_mismatches
+        self.hdop = None  # HDOP of the latest NMEA cross-check
+        self.disabled = False
+        self.last_mismatch = None  # (register fix, NMEA fix) of the latest disagreement
+        self.last_was_nmea = False  # the latest read() returned the NMEA fix
+        self._mismatch_run = 0
+        # counters
+        self.reads = 0
+        self.crosschecks = 0
+        self.mismatches = 0
+        self.read_errors = 0
+
+    def read(self):
+        """One fix (a FIX_KEYS dict, {} if neither source has one)."""
+        if self.disabled:
+            self.last_was_nmea = True
+            return self.nmea_read()
+        self.reads += 1
+        fix = None
+        try:
+            regs = self.device.get_fix_registers()
+            if regs != -1 and regs:
+                fix = decode_fix_registers(regs)
+        except Exception as e:
+            print(f"Error in RegisterFixReader.read: {e}")
+        if fix is None:
+            self.read_errors += 1
+        due = self.crosscheck_every > 0 and (self.reads - 1) % self.crosscheck_every == 0
+        self.last_was_nmea = fix is None or due
+        if not self.last_was_nmea:
+            fix['hdop'] = self.hdop
+            return fix
+        reference = self.nmea_read()
+        if fix is not None and reference:
+            self._crosscheck(fix, reference)
+        return reference if reference else (fix or {})
+
+    def _crosscheck(self, fix, reference):
+        self.crosschecks += 1
+        self.hdop = reference.get('hdop')
+        if fixes_agree(fix, reference, self.tolerance):
+            self._mismatch_run = 0
+            return
+        self.mismatches += 1
+        self._mismatch_run += 1
+        self.last_mismatch = (fix, reference)
+        log.warning("Register fix %s disagrees with the NMEA fix %s", fix, reference)
+        if self._mismatch_run >= self.max_mismatches:
+            self.disabled = True
+            log.warning("Register fixes disabled after %d disagreeing cross-checks, reading NMEA",
+                        self._mismatch_run)
+
+    def stats(self):
+        """Counters as a dict (for logging)."""
+        return {
+            "reads": self.reads,
+            "crosschecks": self.crosschecks,
+            "mismatches": self.mismatches,
+            "read_errors": self.read_errors,
+            "disabled": self.disabled,
+        }
@@ -0,0 +1,324 @@
+# imports
+import gzip
+import json
+import random
+import time
+from bisect import bisect_right
+from datetime import datetime, timezone
+from src import nmea
+from src.DFRobot_GNSS import struct_utc_tim, struct_lat_lon, GPS_BeiDou_GLONASS
+
+# sentence types sent once per dump (their repetition marks the next dump in a log)
+_EPOCH_TYPES = (b'GGA', b'RMC', b'GLL', b'ZDA')
+
+
+def sentence(body):
+    """Wrap a sentence body (bytes, without '$' and '*') into a full sentence with checksum and CRLF."""
+    return b'$' + body + b'*%02X' % nmea._xor_bytes(body) + b'\r\n'
+
+
+def dm(value, deg_digits, decimals=5):
+    """Decimal degrees to the NMEA `d..dmm.mmmmm` form (sign dropped, see the N/S E/W field)."""
+    deg = int(abs(value))
+    return b'%0*d%0*.*f' % (deg_digits, deg, decimals + 3, decimals, (abs(value) - deg) * 60)
+
+
+def fix_sentences(fix):
+    """
+    GGA + RMC sentences reproducing one fix dict (as written to logs/gnss_log.txt).
+
+    Positions use 6 decimal minutes so read_gnss_dict() gives back the logged 6 decimal degrees.
+    Missing values become empty fields (and RMC status 'V' without a position).
+    """
+    def f(v, fmt):
+        return b'' if v is None else fmt % v
+    utc, lat, lon = fix.get('utc'), fix.get('lat'), fix.get('lon')
+    t = datetime.fromtimestamp(utc, timezone.utc) if utc is not None else None
+    hms = t.strftime('%H%M%S.000').encode() if t else b''
+    date = t.strftime('%d%m%y').encode() if t else b''
+    lat_f = (dm(lat, 2, 6), b'N' if lat >= 0 else b'S') if lat is not None else (b'', b'')
+    lon_f = (dm(lon, 3, 6), b'E' if lon >= 0 else b'W') if lon is not None else (b'', b'')
+    gga = b','.join([b'GNGGA', hms, *lat_f, *lon_f, f(fix.get('fx'), b'%d'), f(fix.get('nsat'), b'%02d'),
+                     f(fix.get('hdop'), b'%.1f'), f(fix.get('alt'), b'%.1f'), b'M', b'', b'M', b'', b''])
+    rmc = b','.join([b'GNRMC', hms, b'A' if lat is not None else b'V', *lat_f, *lon_f,
+                     f(fix.get('sog'), b'%.2f'), f(fix.get('cog'), b'%.2f'), date, b'', b'', b'A', b'V'])
+    return sentence(gga) + sentence(rmc)
+
+
+def _epoch_time(lines, previous):
+    """Epoch seconds of a group of sentences (from its RMC), else one second after `previous`."""
+    for line in lines:
+        if nmea.sentence_type(line) == nmea.RMC:
+            try:
+                utc = nmea.parse_rmc(line)[0]
+                if utc is not None:
+                    return float(utc)
+            except ValueError:
+                pass
+    return previous + 1.0 if previous is not None else 0.0
+
+
+def load_nmea_log(data):
+    """
+    Split a recorded NMEA log into the module's one-second dumps.
+
+    A new epoch starts when a GGA/RMC/GLL/ZDA sentence type shows up again in the current
+    epoch. Splitting on the time field would not work: one module buffer can hold the GGA of
+    the previous second next to the RMC of this one. Sentences that repeat within a dump
+    (GSA, GSV, TXT, ...) stay with the epoch they follow.
+
+    Args:
+        data (bytes): Raw log contents (NUL bytes and non-'$' lines are ignored).
+
+    Returns:
+        list[tuple]: (epoch seconds, dump bytes) per epoch, oldest first.
+    """
+    groups, current, seen = [], [], set()
+    for line in nmea.split_dump(data):
+        line = line.rstrip()
+        st = nmea.sentence_type(line)
+        if st in _EPOCH_TYPES:
+            if st in seen:
+                groups.append(current)
+                current, seen = [], set()
+            seen.add(st)
+        current.append(line)
+    if current:
+        groups.append(current)
+    epochs, previous = [], None
+    for lines in groups:
+        previous = _epoch_time(lines, previous)
+        epochs.append((previous, b''.join(line + b'\r\n' for line in lines)))
+    return epochs
+
+
+def load_track(lines):
+    """
+    Turn a fix track (JSON lines as written by GNSS.append_gnss_to_log) into epochs.
+
+    Args:
+        lines (iterable[str]): One fix dict per line; blank or unreadable lines are skipped.
+
+    Returns:
+        list[tuple]: (epoch seconds, dump bytes) per fix.
+    """
+    epochs, previous = [], None
+    for line in lines:
+        try:
+            fix = json.loads(line)
+        except ValueError:
+            continue
+        if not isinstance(fix, dict):
+            continue
+        t = float(fix['utc']) if fix.get('utc') is not None else (previous + 1.0 if previous is not None else 0.0)
+        previous = t
+        epochs.append((t, fix_sentences(fix)))
+    return epochs
+
+
+def load_epochs(path):
+    """Load a replay file (optionally gzipped): a JSON-lines fix track if it starts with '{', else a raw NMEA log."""
+    with open(path, 'rb') as f:
+        data = f.read()
+    if data[:2] == b'\x1f\x8b':  # a rotated, gzipped fix log
+        data = gzip.decompress(data)
+    if data.lstrip()[:1] == b'{':
+        return load_track(data.decode('utf-8', 'replace').splitlines())
+    return load_nmea_log(data)
+
+
+class NMEAReplay:
+    """
+    Drop-in stand-in for DFRobot_GNSS that replays recorded epochs, for load tests.
+
+    The replay clock runs `speed` times faster than real time from the first read (or begin()):
+    every get_all_gnss() returns the epoch the recording had reached at that moment, like the
+    module returning its latest buffer. `speed=0` steps instead, one epoch per read, which pushes
+    data through as fast as the caller can take it. The register getters (get_utc, get_lat, ...)
+    answer from the same epoch.
+
+    Faults can be injected: with probability `dropout` a read returns no data, and with
+    probability `corrupt` each sentence has its checksum broken.
+
+    Args:
+        epochs (list[tuple]): (epoch seconds, dump bytes) as from load_epochs().
+        speed (float): Time compression (1 = real time, 100 = 100x), 0 to step per read.
+        dropout (float): Probability that a read returns nothing.
+        corrupt (float): Probability that a sentence checksum is corrupted.
+        loop (bool): Start over at the end instead of repeating the last epoch.
+        seed (int | None): Seed for the fault injection.
+        clock (callable): Monotonic clock, replaceable in tests.
+    """
+
+    def __init__(self, epochs, speed=1.0, dropout=0.0, corrupt=0.0, loop=False, seed=None, clock=time.monotonic):
+        if not epochs:
+            raise ValueError("Nothing to replay")
+        self.epochs = epochs
+        self.times = [t for t, _ in epochs]
+        self.speed = speed
+        self.dropout = dropout
+        self.corrupt = corrupt
+        self.loop = loop
+        self.clock = clock
+        self._rnd = random.Random(seed)
+        self._start = None
+        self._index = -1      # epoch latched by the last get_gnss_len()
+        self._data = b''      # bytes handed out for that epoch
+        self.mode = GPS_BeiDou_GLONASS
+        self.powered = True
+        # counters
+        self.reads = 0
+        self.dropouts = 0
+        self.corrupted = 0
+        self.finished = False
+
+    @classmethod
+    def from_file(cls, path, **kwargs):
+        """Replay an NMEA log or a logs/gnss_log.txt track (see load_epochs)."""
+        return cls(load_epochs(path), **kwargs)
+
+    # --- replay clock ---
+    def _current_index(self):
+        if self.speed <= 0:
+            return self._index + 1
+        if self._start is None:
+            self._start = self.clock()
+        first, last = self.times[0], self.times[-1]
+        t = first + (self.clock() - self._start) * self.speed
+        if t > last and self.loop:
+            t = first + (t - first) % (last - first + 1.0)
+        return max(0, bisect_right(self.times, t) - 1)
+
+    def _latch(self):
+        index = self._current_index()
+        if index >= len(self.epochs):
+            if not self.loop:
+                self.finished = True
+                index = len(self.epochs) - 1
+            else:
+                index = 0
+        elif index == len(self.epochs) - 1 and not self.loop and self.speed > 0:
+            self.finished = True
+        self._index = index
+        self.reads += 1
+        if not self.powered:
+            self._data = b''  # a powered down module has nothing new
+            return
+        if self.dropout > 0 and self._rnd.random() < self.dropout:
+            self.dropouts += 1
+            self._data = b''
+            return
+        data = self.epochs[index][1]
+        if self.corrupt > 0:
+            data = self._corrupt(data)
+        self._data = data
+
+    def _corrupt(self, data):
+        out = []
+        for line in data.split(b'\r\n'):
+            if line and self._rnd.random() < self.corrupt:
+                if line.rfind(b'*') == len(line) - 3:
+                    line = line[:-1] + (b'0' if line[-1:] != b'0' else b'1')
+                    self.corrupted += 1
+            out.append(line)
+        return b'\r\n'.join(out)
+
+    def _fix(self):
+        """(utc, lat, lon, sog, cog, fx, nsat, alt, hdop) of the latched epoch, Nones if unknown."""
+        if self._index < 0:
+            self._latch()
+        rmc, gga = nmea.latest_rmc_gga(nmea.split_dump(self.epochs[self._index][1]))
+        values = [None] * 9
+        try:
+            if rmc:
+                values[0:5] = nmea.parse_rmc(rmc)
+            if gga:
+                values[5:9] = nmea.parse_gga(gga)
+        except ValueError:
+            pass
+        return values
+
+    # --- DFRobot_GNSS surface ---
+    def begin(self):
+        if self._start is None:
+            self._start = self.clock()
+        return True
+
+    def enable_power(self):
+        self.powered = True
+
+    def disable_power(self):
+        self.powered = False
+
+    def set_gnss(self, mode):
+        self.mode = mode
+
+    def get_gnss_mode(self):
+        return self.mode
+
+    def rgb_on(self):
+        pass
+
+    def rgb_off(self):
+        pass
+
+    def get_gnss_len(self):
+        self._latch()
+        return len(self._data)
+
+    def get_all_gnss(self):
+        self.get_gnss_len()
+        return list(self._data)
+
+    def get_date(self):
+        utc = struct_utc_tim()
+        t = self._fix()[0]
+        if t is not None:
+            d = datetime.fromtimestamp(t, timezone.utc)
+            utc.year, utc.month, utc.date = d.year, d.month, d.day
+        return utc
+
+    def get_utc(self):
+        utc = self.get_date()
+        t = self._fix()[0]
+        if t is not None:
+            d = datetime.fromtimestamp(t, timezone.utc)
+            utc.hour, utc.minute, utc.second = d.hour, d.minute, d.second
+        return utc
+
+    def _lat_lon(self):
+        ll = struct_lat_lon()
+        _, lat, lon = self._fix()[:3]
+        if lat is not None:
+            minutes = (abs(lat) - int(abs(lat))) * 60
+            ll.lat_dd, ll.lat_mm = int(abs(lat)), int(minutes)
+            ll.lat_mmmmm = int(round((minutes - int(minutes)) * 100000))
+            ll.lat_direction = 'N' if lat >= 0 else 'S'
+            ll.latitude = ll.lat_dd * 100.0 + ll.lat_mm + ll.lat_mmmmm / 100000.0
+            ll.latitude_degree = abs(lat)
+        if lon is not None:
+            minutes = (abs(lon) - int(abs(lon))) * 60
+            ll.lon_ddd, ll.lon_mm = int(abs(lon)), int(minutes)
+            ll.lon_mmmmm = int(round((minutes - int(minutes)) * 100000))
+            ll.lon_direction = 'E' if lon >= 0 else 'W'
+            ll.lonitude = ll.lon_ddd * 100.0 + ll.lon_mm + ll.lon_mmmmm / 100000.0
+            ll.lonitude_degree = abs(lon)
+        return ll
+
+    def get_lat(self):
+        return self._lat_lon()
+
+    def get_lon(self):
+        return self._lat_lon()
+
+    def get_num_sta_used(self):
+        return self._fix()[6] or 0
+
+    def get_alt(self):
+        return self._fix()[7] or 0.0
+
+    def get_sog(self):
+        return self._fix()[3] or 0.0
+
+    def get_cog(self):
+        return self._fix()[4] or 0.0
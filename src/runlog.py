@@ -0,0 +1,266 @@
+# imports
+import os
+import re
+import sys
+import time
+import queue
+import atexit
+import threading
+import logging
+import logging.handlers
+
+LOG_FORMAT = "%(asctime)s %(levelname)s %(name)s: %(message)s"
+_NUMBERS = re.compile(r"\d+")
+
+
+class RateLimitFilter(logging.Filter):
+    """
+    Lets at most `burst` records of the same message through every `period` seconds.
+
+    Records count as the same message when they come from the same logger at the same level
+    and the first KEY_CHARS characters of their message match with every number masked, so
+    "send fail. On send attempt 17" and "... 18" are one message. The first record let
+    through after a window with drops says how many similar ones were suppressed.
+
+    Args:
+        burst (int): Records of one message per window.
+        period (float): Window length in seconds.
+        clock (callable): Monotonic clock, replaceable in tests.
+    """
+
+    KEY_CHARS = 80
+    MAX_KEYS = 1024  # distinct messages tracked before expired windows are dropped
+
+    def __init__(self, burst=30, period=60.0, clock=time.monotonic):
+        super().__init__()
+        self.burst = burst
+        self.period = period
+        self.clock = clock
+        self.suppressed = 0
+        self._windows = {}  # key -> [window start, records let through, records dropped]
+        self._lock = threading.Lock()
+
+    def filter(self, record):
+        msg = record.msg if isinstance(record.msg, str) else str(record.msg)
+        key = (record.name, record.levelno, _NUMBERS.sub("#", msg[:self.KEY_CHARS]))
+        now = self.clock()
+        with self._lock:
+            window = self._windows.get(key)
+            if window is None or now - window[0] >= self.period:
+                if window is None and len(self._windows) >= self.MAX_KEYS:
+                    self._expire(now)
+                self._windows[key] = [now, 1, 0]
+                if window is not None and window[2]:
+                    record.msg = f"{msg} [{window[2]} similar suppressed]"
+                return True
+            if window[1] < self.burst:
+                window[1] += 1
+                return True
+            window[2] += 1
+            self.suppressed += 1
+            return False
+
+    def _expire(self, now):
+        for key in [k for k, w in self._windows.items() if now - w[0] >= self.period]:
+            del self._windows[key]
+        if len(self._windows) >= self.MAX_KEYS:
+            self._windows.clear()
+
+
+class _DroppingQueueHandler(logging.handlers.QueueHandler):
+    """QueueHandler that drops (and counts) records when the queue is full instead of raising."""
+
+    def __init__(self, record_queue):
+        super().__init__(record_queue)
+        self.dropped = 0
+
+    def prepare(self, record):
+        # format the message now (its arguments may change once the call returns), but in place:
+        # the base class copies every record for the sake of other handlers, which cost more
+        # than the rest of a log call
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = self.formatter.formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+class PrintCapture:
+    """
+    File-like stand-in for sys.stdout / sys.stderr that turns each printed line into a record.
+
+    Lines starting with one of `error_prefixes` ("Error in ...", "Failed to ...") are logged
+    at ERROR, the others at `level`. Partial lines are buffered per thread, so prints from the
+    acquisition and transmit threads do not interleave. Writes from the log writer thread
+    itself (e.g. logging's own error reports) go to `fallback` to avoid a feedback loop.
+    """
+
+    def __init__(self, logger, level=logging.INFO, error_prefixes=("Error", "Failed"), fallback=None):
+        self.logger = logger
+        self.level = level
+        self.error_prefixes = error_prefixes
+        self.fallback = fallback
+        self.writer = None  # the RunLog writer thread
+        self._local = threading.local()
+
+    def write(self, text):
+        if self.writer is not None and threading.current_thread() is self.writer:
+            return self.fallback.write(text) if self.fallback is not None else len(text)
+        buffered = getattr(self._local, "buffer", "") + text
+        if "\n" in buffered:
+            *lines, buffered = buffered.split("\n")
+            for line in lines:
+                if line:
+                    self.logger.log(logging.ERROR if line.startswith(self.error_prefixes) else self.level, line)
+        self._local.buffer = buffered
+        return len(text)
+
+    def flush(self):
+        pass
+
+    def isatty(self):
+        return False
+
+
+class RunLog:
+    """
+    Non-blocking logging for the tracker.
+
+    Records are filtered (level, then rate limit) and put on a bounded queue by the thread
+    that logs them; a background writer thread takes them off the queue and hands them to
+    `handler` (a size-rotated file by default, see setup()), so the main loop never waits on
+    the SD card. When the queue is full, records are dropped and counted rather than
+    blocking the loop. With capture_prints, sys.stdout and sys.stderr are replaced by
+    PrintCapture, so the remaining print() calls become records too (loggers "print" and
+    "stderr").
+
+    Args:
+        handler (logging.Handler): Where the writer thread writes records.
+        level (str | int): Level of the root logger ("DEBUG", "INFO", ...).
+        queue_size (int): Records held for the writer before new ones are dropped.
+        burst (int): Records of one message per rate limit window (0 disables the limit).
+        period (float): Rate limit window in seconds.
+        logger (logging.Logger | None): Logger to attach to, the root logger by default.
+    """
+
+    def __init__(self, handler, level=logging.INFO, queue_size=10000, burst=30, period=60.0, logger=None):
+        self.logger = logger if logger is not None else logging.getLogger()
+        self.level = level
+        self.handler = handler
+        if handler.formatter is None:
+            handler.setFormatter(logging.Formatter(LOG_FORMAT))
+        self.queue = queue.Queue(maxsize=queue_size)
+        self.queue_handler = _DroppingQueueHandler(self.queue)
+        self.queue_handler.setFormatter(handler.formatter)
+        self.rate_limit = RateLimitFilter(burst, period) if burst else None
+        if self.rate_limit is not None:
+            self.queue_handler.addFilter(self.rate_limit)
+        self.write_interval = 0.1  # s the writer sleeps after writing out the queue
+        self.written = 0
+        self.write_errors = 0
+        self._thread = None
+        self._streams = None  # (stdout, stderr) replaced by start(capture_prints=True)
+
+    def start(self, capture_prints=True):
+        """Attach to the logger, start the writer thread and (optionally) capture print()."""
+        if self._thread is not None:
+            return
+        self.logger.setLevel(self.level)
+        self.logger.addHandler(self.queue_handler)
+        self._thread = threading.Thread(target=self._run, name="log-writer", daemon=True)
+        self._thread.start()
+        if capture_prints:
+            self._streams = (sys.stdout, sys.stderr)
+            fallback = sys.__stderr__
+            sys.stdout = PrintCapture(self.logger.getChild("print"), logging.INFO, fallback=fallback)
+            sys.stderr = PrintCapture(self.logger.getChild("stderr"), logging.ERROR, fallback=fallback)
+            sys.stdout.writer = sys.stderr.writer = self._thread
+
+    def stop(self, timeout=5.0):
+        """
+        Restore print(), write out what is queued and close the handler.
+
+        Returns:
+            bool: True if the writer finished within `timeout` (otherwise the handler is left
+                open to the still running writer, a daemon thread).
+        """
+        if self._thread is None:
+            return True
+        if self._streams is not None:
+            sys.stdout, sys.stderr = self._streams
+            self._streams = None
+        self.logger.removeHandler(self.queue_handler)
+        deadline = time.monotonic() + timeout
+        try:
+            self.queue.put(None, timeout=timeout)  # writer exits after the records ahead of it
+            self._thread.join(max(0.0, deadline - time.monotonic()))
+        except queue.Full:
+            pass
+        finished = not self._thread.is_alive()
+        self._thread = None
+        if finished:
+            self.handler.close()
+        return finished
+
+    def _run(self):
+        while True:
+            # wait for a record, write everything queued by then, then sleep: the writer wakes
+            # a few times a second instead of once per record, which would take the GIL from
+            # the loop thread on every log call
+            record = self.queue.get()
+            while record is not None:
+                try:
+                    self.handler.handle(record)
+                    self.written += 1
+                except Exception:
+                    self.write_errors += 1
+                try:
+                    record = self.queue.get_nowait()
+                except queue.Empty:
+                    break
+            if record is None:
+                break
+            time.sleep(self.write_interval)
+
+    def stats(self):
+        """Counters and queue depth as a dict (for logging)."""
+        return {
+            "written": self.written,
+            "queued": self.queue.qsize(),
+            "dropped": self.queue_handler.dropped,
+            "suppressed": self.rate_limit.suppressed if self.rate_limit is not None else 0,
+            "write_errors": self.write_errors,
+        }
+
+
+def setup(options, capture_prints=True):
+    """
+    Start non-blocking logging from the `logging` config section.
+
+    Args:
+        options (dict): level, file, max_bytes, backups, queue_size, levels (per logger
+            levels, e.g. {"src.cellular": "DEBUG"}) and rate_limit ({"burst", "period"}).
+        capture_prints (bool): Turn print() output into records as well.
+
+    Returns:
+        RunLog: The started logging, stopped at exit.
+    """
+    path = options.get("file", os.path.join("logs", "runtime.log"))
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    handler = logging.handlers.RotatingFileHandler(path, maxBytes=options.get("max_bytes", 1000000),
+                                                   backupCount=options.get("backups", 3))
+    rate_limit = options.get("rate_limit", {})
+    runlog = RunLog(handler, level=options.get("level", "INFO"), queue_size=options.get("queue_size", 10000),
+                    burst=rate_limit.get("burst", 30), period=rate_limit.get("period", 60.0))
+    for name, level in options.get("levels", {}).items():
+        logging.getLogger(name).setLevel(level)
+    runlog.start(capture_prints=capture_prints)
+    atexit.register(runlog.stop)
+    return runlog
@@ -0,0 +1,117 @@
+# imports
+import numpy as np
+
+EARTH_RADIUS_M = 6371008.8
+
+
+def local_xy(lat, lon):
+    """
+    Project lat/lon (degrees) to metres on a plane through the first point (equirectangular,
+    accurate to well below GNSS noise over the few km of a batch).
+
+    Args:
+        lat (np.ndarray): Latitudes in degrees.
+        lon (np.ndarray): Longitudes in degrees.
+
+    Returns:
+        tuple: (x, y) arrays in metres east and north of the first point.
+    """
+    lat = np.radians(np.asarray(lat, dtype=float))
+    lon = np.radians(np.asarray(lon, dtype=float))
+    x = (lon - lon[0]) * np.cos(lat[0]) * EARTH_RADIUS_M
+    y = (lat - lat[0]) * EARTH_RADIUS_M
+    return x, y
+
+
+def simplify_mask(t, x, y, tolerance):
+    """
+    Time-aware Douglas-Peucker: which points to keep so that every dropped point lies within
+    `tolerance` metres of where linear interpolation *in time* between the kept points puts it
+    (synchronized Euclidean distance). Unlike plain Douglas-Peucker this also bounds the error
+    of "where was the rider at time t", so stops and speed changes on a straight road are kept.
+
+    All segments of one split level are handled in a single vectorized pass (every interior
+    point's distance, then the per-segment max with reduceat), so the cost is a handful of
+    numpy calls per level instead of per segment.
+
+    Args:
+        t (np.ndarray): Times (s), non-decreasing.
+        x (np.ndarray): East (m).
+        y (np.ndarray): North (m).
+        tolerance (float): Max reconstruction error in metres.
+
+    Returns:
+        np.ndarray: Boolean keep mask; the first and last points are always kept.
+    """
+    n = len(t)
+    keep = np.zeros(n, dtype=bool)
+    if n == 0:
+        return keep
+    keep[0] = keep[-1] = True
+    starts, ends = np.array([0]), np.array([n - 1])
+    while True:
+        inner = ends - starts - 1
+        open_ = inner > 0
+        starts, ends, inner = starts[open_], ends[open_], inner[open_]
+        if not starts.size:
+            return keep
+        # flat index of every interior point and the segment it belongs to
+        offsets = np.cumsum(inner) - inner
+        seg = np.repeat(np.arange(starts.size), inner)
+        idx = np.arange(inner.sum()) - offsets[seg] + starts[seg] + 1
+        i, j = starts[seg], ends[seg]
+        dt = t[j] - t[i]
+        r = np.divide(t[idx] - t[i], dt, out=np.full(idx.size, 0.5), where=dt > 0)
+        d = np.hypot(x[idx] - (x[i] + r * (x[j] - x[i])), y[idx] - (y[i] + r * (y[j] - y[i])))
+        dmax = np.maximum.reduceat(d, offsets)
+        # first point at the max of each segment (like argmax)
+        at_max = np.flatnonzero(d == dmax[seg])
+        _, first = np.unique(seg[at_max], return_index=True)
+        split = dmax > tolerance
+        mids = idx[at_max[first]][split]
+        keep[mids] = True
+        starts, ends = np.concatenate((starts[split], mids)), np.concatenate((mids, ends[split]))
+
+
+def reconstruction_error(t, x, y, keep):
+    """
+    Distance (m) of every point from its time-interpolated position on the kept points
+    (0 for kept points). With a mask from simplify_mask() the max is within the tolerance.
+    """
+    xi = np.interp(t, t[keep], x[keep])
+    yi = np.interp(t, t[keep], y[keep])
+    return np.hypot(x - xi, y - yi)
+
+
+def simplify_fixes(fixes, tolerance):
+    """
+    Drop fixes that time interpolation between their neighbours reproduces within `tolerance`.
+
+    Fixes without utc/lat/lon (no fix) are always kept and split the batch into runs that are
+    simplified on their own, so nothing unreproducible is dropped.
+
+    Args:
+        fixes (list[dict]): Fix dicts (gnss_dict_send["f"]), oldest first.
+        tolerance (float): Max horizontal reconstruction error in metres.
+
+    Returns:
+        tuple: (kept fixes, max reconstruction error in metres).
+    """
+    n = len(fixes)
+    if n < 3 or tolerance <= 0:
+        return list(fixes), 0.0
+    valid = np.array([f.get("utc") is not None and f.get("lat") is not None and f.get("lon") is not None
+                      for f in fixes])
+    keep = ~valid
+    max_error = 0.0
+    # runs of consecutive valid fixes
+    edges = np.flatnonzero(np.diff(np.concatenate(([0], valid.astype(np.int8), [0]))))
+    for start, stop in zip(edges[::2], edges[1::2]):
+        run = fixes[start:stop]
+        t = np.array([f["utc"] for f in run], dtype=float)
+        x, y = local_xy([f["lat"] for f in run], [f["lon"] for f in run])
+        mask = simplify_mask(t, x, y, tolerance)
+        keep[start:stop] = mask
+        if len(run) > 2:
+            max_error = max(max_error, float(reconstruction_error(t, x, y, mask).max()))
+    return [fix for fix, k in zip(fixes, keep) if k], max_error
@@ -0,0 +1,100 @@
+# imports
+import os
+import json
+import time
+
+# fallback for process_start() where /proc is not available: the time this module was imported
+_IMPORTED_AT = time.time()
+
+
+def process_start():
+    """
+    Wall-clock time (s since the epoch) the current process started, from /proc on Linux
+    (clock tick resolution, so interpreter startup and imports are included), else the time
+    this module was imported.
+    """
+    try:
+        with open('/proc/self/stat', 'r') as f:
+            # the command name may contain spaces: fields are counted after its closing ")"
+            fields = f.read().rsplit(')', 1)[1].split()
+        started = int(fields[19]) / os.sysconf('SC_CLK_TCK')  # field 22: start time after boot
+        with open('/proc/uptime', 'r') as f:
+            uptime = float(f.read().split()[0])
+        return time.time() - (uptime - started)
+    except Exception:
+        return _IMPORTED_AT
+
+
+def load_config(path, cache_path):
+    """
+    Load the YAML config through a cached parsed copy.
+
+    Parsing YAML (and importing the parser) is one of the slower steps of a cold start on the
+    Pi. The parsed config is kept as JSON in `cache_path` together with the size and mtime of
+    the YAML file, and used as long as both still match; otherwise the YAML is parsed (yaml
+    is only imported then) and the cache rewritten.
+
+    Args:
+        path (str): The YAML config file.
+        cache_path (str): Where the parsed copy is kept.
+
+    Returns:
+        tuple: (config dict, True if it came from the cache).
+    """
+    st = os.stat(path)
+    stamp = [st.st_size, st.st_mtime_ns]
+    try:
+        with open(cache_path, 'r') as f:
+            cached = json.load(f)
+        if cached.get("source") == stamp:
+            return cached["config"], True
+    except (OSError, ValueError, AttributeError):
+        pass  # no usable cache
+    import yaml  # only on a cache miss
+    with open(path, 'r') as f:
+        config = yaml.safe_load(f)
+    try:
+        tmp = cache_path + '.tmp'
+        with open(tmp, 'w') as f:
+            json.dump({"source": stamp, "config": config}, f)
+        os.replace(tmp, cache_path)
+    except (OSError, TypeError, ValueError) as e:
+        print(f"Config cache not written: {e}")  # e.g. YAML types JSON cannot hold
+    return config, False
+
+
+class BootTimer:
+    """
+    Startup milestones, in seconds since the process started.
+
+    mark() records a milestone (the first time only), report() returns them as a dict and
+    record() appends that dict as one JSON line to a file, so cold starts can be compared
+    across reboots (e.g. time from process start to the first logged fix).
+
+    Args:
+        start (float | None): Process start (s since the epoch), process_start() by default.
+        clock (callable): Wall clock, replaceable in tests.
+    """
+
+    def __init__(self, start=None, clock=time.time):
+        self.clock = clock
+        self.start = process_start() if start is None else start
+        self.marks = {}
+
+    def mark(self, name):
+        """Record milestone `name` now (later calls with the same name are ignored)."""
+        if name not in self.marks:
+            self.marks[name] = self.clock() - self.start
+        return self.marks[name]
+
+    def report(self):
+        """Milestones in the order they were reached, {name: seconds since process start}."""
+        return {name: round(t, 3) for name, t in self.marks.items()}
+
+    def record(self, path, **extra):
+        """Append the report (and `extra` fields) as one JSON line to `path`."""
+        try:
+            with open(path, 'a') as f:
+                f.write(json.dumps({"start": round(self.start, 3), **self.report(), **extra}) + "\n")
+        except Exception as e:
+            print(f"Error in BootTimer.record: {e}")
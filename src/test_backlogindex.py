@@ -0,0 +1,104 @@
+#### for running in vscode (comment out when on Raspberry Pi)
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+####
+
+import unittest
+import tempfile
+import json
+from src.backlogindex import BacklogIndex, BatchInfo, batch_id
+
+
+class TestBacklogIndex(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.dir = self.tmp.name
+        self.path = os.path.join(self.dir, 'backlog.txt')
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def write_batch(self, utc_id, data='{"f":[]}'):
+        with open(os.path.join(self.dir, f'gnss_{utc_id}.json'), 'w') as f:
+            f.write(data)
+
+    def test_fifo_membership_and_list_view(self):
+        index = BacklogIndex([10, 20])
+        self.assertTrue(index.add(30, size=12, fixes=5, first_utc=30, last_utc=38))
+        self.assertFalse(index.add(20))  # no duplicates
+        self.assertEqual((len(index), index[0], index[1], index[-1], index[1:]), (3, 10, 20, 30, [20, 30]))
+        self.assertIn(20, index)
+        self.assertEqual(index.info(30), BatchInfo(12, 5, 30, 38))
+        self.assertIsNone(index.info(99))
+        self.assertTrue(index.discard(20))
+        self.assertFalse(index.discard(20))
+        with self.assertRaises(ValueError):
+            index.remove(20)
+        index.append(20)  # back at the tail
+        self.assertEqual(index, [10, 30, 20])
+        self.assertEqual(index.pending_bytes(), 12)
+        for bad in (None, '40', 40.0):
+            with self.assertRaises(TypeError):
+                index.add(bad)
+        self.assertEqual(len(index), 3)
+
+    def test_batch_id(self):
+        self.assertEqual(batch_id('gnss_1756813036.json'), 1756813036)
+        for name in ('tmp_gnss.json', 'gnss_.json', 'gnss_12.json.tmp', 'backlog.txt', 'gnss_x1.json'):
+            self.assertIsNone(batch_id(name))
+
+    def test_save_only_when_changed_and_load(self):
+        index = BacklogIndex()
+        index.add(1, 10, 2, 1, 3)
+        index.add(2)
+        self.assertTrue(index.save(self.path))
+        self.assertFalse(index.save(self.path))
+        index.discard(1)
+        self.assertTrue(index.save(self.path))
+        loaded = BacklogIndex.load(self.path)
+        self.assertEqual((loaded, loaded.info(2)), ([2], BatchInfo(None, None, None, None)))
+        self.assertFalse(loaded.save(self.path))  # same as on disk
+        # the old backlog.txt: a JSON list of IDs
+        with open(self.path, 'w') as f:
+            json.dump([5, 6], f)
+        self.assertEqual(BacklogIndex.load(self.path), [5, 6])
+        with open(self.path, 'w') as f:
+            f.write('{"b":[[1,')
+        self.assertIsNone(BacklogIndex.load(self.path))
+        self.assertIsNone(BacklogIndex.load(os.path.join(self.dir, 'none.txt')))
+
+    def test_recover_trusts_matching_index(self):
+        for utc_id in (1, 2):
+            self.write_batch(utc_id)
+        index = BacklogIndex()
+        index.add(2, 99, 7, 2, 8)  # order and details only the saved index knows
+        index.add(1, 98, 6, 1, 7)
+        index.save(self.path)
+        recovered, how = BacklogIndex.recover(self.dir, self.path)
+        self.assertEqual((how, recovered, recovered.info(2)), ("persisted", [2, 1], BatchInfo(99, 7, 2, 8)))
+
+    def test_recover_rebuilds_stale_or_missing_index(self):
+        self.write_batch(3, '{"f":[1]}')
+        self.write_batch(1)
+        self.write_batch(2)
+        with open(os.path.join(self.dir, 'tmp_gnss.json'), 'w') as f:
+            f.write('{}')
+        index = BacklogIndex()
+        index.add(2, 99, 7, 2, 8)
+        index.add(9)  # file gone
+        index.save(self.path)
+        recovered, how = BacklogIndex.recover(self.dir, self.path)
+        self.assertEqual((how, recovered), ("rebuilt", [1, 2, 3]))
+        self.assertEqual(recovered.info(2), BatchInfo(99, 7, 2, 8))  # kept from the saved index
+        self.assertEqual(recovered.info(3), BatchInfo(9, None, None, None))  # size from the scan
+        self.assertTrue(recovered.save(self.path))
+        os.remove(self.path)
+        recovered, how = BacklogIndex.recover(self.dir, self.path)
+        self.assertEqual((how, recovered), ("scanned", [1, 2, 3]))
+        recovered, how = BacklogIndex.recover(os.path.join(self.dir, 'missing'), self.path)
+        self.assertEqual((how, recovered), ("scanned", []))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,56 @@
+#### for running in vscode (comment out when on Raspberry Pi)
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+####
+
+import unittest
+from src.batchcontrol import BatchController
+
+
+class TestBatchController(unittest.TestCase):
+    def setUp(self):
+        self.ctl = BatchController(batch_size=5, min_batch=2, max_batch=30, window=10)
+
+    def record(self, ok, n, seconds=0.5):
+        for _ in range(n):
+            self.ctl.record_send(ok, seconds)
+
+    def test_configured_size_until_first_send(self):
+        self.assertEqual(self.ctl.update(0), 5)
+        self.assertFalse(self.ctl.send_position)  # no backlog, nothing to overtake
+        self.assertTrue(self.ctl.update(3) == 5 and self.ctl.send_position)
+
+    def test_good_link_shrinks_one_step_per_update(self):
+        self.record(True, 10)
+        self.assertEqual([self.ctl.update(0) for _ in range(4)], [4, 3, 2, 2])
+
+    def test_poor_link_jumps_to_max_and_stops_positions(self):
+        self.record(False, 6)
+        self.record(True, 4)
+        self.assertEqual(self.ctl.update(2), 30)
+        self.assertFalse(self.ctl.send_position)
+
+    def test_backlog_and_latency_grow_batches(self):
+        self.record(True, 10)
+        self.assertEqual(self.ctl.update(10), 30)  # backlog_high
+        ctl = BatchController(batch_size=2, min_batch=2, max_batch=30, window=10, latency_target=2.0)
+        for _ in range(10):
+            ctl.record_send(True, 6.0)
+        self.assertEqual(ctl.update(0), 6)  # 3x the target latency
+
+    def test_mixed_link_interpolates(self):
+        self.record(True, 7)
+        self.record(False, 3)
+        self.assertEqual(self.ctl.target(1), 16)  # 0.7: half way between poor (0.5) and good (0.9)
+        self.assertEqual(self.ctl.stats()['success_rate'], 0.7)
+
+    def test_rejects_bad_bounds(self):
+        with self.assertRaises(ValueError):
+            BatchController(min_batch=10, max_batch=5)
+        with self.assertRaises(ValueError):
+            BatchController(good_success=0.7, poor_success=0.7)  # no range to interpolate over
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,128 @@
+#### for running in vscode (comment out when on Raspberry Pi)
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+####
+
+import unittest
+import random
+from unittest.mock import patch
+from src.cadence import TickScheduler
+from src.gps import GNSS
+
+
+class SimClock:
+    """Monotonic clock whose sleep() advances it, waking up to `wake_latency` s late."""
+    def __init__(self, t=5000.0, wake_latency=0.0, seed=0):
+        self.t = t
+        self.wake_latency = wake_latency
+        self.rng = random.Random(seed)
+
+    def __call__(self):
+        return self.t
+
+    def sleep(self, seconds):
+        self.t += seconds + self.rng.uniform(0, self.wake_latency)
+
+
+def variable_work(rng, period):
+    """Iteration work: mostly within the interval, sometimes over it, now and then a long stall."""
+    r = rng.random()
+    if r < 0.90:
+        return rng.uniform(0.0, 0.9 * period)
+    if r < 0.98:
+        return rng.uniform(0.9 * period, 1.4 * period)
+    return rng.uniform(1.4 * period, 4.0 * period)
+
+
+def simulate(policy, ticks=10000, period=2.0, max_catch_up=10, seed=1):
+    clock = SimClock(wake_latency=0.005, seed=seed)
+    scheduler = TickScheduler(period, policy=policy, max_catch_up=max_catch_up, clock=clock, sleep=clock.sleep)
+    rng = random.Random(seed)
+    scheduler.start()
+    starts = []  # (tick number, deadline, actual start)
+    overruns = 0
+    slept_late = []  # lateness of the ticks reached by sleeping
+    for _ in range(ticks):
+        starts.append((scheduler.tick, scheduler.interval_start(), clock()))
+        clock.t += variable_work(rng, period)
+        overran = scheduler.remaining() <= 0
+        overruns += overran
+        scheduler.wait()
+        if not overran:
+            slept_late.append(clock() - scheduler.interval_start())
+    return scheduler, starts, overruns, slept_late
+
+
+class TestTickScheduler(unittest.TestCase):
+    def test_skip_keeps_the_grid_over_10000_ticks(self):
+        period = 2.0
+        scheduler, starts, overruns, slept_late = simulate("skip", period=period)
+        start = scheduler.start_time
+        for tick, deadline, actual in starts:
+            self.assertEqual(deadline, start + tick * period)  # no accumulated drift
+            self.assertGreaterEqual(actual, deadline)
+            self.assertLess(actual - deadline, period)  # a late tick runs in the slot in progress
+        # tick numbers only move forward, and every slot is either run or skipped
+        numbers = [tick for tick, _, _ in starts]
+        self.assertEqual(numbers, sorted(set(numbers)))
+        self.assertEqual(scheduler.ticks + scheduler.skipped, scheduler.tick + 1)
+        self.assertEqual(scheduler.overruns, overruns)
+        self.assertGreater(scheduler.skipped, 0)
+        # ticks reached by sleeping start within the wake-up latency: work never shifts them
+        self.assertLessEqual(max(slept_late), 0.005)
+        stats = scheduler.stats()
+        self.assertEqual(stats["ticks"], 10001)
+        self.assertLessEqual(stats["late_ms_max"], period * 1e3)
+
+    def test_catch_up_runs_every_missed_tick(self):
+        period = 2.0
+        scheduler, starts, overruns, slept_late = simulate("catch_up", period=period, max_catch_up=10)
+        start = scheduler.start_time
+        self.assertEqual(scheduler.skipped, 0)
+        self.assertEqual([tick for tick, _, _ in starts], list(range(len(starts))))
+        for tick, deadline, actual in starts:
+            self.assertEqual(deadline, start + tick * period)
+            self.assertGreaterEqual(actual, deadline)
+        self.assertEqual(scheduler.overruns, overruns)
+        # the schedule is met again after the catch-ups: most ticks still start on time
+        self.assertLessEqual(max(slept_late), 0.005)
+        lateness = sorted(actual - deadline for _, deadline, actual in starts)
+        self.assertLessEqual(lateness[len(lateness) // 2], 0.005)
+
+    def test_catch_up_is_bounded(self):
+        clock = SimClock()
+        scheduler = TickScheduler(1.0, policy="catch_up", max_catch_up=3, clock=clock, sleep=clock.sleep)
+        scheduler.start()
+        clock.t += 20.5  # a stall over 20 deadlines
+        self.assertEqual(scheduler.wait(), 0.0)
+        self.assertEqual((scheduler.tick, scheduler.skipped), (17, 16))
+        for _ in range(3):
+            self.assertEqual(scheduler.wait(), 0.0)  # the 3 kept ticks back to back
+        self.assertAlmostEqual(scheduler.wait(), 0.5)  # on the grid again
+        self.assertEqual(clock(), scheduler.start_time + 21)
+
+    def test_unknown_policy(self):
+        with self.assertRaises(ValueError):
+            TickScheduler(1.0, policy="later")
+
+
+class TestGNSSWithScheduler(unittest.TestCase):
+    def test_wait_and_budgets_follow_the_deadlines(self):
+        clock = SimClock()
+        gnss = GNSS(search_rate=2)
+        gnss.scheduler = TickScheduler(2, clock=clock, sleep=clock.sleep)
+        gnss.scheduler.start()
+        clock.t += 0.5  # read and parse
+        # a wall clock step (NTP, GNSS time) changes nothing
+        with patch('src.gps.time.time', return_value=10.0 ** 9):
+            self.assertAlmostEqual(gnss.interval_time_left(last_gnss_time=0.0), 1.4)
+            self.assertTrue(gnss.check_enough_time_remaining(0.0, 2))
+            clock.t += 1.45
+            self.assertFalse(gnss.check_enough_time_remaining(0.0, 2))
+            gnss.wait_for_send(last_gnss_time=0.0, search_rate=2)
+        self.assertEqual(clock(), gnss.scheduler.start_time + 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,53 @@
+#### for running in vscode (comment out when on Raspberry Pi)
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+####
+
+import unittest
+import json
+from unittest.mock import patch
+from src.cellular import Cellular, build_bundle, parse_bundle_ack, bundle_entry_size
+
+
+class TestBundleFormat(unittest.TestCase):
+    def test_build_and_entry_size(self):
+        batches = [(1756813036, b'{"f":[1]}'), (1756813046, b'{"f":[2]}')]
+        payload = build_bundle(batches)
+        self.assertEqual(json.loads(payload), {"b": [{"id": 1756813036, "d": {"f": [1]}},
+                                                     {"id": 1756813046, "d": {"f": [2]}}]})
+        # entry sizes (separators included) cover the payload up to the wrapper
+        self.assertEqual(len(payload), len(b'{"b":[]}') - 1 + sum(bundle_entry_size(i, d) for i, d in batches))
+
+    def test_parse_ack(self):
+        self.assertEqual(parse_bundle_ack(b'{"ack":[3,1,9]}', [1, 2, 3]), [1, 3])
+        self.assertEqual(parse_bundle_ack(None, [1]), [])
+        self.assertEqual(parse_bundle_ack(b'<html>', [1]), [])
+
+
+class TestSendBundle(unittest.TestCase):
+    def setUp(self):
+        self.cell = Cellular(bundle_max_bytes=1024)
+
+    def test_partial_ack_from_server(self):
+        with patch.object(self.cell, '_post', return_value=b'{"ack":[2]}') as post:
+            self.assertEqual(self.cell.send_bundle([(1, b'{}'), (2, b'{}')]), [2])
+        post.assert_called_once_with(b'{"b":[{"id":1,"d":{}},{"id":2,"d":{}}]}')
+
+    def test_link_down_and_errors_ack_nothing(self):
+        with patch('src.cellular.time.sleep'):
+            self.assertEqual(self.cell.send_bundle([(1, b'{}')]), [])  # simulated link starts down
+            self.cell.test_counter = 10
+            self.assertEqual(self.cell.send_bundle([(1, b'{}'), (2, b'{}')]), [1, 2])
+        with patch.object(self.cell, '_post', side_effect=OSError("modem")):
+            self.assertEqual(self.cell.send_bundle([(1, b'{}')]), [])
+
+
+class TestSendFile(unittest.TestCase):
+    def test_unreadable_file_is_a_failed_send(self):
+        cell = Cellular()
+        self.assertFalse(cell.send_file('/nonexistent/gnss_1.json'))
+
+
+if __name__ == '__main__':
+    unittest.main()
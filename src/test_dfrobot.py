@@ -0,0 +1,74 @@
+#### for running in vscode (comment out when on Raspberry Pi)
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+####
+
+import unittest
+import time
+from unittest.mock import patch
+from src.DFRobot_GNSS import (DFRobot_GNSS_UART, I2C_ALL_DATA, I2C_ID, I2C_LAT_1, GNSS_DEVICE_ADDR,
+                              GPS_BeiDou_GLONASS)
+from src.fake_serial import FakeGNSSSerial
+from src.gps import TEST_GNSS_DATA
+
+
+class TestUARTBulkRead(unittest.TestCase):
+    def setUp(self):
+        # fast line so the tests do not wait on simulated wire time
+        self.ser = FakeGNSSSerial(bytes(TEST_GNSS_DATA), baudrate=1_000_000, latency=0.0)
+        self.dev = DFRobot_GNSS_UART(1_000_000, ser=self.ser)
+        self.dev.START_GET_SETTLE = 0.0
+
+    def test_get_all_gnss_returns_whole_buffer(self):
+        self.assertEqual(self.dev.get_all_gnss(), list(TEST_GNSS_DATA))
+
+    def test_get_all_gnss_uses_few_requests(self):
+        self.dev.get_all_gnss()
+        blocks = -(-len(TEST_GNSS_DATA) // DFRobot_GNSS_UART.ALL_DATA_BLOCK)
+        self.assertEqual(self.ser.requests, 1 + blocks)  # length + data blocks
+
+    def test_nul_replaced_by_newline(self):
+        self.ser.set_nmea(b'$A\x00B')
+        self.assertEqual(self.dev.get_all_gnss(), [36, 65, 0x0A, 66])
+
+
+
+class TestUARTReadReg(unittest.TestCase):
+    def setUp(self):
+        self.ser = FakeGNSSSerial(bytes(TEST_GNSS_DATA), baudrate=1_000_000, latency=0.0)
+        self.dev = DFRobot_GNSS_UART(1_000_000, ser=self.ser)
+
+    def test_returns_as_soon_as_bytes_arrive(self):
+        self.ser.latency = 0.01
+        start = time.monotonic()
+        self.assertEqual(self.dev.read_reg(I2C_ID, 1), [GNSS_DEVICE_ADDR])
+        self.assertLess(time.monotonic() - start, 0.045)  # the old path always slept 50 ms
+        self.assertTrue(self.dev.begin())
+
+    def test_does_not_poll(self):
+        with patch.object(FakeGNSSSerial, 'inWaiting', side_effect=AssertionError("polled")):
+            self.assertEqual(self.dev.get_gnss_mode(), GPS_BeiDou_GLONASS)
+
+    def test_short_read_is_reported(self):
+        self.ser.latency = 0.05  # module answers after the deadline
+        self.assertEqual(self.dev.read_reg(I2C_ALL_DATA, 10, timeout=0.01), -1)
+        self.assertEqual(self.dev.short_reads, 1)
+        self.assertEqual(self.dev.last_short_read, (I2C_ALL_DATA, 10, 0))
+
+    def test_partial_answer_is_not_returned(self):
+        # only 2 of the 6 latitude bytes make it before the deadline
+        self.ser.baudrate = 200  # 50 ms per byte: answer bytes land at 150, 200, 250 ms...
+        self.assertEqual(self.dev.read_reg(I2C_LAT_1, 6, timeout=0.225), -1)
+        self.assertEqual(self.dev.last_short_read, (I2C_LAT_1, 6, 2))
+
+    def test_getters_keep_defaults_on_short_read(self):
+        self.ser.latency = 0.5
+        self.dev.READ_MARGIN = 0.01
+        self.assertEqual(self.dev.get_alt(), 0.0)
+        self.assertEqual(self.dev.get_num_sta_used(), 0)
+        self.assertEqual(self.dev.get_gnss_mode(), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,117 @@
+#### for running in vscode (comment out when on Raspberry Pi)
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+####
+
+import unittest
+import tempfile
+from src.diskqueue import SegmentQueue
+
+
+class TestSegmentQueue(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.dir = self.tmp.name
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def segments(self):
+        return sorted(n for n in os.listdir(self.dir) if n.endswith('.q'))
+
+    def test_fifo_and_list_view(self):
+        q = SegmentQueue(self.dir)
+        self.assertIsNone(q.peek())
+        self.assertIsNone(q.ack())
+        for key in (10, 20, 30):
+            q.put(key, f'{{"k":{key}}}'.encode())
+        self.assertEqual((len(q), list(q), q[0]), (3, [10, 20, 30], 10))
+        self.assertIn(20, q)
+        self.assertEqual(q.peek(), (10, b'{"k":10}'))
+        self.assertEqual(q.ack(), 10)
+        self.assertEqual(q.peek(), (20, b'{"k":20}'))
+        q.close()
+
+    def test_peek_index_and_ack_count(self):
+        q = SegmentQueue(self.dir)
+        for key in range(5):
+            q.put(key, b'%d' % key)
+        self.assertEqual(q.peek(3), (3, b'3'))
+        self.assertIsNone(q.peek(5))
+        self.assertEqual(q.ack(3), 2)
+        self.assertIsNone(q.ack(0))  # nothing acked
+        self.assertIsNone(q.ack(-1))
+        self.assertEqual(list(q), [3, 4])
+        q.close()
+        q = SegmentQueue(self.dir)
+        self.assertEqual(list(q), [3, 4])
+        self.assertEqual(q.ack(10), 4)
+        self.assertEqual(len(q), 0)
+        q.close()
+
+    def test_reopen_keeps_pending_and_acks(self):
+        q = SegmentQueue(self.dir)
+        for key in range(5):
+            q.put(key, b'x' * key)
+        q.ack()
+        q.ack()
+        q.close()
+        q = SegmentQueue(self.dir)
+        self.assertEqual(list(q), [2, 3, 4])
+        self.assertEqual(q.peek(), (2, b'xx'))
+        q.put(5, b'new')
+        q.close()
+        self.assertEqual(list(SegmentQueue(self.dir)), [2, 3, 4, 5])
+
+    def test_segments_roll_over_and_are_reclaimed(self):
+        q = SegmentQueue(self.dir, segment_bytes=100)
+        for key in range(10):
+            q.put(key, b'p' * 40)  # 56 byte records: one per segment
+        self.assertEqual(len(self.segments()), 10)
+        for _ in range(9):
+            q.ack()
+        self.assertEqual(len(self.segments()), 1)
+        q.ack()
+        q.put(99, b'after')
+        q.close()
+        self.assertEqual(list(SegmentQueue(self.dir, segment_bytes=100)), [99])
+
+    def test_torn_append_is_cut_back(self):
+        q = SegmentQueue(self.dir)
+        q.put(1, b'complete')
+        q.put(2, b'will be torn')
+        path = q.tail_path
+        q.close()
+        size = os.path.getsize(path)
+        with open(path, 'r+b') as f:
+            f.truncate(size - 3)  # power cut in the middle of the second append
+        q = SegmentQueue(self.dir)
+        self.assertEqual(list(q), [1])
+        self.assertEqual(q.truncated, size - 3 - (16 + len(b'complete')))  # the partial second record
+        q.put(3, b'next')
+        q.close()
+        q = SegmentQueue(self.dir)
+        self.assertEqual([q.peek()[1], q[1]], [b'complete', 3])
+        self.assertEqual(q.truncated, 0)
+
+    def test_corrupt_record_and_lost_index(self):
+        q = SegmentQueue(self.dir)
+        for key in range(3):
+            q.put(key, b'data')
+        q.ack()
+        path = q.tail_path
+        q.close()
+        with open(path, 'r+b') as f:
+            data = bytearray(f.read())
+            data[-1] ^= 0xFF  # flip a payload bit of the last record
+            f.seek(0)
+            f.write(data)
+        self.assertEqual(list(SegmentQueue(self.dir)), [1])
+        os.remove(os.path.join(self.dir, 'index.json'))
+        # without the index everything still on disk is pending again (at-least-once)
+        self.assertEqual(list(SegmentQueue(self.dir)), [0, 1])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,56 @@
+#### for running in vscode (comment out when on Raspberry Pi)
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+####
+
+import unittest
+from src import fixcodec
+from src.gps import GNSS
+from benchmarks.fixtures import track
+
+
+class TestFixCodec(unittest.TestCase):
+    def test_varint_zigzag_round_trip(self):
+        for n in (0, 1, -1, 63, -64, 64, 127, 128, -129, 2 ** 31, -2 ** 31, 2 ** 40, -(2 ** 63)):
+            out = bytearray()
+            fixcodec._put_zigzag(out, n)
+            self.assertEqual(fixcodec._get_zigzag(out, 0), (n, len(out)))
+
+    def test_round_trip_matches_scaled_json(self):
+        gnss = GNSS()
+        for n in (0, 1, 5, 50, 500):
+            fixes = track(n)
+            decoded = gnss.decode_gnss_binary(gnss.encode_gnss_binary({'f': fixes}))['f']
+            self.assertEqual(decoded, fixes)
+
+    def test_none_fields_and_negative_values(self):
+        fixes = [{'utc': 100, 'lat': -89.999999, 'lon': -179.5, 'alt': -12.4, 'sog': 0.0,
+                  'cog': None, 'fx': 0, 'hdop': None, 'nsat': 0},
+                 {'utc': 101, 'lat': None, 'lon': 179.5, 'alt': 5.0, 'sog': 1.25,
+                  'cog': 10.0, 'fx': 2, 'hdop': 0.9, 'nsat': 12},
+                 {'utc': 99, 'lat': 89.5, 'lon': 0.0, 'alt': 0.0, 'sog': 0.0,
+                  'cog': 0.0, 'fx': 1, 'hdop': 1.0, 'nsat': 3}]
+        data = fixcodec.encode_batch(fixes)
+        self.assertTrue(data[0] & fixcodec.FLAG_MASKS)
+        self.assertEqual(fixcodec.decode_batch(data), fixes)
+        # no None anywhere: no masks are written
+        self.assertFalse(fixcodec.encode_batch(fixes[2:])[0] & fixcodec.FLAG_MASKS)
+
+    def test_smaller_than_compact_json(self):
+        import json
+        gnss = GNSS()
+        batch = {'f': track(50)}
+        as_json = json.dumps(gnss.compress_gnss_dict(batch, scaled=False), separators=(',', ':'))
+        self.assertLess(len(gnss.encode_gnss_binary(batch)) * 4, len(as_json))
+
+    def test_rejects_bad_input(self):
+        data = fixcodec.encode_batch(track(3))
+        for bad in (b'', bytes([0x02]) + data[1:], data[:-1], data + b'\x00'):
+            with self.assertRaises(ValueError):
+                fixcodec.decode_batch(bad)
+        self.assertEqual(GNSS().decode_gnss_binary(data[:-1]), {'f': []})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,111 @@
+#### for running in vscode (comment out when on Raspberry Pi)
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+####
+
+import unittest
+import gzip
+import json
+import tempfile
+from unittest.mock import patch
+from src.fixlog import FixLog, FLUSH, FSYNC, BATCH
+from src.gps import GNSS
+from src.fake_clock import FakeClock
+
+
+def read_lines(path):
+    with open(path) as f:
+        return [json.loads(line) for line in f]
+
+
+class TestFixLog(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, 'gnss_log.txt')
+        self.clock = FakeClock(1756813036.0)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_flush_mode_writes_through_without_fsync(self):
+        log = FixLog(self.path, mode=FLUSH, clock=self.clock)
+        with patch('src.fixlog.os.fsync') as fsync:
+            for i in range(3):
+                log.append({'utc': i})
+                self.assertEqual(len(read_lines(self.path)), i + 1)  # visible at once
+            fsync.assert_not_called()
+        log.close()
+
+    def test_fsync_mode_syncs_every_fix(self):
+        log = FixLog(self.path, mode=FSYNC, clock=self.clock)
+        with patch('src.fixlog.os.fsync') as fsync:
+            for i in range(4):
+                log.append({'utc': i})
+            self.assertEqual(fsync.call_count, 4)
+        self.assertEqual(log.stats()['syncs'], 4)
+        log.close()
+
+    def test_batch_mode_by_count_and_time(self):
+        log = FixLog(self.path, mode=BATCH, sync_every=3, sync_interval=10, clock=self.clock)
+        with patch('src.fixlog.os.fsync') as fsync:
+            log.append({'utc': 0})
+            log.append({'utc': 1})
+            self.assertEqual(read_lines(self.path), [])  # still buffered: lost on a power cut
+            log.append({'utc': 2})
+            self.assertEqual(len(read_lines(self.path)), 3)
+            log.append({'utc': 3})
+            self.clock.t += 10
+            log.append({'utc': 4})  # interval elapsed before the count
+            self.assertEqual(len(read_lines(self.path)), 5)
+            self.assertEqual(fsync.call_count, 2)
+        log.close()
+        self.assertEqual([f['utc'] for f in read_lines(self.path)], [0, 1, 2, 3, 4])
+
+    def test_size_rotation_compresses_and_prunes(self):
+        line = json.dumps({'utc': 0, 'pad': 'x' * 80}) + '\n'
+        log = FixLog(self.path, max_bytes=len(line) * 4, rotate_daily=False, max_backups=2, clock=self.clock)
+        for i in range(14):
+            self.clock.t += 1
+            log.append({'utc': 0, 'pad': 'x' * 80})
+        log.close()
+        names = sorted(os.listdir(self.tmp.name))
+        self.assertEqual(log.rotations, 3)
+        self.assertEqual(len(names), 3)  # current + 2 kept backups
+        self.assertTrue(all(n.endswith('.txt.gz') for n in names if n != 'gnss_log.txt'))
+        self.assertEqual(len(read_lines(self.path)), 2)
+        with gzip.open(os.path.join(self.tmp.name, names[-2]), 'rt') as f:
+            self.assertEqual(len(f.readlines()), 4)
+
+    def test_daily_rotation_keeps_buffered_fixes_in_old_day(self):
+        log = FixLog(self.path, mode=BATCH, sync_every=100, compress=False, clock=self.clock)
+        log.append({'utc': 1})
+        self.clock.t += 86400
+        log.append({'utc': 2})
+        log.close()
+        rotated = [n for n in os.listdir(self.tmp.name) if n != 'gnss_log.txt']
+        self.assertEqual(len(rotated), 1)
+        self.assertEqual(read_lines(os.path.join(self.tmp.name, rotated[0])), [{'utc': 1}])
+        self.assertEqual(read_lines(self.path), [{'utc': 2}])
+
+    def test_reopen_appends(self):
+        FixLog(self.path).append({'utc': 1})
+        log = FixLog(self.path)
+        log.append({'utc': 2})
+        log.close()
+        self.assertEqual(len(read_lines(self.path)), 2)
+
+    def test_gnss_uses_configured_log(self):
+        gnss = GNSS()
+        gnss.logs_dir = self.tmp.name
+        self.assertTrue(gnss.open_fix_log(mode=BATCH, sync_every=2))
+        gnss.append_gnss_to_log({'utc': 5})
+        self.assertEqual(read_lines(self.path), [])
+        gnss.append_gnss_to_log({'utc': 6})
+        self.assertEqual(read_lines(self.path), [{'utc': 5}, {'utc': 6}])
+        self.assertFalse(gnss.open_fix_log(mode='sometimes'))
+        self.assertIsNone(gnss.fix_log)
+
+
+if __name__ == '__main__':
+    unittest.main()
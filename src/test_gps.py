@@ -5,11 +5,15 @@ sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')
 ####
 
 import unittest
-from src.gps import GNSS, GNSS_lora
+from src.gps import GNSS, GNSS_lora, TEST_GNSS_DATA
+from src.cellular import bundle_entry_size
+from src.DFRobot_GNSS import DFRobot_GNSS_UART, I2C_RGB_MODE, RGB_ON
+from src.fake_serial import FakeGNSSSerial
 from unittest.mock import patch, MagicMock, mock_open
 import tempfile
 import json
 import time
+import itertools
 
 class TestGNSSCheckSats(unittest.TestCase):
     def setUp(self):
@@ -95,6 +99,63 @@ class TestGNSSGetGnssDict(unittest.TestCase):
         self.assertIsNone(result['hdop'])
         self.assertIsNone(result['nsat'])
 
+class TestGNSSBackgroundAcquisition(unittest.TestCase):
+    def setUp(self):
+        self.gnss = GNSS(search_rate=1)
+        self.reads = 0
+        test = self
+        class DummyGNSS:
+            def get_all_gnss(self):
+                test.reads += 1
+                return TEST_GNSS_DATA
+        self.gnss.gnss = DummyGNSS()
+
+    def tearDown(self):
+        self.gnss.stop_acquisition()
+
+    def test_returns_cached_fix_without_reading(self):
+        self.assertTrue(self.gnss.start_acquisition(ring_size=4, period=0.01))
+        first = self.gnss.get_gnss_dict(test_mode=False)
+        self.assertAlmostEqual(first['lat'], -34.139426, places=6)
+        self.gnss.stop_acquisition()
+        reads = self.reads
+        self.gnss._acq_thread = object()  # pretend it still runs: no device access allowed
+        again = self.gnss.get_gnss_dict(test_mode=False)
+        self.assertEqual(self.reads, reads)
+        # the same fix is not returned twice
+        self.assertEqual(again, dict.fromkeys(first))
+        self.assertFalse(self.gnss.last_fix_new)
+        self.assertGreaterEqual(self.gnss.last_fix_age, 0.0)
+        self.gnss._acq_thread = None
+
+    def test_stale_fix_is_no_fix(self):
+        self.gnss.start_acquisition(period=0.01)
+        self.gnss.get_gnss_dict()
+        self.gnss.stop_acquisition()
+        with self.gnss._fix_lock:
+            read_at, seq, fix = self.gnss._fix_ring[-1]
+            self.gnss._fix_ring.append((read_at - 1.0, seq + 1, fix))  # newer, but read 1 s ago
+        self.gnss._acq_thread = object()
+        self.assertEqual(self.gnss.get_gnss_dict(), dict.fromkeys(fix))  # older than 3 periods
+        self.assertFalse(self.gnss.last_fix_new)
+        self.gnss._acq_thread = None
+
+    def test_reports_skipped_fixes(self):
+        self.gnss.start_acquisition(ring_size=2, period=0.005)
+        self.gnss.get_gnss_dict()
+        time.sleep(0.1)
+        self.gnss.get_gnss_dict()
+        self.assertGreater(self.gnss.last_fix_skipped, 0)
+        self.assertEqual(len(self.gnss._fix_ring), 2)  # bounded
+
+    def test_stop_returns_to_synchronous_reads(self):
+        self.gnss.start_acquisition(period=0.01)
+        self.gnss.stop_acquisition()
+        self.assertIsNone(self.gnss._acq_thread)
+        reads = self.reads
+        self.gnss.get_gnss_dict(test_mode=False)
+        self.assertEqual(self.reads, reads + 1)
+
 class TestGNSSBoot(unittest.TestCase):
     def setUp(self):
         self.gnss = GNSS()
@@ -117,12 +178,33 @@ class TestGNSSBoot(unittest.TestCase):
             def rgb_on(self):
                 pass
         self.gnss.gnss = Dummy()
-        # Simulate presence of backlog file containing [1,2,3]
-        with patch('os.path.isfile', return_value=True), \
-             patch('builtins.open', mock_open(read_data=json.dumps([1, 2, 3]))):
+        with tempfile.TemporaryDirectory() as td:
+            self.gnss.logs_dir = td
+            for utc_id in (3, 1, 2):
+                with open(os.path.join(td, f'gnss_{utc_id}.json'), 'w') as f:
+                    f.write('{"f":[]}')
+            # stale backlog.txt: gnss_1.json is not in it, gnss_9.json is gone
+            with open(os.path.join(td, 'backlog.txt'), 'w') as f:
+                json.dump([2, 3, 9], f)
             self.assertTrue(self.gnss.boot())
             self.assertEqual(self.gnss.transmit_backlog, [1, 2, 3])
 
+    def test_fast_boot_only_writes_settings_that_differ(self):
+        ser = FakeGNSSSerial(baudrate=1_000_000, latency=0.0)
+        device = DFRobot_GNSS_UART(1_000_000, ser=ser)
+        device.WRITE_SETTLE = device.BEGIN_SETTLE = 0.0
+        self.gnss.gnss = device
+        with tempfile.TemporaryDirectory() as td:
+            self.gnss.logs_dir = td
+            # fresh module: mode already GPS+BeiDou+GLONASS, power on, LED off
+            self.assertTrue(self.gnss.boot(fast=True))
+            self.assertEqual((self.gnss.boot_stats['device_writes'], ser.regs[I2C_RGB_MODE]), (1, RGB_ON))
+            # after a Pi reboot everything already holds
+            self.assertTrue(self.gnss.boot(fast=True))
+            self.assertEqual(self.gnss.boot_stats['device_writes'], 0)
+            self.assertTrue(self.gnss.boot())
+            self.assertEqual(self.gnss.boot_stats['device_writes'], 3)
+
 class TestGNSSAppendDicts(unittest.TestCase):
     def setUp(self):
         self.gnss = GNSS()
@@ -136,6 +218,16 @@ class TestGNSSAppendDicts(unittest.TestCase):
         result = self.gnss.append_gnss_dict_send({"f": [{"utc": 1}]}, {"utc": 2})
         self.assertEqual([fix["utc"] for fix in result["f"]], [1, 2])
 
+    def test_batch_id_is_newest_fix_utc(self):
+        self.assertEqual(self.gnss.batch_id({"f": [{"utc": 5}, {"utc": 7}, {"utc": None}]}), 7)
+
+    def test_batch_id_without_times_counts_on(self):
+        self.gnss.transmit_backlog = [3, 9]
+        self.assertEqual(self.gnss.batch_id({"f": [{"utc": None}]}), 10)
+        self.assertEqual(self.gnss.batch_id({"f": [{"utc": None}]}), 11)
+        self.assertEqual(self.gnss.batch_id({"f": [{"utc": 20}]}), 20)
+        self.assertEqual(self.gnss.batch_id({"f": []}), 21)
+
 class TestGNSSWaitAndLog(unittest.TestCase):
     def setUp(self):
         self.gnss = GNSS()
@@ -313,26 +405,29 @@ class TestGNSSSendGnssJson(unittest.TestCase):
 
     def test_send_no_backlog_adds_current_on_failure(self):
         cell = MagicMock()
+        cell.send_file.return_value = False
         with patch.object(GNSS, 'json_file_exists', return_value=True), \
-             patch.object(GNSS, 'update_backlog_file') as mock_upd, \
-             patch.object(GNSS, 'check_enough_time_remaining', return_value=False):
-            result = self.gnss.send_gnss_json(111, cell, last_gnss_time=time.time())
+             patch.object(GNSS, 'update_backlog_file') as mock_upd:
+            # last_gnss_time far in the past: no time left, a single attempt is made
+            result = self.gnss.send_gnss_json(111, cell, last_gnss_time=0.0)
             self.assertFalse(result)
             self.assertIn(111, self.gnss.transmit_backlog)
+            cell.send_file.assert_called_once()
             mock_upd.assert_called()
 
     def test_send_backlog_attempts_oldest_and_adds_current(self):
         cell = MagicMock()
+        cell.send_file.return_value = False
         self.gnss.transmit_backlog = [222]
         with patch.object(GNSS, 'json_file_exists', return_value=True), \
-             patch.object(GNSS, 'remove_from_transmit_backlog') as mock_rem, \
-             patch.object(GNSS, 'update_backlog_file') as mock_upd, \
-             patch.object(GNSS, 'check_enough_time_remaining', return_value=False):
-            result = self.gnss.send_gnss_json(333, cell, last_gnss_time=time.time())
+             patch.object(GNSS, 'delete_json_file') as mock_del, \
+             patch.object(GNSS, 'update_backlog_file') as mock_upd:
+            result = self.gnss.send_gnss_json(333, cell, last_gnss_time=0.0)
             self.assertFalse(result)
-            # Current added; oldest not removed due to forced failure
-            self.assertIn(333, self.gnss.transmit_backlog)
-            mock_rem.assert_not_called()
+            # Current added; oldest attempted first and kept due to forced failure
+            self.assertEqual(self.gnss.transmit_backlog, [222, 333])
+            self.assertTrue(cell.send_file.call_args[0][0].endswith('gnss_222.json'))
+            mock_del.assert_not_called()
             mock_upd.assert_called()
 
     def test_send_success_when_test_count_hits_threshold(self):
@@ -347,17 +442,259 @@ class TestGNSSSendGnssJson(unittest.TestCase):
 
     def test_send_backlog_success_removes_oldest_but_still_false(self):
         cell = MagicMock()
+        cell.send_file.return_value = True
         self.gnss.transmit_backlog = [555]
-        self.gnss.test_count = 29
         with patch.object(GNSS, 'json_file_exists', return_value=True), \
-             patch.object(GNSS, 'remove_from_transmit_backlog') as mock_rem, \
-             patch.object(GNSS, 'update_backlog_file') as mock_upd, \
-             patch.object(GNSS, 'check_enough_time_remaining', return_value=False):
-            result = self.gnss.send_gnss_json(666, cell, last_gnss_time=time.time())
+             patch.object(GNSS, 'delete_json_file') as mock_del, \
+             patch.object(GNSS, 'update_backlog_file') as mock_upd:
+            # no time left: only the oldest entry is sent
+            result = self.gnss.send_gnss_json(666, cell, last_gnss_time=0.0)
             self.assertFalse(result)
-            mock_rem.assert_called_once_with(555)
+            mock_del.assert_called_once_with('gnss_555', self.gnss.logs_dir)
+            self.assertEqual(self.gnss.transmit_backlog, [666])
             mock_upd.assert_called()
 
+    def test_send_drains_whole_backlog_while_time_remains(self):
+        cell = MagicMock()
+        cell.send_file.return_value = True
+        self.gnss.transmit_backlog = list(range(1, 2001))  # deep enough to break the old recursion
+        with patch.object(GNSS, 'json_file_exists', return_value=True), \
+             patch.object(GNSS, 'delete_json_file'), \
+             patch.object(GNSS, 'update_backlog_file'):
+            self.assertTrue(self.gnss.send_gnss_json(2001, cell, last_gnss_time=time.time()))
+            self.assertEqual(cell.send_file.call_count, 2001)
+
+
+class TestGNSSDrainBacklog(unittest.TestCase):
+    def setUp(self):
+        self.gnss = GNSS(search_rate=1)
+        self.tmp = tempfile.TemporaryDirectory()
+        self.gnss.logs_dir = self.tmp.name
+        for utc_id in (1, 2, 3, 4):
+            self.gnss.create_gnss_json({"f": [{"utc": utc_id}]}, unique_id=utc_id)
+        self.gnss.transmit_backlog = [1, 2, 3, 4]
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_missing_file_dropped_and_result_counts(self):
+        os.remove(os.path.join(self.tmp.name, 'gnss_2.json'))
+        cell = MagicMock()
+        cell.send_file.return_value = True
+        result = self.gnss.drain_backlog(cell, time_budget=10)
+        self.assertEqual((result['sent'], result['missing'], result['failed'], result['remaining']), (3, 1, 0, 0))
+        self.assertEqual(self.gnss.transmit_backlog, [])
+        self.assertEqual(os.listdir(self.tmp.name), [])
+
+    def test_byte_budget_and_failure_stop(self):
+        cell = MagicMock()
+        cell.send_file.side_effect = [True, True, False]
+        size = os.path.getsize(os.path.join(self.tmp.name, 'gnss_1.json'))
+        result = self.gnss.drain_backlog(cell, time_budget=10, byte_budget=2 * size)
+        self.assertEqual((result['sent'], result['bytes_sent']), (2, 2 * size))
+        self.assertEqual(self.gnss.transmit_backlog, [3, 4])
+        result = self.gnss.drain_backlog(cell, time_budget=10, max_failures=1)
+        self.assertEqual((result['sent'], result['failed'], result['remaining']), (0, 1, 2))
+        self.assertEqual(self.gnss.transmit_backlog, [3, 4])
+
+    def test_send_exception_counts_as_failure(self):
+        cell = MagicMock()
+        cell.send_file.side_effect = OSError("file vanished")
+        result = self.gnss.drain_backlog(cell, time_budget=10, max_failures=3)
+        self.assertEqual((result['sent'], result['failed'], result['remaining']), (0, 3, 4))
+        self.assertEqual(cell.send_file.call_count, 3)
+        self.gnss.use_segment_queue()
+        result = self.gnss.drain_backlog(cell, time_budget=10, max_failures=2)
+        self.assertEqual((result['sent'], result['failed'], result['remaining']), (0, 2, 4))
+        self.gnss.queue.close()
+
+    def test_pipelined_files_retry_failures_in_order(self):
+        cell = MagicMock()
+        cell.pipeline = 3
+        cell.send_many.side_effect = [[True, False, True], [True, True]]
+        result = self.gnss.drain_backlog(cell, time_budget=10)
+        self.assertEqual((result['sent'], result['failed'], result['uploads'], result['remaining']), (4, 1, 5, 0))
+        sent = [[os.path.basename(p) for p in c.args[0]] for c in cell.send_many.call_args_list]
+        self.assertEqual(sent, [['gnss_1.json', 'gnss_2.json', 'gnss_3.json'], ['gnss_2.json', 'gnss_4.json']])
+        cell.send_file.assert_not_called()
+
+    def test_created_batches_are_indexed_without_stat(self):
+        self.gnss.transmit_backlog = []
+        path = self.gnss.create_gnss_json({"f": [{"utc": 9}, {"utc": 5}, {"utc": 7}]}, unique_id=5)
+        with patch('os.path.isfile') as isfile, patch('os.stat') as stat:
+            self.gnss.add_to_transmit_backlog(5)
+            isfile.assert_not_called()
+            stat.assert_not_called()
+        info = self.gnss.transmit_backlog.info(5)
+        self.assertEqual(tuple(info), (os.path.getsize(path), 3, 5, 9))
+
+class FakeBundleCell:
+    """Transport that takes bundles; batches in `reject` are left unacknowledged."""
+
+    def __init__(self, bundle_max_bytes, reject=()):
+        self.bundle_max_bytes = bundle_max_bytes
+        self.reject = set(reject)
+        self.bundles = []
+
+    def send_bundle(self, batches):
+        self.bundles.append([(i, bytes(d)) for i, d in batches])
+        return [i for i, _ in batches if i not in self.reject]
+
+    def send_file(self, path):
+        self.bundles.append([path])
+        return True
+
+
+class TestGNSSBundleDrain(unittest.TestCase):
+    def setUp(self):
+        self.gnss = GNSS(search_rate=1)
+        self.tmp = tempfile.TemporaryDirectory()
+        self.gnss.logs_dir = self.tmp.name
+        for utc_id in range(1, 7):
+            self.gnss.create_gnss_json({"f": [{"utc": utc_id}]}, unique_id=utc_id)
+        self.gnss.transmit_backlog = list(range(1, 7))
+
+    def tearDown(self):
+        if self.gnss.queue is not None:
+            self.gnss.queue.close()
+        self.tmp.cleanup()
+
+    def test_packs_up_to_limit(self):
+        size = bundle_entry_size(1, b'{"f":[{"utc":1}]}')
+        cell = FakeBundleCell(bundle_max_bytes=3 * size)
+        result = self.gnss.drain_backlog(cell, time_budget=10)
+        self.assertEqual([[i for i, _ in b] for b in cell.bundles], [[1, 2, 3], [4, 5, 6]])
+        self.assertEqual((result['sent'], result['uploads'], result['remaining']), (6, 2, 0))
+        self.assertEqual(os.listdir(self.tmp.name), [])
+
+    def test_partial_ack_keeps_order(self):
+        os.remove(os.path.join(self.tmp.name, 'gnss_4.json'))
+        cell = FakeBundleCell(bundle_max_bytes=4096, reject={2, 5})
+        result = self.gnss.drain_backlog(cell, time_budget=10, max_failures=1)
+        self.assertEqual((result['sent'], result['missing'], result['failed']), (3, 1, 1))
+        self.assertEqual(self.gnss.transmit_backlog, [2, 5])
+        self.assertEqual(sorted(os.listdir(self.tmp.name)), ['gnss_2.json', 'gnss_5.json'])
+        cell.reject = set()
+        result = self.gnss.drain_backlog(cell, time_budget=10)
+        self.assertEqual([i for i, _ in cell.bundles[-1]], [2, 5])
+        self.assertEqual(self.gnss.transmit_backlog, [])
+
+    def test_single_entry_and_disabled_bundles_use_send_file(self):
+        self.gnss.transmit_backlog = [1]
+        cell = FakeBundleCell(bundle_max_bytes=4096)
+        self.gnss.drain_backlog(cell, time_budget=10)
+        self.assertEqual(cell.bundles, [[os.path.join(self.tmp.name, 'gnss_1.json')]])
+        self.gnss.transmit_backlog = [2, 3]
+        cell = FakeBundleCell(bundle_max_bytes=0)
+        self.gnss.drain_backlog(cell, time_budget=10)
+        self.assertEqual(len(cell.bundles), 2)
+
+    def test_byte_budget_stops_bundles(self):
+        size = len(b'{"f":[{"utc":1}]}')
+        cell = FakeBundleCell(bundle_max_bytes=2 * bundle_entry_size(1, b'{"f":[{"utc":1}]}'))
+        clock = itertools.count().__next__  # one second per call: a spin would use the 100 s budget up
+        result = self.gnss.drain_backlog(cell, time_budget=100, byte_budget=3 * size, clock=clock)
+        self.assertEqual([[i for i, _ in b] for b in cell.bundles], [[1, 2], [3]])
+        self.assertEqual((result['sent'], result['uploads'], result['remaining']), (3, 2, 3))
+        self.assertLess(result['time_used'], 20)
+
+    def test_byte_budget_stops_segment_queue_bundles(self):
+        self.gnss.use_segment_queue()
+        size = len(b'{"f":[{"utc":1}]}')
+        cell = FakeBundleCell(bundle_max_bytes=2 * bundle_entry_size(1, b'{"f":[{"utc":1}]}'))
+        clock = itertools.count().__next__
+        result = self.gnss.drain_backlog(cell, time_budget=100, byte_budget=3 * size, clock=clock)
+        self.assertEqual([[i for i, _ in b] for b in cell.bundles], [[1, 2], [3]])
+        self.assertEqual((result['sent'], result['uploads'], result['remaining']), (3, 2, 3))
+        self.assertLess(result['time_used'], 20)
+
+    def test_segment_queue_acks_in_order(self):
+        self.gnss.use_segment_queue()
+        cell = FakeBundleCell(bundle_max_bytes=4096, reject={3})
+        result = self.gnss.drain_backlog(cell, time_budget=10, max_failures=1)
+        self.assertEqual((result['sent'], result['failed']), (2, 1))
+        self.assertEqual(list(self.gnss.transmit_backlog), [3, 4, 5, 6])  # 4-6 go again with 3
+        cell.reject = set()
+        self.gnss.drain_backlog(cell, time_budget=10)
+        self.assertEqual([i for i, _ in cell.bundles[-1]], [3, 4, 5, 6])
+        self.assertEqual(len(self.gnss.transmit_backlog), 0)
+
+
+class TestGNSSSendObserver(unittest.TestCase):
+    def test_drain_reports_every_attempt(self):
+        gnss = GNSS(search_rate=1)
+        with tempfile.TemporaryDirectory() as tmp:
+            gnss.logs_dir = tmp
+            for utc_id in (1, 2):
+                gnss.create_gnss_json({"f": [{"utc": utc_id}]}, unique_id=utc_id)
+            gnss.transmit_backlog = [1, 2]
+            seen = []
+            gnss.send_observer = lambda ok, seconds: seen.append(ok)
+            cell = MagicMock()
+            cell.send_file.side_effect = [False, True, True]
+            gnss.drain_backlog(cell, time_budget=10)
+            self.assertEqual(seen, [False, True, True])
+            gnss.send_observer = MagicMock(side_effect=RuntimeError("observer"))
+            gnss.create_gnss_json({"f": [{"utc": 3}]}, unique_id=3)
+            gnss.transmit_backlog = [3]
+            cell.send_file.side_effect = None
+            cell.send_file.return_value = True
+            self.assertEqual(gnss.drain_backlog(cell, time_budget=10)['sent'], 1)
+
+
+class TestGNSSSegmentQueue(unittest.TestCase):
+    def setUp(self):
+        self.gnss = GNSS(search_rate=1)
+        self.tmp = tempfile.TemporaryDirectory()
+        self.gnss.logs_dir = self.tmp.name
+
+    def tearDown(self):
+        if self.gnss.queue is not None:
+            self.gnss.queue.close()
+        self.tmp.cleanup()
+
+    def test_migrates_files_and_drains_in_order(self):
+        self.gnss.create_gnss_json({"f": [{"utc": 1}]}, unique_id=1)
+        self.gnss.transmit_backlog = [1]
+        self.assertTrue(self.gnss.use_segment_queue())
+        self.assertFalse(os.path.exists(os.path.join(self.tmp.name, 'gnss_1.json')))
+        self.gnss.create_gnss_json({"f": [{"utc": 2}]}, unique_id=2)
+        self.gnss.add_to_transmit_backlog(2)  # no-op: already queued
+        self.assertEqual(list(self.gnss.transmit_backlog), [1, 2])
+
+        payloads = []
+        cell = MagicMock()
+        cell.send_file.side_effect = lambda path: payloads.append(open(path).read()) or True
+        self.assertTrue(self.gnss.send_gnss_json(2, cell, last_gnss_time=time.time()))
+        self.assertEqual(payloads, ['{"f":[{"utc":1}]}', '{"f":[{"utc":2}]}'])
+        self.assertEqual(len(self.gnss.transmit_backlog), 0)
+
+    def test_batch_without_last_time_is_queued(self):
+        self.gnss.use_segment_queue()
+        batch = {"f": [{"utc": 1756813036 + i} for i in range(4)] + [{"utc": None}]}
+        utc_id = self.gnss.batch_id(batch)
+        self.assertTrue(self.gnss.create_gnss_json(batch, unique_id=utc_id))
+        self.assertEqual(list(self.gnss.transmit_backlog), [1756813039])
+
+    def test_failed_send_survives_restart(self):
+        self.gnss.use_segment_queue()
+        for utc_id in (5, 6):
+            self.gnss.create_gnss_json({"f": [{"utc": utc_id}]}, unique_id=utc_id)
+        cell = MagicMock()
+        cell.send_file.side_effect = [True, False]
+        result = self.gnss.drain_backlog(cell, time_budget=10, max_failures=1)
+        self.assertEqual((result['sent'], result['failed'], result['remaining']), (1, 1, 1))
+        self.gnss.queue.close()
+
+        restarted = GNSS(search_rate=1)
+        restarted.logs_dir = self.tmp.name
+        restarted.use_segment_queue()
+        self.assertEqual(list(restarted.transmit_backlog), [6])
+        restarted.remove_from_transmit_backlog(6)
+        self.assertEqual(len(restarted.transmit_backlog), 0)
+        restarted.queue.close()
+
+
 class TestGNSSTempSendCurrentPosition(unittest.TestCase):
     def setUp(self):
         self.gnss = GNSS(search_rate=1)
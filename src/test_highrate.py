@@ -0,0 +1,160 @@
+#### for running in vscode (comment out when on Raspberry Pi)
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+####
+
+import unittest
+import math
+import tempfile
+from src import nmea
+from src.fixlog import FixLog
+from src.gps import GNSS, FIX_KEYS
+from src.highrate import FixRing, Decimator, HighRateTracker, fix_dict, TRACK_HEADER
+from src.fake_nmea_stream import FakeNMEAStream, START_UTC
+from src.fake_clock import FakeClock
+
+
+def values(utc):
+    return (utc, -34.1, 18.4, 78.7, 12.5, 90.0, 1, 0.7, 18)
+
+
+class TestFixRing(unittest.TestCase):
+    def test_rows_wrap_and_lost(self):
+        ring = FixRing(4)
+        self.assertIsNone(ring.latest())
+        for i in range(3):
+            ring.push(values(float(i)))
+        rows, seq, lost = ring.rows(0)
+        self.assertEqual(([r[0] for r in rows], seq, lost), ([0.0, 1.0, 2.0], 3, 0))
+        for i in range(3, 10):
+            ring.push(values(float(i)))
+        rows, seq, lost = ring.rows(seq)  # 3..9 pushed, only 6..9 still in the ring
+        self.assertEqual(([r[0] for r in rows], seq, lost), ([6.0, 7.0, 8.0, 9.0], 10, 3))
+        self.assertEqual(ring.rows(seq), ([], 10, 0))
+        self.assertEqual(len(ring), 4)
+        self.assertEqual(ring.latest()[0], 9.0)
+
+    def test_missing_values_are_nan(self):
+        ring = FixRing(2)
+        ring.push((1.0, None, None, None, None, None, 0, None, 0))
+        self.assertTrue(math.isnan(ring.latest()[1]))
+        self.assertEqual(fix_dict(ring.latest()), {'utc': 1, 'lat': None, 'lon': None, 'alt': None, 'sog': None,
+                                                   'cog': None, 'fx': 0, 'hdop': None, 'nsat': 0})
+
+
+class TestDecimator(unittest.TestCase):
+    def test_every_nth(self):
+        decimator = Decimator(every=3)
+        self.assertEqual([decimator.accept(float(i)) for i in range(7)],
+                         [False, False, True, False, False, True, False])
+
+    def test_time_slots_are_aligned(self):
+        decimator = Decimator(interval=1.0)
+        utcs = [START_UTC + 0.3 + i / 10 for i in range(30)]
+        picked = [u for u in utcs if decimator.accept(u)]
+        self.assertEqual([round(u, 2) for u in picked], [START_UTC + 0.3, START_UTC + 1.0, START_UTC + 2.0, START_UTC + 3.0])
+        # a gap does not shift the picks: the first fix after it starts its slot
+        self.assertTrue(decimator.accept(START_UTC + 5.4))
+        self.assertFalse(decimator.accept(START_UTC + 5.9))
+        self.assertTrue(decimator.accept(START_UTC + 6.0))
+
+
+class TestParseEpochs(unittest.TestCase):
+    def test_pairs_rmc_and_gga_by_time(self):
+        stream = FakeNMEAStream(hz=10)
+        data = b''.join(stream.epoch_sentences(n) for n in range(3))
+        epochs = nmea.parse_epochs(nmea.NMEAFramer().feed(data))
+        self.assertEqual([round(e[0] - START_UTC, 2) for e in epochs], [0.0, 0.1, 0.2])
+        for e in epochs:
+            self.assertEqual((e[6], e[8], e[7]), (1, 18, 0.7))  # from the GGA of the same epoch
+            self.assertAlmostEqual(e[4], 12.5)
+
+    def test_rmc_without_gga(self):
+        data = FakeNMEAStream(hz=10).epoch_sentences(5)
+        rmc_only = [line for line in nmea.NMEAFramer().feed(data) if nmea.sentence_type(line) == nmea.RMC]
+        (epoch,) = nmea.parse_epochs(rmc_only)
+        self.assertAlmostEqual(epoch[0], START_UTC + 0.5)
+        self.assertEqual(epoch[6:], (None, None, None))
+
+
+class TestHighRateTracker(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, 'track.csv')
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_full_rate_track_and_decimated_uplink(self):
+        clock = FakeClock(1000.0)
+        stream = FakeNMEAStream(hz=10, clock=clock)
+        track = FixLog(self.path, header=TRACK_HEADER, compress=False)
+        tracker = HighRateTracker(stream.get_all_gnss, hz=10, ring_size=100, track=track, clock=clock)
+        for _ in range(50):  # 5 s, polled on every epoch
+            tracker.poll()
+            clock.t += 0.1
+        tracker.poll()
+        tracker.flush()
+        track.close()
+        self.assertEqual(tracker.fixes, 51)
+        uplink = tracker.take_uplink()
+        self.assertEqual([f['utc'] for f in uplink], [int(START_UTC) + i for i in range(6)])
+        self.assertEqual(set(uplink[0]), set(FIX_KEYS))
+        self.assertEqual(tracker.take_uplink(), [])
+        with open(self.path) as f:
+            lines = f.read().splitlines()
+        self.assertEqual(lines[0], TRACK_HEADER)
+        self.assertEqual(len(lines), 52)
+        self.assertEqual(lines[2].split(',')[0], '%.2f' % (START_UTC + 0.1))
+        self.assertLess(track.blocks, 10)  # one write per flush interval, not per fix
+
+    def test_slow_polls_keep_every_epoch_and_drop_rereads(self):
+        clock = FakeClock(1000.0)
+        stream = FakeNMEAStream(hz=10, clock=clock)
+        chunks = []
+
+        def read():  # re-delivers the previous read each time, like an unrefreshed module buffer
+            data = stream.get_all_gnss()
+            out = b''.join(chunks[-1:]) + data
+            chunks.append(data)
+            return out
+
+        tracker = HighRateTracker(read, hz=10, ring_size=100, clock=clock)
+        for _ in range(10):
+            tracker.poll()
+            clock.t += 0.35  # several epochs per read
+        rows, _, lost = tracker.ring.rows(0)
+        utcs = [round(r[0] - START_UTC, 2) for r in rows]
+        self.assertEqual(utcs, [round(n / 10, 2) for n in range(len(utcs))])  # none missed, none twice
+        self.assertGreater(tracker.duplicates, 0)
+        self.assertEqual(tracker.fixes, stream.epoch)
+        stats = tracker.stats()
+        self.assertEqual((stats["fixes"], stats["lost"]), (stream.epoch, 0))
+
+
+class TestGNSSHighRate(unittest.TestCase):
+    def test_get_gnss_dict_returns_newest_and_backfill(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            clock = FakeClock(1000.0)
+            stream = FakeNMEAStream(hz=10, clock=clock)
+            gnss = GNSS(search_rate=2)
+            gnss.high_rate = HighRateTracker(stream.get_all_gnss, hz=10, clock=clock,
+                                             track=FixLog(os.path.join(tmp, 'track.csv'), header=TRACK_HEADER))
+            self.assertEqual(gnss.get_gnss_dict(), dict.fromkeys(FIX_KEYS))
+            for _ in range(25):
+                gnss.high_rate.poll()
+                clock.t += 0.1
+            fix = gnss.get_gnss_dict()
+            self.assertEqual(fix['utc'], int(START_UTC) + 2)
+            self.assertEqual([f['utc'] for f in gnss.uplink_backfill], [int(START_UTC), int(START_UTC) + 1])
+            self.assertTrue(gnss.last_fix_new)
+            fix = gnss.get_gnss_dict()  # nothing decimated since: no fix, not the last one again
+            self.assertEqual((fix, gnss.uplink_backfill), (dict.fromkeys(FIX_KEYS), []))
+            self.assertFalse(gnss.last_fix_new)
+            gnss.stop_high_rate()
+            self.assertIsNone(gnss.high_rate)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,122 @@
+#### for running in vscode (comment out when on Raspberry Pi)
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+####
+
+import unittest
+import json
+import socket
+import tempfile
+from src.httpsession import HTTPSession
+from src.fake_ingest import FakeIngestServer
+from src.cellular import Cellular
+from src.gps import GNSS
+from src.fake_clock import FakeClock
+
+
+def batch(i):
+    return json.dumps({"f": [{"utc": 1756813036 + i}]}).encode()
+
+
+class TestHTTPSession(unittest.TestCase):
+    def setUp(self):
+        self.server = FakeIngestServer().start()
+
+    def tearDown(self):
+        self.server.stop()
+
+    def test_keepalive_reuses_one_connection(self):
+        session = HTTPSession(self.server.url)
+        for i in range(5):
+            self.assertEqual(session.post(batch(i)), b'{"ok":true}')
+        session.close()
+        self.assertEqual((self.server.connections, self.server.requests), (1, 5))
+        stats = session.stats()
+        self.assertEqual((stats['connects'], stats['requests'], stats['failures']), (1, 5, 0))
+        self.assertGreater(stats['bytes_sent'], 5 * len(batch(0)))
+
+    def test_without_keepalive_connects_per_request(self):
+        session = HTTPSession(self.server.url, keepalive=False)
+        for i in range(3):
+            self.assertIsNotNone(session.post(batch(i)))
+        self.assertFalse(session.connected)
+        self.assertEqual(self.server.connections, 3)
+
+    def test_pipelined_answers_in_order(self):
+        session = HTTPSession(self.server.url, pipeline=4)
+        bundles = [b'{"b":[{"id":%d,"d":{}}]}' % i for i in range(6)]
+        answers = session.post_many(bundles)
+        self.assertEqual([json.loads(a)["ack"] for a in answers], [[i] for i in range(6)])
+        self.assertEqual(self.server.connections, 1)
+        session.close()
+
+    def test_reconnects_when_server_closes(self):
+        self.server.max_requests_per_connection = 2
+        session = HTTPSession(self.server.url)
+        self.assertTrue(all(session.post_many([batch(i) for i in range(5)])))
+        self.assertEqual((session.connects, self.server.requests), (3, 5))
+        session.close()
+
+    def test_no_content_answer_keeps_connection(self):
+        self.server.no_content = True
+        session = HTTPSession(self.server.url, timeout=2)
+        for i in range(3):
+            self.assertEqual(session.post(batch(i)), b"")
+        self.assertTrue(session.connected)
+        self.assertEqual((self.server.connections, session.failures), (1, 0))
+        session.close()
+
+    def test_backoff_when_unreachable(self):
+        with socket.socket() as s:
+            s.bind(('127.0.0.1', 0))
+            port = s.getsockname()[1]  # nothing listens here once closed
+        clock = FakeClock()
+        session = HTTPSession(f"http://127.0.0.1:{port}/ingest", timeout=1, backoff=2, clock=clock)
+        self.assertIsNone(session.post(batch(0)))
+        self.assertIsNone(session.post(batch(1)))  # within the backoff: no new attempt
+        self.assertEqual(session.connect_failures, 1)
+        clock.t += 2
+        self.assertIsNone(session.post(batch(2)))
+        self.assertEqual(session.connect_failures, 2)
+        clock.t += 2  # the delay doubled to 4 s
+        session.post(batch(3))
+        self.assertEqual(session.connect_failures, 2)
+
+    def test_rejects_unknown_scheme(self):
+        with self.assertRaises(ValueError):
+            HTTPSession("ftp://example.com/ingest")
+
+
+class TestCellularHTTP(unittest.TestCase):
+    def test_files_and_bundles_over_one_connection(self):
+        with FakeIngestServer(reject={2}) as server, tempfile.TemporaryDirectory() as tmp:
+            cell = Cellular(endpoint=server.url, pipeline=2)
+            paths = []
+            for i in range(3):
+                paths.append(os.path.join(tmp, f"gnss_{i}.json"))
+                with open(paths[-1], 'wb') as f:
+                    f.write(batch(i))
+            self.assertTrue(cell.send_file(paths[0]))
+            self.assertEqual(cell.send_many(paths[1:]), [True, True])
+            self.assertEqual(cell.send_bundle([(1, b'{}'), (2, b'{}'), (3, b'{}')]), [1, 3])
+            cell.close()
+            self.assertEqual((server.connections, server.requests), (1, 4))
+            self.assertEqual(cell.stats()['requests'], 4)
+
+    def test_backlog_files_pipelined_without_bundles(self):
+        with FakeIngestServer() as server, tempfile.TemporaryDirectory() as tmp:
+            gnss = GNSS(search_rate=1)
+            gnss.logs_dir = tmp
+            for i in range(5):
+                gnss.create_gnss_json(json.loads(batch(i)), unique_id=i + 1)
+            gnss.transmit_backlog = [1, 2, 3, 4, 5]
+            cell = Cellular(bundle_max_bytes=0, endpoint=server.url, pipeline=4)
+            result = gnss.drain_backlog(cell, time_budget=10)
+            cell.close()
+            self.assertEqual((result['sent'], result['remaining']), (5, 0))
+            self.assertEqual((server.connections, server.requests), (1, 5))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,177 @@
+#### for running in vscode (comment out when on Raspberry Pi)
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+####
+
+import unittest
+from src.lora import (LoRaPositionCodec, LoRaScheduler, PACKET_BYTES, DUTY_WINDOW, time_on_air, channel_capacity,
+                      sub_band, POSITION_HEADROOM)
+from src.fake_radio import FakeLoRaRadio
+from src.gps import GNSS_lora
+from src.fake_clock import FakeClock
+
+FIX = {'utc': 1756813036, 'lat': -34.139425, 'lon': 18.39277, 'alt': 30.8, 'sog': 12.5, 'cog': 57.4,
+       'fx': 1, 'hdop': 0.7, 'nsat': 18}
+
+
+class TestLoRaPositionCodec(unittest.TestCase):
+    def setUp(self):
+        self.codec = LoRaPositionCodec(-34.1, 18.4, origin_time=1756800000)
+
+    def test_round_trip_within_quantization(self):
+        packet = self.codec.encode(FIX, device_id=4095, seq=300)
+        self.assertEqual(len(packet), PACKET_BYTES)
+        got = self.codec.decode(packet)
+        self.assertEqual((got['device'], got['seq'], got['utc']), (4095, 300 & 0xFF, FIX['utc']))
+        self.assertAlmostEqual(got['lat'], FIX['lat'], delta=0.5e-5)
+        self.assertAlmostEqual(got['lon'], FIX['lon'], delta=0.5e-5)
+        self.assertAlmostEqual(got['sog'], FIX['sog'], delta=0.125 * 3600 / 1852)
+        self.assertAlmostEqual(got['cog'], FIX['cog'], delta=360 / 128)
+        self.assertEqual((got['fx'], got['hdop']), (1, 1.0))
+
+    def test_time_unwrapped_with_receive_time(self):
+        later = dict(FIX, utc=FIX['utc'] + 5 * 86400)  # several 2^17 s wraps after the origin
+        packet = self.codec.encode(later, 1, 0)
+        self.assertNotEqual(self.codec.decode(packet)['utc'], later['utc'])
+        self.assertEqual(self.codec.decode(packet, ref_time=later['utc'] + 3)['utc'], later['utc'])
+
+    def test_no_fix_quality_and_saturation(self):
+        got = self.codec.decode(self.codec.encode(dict(FIX, fx=0, sog=500, cog=359.9), 1, 0))
+        self.assertEqual((got['fx'], got['hdop'], got['cog']), (0, None, 0.0))
+        self.assertAlmostEqual(got['sog'], 31.75 * 3600 / 1852, places=1)
+
+    def test_rejects_bad_input(self):
+        with self.assertRaises(ValueError):
+            self.codec.encode(dict(FIX, lat=-36.0), 1, 0)  # outside the venue range
+        with self.assertRaises(ValueError):
+            self.codec.encode(dict(FIX, lat=None), 1, 0)
+        with self.assertRaises(ValueError):
+            self.codec.encode(FIX, 4096, 0)
+        with self.assertRaises(ValueError):
+            self.codec.decode(b'\x00' * PACKET_BYTES)  # version 0
+        with self.assertRaises(ValueError):
+            self.codec.decode(b'\x10' * 11)
+
+
+class TestAirtime(unittest.TestCase):
+    def test_reference_values(self):
+        # Semtech LoRa calculator, BW 125 kHz, CR 4/5, 8 symbol preamble, explicit header, CRC on
+        self.assertAlmostEqual(time_on_air(12, sf=7), 0.041216, places=6)
+        self.assertAlmostEqual(time_on_air(12, sf=12), 1.155072, places=6)
+        self.assertAlmostEqual(time_on_air(60, sf=7), 0.112896, places=6)
+
+    def test_channel_capacity(self):
+        cap = channel_capacity(time_on_air(12, sf=7), interval=10)
+        self.assertEqual(cap['riders'], 44)
+        self.assertAlmostEqual(cap['min_interval'], 4.1216, places=4)
+        self.assertTrue(cap['duty_ok'])
+        self.assertFalse(channel_capacity(time_on_air(12, sf=9), interval=10)['duty_ok'])
+
+
+class TestLoRaScheduler(unittest.TestCase):
+    def setUp(self):
+        self.clock = FakeClock(1000.0)
+        self.codec = LoRaPositionCodec(-34.1, 18.4)
+        self.seq = 0
+
+    def encode(self, fix):
+        self.seq += 1
+        return self.codec.encode(fix, 1, self.seq)
+
+    def make(self, sf=7, **options):
+        self.radio = FakeLoRaRadio(self.clock, sf=sf)
+        return LoRaScheduler(self.radio, self.encode, sf=sf, clock=self.clock, **options)
+
+    def ride(self, sched, seconds, step=2):
+        actions = []
+        for i in range(int(seconds / step)):
+            actions.append(sched.tick(dict(FIX, utc=FIX['utc'] + int(self.clock.t))))
+            self.clock.t += step
+        return actions
+
+    def test_sub_bands(self):
+        self.assertEqual(sub_band(868.1), ('g1', 0.01))
+        self.assertEqual(sub_band(869.525), ('g3', 0.1))
+        with self.assertRaises(ValueError):
+            sub_band(915.0)
+
+    def test_stays_within_duty_cycle_for_hours(self):
+        for sf in (7, 10, 12):
+            sched = self.make(sf=sf, position_interval=0)  # the legal minimum
+            self.ride(sched, 3 * 3600)
+            self.assertLessEqual(self.radio.max_window_airtime(), 0.01 * DUTY_WINDOW + 1e-9)
+            report = sched.report()
+            # the live position keeps up with the legal rate (to within the 2 s GNSS interval)
+            self.assertLessEqual(report['achieved_interval'], report['legal_interval'] + 2)
+            # and uses the airtime that rounding to whole GNSS intervals leaves
+            self.assertAlmostEqual(report['usage'], report['legal_interval'] / report['achieved_interval'], delta=0.05)
+
+    def test_spare_airtime_goes_to_backlog(self):
+        sched = self.make(position_interval=30, burst=0.1)
+        sched.backlog.extend(dict(FIX, utc=FIX['utc'] - i) for i in (30, 20, 10))
+        actions = self.ride(sched, 120)
+        self.assertEqual(actions[0], 'position')
+        self.assertEqual(actions.count('backlog'), 3)
+        self.assertEqual(actions.count('position'), 4)
+        self.assertEqual(len(sched.backlog), 0)
+
+    def test_default_interval_leaves_airtime_for_missed_positions(self):
+        sched = self.make()
+        self.assertAlmostEqual(sched.position_interval, sched.legal_interval * POSITION_HEADROOM)
+        sched.backlog.extend(dict(FIX, utc=FIX['utc'] - i) for i in (30, 20, 10))
+        self.ride(sched, 2 * 3600)
+        self.assertLessEqual(self.radio.max_window_airtime(), 0.01 * DUTY_WINDOW + 1e-9)
+        self.assertEqual((sched.backlog_sent, sched.missed, len(sched.backlog)), (3, 0, 0))
+
+    def test_legal_minimum_interval_does_not_queue_missed(self):
+        sched = self.make(sf=12, position_interval=0)
+        self.ride(sched, 600)
+        self.assertFalse(sched.resend_missed)
+        self.assertEqual((len(sched.backlog), sched.backlog_sent), (0, 0))
+        self.assertEqual(sched.missed, sched.dropped)
+
+    def test_missed_positions_are_queued_once_per_interval(self):
+        sched = self.make(sf=12, backlog_size=2)  # 1.16 s packets: one per 116 s at 1%
+        actions = self.ride(sched, 600)
+        self.assertEqual(sched.missed, sched.dropped + len(sched.backlog) + sched.backlog_sent)
+        self.assertLessEqual(len(sched.backlog), 2)
+        self.assertEqual(len(self.radio.sent), actions.count('position') + actions.count('backlog'))
+        self.assertEqual(self.seq, len(self.radio.sent))  # only sent packets use a sequence number
+
+    def test_no_fix_sends_backlog_or_nothing(self):
+        sched = self.make()
+        self.assertEqual(sched.tick(dict.fromkeys(FIX)), 'none')
+        self.assertEqual(sched.report()['positions_sent'], 0)
+
+
+class TestGNSSLoRa(unittest.TestCase):
+    def test_transmit_current_position(self):
+        radio = type('Radio', (), {'sent': [], 'send': lambda self, p: self.sent.append(p)})()
+        gnss = GNSS_lora(lora_config={'device_id': 7, 'spreading_factor': 9,
+                                      'origin': {'lat': -34.1, 'lon': 18.4, 'time': 0}})
+        gnss.radio = radio
+        first = gnss.transmit_current_position(FIX)
+        gnss.transmit_current_position(FIX)
+        self.assertEqual(radio.sent[0], first)
+        got = [gnss.lora_codec.decode(p, ref_time=FIX['utc']) for p in radio.sent]
+        self.assertEqual([(g['device'], g['seq'], g['utc']) for g in got], [(7, 0, FIX['utc']), (7, 1, FIX['utc'])])
+        self.assertAlmostEqual(gnss.lora_airtime, time_on_air(PACKET_BYTES, sf=9))
+        self.assertIsNone(gnss.transmit_current_position(dict.fromkeys(FIX)))
+
+    def test_scheduled_transmit(self):
+        clock = FakeClock(1000.0)
+        gnss = GNSS_lora(lora_config={'frequency_mhz': 868.1, 'spreading_factor': 7, 'position_interval': 10})
+        gnss.radio = FakeLoRaRadio(clock)
+        self.assertTrue(gnss.start_lora_scheduler(clock=clock))
+        sent = []
+        for i in range(15):
+            sent.append(gnss.transmit_current_position(dict(FIX, utc=FIX['utc'] + 2 * i)))
+            clock.t += 2
+        self.assertEqual(sum(p is not None for p in sent), 3)  # one per 10 s
+        self.assertEqual(len(gnss.radio.sent), 3)
+        self.assertEqual(gnss.lora_scheduler.report()['position_interval'], 10)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,82 @@
+#### for running in vscode (comment out when on Raspberry Pi)
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+####
+
+import unittest
+import tempfile
+import json
+from unittest.mock import patch
+from src.metrics import Histogram, Metrics
+from src.gps import GNSS
+from src.cellular import Cellular
+
+
+class TestHistogram(unittest.TestCase):
+    def test_buckets_and_quantiles(self):
+        hist = Histogram()
+        self.assertEqual(hist.quantile(0.5), 0.0)
+        for seconds in [0.0000005] + [0.001] * 8 + [0.5]:  # 0.5 us, 1 ms (in [512, 1024) us), 0.5 s
+            hist.add(seconds)
+        summary = hist.summary()
+        self.assertEqual(summary["le_us"], {"1": 1, "1024": 8, "524288": 1})
+        self.assertEqual((summary["n"], summary["max_ms"]), (10, 500.0))
+        self.assertEqual(summary["p50_ms"], 1.024)  # bucket upper bound, within 2x of 1 ms
+        self.assertEqual(summary["p99_ms"], 500.0)  # capped at the max
+        self.assertAlmostEqual(summary["mean_ms"], 50.8, places=3)
+
+    def test_huge_values_land_in_the_last_bucket(self):
+        hist = Histogram()
+        hist.add(10_000.0)
+        self.assertEqual(sum(hist.counts), 1)
+        self.assertEqual(hist.counts[-1], 1)
+
+
+class TestMetrics(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, 'metrics.json')
+        self.now = [0.0]
+        self.metrics = Metrics(path=self.path, interval=30, clock=lambda: self.now[0])
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_snapshot_written_every_interval(self):
+        self.metrics.observe('send', 0.25)
+        self.metrics.count('loop_overrun')
+        self.metrics.count('loop_overrun', 2)
+        self.metrics.gauge('backlog', 7)
+        self.assertFalse(self.metrics.maybe_write())
+        self.now[0] = 30.0
+        self.assertTrue(self.metrics.maybe_write())
+        self.assertFalse(self.metrics.maybe_write())
+        with open(self.path) as f:
+            snapshot = json.load(f)
+        self.assertEqual(snapshot["stages"]["send"]["n"], 1)
+        self.assertEqual((snapshot["counters"], snapshot["gauges"], snapshot["uptime"]),
+                         ({"loop_overrun": 3}, {"backlog": 7}, 30.0))
+        self.assertEqual(os.listdir(self.tmp.name), ['metrics.json'])
+
+    def test_gnss_and_cellular_stages(self):
+        gnss = GNSS(search_rate=1, test_mode=True)
+        gnss.logs_dir = self.tmp.name
+        gnss.metrics = self.metrics
+        fix = gnss.get_gnss_dict()
+        gnss.append_gnss_to_log(fix)
+        batch = gnss.append_gnss_dict_send({}, fix)
+        path = gnss.create_gnss_json(batch, unique_id=fix['utc'])
+        gnss.wait_for_send(last_gnss_time=0.0, search_rate=1)  # interval long gone
+        cell = Cellular()
+        cell.metrics = self.metrics
+        with patch.object(cell, '_send_file', return_value=False):
+            self.assertFalse(cell.send_file(path))
+        self.assertEqual(sorted(self.metrics.histograms),
+                         ['acquire', 'batch', 'log', 'parse', 'send', 'serialize', 'wait'])
+        self.assertEqual(self.metrics.counters, {'loop_overrun': 1, 'sends_failed': 1})
+        gnss.fix_log.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,209 @@
+#### for running in vscode (comment out when on Raspberry Pi)
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+####
+
+import unittest
+from datetime import datetime, timezone
+import pynmea2
+from src import nmea
+from src.gps import GNSS, TEST_GNSS_DATA
+
+
+def with_checksum(body):
+    """Wrap a sentence body (no '$'/'*') into a full sentence with a valid checksum."""
+    cs = 0
+    for c in body:
+        cs ^= ord(c)
+    return f"${body}*{cs:02X}"
+
+
+def pynmea2_fix(data):
+    """The original pynmea2 based get_gnss_dict extraction, kept as the reference."""
+    text = ''.join(chr(b) for b in data).replace('\x00', '')
+    rmc = gga = None
+    for line in text.splitlines():
+        if not line.startswith('$'):
+            continue
+        try:
+            msg = pynmea2.parse(line, check=True)
+        except Exception:
+            continue
+        st = getattr(msg, 'sentence_type', '')
+        if st == 'RMC':
+            rmc = msg
+        elif st == 'GGA':
+            gga = msg
+    utc = lat = lon = sog_k = cog = None
+    if rmc:
+        if rmc.datestamp and rmc.timestamp:
+            utc = int(datetime.combine(rmc.datestamp, rmc.timestamp).replace(tzinfo=timezone.utc).timestamp())
+        lat = rmc.latitude
+        lon = rmc.longitude
+        try:
+            sog_k = float(rmc.spd_over_grnd or 0.0)
+        except Exception:
+            sog_k = None
+        try:
+            cog = float(rmc.true_course or 0.0)
+        except Exception:
+            cog = None
+    fx = hdop = nsat = alt = None
+    if gga:
+        try:
+            fx = int(gga.gps_qual or 0)
+        except Exception:
+            fx = 0
+        try:
+            nsat = int(gga.num_sats or 0)
+        except Exception:
+            nsat = 0
+        try:
+            alt = float(gga.altitude or 0.0)
+        except Exception:
+            alt = None
+        try:
+            hdop = float(gga.horizontal_dil or 0.0)
+        except Exception:
+            hdop = None
+    def r(x, n): return None if x is None else round(x, n)
+    return {'utc': utc, 'lat': r(lat, 6), 'lon': r(lon, 6), 'alt': r(alt, 1), 'sog': r(sog_k, 2),
+            'cog': r(cog, 1), 'fx': fx, 'hdop': r(hdop, 1), 'nsat': nsat}
+
+
+def fast_fix(data):
+    """get_gnss_dict on live (non test mode) data fed through a dummy device."""
+    class Dummy:
+        def get_all_gnss(self):
+            return list(data)
+    g = GNSS()
+    g.gnss = Dummy()
+    return g.get_gnss_dict(test_mode=False)
+
+
+class TestChecksum(unittest.TestCase):
+    def test_valid_and_invalid(self):
+        line = with_checksum("GNRMC,113716.000,A,3408.36553,S,01823.56621,E,0.00,57.43,020925,,,A,V").encode()
+        self.assertTrue(nmea.checksum_ok(line))
+        self.assertTrue(nmea.checksum_ok(line + b'\r\n'))
+        self.assertTrue(nmea.checksum_ok(line[:-2] + line[-2:].lower()))
+        self.assertFalse(nmea.checksum_ok(line[:-1] + b'0' if line[-1:] != b'0' else line[:-1] + b'1'))
+        self.assertFalse(nmea.checksum_ok(line.split(b'*')[0]))  # checksum is mandatory
+        self.assertFalse(nmea.checksum_ok(line[:10] + b'X' + line[11:]))
+
+    def test_xor_matches_loop(self):
+        for n in range(0, 100):
+            data = bytes((i * 37 + n) & 0xFF for i in range(n))
+            expected = 0
+            for b in data:
+                expected ^= b
+            self.assertEqual(nmea._xor_bytes(data), expected)
+
+
+class TestParseMatchesPynmea2(unittest.TestCase):
+    def assert_same(self, data):
+        self.assertEqual(fast_fix(data), pynmea2_fix(data))
+
+    def test_recorded_dump(self):
+        self.assert_same(TEST_GNSS_DATA)
+
+    def test_empty(self):
+        self.assert_same([])
+
+    def test_north_west_and_fractional_seconds(self):
+        dump = (with_checksum("GPGGA,235959.750,5130.12345,N,00007.54321,W,2,11,0.9,-12.4,M,47.0,M,,") + "\r\n"
+                + with_checksum("GPRMC,235959.750,A,5130.12345,N,00007.54321,W,12.34,359.99,311299,,,D") + "\r\n")
+        self.assert_same(dump.encode())
+
+    def test_blank_fields(self):
+        dump = (with_checksum("GNGGA,,,,,,0,00,,,M,,M,,") + "\r\n"
+                + with_checksum("GNRMC,,V,,,,,,,,,,N,V") + "\r\n")
+        self.assert_same(dump.encode())
+
+    def test_latest_valid_wins_and_bad_checksum_ignored(self):
+        first = with_checksum("GNRMC,113716.000,A,3408.36553,S,01823.56621,E,1.00,10.0,020925,,,A,V")
+        second = with_checksum("GNRMC,113718.000,A,3408.36600,S,01823.56700,E,2.00,20.0,020925,,,A,V")
+        corrupt = second[:-1] + ('0' if second[-1] != '0' else '1')
+        dump = first + "\r\n" + second + "\r\n" + corrupt + "\r\n"
+        self.assert_same(dump.encode())
+        self.assertEqual(fast_fix(dump.encode())['sog'], 2.0)
+
+    def test_proprietary_sentence_is_not_rmc_or_gga(self):
+        real = with_checksum("GNRMC,113716.000,A,3408.36553,S,01823.56621,E,1.00,10.0,020925,,,A,V")
+        garmin = with_checksum("PGRMC,113718.000,A,3408.36600,S,01823.56700,E,2.00,20.0,020925,,,A,V")
+        dump = (real + "\r\n" + garmin + "\r\n" + with_checksum("PGGAX,1,2,3") + "\r\n").encode()
+        self.assertEqual(nmea.sentence_type(garmin.encode()), b'')
+        self.assertEqual(nmea.latest_rmc_gga(nmea.split_dump(dump))[0], real.encode())
+        self.assert_same(dump)
+        self.assertEqual(fast_fix(dump)['sog'], 1.0)
+
+    def test_nul_padding_and_garbage(self):
+        dump = bytes(TEST_GNSS_DATA[:300]) + b'\x00\x00\xff$$garbage\n' + bytes(TEST_GNSS_DATA[300:])
+        self.assert_same(dump)
+
+    def test_non_numeric_fields(self):
+        dump = (with_checksum("GNGGA,113715.000,3408.36553,S,01823.56620,E,x,ab,?,alt,M,30.8,M,,") + "\r\n"
+                + with_checksum("GNRMC,113716.000,A,3408.36553,S,01823.56621,E,fast,north,020925,,,A,V") + "\r\n")
+        self.assert_same(dump.encode())
+
+
+class TestNMEAFramer(unittest.TestCase):
+    def setUp(self):
+        self.dump = bytes(TEST_GNSS_DATA)
+        self.expected = nmea.split_dump(self.dump)
+
+    def test_whole_dump(self):
+        framer = nmea.NMEAFramer()
+        self.assertEqual(framer.feed(self.dump), self.expected)
+        self.assertEqual(framer.dropped, 0)
+
+    def test_any_split_point_carries_over(self):
+        for cut in range(1, len(self.dump)):
+            framer = nmea.NMEAFramer()
+            out = framer.feed(self.dump[:cut]) + framer.feed(self.dump[cut:])
+            self.assertEqual(out, self.expected, f"cut at {cut}")
+
+    def test_byte_by_byte(self):
+        framer = nmea.NMEAFramer()
+        out = []
+        for b in self.dump:
+            out += framer.feed([b])
+        self.assertEqual(out, self.expected)
+
+    def test_resync_on_garbage(self):
+        framer = nmea.NMEAFramer()
+        noisy = b'\xff\x13junk' + self.dump[:50] + b'\xfe$GN' + self.dump[50:]
+        out = framer.feed(noisy)
+        # the sentence interrupted by garbage is lost, everything after it is recovered
+        self.assertEqual(out, self.expected[1:])
+        self.assertGreater(framer.dropped, 0)
+
+    def test_nul_substituted_newline_drops_only_that_sentence(self):
+        framer = nmea.NMEAFramer()
+        broken = self.dump[:20] + b'\n' + self.dump[21:]  # driver turned a NUL into '\n'
+        self.assertEqual(framer.feed(broken), self.expected[1:])
+
+    def test_type_filter_and_overlong(self):
+        framer = nmea.NMEAFramer(types=(nmea.RMC, nmea.GGA), max_len=120)
+        out = framer.feed(b'$' + b'A' * 300 + self.dump)
+        self.assertEqual([nmea.sentence_type(l) for l in out], [b'GGA', b'RMC'])
+        self.assertEqual(framer.sentences, 2)
+        self.assertEqual(framer.skipped, len(self.expected) - 2)
+
+    def test_get_gnss_dict_completes_sentence_across_reads(self):
+        rmc_at = self.dump.index(b'$GNRMC')
+        reads = [list(self.dump[:rmc_at + 20]), list(self.dump[rmc_at + 20:])]
+        class Dummy:
+            def get_all_gnss(self):
+                return reads.pop(0)
+        g = GNSS()
+        g.gnss = Dummy()
+        first = g.get_gnss_dict(test_mode=False)
+        self.assertIsNone(first['utc'])  # RMC not complete yet
+        second = g.get_gnss_dict(test_mode=False)
+        self.assertEqual(second['lat'], round(-(34 + 8.36553 / 60), 6))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,102 @@
+#### for running in vscode (comment out when on Raspberry Pi)
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+####
+
+import unittest
+from src.DFRobot_GNSS import DFRobot_GNSS_UART, FIX_REGS_LEN, I2C_LAT_1
+from src.fake_serial import FakeGNSSSerial
+from src.gps import GNSS, TEST_GNSS_DATA, FIX_KEYS
+from src.regfix import decode_fix_registers, encode_fix_registers, fixes_agree, RegisterFixReader
+
+
+def make_device():
+    ser = FakeGNSSSerial(bytes(TEST_GNSS_DATA), baudrate=1_000_000, latency=0.0)
+    dev = DFRobot_GNSS_UART(1_000_000, ser=ser)
+    dev.START_GET_SETTLE = 0.0
+    return ser, dev
+
+
+class TestDecode(unittest.TestCase):
+    def test_round_trip(self):
+        regs = encode_fix_registers(1756813036, -34.139426, 18.39277, 78.7, 12.34, 271.5, 18)
+        self.assertEqual(len(regs), FIX_REGS_LEN)
+        self.assertEqual(decode_fix_registers(regs), {'utc': 1756813036, 'lat': -34.139426, 'lon': 18.39277,
+                                                      'alt': 78.7, 'sog': 12.34, 'cog': 271.5, 'fx': 1,
+                                                      'hdop': None, 'nsat': 18})
+
+    def test_no_fix_yet(self):
+        fix = decode_fix_registers(encode_fix_registers(None, None, None, None, None, None, 0))
+        self.assertEqual((fix['utc'], fix['lat'], fix['lon'], fix['fx']), (None, None, None, 0))
+        self.assertEqual(decode_fix_registers(bytes(FIX_REGS_LEN))['utc'], None)
+
+    def test_short_block(self):
+        with self.assertRaises(ValueError):
+            decode_fix_registers([0] * 10)
+
+    def test_matches_the_nmea_path(self):
+        _, dev = make_device()
+        nmea_fix = GNSS(device=dev).read_gnss_dict()
+        fix = decode_fix_registers(dev.get_fix_registers())
+        self.assertEqual(set(fix), set(FIX_KEYS))
+        for key in ('utc', 'lat', 'lon', 'alt', 'sog', 'cog', 'fx', 'nsat'):
+            self.assertEqual(fix[key], nmea_fix[key], key)
+
+    def test_one_request(self):
+        ser, dev = make_device()
+        dev.get_fix_registers()
+        self.assertEqual((ser.requests, ser.bytes_in), (1, FIX_REGS_LEN))
+
+    def test_agreement(self):
+        fix = {'utc': 10, 'lat': 1.0, 'lon': 2.0, 'nsat': 9}
+        self.assertTrue(fixes_agree(fix, dict(fix, lat=1.000004)))
+        self.assertFalse(fixes_agree(fix, dict(fix, lat=1.001)))
+        self.assertFalse(fixes_agree(fix, dict(fix, nsat=8)))
+        self.assertTrue(fixes_agree(fix, dict(fix, utc=11, lat=1.001)))  # refreshed in between
+        self.assertFalse(fixes_agree(fix, dict(fix, utc=50)))
+
+
+class TestRegisterFixReader(unittest.TestCase):
+    def test_crosscheck_cadence_and_hdop(self):
+        ser, dev = make_device()
+        gnss = GNSS(device=dev)
+        self.assertTrue(gnss.use_register_fixes(crosscheck_every=5))
+        ser.requests = 0
+        fixes = [gnss.read_gnss_dict() for _ in range(10)]
+        reader = gnss.register_reader
+        self.assertEqual((reader.reads, reader.crosschecks, reader.mismatches), (10, 2, 0))
+        self.assertEqual([f['hdop'] for f in fixes], [0.7] * 10)  # from the cross-check
+        blocks = -(-len(TEST_GNSS_DATA) // DFRobot_GNSS_UART.ALL_DATA_BLOCK)
+        self.assertEqual(ser.requests, 10 + 2 * (1 + blocks))
+
+    def test_mismatches_fall_back_to_nmea(self):
+        ser, dev = make_device()
+        gnss = GNSS(device=dev)
+        gnss.use_register_fixes(crosscheck_every=1, max_mismatches=2)
+        ser.regs[I2C_LAT_1] += 1  # the registers say one degree further south
+        with self.assertLogs('src.regfix', level='WARNING'):
+            first = gnss.read_gnss_dict()
+            gnss.read_gnss_dict()
+        self.assertEqual(first['lat'], -34.139426)  # the cross-checked read returns the NMEA fix
+        self.assertTrue(gnss.register_reader.disabled)
+        self.assertEqual(gnss.register_reader.stats()['mismatches'], 2)
+        ser.requests = 0
+        gnss.read_gnss_dict()
+        self.assertGreater(ser.requests, 1)  # NMEA dump from now on
+
+    def test_failed_block_read_uses_nmea(self):
+        calls = []
+        reader = RegisterFixReader(type('Dev', (), {'get_fix_registers': lambda self: -1})(),
+                                   lambda: calls.append(1) or {'utc': 1}, crosscheck_every=0)
+        self.assertEqual(reader.read(), {'utc': 1})
+        self.assertEqual((reader.read_errors, len(calls)), (1, 1))
+
+    def test_not_available_in_test_mode(self):
+        gnss = GNSS(test_mode=True)
+        self.assertFalse(gnss.use_register_fixes())
+        self.assertIsNone(gnss.register_reader)
+
+
+if __name__ == '__main__':
+    unittest.main()
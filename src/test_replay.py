@@ -0,0 +1,110 @@
+#### for running in vscode (comment out when on Raspberry Pi)
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+####
+
+import unittest
+import json
+import tempfile
+from src import replay
+from src.replay import NMEAReplay
+from src.gps import GNSS, TEST_GNSS_DATA
+from src.fake_clock import FakeClock
+
+
+def make_track(n, start=1756813036):
+    return [{'utc': start + i, 'lat': round(-34.139425 + i * 1e-5, 6), 'lon': round(18.39277 - i * 2e-5, 6),
+             'alt': 30.8 + i, 'sog': 12.5, 'cog': 57.4, 'fx': 1, 'hdop': 0.7, 'nsat': 18} for i in range(n)]
+
+
+class TestReplayLoaders(unittest.TestCase):
+    def test_recorded_dump_is_one_epoch(self):
+        epochs = replay.load_nmea_log(bytes(TEST_GNSS_DATA))
+        self.assertEqual(len(epochs), 1)
+        self.assertEqual(epochs[0][0], 1756813036.0)
+        self.assertEqual(epochs[0][1].count(b'$'), 16)
+        self.assertEqual(len(replay.load_nmea_log(bytes(TEST_GNSS_DATA) * 3)), 3)
+
+    def test_log_split_per_dump(self):
+        log = b''.join(replay.fix_sentences(fix) + b'$GPTXT,01,01,01,ANTENNA OK*35\r\n' for fix in make_track(3))
+        epochs = replay.load_nmea_log(log)
+        self.assertEqual([t for t, _ in epochs], [1756813036.0, 1756813037.0, 1756813038.0])
+        self.assertTrue(all(dump.count(b'$') == 3 for _, dump in epochs))
+
+    def test_track_file_round_trip_through_gnss(self):
+        track = make_track(5)
+        track[2] = dict.fromkeys(track[2])  # a logged "no fix" line
+        with tempfile.NamedTemporaryFile('w', suffix='.txt', delete=False) as f:
+            f.write(''.join(json.dumps(fix) + '\n' for fix in track) + 'garbage\n')
+        try:
+            device = NMEAReplay.from_file(f.name, speed=0)
+        finally:
+            os.remove(f.name)
+        gnss = GNSS(test_mode=True, device=device)
+        self.assertFalse(gnss.test_mode)
+        self.assertTrue(gnss.boot())
+        got = [gnss.get_gnss_dict(test_mode=False) for _ in track]
+        self.assertEqual(got[:2] + got[3:], track[:2] + track[3:])
+        self.assertIsNone(got[2]['utc'])
+        self.assertEqual(got[2]['fx'], 0)  # blank fields parse the way the module's no-fix output does
+
+
+class TestNMEAReplay(unittest.TestCase):
+    def setUp(self):
+        self.track = make_track(20)
+        self.epochs = replay.load_track(json.dumps(fix) for fix in self.track)
+
+    def test_accelerated_clock(self):
+        clock = FakeClock()
+        device = NMEAReplay(self.epochs, speed=100, clock=clock)
+        self.assertTrue(device.begin())
+        self.assertEqual(device.get_utc().second, 16)  # 11:37:16
+        clock.t += 0.05  # 5 s of recording at 100x
+        gnss = GNSS(device=device)
+        self.assertEqual(gnss.get_gnss_dict()['utc'], self.track[5]['utc'])
+        clock.t += 10  # far past the end: stays on the last epoch
+        self.assertEqual(gnss.get_gnss_dict()['utc'], self.track[-1]['utc'])
+        self.assertTrue(device.finished)
+
+    def test_loop(self):
+        clock = FakeClock()
+        device = NMEAReplay(self.epochs, speed=1, loop=True, clock=clock)
+        device.begin()
+        clock.t += 23  # 20 epochs per lap
+        device.get_all_gnss()
+        self.assertEqual(device.get_utc().second, 19)  # 11:37:16 + 3
+
+    def test_register_getters(self):
+        device = NMEAReplay(self.epochs, speed=0)
+        device.get_all_gnss()
+        fix = self.track[0]
+        lat = device.get_lat()
+        self.assertEqual(lat.lat_direction, 'S')
+        self.assertAlmostEqual(lat.latitude_degree, -fix['lat'], places=6)
+        self.assertEqual(device.get_lon().lon_direction, 'E')
+        self.assertEqual((device.get_num_sta_used(), device.get_alt(), device.get_sog(), device.get_cog()),
+                         (18, 30.8, 12.5, 57.4))
+        self.assertEqual(device.get_date().year, 2025)
+
+    def test_dropout_and_corruption(self):
+        gnss = GNSS(device=NMEAReplay(self.epochs, speed=0, dropout=1.0, seed=1))
+        self.assertIsNone(gnss.get_gnss_dict()['utc'])
+        self.assertEqual(gnss.gnss.dropouts, 1)
+
+        device = NMEAReplay(self.epochs, speed=0, corrupt=1.0, seed=1)
+        gnss = GNSS(device=device)
+        self.assertIsNone(gnss.get_gnss_dict()['lat'])
+        self.assertEqual(device.corrupted, 2)
+        self.assertGreater(gnss.framer.dropped, 0)
+
+    def test_power_off_returns_nothing(self):
+        device = NMEAReplay(self.epochs, speed=0)
+        device.disable_power()
+        self.assertEqual(device.get_all_gnss(), [])
+        device.enable_power()
+        self.assertTrue(device.get_all_gnss())
+
+
+if __name__ == '__main__':
+    unittest.main()
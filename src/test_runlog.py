@@ -0,0 +1,112 @@
+#### for running in vscode (comment out when on Raspberry Pi)
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+####
+
+import unittest
+import tempfile
+import threading
+import logging
+from src.runlog import RateLimitFilter, PrintCapture, RunLog, setup
+
+
+def make_record(msg, level=logging.INFO, name="test"):
+    return logging.LogRecord(name, level, __file__, 0, msg, None, None)
+
+
+class ListHandler(logging.Handler):
+    """Keeps the formatted records; emit() waits on `gate` while it is clear."""
+    def __init__(self):
+        super().__init__()
+        self.lines = []
+        self.gate = threading.Event()
+        self.gate.set()
+
+    def emit(self, record):
+        self.gate.wait(5)
+        self.lines.append(self.format(record))
+
+
+class TestRateLimitFilter(unittest.TestCase):
+    def test_repeats_suppressed_per_window(self):
+        now = [0.0]
+        limit = RateLimitFilter(burst=2, period=60, clock=lambda: now[0])
+        passed = [limit.filter(make_record(f"Cell: send fail. On send attempt {i}")) for i in range(5)]
+        self.assertEqual(passed, [True, True, False, False, False])
+        self.assertTrue(limit.filter(make_record("another message")))
+        self.assertTrue(limit.filter(make_record("Cell: send fail", level=logging.ERROR)))
+        self.assertEqual(limit.suppressed, 3)
+
+        now[0] = 60.0
+        record = make_record("Cell: send fail. On send attempt 9")
+        self.assertTrue(limit.filter(record))
+        self.assertEqual(record.msg, "Cell: send fail. On send attempt 9 [3 similar suppressed]")
+
+
+class TestRunLog(unittest.TestCase):
+    def setUp(self):
+        self.logger = logging.getLogger("test_runlog")
+        self.logger.propagate = False
+        self.handler = ListHandler()
+        self.handler.setFormatter(logging.Formatter("%(levelname)s %(message)s"))
+
+    def test_records_written_by_the_writer_thread(self):
+        run_log = RunLog(self.handler, level="INFO", logger=self.logger)
+        run_log.start(capture_prints=False)
+        self.logger.debug("loop trace %d", 1)
+        self.logger.info("payload %s", [1, 2])
+        self.logger.error("Error in send")
+        run_log.stop()
+        self.assertEqual(self.handler.lines, ["INFO payload [1, 2]", "ERROR Error in send"])
+        self.assertEqual(run_log.stats()["written"], 2)
+        self.assertNotIn(run_log.queue_handler, self.logger.handlers)
+
+    def test_full_queue_drops_instead_of_blocking(self):
+        self.handler.gate.clear()  # a stalled SD card
+        run_log = RunLog(self.handler, queue_size=2, burst=0, logger=self.logger)
+        run_log.start(capture_prints=False)
+        for i in range(10):
+            self.logger.info("fix %d", i)
+        self.assertGreaterEqual(run_log.stats()["dropped"], 7)
+        self.handler.gate.set()
+        run_log.stop()
+        self.assertEqual(len(self.handler.lines) + run_log.stats()["dropped"], 10)
+
+    def test_print_capture(self):
+        records = []
+        self.logger.handlers = []
+        self.logger.setLevel(logging.DEBUG)
+        collect = logging.Handler()
+        collect.emit = records.append
+        self.logger.addHandler(collect)
+        capture = PrintCapture(self.logger)
+        print("Starting Enduro Tracker...", file=capture)
+        print("Error in boot: timeout", file=capture)
+        capture.write("partial ")
+        self.assertEqual(len(records), 2)
+        capture.write("line\n")
+        self.assertEqual([(r.levelno, r.getMessage()) for r in records],
+                         [(logging.INFO, "Starting Enduro Tracker..."), (logging.ERROR, "Error in boot: timeout"),
+                          (logging.INFO, "partial line")])
+        self.logger.removeHandler(collect)
+
+    def test_setup_rotates_by_size(self):
+        root = logging.getLogger()
+        level = root.level
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'runtime.log')
+            run_log = setup({"file": path, "level": "DEBUG", "max_bytes": 2000, "backups": 2,
+                             "rate_limit": {"burst": 0}}, capture_prints=False)
+            for i in range(200):
+                logging.getLogger("src.test").debug("batch %d sent", i)
+            run_log.stop()
+            self.assertEqual(sorted(os.listdir(tmp)), ['runtime.log', 'runtime.log.1', 'runtime.log.2'])
+            self.assertLessEqual(os.path.getsize(path), 2000)
+            with open(path) as f:
+                self.assertTrue(f.read().rstrip().endswith("DEBUG src.test: batch 199 sent"))
+        root.setLevel(level)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,96 @@
+#### for running in vscode (comment out when on Raspberry Pi)
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+####
+
+import unittest
+import json
+import random
+import tempfile
+import numpy as np
+from src.simplify import local_xy, simplify_mask, reconstruction_error, simplify_fixes
+from src.gps import GNSS
+
+M_PER_DEG = 111195.0  # metres per degree of latitude
+
+
+def ride(n, seed=1, noise=1.5):
+    """Fixes every 2 s along straight legs with turns, speed changes and a stop."""
+    rnd = random.Random(seed)
+    lat, lon, heading, fixes = -34.139425, 18.39277, 0.0, []
+    for i in range(n):
+        if i % 40 == 0:
+            heading += rnd.uniform(-1.5, 1.5)
+        speed = 0.0 if 100 <= i % 300 < 110 else 8 + 4 * np.sin(i / 25)
+        lat += speed * 2 * np.cos(heading) / M_PER_DEG
+        lon += speed * 2 * np.sin(heading) / (M_PER_DEG * np.cos(np.radians(lat)))
+        fixes.append({'utc': 1756813036 + 2 * i, 'lat': round(lat + rnd.gauss(0, noise) / M_PER_DEG, 6),
+                      'lon': round(lon + rnd.gauss(0, noise) / M_PER_DEG, 6), 'alt': 30.8, 'sog': speed,
+                      'cog': 0.0, 'fx': 1, 'hdop': 0.7, 'nsat': 18})
+    return fixes
+
+
+class TestSimplify(unittest.TestCase):
+    def test_collinear_constant_speed_keeps_ends(self):
+        t = np.arange(10.0)
+        keep = simplify_mask(t, t * 5, t * 2, tolerance=0.1)
+        self.assertEqual(np.flatnonzero(keep).tolist(), [0, 9])
+
+    def test_stop_on_straight_line_is_kept(self):
+        t = np.arange(7.0)
+        x = np.array([0, 10, 20, 20, 20, 30, 40], dtype=float)  # same line, but a stop
+        keep = simplify_mask(t, x, np.zeros(7), tolerance=1.0)
+        self.assertTrue(keep[2] and keep[4])
+        self.assertLessEqual(reconstruction_error(t, x, np.zeros(7), keep).max(), 1.0)
+
+    def test_error_bound_holds(self):
+        fixes = ride(600)
+        for tolerance in (1.0, 5.0, 20.0):
+            kept, max_error = simplify_fixes(fixes, tolerance)
+            self.assertLessEqual(max_error, tolerance)
+            self.assertEqual((kept[0], kept[-1]), (fixes[0], fixes[-1]))
+            self.assertLess(len(kept), len(fixes))
+            # check the bound independently from the kept fixes
+            t = np.array([f['utc'] for f in fixes], dtype=float)
+            x, y = local_xy([f['lat'] for f in fixes], [f['lon'] for f in fixes])
+            keep = np.isin(t, [f['utc'] for f in kept])
+            self.assertLessEqual(reconstruction_error(t, x, y, keep).max(), tolerance + 1e-9)
+
+    def test_projection_scale(self):
+        x, y = local_xy([-34.0, -34.001], [18.0, 18.001])
+        self.assertAlmostEqual(y[1], -111.2, places=1)
+        self.assertAlmostEqual(x[1], 111.2 * np.cos(np.radians(34)), places=1)
+
+    def test_no_fix_entries_are_kept(self):
+        fixes = ride(20)
+        fixes[7] = dict.fromkeys(fixes[7])
+        kept, _ = simplify_fixes(fixes, 50.0)
+        self.assertIn(fixes[7], kept)
+        self.assertIn(fixes[6], kept)  # ends of the runs on either side
+        self.assertIn(fixes[8], kept)
+        self.assertEqual(simplify_fixes(fixes[:2], 50.0)[0], fixes[:2])
+
+
+class TestGNSSSimplify(unittest.TestCase):
+    def test_create_gnss_json_simplifies_and_reports(self):
+        gnss = GNSS()
+        fixes = ride(60)
+        with tempfile.TemporaryDirectory() as tmp:
+            gnss.logs_dir = tmp
+            path = gnss.create_gnss_json({'f': fixes}, unique_id=1)
+            self.assertEqual(len(json.load(open(path))['f']), 60)  # off by default
+            self.assertIsNone(gnss.last_simplify)
+            gnss.simplify_tolerance = 5.0
+            batch = {'f': fixes}
+            path = gnss.create_gnss_json(batch, unique_id=2, compact=True)
+            sent = json.load(open(path))['f']
+        self.assertEqual(len(batch['f']), 60)  # the caller's batch is left alone
+        self.assertEqual(len(sent), gnss.last_simplify['fixes_out'])
+        self.assertLess(gnss.last_simplify['ratio'], 0.5)
+        self.assertLessEqual(gnss.last_simplify['max_error_m'], 5.0)
+        self.assertEqual((sent[0][0], sent[-1][0]), (fixes[0]['utc'], fixes[-1]['utc']))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,74 @@
+#### for running in vscode (comment out when on Raspberry Pi)
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+####
+
+import unittest
+import tempfile
+import json
+import time
+from unittest.mock import patch
+from src.startup import BootTimer, load_config, process_start
+
+
+class TestLoadConfig(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, 'config.yaml')
+        self.cache = os.path.join(self.tmp.name, 'config_cache.json')
+        self.write('{ "global": { "GNSS_SEARCH_RATE": 2, "FAST_BOOT": True } } # comment')
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def write(self, text):
+        with open(self.path, 'w') as f:
+            f.write(text)
+
+    def test_cache_used_until_the_yaml_changes(self):
+        config, cached = load_config(self.path, self.cache)
+        self.assertEqual((config, cached), ({"global": {"GNSS_SEARCH_RATE": 2, "FAST_BOOT": True}}, False))
+        with patch('yaml.safe_load') as safe_load:
+            config, cached = load_config(self.path, self.cache)
+            safe_load.assert_not_called()
+        self.assertEqual((config["global"]["GNSS_SEARCH_RATE"], cached), (2, True))
+        self.write('{ "global": { "GNSS_SEARCH_RATE": 10 } }')
+        config, cached = load_config(self.path, self.cache)
+        self.assertEqual((config["global"]["GNSS_SEARCH_RATE"], cached), (10, False))
+
+    def test_corrupt_cache_is_replaced(self):
+        with open(self.cache, 'w') as f:
+            f.write('{"source": [1,')
+        config, cached = load_config(self.path, self.cache)
+        self.assertFalse(cached)
+        with open(self.cache, 'r') as f:
+            self.assertEqual(json.load(f)["config"], config)
+
+
+class TestBootTimer(unittest.TestCase):
+    def test_process_start_is_in_the_past(self):
+        start = process_start()
+        self.assertLessEqual(start, time.time())
+        self.assertGreater(start, time.time() - 3600)
+
+    def test_marks_and_record(self):
+        now = [100.0]
+        timer = BootTimer(start=99.0, clock=lambda: now[0])
+        timer.mark("config")
+        now[0] = 101.5
+        timer.mark("first_fix")
+        timer.mark("config")  # only the first time counts
+        self.assertEqual(timer.report(), {"config": 1.0, "first_fix": 2.5})
+        with tempfile.TemporaryDirectory() as td:
+            path = os.path.join(td, 'boot_times.jsonl')
+            timer.record(path, fast_boot=True)
+            timer.record(path)
+            with open(path) as f:
+                lines = [json.loads(line) for line in f]
+        self.assertEqual(lines[0], {"start": 99.0, "config": 1.0, "first_fix": 2.5, "fast_boot": True})
+        self.assertEqual(len(lines), 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,125 @@
+#### for running in vscode (comment out when on Raspberry Pi)
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+####
+
+import unittest
+import time
+import threading
+from unittest.mock import patch
+from src.gps import GNSS
+from src.transmit import TransmitWorker
+
+
+class FakeCell:
+    """send_file fails while `up` is False; records what was sent."""
+    def __init__(self, up=True, delay=0.0):
+        self.up = up
+        self.delay = delay
+        self.sent = []
+        self.gate = threading.Event()
+        self.gate.set()
+
+    def send_file(self, path):
+        self.gate.wait()
+        time.sleep(self.delay)
+        if self.up:
+            self.sent.append(os.path.basename(path))
+        return self.up
+
+
+def wait_until(cond, timeout=2.0):
+    end = time.monotonic() + timeout
+    while time.monotonic() < end:
+        if cond():
+            return True
+        time.sleep(0.005)
+    return cond()
+
+
+class TestTransmitWorker(unittest.TestCase):
+    def setUp(self):
+        self.gnss = GNSS(search_rate=1)
+        self.ids = []
+        patcher = patch.object(GNSS, 'update_backlog_file')
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def tearDown(self):
+        self.worker.stop()
+        for utc_id in self.ids:
+            self.gnss.delete_json_file(f"gnss_{utc_id}", os.path.join(os.path.dirname(__file__), '../logs/'))
+
+    def batch(self, utc_id):
+        self.ids.append(utc_id)
+        self.gnss.create_gnss_json({"f": [{"utc": utc_id}]}, unique_id=utc_id)
+        return utc_id
+
+    def test_sends_batches_in_order(self):
+        cell = FakeCell()
+        self.worker = TransmitWorker(self.gnss, cell)
+        self.worker.start()
+        for utc_id in (9000000001, 9000000002, 9000000003):
+            self.worker.submit_batch(self.batch(utc_id))
+        self.assertTrue(wait_until(lambda: self.worker.batches_sent == 3))
+        self.assertEqual(cell.sent, ["gnss_9000000001.json", "gnss_9000000002.json", "gnss_9000000003.json"])
+        self.assertTrue(self.worker.backlog_empty)
+
+    def test_submit_never_blocks_on_slow_link(self):
+        cell = FakeCell()
+        cell.gate.clear()  # link hangs
+        self.worker = TransmitWorker(self.gnss, cell, max_queue=2)
+        self.worker.start()
+        start = time.monotonic()
+        results = [self.worker.submit_batch(self.batch(9000000100 + i)) for i in range(6)]
+        self.assertLess(time.monotonic() - start, 0.2)
+        self.assertIn(False, results)
+        self.assertGreater(self.worker.stats()["batches_deferred"], 0)
+        cell.gate.set()
+        # deferred batches are not lost
+        self.assertTrue(wait_until(lambda: self.worker.batches_sent == 6))
+
+    def test_failed_batches_stay_in_backlog_and_live_position_goes_first(self):
+        cell = FakeCell(up=False)
+        self.worker = TransmitWorker(self.gnss, cell, retry_interval=0.02)
+        self.worker.start()
+        self.worker.submit_batch(self.batch(9000000200))
+        self.assertTrue(wait_until(lambda: self.worker.send_failures >= 2))
+        self.assertEqual(self.gnss.transmit_backlog, [9000000200])
+        self.assertFalse(self.worker.backlog_empty)
+        cell.up = True
+        self.worker.submit_position({"utc": 1, "lat": 0.0})
+        self.assertTrue(wait_until(lambda: self.worker.batches_sent == 1))
+        self.assertEqual(cell.sent, ["tmp_gnss.json", "gnss_9000000200.json"])
+
+    def test_raising_send_backs_off(self):
+        cell = FakeCell()
+        calls = []
+
+        def send_file(path):
+            calls.append(path)
+            raise OSError("file vanished")
+        cell.send_file = send_file
+        self.worker = TransmitWorker(self.gnss, cell, retry_interval=0.1)
+        self.worker.start()
+        self.worker.submit_batch(self.batch(9000000300))
+        time.sleep(0.35)
+        self.assertLessEqual(len(calls), 5)  # one attempt per retry_interval, not a spin
+        self.assertGreaterEqual(self.worker.send_failures, 2)
+        self.assertEqual(self.gnss.transmit_backlog, [9000000300])
+
+    def test_drain_without_progress_backs_off(self):
+        cell = FakeCell()
+        self.worker = TransmitWorker(self.gnss, cell, retry_interval=0.1)
+        result = {'sent': 0, 'failed': 0, 'missing': 0, 'remaining': 1}
+        with patch.object(self.gnss, 'drain_backlog', return_value=result) as drain:
+            self.worker.start()
+            self.worker.submit_batch(self.batch(9000000301))
+            time.sleep(0.35)
+            self.worker.stop()
+        self.assertLessEqual(drain.call_count, 5)
+
+
+if __name__ == '__main__':
+    unittest.main()
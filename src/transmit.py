@@ -0,0 +1,192 @@
+# imports
+import os
+import queue
+import threading
+
+
+class TransmitWorker:
+    """
+    Background thread that owns all `cell.send_file` traffic.
+
+    The main loop only hands over work with submit_batch() / submit_position() and never waits
+    on the network. The worker keeps the GNSS transmit backlog (oldest first) and, while it is
+    not empty, sends the newest live position ahead of it so tracking stays current.
+
+    Batches are never dropped: the JSON file is already on disk, so when the queue is full the
+    batch ID is deferred and merged into the backlog on the worker's next pass. Live positions
+    are only useful while fresh, so a full queue drops them.
+
+    Args:
+        gnss (GNSS): Owner of the backlog and the JSON files.
+        cell (Cellular): Transport with send_file(path) -> bool.
+        max_queue (int): Bound on queued items.
+        retry_interval (float): Seconds to wait before retrying after a failed send.
+        compact (bool): Send live positions in the compact format.
+    """
+
+    def __init__(self, gnss, cell, max_queue=16, retry_interval=2.0, compact=False):
+        self.gnss = gnss
+        self.cell = cell
+        self.retry_interval = retry_interval
+        self.compact = compact
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._deferred = []              # batch IDs that did not fit in the queue
+        self._deferred_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+        self._position = None            # newest live position waiting to be sent
+        # counters
+        self.batches_queued = 0
+        self.batches_deferred = 0
+        self.batches_sent = 0
+        self.positions_sent = 0
+        self.positions_dropped = 0
+        self.send_failures = 0
+
+    def start(self):
+        """Start the worker thread."""
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="transmit-worker", daemon=True)
+            self._thread.start()
+            print("Transmit worker started.")
+
+    def stop(self, timeout=5.0):
+        """Stop the worker thread (a send in progress is allowed to finish)."""
+        self._stop.set()
+        try:
+            self._queue.put_nowait(("stop", None))  # wake the thread if it waits for work
+        except queue.Full:
+            pass  # busy: it sees the stop flag after the current pass
+        if self._thread is not None:
+            self._thread.join(timeout)
+        self._thread = None
+
+    def submit_batch(self, utc_id):
+        """
+        Queue the batch file `gnss_{utc_id}.json` for sending. Never blocks.
+
+        Returns:
+            bool: True if queued, False if deferred because the queue was full.
+        """
+        try:
+            self._queue.put_nowait(("batch", utc_id))
+            self.batches_queued += 1
+            return True
+        except queue.Full:
+            with self._deferred_lock:
+                self._deferred.append(utc_id)
+            self.batches_deferred += 1
+            return False
+
+    def submit_position(self, gnss_dict_current):
+        """
+        Queue the current fix as a live position update. Never blocks.
+
+        Returns:
+            bool: True if queued, False if dropped because the queue was full.
+        """
+        try:
+            self._queue.put_nowait(("position", gnss_dict_current))
+            return True
+        except queue.Full:
+            self.positions_dropped += 1
+            return False
+
+    @property
+    def backlog_empty(self):
+        """True when nothing is queued, deferred or waiting in the GNSS backlog."""
+        return self._queue.empty() and not self._deferred and not self.gnss.transmit_backlog
+
+    def stats(self):
+        """Counters and queue depth as a dict (for logging)."""
+        return {
+            "queue_depth": self._queue.qsize(),
+            "backlog": len(self.gnss.transmit_backlog),
+            "deferred_pending": len(self._deferred),
+            "batches_queued": self.batches_queued,
+            "batches_deferred": self.batches_deferred,
+            "batches_sent": self.batches_sent,
+            "positions_sent": self.positions_sent,
+            "positions_dropped": self.positions_dropped,
+            "send_failures": self.send_failures,
+        }
+
+    # --- worker thread ---
+    def _run(self):
+        wait = None  # block until work arrives
+        while not self._stop.is_set():
+            try:
+                item = self._queue.get(timeout=wait)
+            except queue.Empty:
+                item = None  # retry timer
+            if self._stop.is_set():
+                break
+            try:
+                self._take(item)
+                # pick up anything else already queued before touching the network
+                while True:
+                    try:
+                        self._take(self._queue.get_nowait())
+                    except queue.Empty:
+                        break
+                link_ok = self._send_pending()
+                # on failure retry after retry_interval unless new work arrives first
+                wait = None if link_ok else self.retry_interval
+            except Exception as e:
+                print(f"Error in TransmitWorker: {e}")
+                wait = self.retry_interval
+
+    def _take(self, item):
+        with self._deferred_lock:
+            deferred, self._deferred = self._deferred, []
+        for utc_id in deferred:
+            self.gnss.add_to_transmit_backlog(utc_id)
+        if item is None:
+            return
+        kind, payload = item
+        if kind == "batch":
+            self.gnss.add_to_transmit_backlog(payload)
+        elif kind == "position":
+            if self._position is not None:
+                self.positions_dropped += 1  # superseded before it could be sent
+            self._position = payload
+
+    def _send_pending(self):
+        """Send the live position (only while there is a backlog) and then the backlog, oldest first."""
+        backlog = self.gnss.transmit_backlog
+        if self._position is not None:
+            if backlog:
+                path = self.gnss.create_current_position_json(self._position, compact=self.compact)
+                if not path or not self._send(path):
+                    return False
+                self.positions_sent += 1
+                try:
+                    os.remove(path)
+                except Exception as e:
+                    print(f"Failed to delete temp file after send: {e}")
+            self._position = None
+        ok = True
+        while backlog and not self._stop.is_set():
+            # drain in slices of retry_interval so queued live positions are not starved
+            result = self.gnss.drain_backlog(self.cell, time_budget=self.retry_interval, max_failures=1)
+            self.batches_sent += result['sent']
+            # no progress without a counted failure (e.g. a drain error) also waits retry_interval
+            if result['failed'] or not (result['sent'] or result['missing']):
+                self.send_failures += result['failed']
+                ok = False
+                break
+            if not self._queue.empty():
+                break  # a newer live position may be waiting
+        self.gnss.update_backlog_file(backlog)
+        return ok
+
+    def _send(self, path):
+        try:
+            ok = self.cell.send_file(path)
+        except Exception as e:
+            print(f"Error in TransmitWorker send: {e}")
+            ok = False
+        if not ok:
+            self.send_failures += 1
+        return ok